@@ -0,0 +1,61 @@
+"""Benchmark the co-rating pair counters used by PostSelectionSimilarity.
+
+Compares the 'loop' and 'vectorized' engines on synthetic ratings and checks that they return
+identical pair counts.
+
+Usage (from scoring/src):
+  PYTHONPATH=. python ../benchmarks/pair_counts_benchmark.py --ratings 200000
+"""
+
+import argparse
+import time
+
+from scoring import constants as c
+from scoring.post_selection_similarity import (
+  _get_pair_counts_dict,
+  _get_pair_counts_dict_vectorized,
+)
+
+import numpy as np
+import pandas as pd
+
+
+def make_ratings(numRatings: int, numTweets: int, numRaters: int, seed: int) -> pd.DataFrame:
+  rng = np.random.default_rng(seed)
+  tweetIds = rng.integers(0, numTweets, size=numRatings)
+  return pd.DataFrame(
+    {
+      c.tweetIdKey: tweetIds,
+      c.noteIdKey: tweetIds * 10 + rng.integers(0, 3, size=numRatings),
+      c.raterParticipantIdKey: np.array([f"{i:019d}" for i in range(numRaters)])[
+        rng.integers(0, numRaters, size=numRatings)
+      ],
+      c.createdAtMillisKey: 1_700_000_000_000 + rng.integers(0, 7 * 24 * 3600 * 1000, numRatings),
+    }
+  )
+
+
+def main():
+  parser = argparse.ArgumentParser("Benchmark PostSelectionSimilarity pair counts")
+  parser.add_argument("--ratings", type=int, default=200_000)
+  parser.add_argument("--tweets", type=int, default=2_000)
+  parser.add_argument("--raters", type=int, default=20_000)
+  parser.add_argument("--window-millis", type=int, default=1000 * 60 * 20)
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  ratings = make_ratings(args.ratings, args.tweets, args.raters, args.seed)
+  results = {}
+  for name, engine in [
+    ("loop", _get_pair_counts_dict),
+    ("vectorized", _get_pair_counts_dict_vectorized),
+  ]:
+    start = time.perf_counter()
+    results[name] = engine(ratings.copy(), windowMillis=args.window_millis)
+    print(f"{name}: {time.perf_counter() - start:.2f} secs, {len(results[name])} pairs")
+  assert results["loop"] == results["vectorized"], "engines returned different pair counts"
+  print("pair counts identical")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,101 @@
+"""Benchmark the shared RatingsIndex and the factorized MF ID maps.
+
+Splits synthetic ratings into one subset per scorer and times, for each subset:
+  - filter_ratings with and without the RatingsIndex (including the get_codes lookup)
+  - MatrixFactorization.get_note_and_rater_id_maps against the previous unique() plus merge
+and checks that both versions return identical results.
+
+Usage (from scoring/src):
+  PYTHONPATH=. python ../benchmarks/ratings_index_benchmark.py --ratings 2000000
+"""
+
+import argparse
+import time
+
+from scoring import constants as c
+from scoring.matrix_factorization.matrix_factorization import Constants, MatrixFactorization
+from scoring.process_data import filter_ratings
+
+import numpy as np
+import pandas as pd
+
+
+def make_ratings(numRatings: int, numNotes: int, numRaters: int, seed: int) -> pd.DataFrame:
+  rng = np.random.default_rng(seed)
+  noteIds = np.sort(rng.choice(10**18, numNotes, replace=False)).astype(np.int64)
+  return pd.DataFrame(
+    {
+      c.noteIdKey: noteIds[rng.integers(0, numNotes, numRatings)],
+      # Participant IDs are encoded as int32 codes during scoring.
+      c.raterParticipantIdKey: rng.integers(0, numRaters, numRatings).astype(np.int32),
+      c.helpfulNumKey: rng.integers(0, 3, numRatings).astype(np.float32) / 2,
+    }
+  )
+
+
+def get_id_maps_with_merge(ratings: pd.DataFrame):
+  """get_note_and_rater_id_maps before IDs were factorized."""
+  noteData = ratings[[c.noteIdKey, c.raterParticipantIdKey, c.helpfulNumKey]]
+  raterIdMap = (
+    pd.DataFrame(noteData[c.raterParticipantIdKey].unique())
+    .reset_index()
+    .set_index(0)
+    .reset_index()
+    .rename(columns={0: c.raterParticipantIdKey, "index": Constants.raterIndexKey})
+  )
+  noteIdMap = (
+    pd.DataFrame(noteData[c.noteIdKey].unique())
+    .reset_index()
+    .set_index(0)
+    .reset_index()
+    .rename(columns={0: c.noteIdKey, "index": Constants.noteIndexKey})
+  )
+  ratingFeaturesAndLabels = noteData.merge(noteIdMap, on=c.noteIdKey).merge(
+    raterIdMap, on=c.raterParticipantIdKey
+  )
+  return noteIdMap, raterIdMap, ratingFeaturesAndLabels
+
+
+def main():
+  parser = argparse.ArgumentParser("Benchmark RatingsIndex and MF ID maps")
+  parser.add_argument("--ratings", type=int, default=2_000_000)
+  parser.add_argument("--notes", type=int, default=120_000)
+  parser.add_argument("--raters", type=int, default=200_000)
+  parser.add_argument("--scorers", type=int, default=21)
+  parser.add_argument("--seed", type=int, default=0)
+  args = parser.parse_args()
+
+  rng = np.random.default_rng(args.seed)
+  ratings = make_ratings(args.ratings, args.notes, args.raters, args.seed)
+  start = time.perf_counter()
+  ratingsIndex = c.RatingsIndex.from_ratings(ratings)
+  print(f"build index: {time.perf_counter() - start:.2f} secs")
+  subsets = [ratings[rng.random(len(ratings)) < 0.5] for _ in range(args.scorers)]
+
+  timings = {"filter": 0.0, "filter with index": 0.0, "id maps merge": 0.0, "id maps factorize": 0.0}
+  mf = MatrixFactorization()
+  for subset in subsets:
+    start = time.perf_counter()
+    expected = filter_ratings(subset, 10, 5, log=False)
+    timings["filter"] += time.perf_counter() - start
+    start = time.perf_counter()
+    actual = filter_ratings(subset, 10, 5, log=False, ratingsIndex=ratingsIndex)
+    timings["filter with index"] += time.perf_counter() - start
+    pd.testing.assert_frame_equal(expected, actual)
+
+    start = time.perf_counter()
+    expectedMaps = get_id_maps_with_merge(expected)
+    timings["id maps merge"] += time.perf_counter() - start
+    start = time.perf_counter()
+    actualMaps = mf.get_note_and_rater_id_maps(expected)
+    timings["id maps factorize"] += time.perf_counter() - start
+    for expectedMap, actualMap in zip(expectedMaps, actualMaps):
+      pd.testing.assert_frame_equal(expectedMap, actualMap)
+
+  for name, seconds in timings.items():
+    print(f"{name}: {seconds:.2f} secs over {args.scorers} subsets")
+  print("results identical")
+
+
+if __name__ == "__main__":
+  main()
@@ -4,7 +4,9 @@ from enum import Enum
 import logging
 import os
 import time
-from typing import Dict, Optional, Set
+from typing import Dict, Optional, Set, Tuple
+
+from . import profiling
 
 import numpy as np
 import pandas as pd
@@ -369,6 +371,10 @@ notHelpfulTagsTiebreakMapping = {
 notHelpfulTagsEnumMapping = {
   tag: idx for (idx, (_, tag)) in enumerate(notHelpfulTagsAndTieBreakOrder)
 }
+# Ratings may instead carry every tag as one bit of a uint64 mask column (see tag_mask.py), with
+# bit i holding ratingTagsMaskOrder[i].  Masks are never persisted, so the order may change.
+tagMaskKey = "tagMask"
+ratingTagsMaskOrder = helpfulTagsTSVOrder + notHelpfulTagsTSVOrder
 adjustedSuffix = "Adjusted"
 notHelpfulTagsAdjustedColumns = [f"{column}{adjustedSuffix}" for column in notHelpfulTagsTSVOrder]
 notHelpfulTagsAdjustedTSVColumnsAndTypes = [
@@ -947,11 +953,19 @@ inputPathsTSVColumns = [col for (col, _) in inputPathsTSVColumnsAndTypes]
 inputPathsTSVTypeMapping = {col: dtype for (col, dtype) in inputPathsTSVColumnsAndTypes}
 
 
+class TSVReaderEngine(Enum):
+  # Read each file into a Python str and parse it with pd.read_csv.
+  PANDAS = "pandas"
+  # Stream each file from disk in blocks with pyarrow's CSV reader; shards are read in parallel.
+  PYARROW = "pyarrow"
+
+
 @contextmanager
 def time_block(label):
   start = time.time()
   try:
-    yield
+    with profiling.span(label):
+      yield
   finally:
     end = time.time()
     logger.info(f"{label} elapsed time: {end - start:.2f} secs ({((end - start) / 60.0):.2f} mins)")
@@ -980,10 +994,18 @@ class PrescoringMetaOutput:
   metaScorerOutput: Dict[str, PrescoringMetaScorerOutput]  # scorerName => output
 
 
+class SharedMemoryTransport(Enum):
+  # Each DataFrame is written as gzip-compressed Parquet and fully decoded by every worker.
+  PARQUET = "parquet"
+  # Each column is laid out as a raw, uncompressed buffer which workers map copy-on-write.
+  COLUMNAR = "columnar"
+
+
 @dataclass
 class SharedMemoryDataframeInfo:
   sharedMemoryName: str
   dataSize: int
+  transport: SharedMemoryTransport = SharedMemoryTransport.PARQUET
 
 
 @dataclass
@@ -1005,6 +1027,35 @@ class FinalScoringArgsSharedMemory(ScoringArgsSharedMemory):
   prescoringRaterModelOutput: SharedMemoryDataframeInfo
 
 
+@dataclass
+class RatingsIndex:
+  """Global dictionaries of the notes and raters appearing in the ratings of a scoring run.
+
+  Built once before the scorers run and shared by all of them (including parallel workers,
+  which receive it with their scoring args), so that per-scorer rating counts and filters can
+  operate on dense integer codes.  Codes are not cached: get_codes looks up the IDs of the
+  ratings passed to it, which is one hash lookup per ID column per call.
+  """
+
+  noteIds: pd.Index
+  raterIds: pd.Index
+
+  @classmethod
+  def from_ratings(cls, ratings: pd.DataFrame) -> "RatingsIndex":
+    return cls(
+      noteIds=pd.Index(pd.unique(ratings[noteIdKey])),
+      raterIds=pd.Index(pd.unique(ratings[raterParticipantIdKey])),
+    )
+
+  def get_codes(self, ratings: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Return the note and rater codes of each rating, or None if any ID is not indexed."""
+    noteCodes = self.noteIds.get_indexer(ratings[noteIdKey])
+    raterCodes = self.raterIds.get_indexer(ratings[raterParticipantIdKey])
+    if (noteCodes < 0).any() or (raterCodes < 0).any():
+      return None
+    return noteCodes, raterCodes
+
+
 @dataclass
 class ScoringArgs:
   noteTopics: pd.DataFrame
@@ -1019,9 +1070,24 @@ class ScoringArgs:
     self.userEnrollment = None
 
 
+@dataclass
+class PrescoringWarmStart:
+  """Prescoring output from a previous run, used to warm start prescoring matrix factorization.
+
+  See process_data.read_prescoring_warm_start and matrix_factorization.WarmStart.
+  """
+
+  noteModelOutput: pd.DataFrame
+  raterModelOutput: pd.DataFrame
+  metaOutput: PrescoringMetaOutput
+  newRatingsAfterMillis: Optional[int] = None
+  compareToFullRetrain: bool = False
+
+
 @dataclass
 class PrescoringArgs(ScoringArgs):
-  pass
+  ratingsIndex: Optional[RatingsIndex] = None
+  warmStart: Optional[PrescoringWarmStart] = None
 
 
 @dataclass
@@ -1029,6 +1095,7 @@ class FinalScoringArgs(ScoringArgs):
   prescoringNoteModelOutput: pd.DataFrame
   prescoringRaterModelOutput: pd.DataFrame
   prescoringMetaOutput: PrescoringMetaOutput
+  ratingsIndex: Optional[RatingsIndex] = None
 
   def remove_large_args_for_multiprocessing(self):
     self.ratings = None
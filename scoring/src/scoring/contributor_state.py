@@ -2,7 +2,7 @@ import logging
 
 from . import constants as c, explanation_tags
 from .helpfulness_scores import author_helpfulness
-from .note_ratings import get_ratings_with_scores, get_valid_ratings
+from .note_ratings import RatingsWithNoteState, get_ratings_with_scores, get_valid_ratings
 
 import pandas as pd
 
@@ -189,10 +189,16 @@ def _get_visible_rating_counts(
     c.unsuccessfulRatingNotHelpfulCount,
     c.unsuccessfulRatingTotal,
   ]
-  validRatings = get_valid_ratings(ratings, noteStatusHistory, scoredNotes)
+  # Both aggregates are derived from the same view, so ratings are sorted by note once.
+  ratingsWithNoteState = RatingsWithNoteState(ratings, noteStatusHistory)
+  validRatings = get_valid_ratings(
+    ratings, noteStatusHistory, scoredNotes, ratingsWithNoteState=ratingsWithNoteState
+  )
   ratingCounts = validRatings.groupby(c.raterParticipantIdKey).sum()[ratingCountRows]
 
-  ratingsWithScores = get_ratings_with_scores(ratings, noteStatusHistory, scoredNotes)
+  ratingsWithScores = get_ratings_with_scores(
+    ratings, noteStatusHistory, scoredNotes, ratingsWithNoteState=ratingsWithNoteState
+  )
 
   historyCounts = ratingsWithScores.groupby(c.raterParticipantIdKey).sum()[
     [c.awaitingMoreRatingsBoolKey]
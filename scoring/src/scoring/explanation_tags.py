@@ -1,12 +1,40 @@
-from collections import Counter
-from typing import List
+from typing import List, Tuple
 
 from . import constants as c
+from .tag_counts import NoteTagCounts
 
 import numpy as np
 import pandas as pd
 
 
+def _get_top_two_tag_positions(
+  tagCounts: np.ndarray, minRatingsToGetTag: int, minTagsNeededToGetStatus: int
+) -> Tuple[np.ndarray, np.ndarray]:
+  """Select the two most common tags of each row of a (rows x tags) count matrix.
+
+  Only tags with at least minRatingsToGetTag ratings are considered, and rows with fewer than
+  minTagsNeededToGetStatus such tags are dropped.  Ties go to the tag in the earlier column, so
+  columns must be ordered from the highest tiebreak priority down.
+
+  Returns:
+    Positions of the rows kept, and a (rows kept x 2) matrix of the column positions of the most
+    and second most common tag in each row.
+  """
+  eligible = tagCounts >= minRatingsToGetTag  # NaN counts are never eligible.
+  rows = np.flatnonzero(eligible.sum(axis=1) >= minTagsNeededToGetStatus)
+  numTags = tagCounts.shape[1]
+  if len(rows) == 0 or numTags < 2:
+    return rows, np.zeros((len(rows), 2), dtype=np.int64)
+  # Rank eligible tags by count and then by column, and every ineligible tag below them.
+  keys = np.where(
+    eligible[rows], tagCounts[rows] * numTags + (numTags - 1 - np.arange(numTags)), -1
+  )
+  topTwo = np.argpartition(-keys, 1, axis=1)[:, :2]
+  topKeys = np.take_along_axis(keys, topTwo, axis=1)
+  topTwo[topKeys[:, 1] > topKeys[:, 0]] = topTwo[topKeys[:, 1] > topKeys[:, 0], ::-1]
+  return rows, topTwo
+
+
 def get_top_two_tags_for_note(
   noteStats: pd.DataFrame,
   minRatingsToGetTag: int,
@@ -35,36 +63,16 @@ def get_top_two_tags_for_note(
   with c.time_block("NH Tags: Top 2 per note"):
     noteStats.set_index(c.noteIdKey, inplace=True)
     noteTagTotals = noteStats[tagsConsideredInTiebreakOrder[::-1]]  # Put winning tags at front.
-
-    # Filter tags and apply minimum rating threshold
-    filteredTags = noteTagTotals.where(lambda x: x >= minRatingsToGetTag)
-    filteredTags.dropna(
-      thresh=minTagsNeededToGetStatus, inplace=True
-    )  # only keep rows with at least 2 non-NaN entries
-
-    negativeTags = -1 * filteredTags.to_numpy(dtype=np.float64)
-
-    # Create a small value for tie-breaking, proportional to the column indices
-    # The small value should be smaller than the smallest difference between any two elements (ints)
-    epsilon = 1e-3
-    tieBreakers = np.arange(negativeTags.shape[1]) * epsilon
-
-    # Add the tie_breaker to the array
-    negativeTieBrokenTags = tieBreakers + negativeTags
-
-    # Fill nans with 0 (higher than all other values with nonzero tag counts)
-    negativeTieBrokenTags = np.nan_to_num(negativeTieBrokenTags)
-
-    # Use argsort on the modified array
-    sortedIndices = np.argsort(negativeTieBrokenTags, axis=1)
-
-    # Extract indices of the two largest values in each row
-    topTwoIndices = sortedIndices[:, :2]
+    rows, topTwoIndices = _get_top_two_tag_positions(
+      noteTagTotals.to_numpy(dtype=np.float64, na_value=np.nan),
+      minRatingsToGetTag,
+      minTagsNeededToGetStatus,
+    )
     noteTopTags = pd.DataFrame(
-      np.array(filteredTags.columns)[topTwoIndices], columns=[c.firstTagKey, c.secondTagKey]
+      np.array(noteTagTotals.columns)[topTwoIndices], columns=[c.firstTagKey, c.secondTagKey]
     )
-    noteTopTags[c.noteIdKey] = filteredTags.index
-    noteTopTags.index = filteredTags.index
+    noteTopTags[c.noteIdKey] = noteTagTotals.index[rows]
+    noteTopTags.index = noteTagTotals.index[rows]
 
     return noteTopTags
 
@@ -89,63 +97,52 @@ def get_top_nonhelpful_tags_per_author(
   """
   # Finds the top two non-helpful tags per note.
   with c.time_block("NH Tags: Top 2 per note"):
-    # Aggregate ratings by note ID
-    noteTagTotals = reputationFilteredRatings.groupby(c.noteIdKey).sum(numeric_only=True)[
-      c.notHelpfulTagsTiebreakOrder[::-1]  # Put winning tags at front.
-    ]
-
-    # Filter tags and apply minimum rating threshold
-    filteredTags = noteTagTotals.where(lambda x: x >= c.minRatingsToGetTag)
-    filteredTags.dropna(thresh=2, inplace=True)  # only keep rows with at least 2 non-NaN entries
-
-    negativeTags = -1 * filteredTags.to_numpy(dtype=np.float64)
-
-    # Create a small value for tie-breaking, proportional to the column indices
-    # The small value should be smaller than the smallest difference between any two elements (ints)
-    epsilon = 1e-3
-    tieBreakers = np.arange(negativeTags.shape[1]) * epsilon
-
-    # Add the tie_breaker to the array
-    negativeTieBrokenTags = tieBreakers + negativeTags
-
-    # Fill nans with 0 (higher than all other values with nonzero tag counts)
-    negativeTieBrokenTags = np.nan_to_num(negativeTieBrokenTags)
-
-    # Use argsort on the modified array
-    sortedIndices = np.argsort(negativeTieBrokenTags, axis=1)
-
-    # Extract indices of the two largest values in each row
-    topTwoIndices = sortedIndices[:, :2]
-    noteTopTags = pd.DataFrame(
-      np.array(filteredTags.columns)[topTwoIndices], columns=[c.firstTagKey, c.secondTagKey]
+    tagCounts = NoteTagCounts(reputationFilteredRatings, c.notHelpfulTagsTiebreakOrder[::-1])
+    noteRows, noteTopTwo = _get_top_two_tag_positions(
+      tagCounts.tag_counts(), c.minRatingsToGetTag, 2
     )
-    noteTopTags[c.noteIdKey] = filteredTags.index
+    # Translate tag positions in reverse tiebreak order to tag enum ids (positions in TSV order).
+    tagEnumIds = np.array([c.notHelpfulTagsEnumMapping[tag] for tag in tagCounts.tagCols])
+    noteTopTagIds = tagEnumIds[noteTopTwo]
+    noteIdsWithTags = tagCounts.noteIds[noteRows]
+    del tagCounts
 
   with c.time_block("NH Tags: Top 2 per author"):
-    # Aggregates top two tags per author.
-    notesToUse = noteStatusHistory[[c.noteAuthorParticipantIdKey, c.noteIdKey]]
-    authorTagsAgg = (
-      notesToUse.merge(noteTopTags, on=[c.noteIdKey], how="left")
-      .groupby(c.noteAuthorParticipantIdKey)
-      .agg(Counter)
+    # Counts how often each tag is one of the top two tags on notes by each author.  Notes without
+    # an author or without top tags are skipped, and authors are sorted by participant id.
+    authorCodes, authors = pd.factorize(
+      noteStatusHistory[c.noteAuthorParticipantIdKey], sort=True
     )
-
-  # Chooses top two tags per author.
-  def _set_top_tags(row: pd.Series) -> pd.Series:
-    # Note that row[c.firstTagKey] and row[c.secondTagKey] are both Counter
-    # objects mapping tags to counts due to the aggregation above.
-    tagTuples = [
-      (count, c.notHelpfulTagsTiebreakMapping[tag], c.notHelpfulTagsEnumMapping[tag])
-      for tag, count in (row[c.firstTagKey] + row[c.secondTagKey]).items()
-      if (tag is not None) and not pd.isna(tag)
-    ]
-    tags = [tsvId for (_, tieBreakId, tsvId) in sorted(tagTuples, reverse=True)[:2]]
-    topNotHelpfulTags = ",".join([str(tag) for tag in tags])
-    row[c.authorTopNotHelpfulTagValues] = topNotHelpfulTags
-    return row
+    noteRowPositions = pd.Index(noteIdsWithTags).get_indexer(noteStatusHistory[c.noteIdKey])
+    keep = (authorCodes >= 0) & (noteRowPositions >= 0)
+    authorCodes, noteRowPositions = authorCodes[keep], noteRowPositions[keep]
+    numTags = len(c.notHelpfulTagsTSVOrder)
+    authorTagCounts = np.zeros(len(authors) * numTags, dtype=np.int64)
+    for i in range(2):
+      authorTagCounts += np.bincount(
+        authorCodes * numTags + noteTopTagIds[noteRowPositions, i],
+        minlength=len(authorTagCounts),
+      )
+    authorTagCounts = authorTagCounts.reshape(len(authors), numTags)
 
   with c.time_block("NH Tags: Set Top Tags"):
-    topTwoPerAuthor = authorTagsAgg.apply(_set_top_tags, axis=1).reset_index()[
-      [c.noteAuthorParticipantIdKey, c.authorTopNotHelpfulTagValues]
-    ]
+    # Chooses the two most common tags per author, breaking ties by tiebreak priority.  Columns of
+    # authorTagCounts are tag enum ids, so they are put in tiebreak order for selection and the
+    # chosen positions are mapped back to the tag values to report.
+    tiebreakOrder = np.argsort(
+      [-c.notHelpfulTagsTiebreakMapping[tag] for tag in c.notHelpfulTagsTSVOrder], kind="stable"
+    )
+    authorRows, topTwo = _get_top_two_tag_positions(authorTagCounts[:, tiebreakOrder], 1, 1)
+    firstTags, secondTags = tiebreakOrder[topTwo].astype(str).T
+    twoTags = (authorTagCounts[authorRows] > 0).sum(axis=1) >= 2
+    topTagValues = np.full(len(authors), "", dtype=object)
+    topTagValues[authorRows] = np.where(
+      twoTags, np.char.add(np.char.add(firstTags, ","), secondTags), firstTags
+    ).tolist()
+    topTwoPerAuthor = pd.DataFrame(
+      {
+        c.noteAuthorParticipantIdKey: authors,
+        c.authorTopNotHelpfulTagValues: topTagValues,
+      }
+    )
   return topTwoPerAuthor
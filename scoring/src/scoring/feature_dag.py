@@ -0,0 +1,168 @@
+"""Compute families of model features as a dependency graph.
+
+Each feature family is a function of named inputs, which may be frames passed to run or the
+outputs of other families.  Families whose inputs are ready run concurrently in a thread pool,
+and the output of each family can be cached by a fingerprint of its inputs so repeated runs
+over the same data skip the computation.
+"""
+
+from collections import OrderedDict
+import concurrent.futures
+import copy
+from dataclasses import dataclass
+from hashlib import sha256
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .pandas_utils import get_df_content_fingerprint
+
+import pandas as pd
+
+
+logger = logging.getLogger("birdwatch.feature_dag")
+logger.setLevel(logging.INFO)
+
+
+@dataclass
+class FeatureFamily:
+  name: str
+  fn: Callable[..., Any]
+  inputs: List[str]
+  params: Dict[str, Any]
+
+
+class FeatureDag:
+  """A dependency graph of feature families.
+
+  Families are added in an order where every input is either a source passed to run or a
+  family added earlier, so insertion order is a valid sequential schedule.
+  """
+
+  def __init__(
+    self,
+    sources: List[str],
+    numWorkers: int = 1,
+    cache: Optional["OrderedDict[str, Any]"] = None,
+    maxCacheEntries: int = 0,
+  ):
+    """
+    Args:
+      sources: names of the inputs passed to run
+      numWorkers: number of threads computing families concurrently
+      cache: if set, family outputs keyed by a fingerprint of the family inputs.  The cache is
+        shared across runs and kept in least-recently-used order.  Outputs are copied into and
+        out of the cache, so callers may modify the results of run.
+      maxCacheEntries: maximum number of family outputs retained in cache
+    """
+    self._sources = list(sources)
+    self._families: List[FeatureFamily] = []
+    self._numWorkers = numWorkers
+    self._cache = cache
+    self._maxCacheEntries = maxCacheEntries
+    self.timings: Dict[str, float] = dict()
+    self.cacheHits: List[str] = []
+
+  def add(
+    self,
+    name: str,
+    fn: Callable[..., Any],
+    inputs: List[str],
+    params: Optional[Dict[str, Any]] = None,
+  ) -> None:
+    """Add a family computing fn(*inputs).
+
+    Args:
+      name: name of the family output
+      fn: function of the inputs
+      inputs: names of sources or earlier families passed to fn
+      params: values captured by fn which change its output.  They are part of the cache key,
+        so families which differ only in a captured argument do not share cached outputs.
+    """
+    known = set(self._sources) | {family.name for family in self._families}
+    assert name not in known, f"duplicate feature family: {name}"
+    missing = [inputName for inputName in inputs if inputName not in known]
+    assert not missing, f"{name} depends on undefined inputs: {missing}"
+    self._families.append(FeatureFamily(name, fn, list(inputs), dict(params or {})))
+
+  def _get_source_keys(self, sources: Dict[str, Any]) -> Dict[str, str]:
+    keys = dict()
+    for name, value in sources.items():
+      if isinstance(value, pd.DataFrame):
+        keys[name] = get_df_content_fingerprint(value)
+      else:
+        keys[name] = sha256(repr(value).encode()).hexdigest()
+    return keys
+
+  def _get_family_key(self, family: FeatureFamily, keys: Dict[str, str]) -> str:
+    # Keys of family outputs are derived from the keys of their inputs, so only sources are
+    # ever hashed.
+    params = [f"{name}={value!r}" for (name, value) in sorted(family.params.items())]
+    return sha256(
+      ",".join([family.name] + params + [keys[inputName] for inputName in family.inputs]).encode()
+    ).hexdigest()
+
+  def _lookup(self, key: str) -> Optional[Any]:
+    if self._cache is None or key not in self._cache:
+      return None
+    self._cache.move_to_end(key)
+    return copy.deepcopy(self._cache[key])
+
+  def _store(self, key: str, value: Any) -> None:
+    if self._cache is None:
+      return
+    self._cache[key] = copy.deepcopy(value)
+    while len(self._cache) > self._maxCacheEntries:
+      self._cache.popitem(last=False)
+
+  def _compute(self, family: FeatureFamily, results: Dict[str, Any]) -> Any:
+    start = time.perf_counter()
+    value = family.fn(*[results[inputName] for inputName in family.inputs])
+    self.timings[family.name] = self.timings.get(family.name, 0.0) + (
+      time.perf_counter() - start
+    )
+    return value
+
+  def run(self, sources: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute every family and return the outputs keyed by family name, along with sources."""
+    assert set(sources) == set(self._sources), f"unexpected sources: {list(sources)}"
+    results = dict(sources)
+    keys = self._get_source_keys(sources) if self._cache is not None else dict()
+    pending = list(self._families)
+    # Resolve families from the cache, or return the families which must be computed now.
+    def take_ready() -> List[FeatureFamily]:
+      ready = []
+      for family in [f for f in pending if all(i in results for i in f.inputs)]:
+        pending.remove(family)
+        if self._cache is not None:
+          keys[family.name] = self._get_family_key(family, keys)
+          cached = self._lookup(keys[family.name])
+          if cached is not None:
+            self.cacheHits.append(family.name)
+            results[family.name] = cached
+            continue
+        ready.append(family)
+      return ready
+
+    if self._numWorkers <= 1:
+      while pending:
+        for family in take_ready():
+          results[family.name] = self._compute(family, results)
+          if self._cache is not None:
+            self._store(keys[family.name], results[family.name])
+      return results
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=self._numWorkers) as executor:
+      running: Dict[concurrent.futures.Future, FeatureFamily] = dict()
+      while pending or running:
+        for family in take_ready():
+          running[executor.submit(self._compute, family, dict(results))] = family
+        if not running:
+          continue
+        done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+          family = running.pop(future)
+          results[family.name] = future.result()
+          if self._cache is not None:
+            self._store(keys[family.name], results[family.name])
+    return results
@@ -3,6 +3,7 @@
 from typing import Optional
 
 from . import constants as c
+from .tag_mask import get_columns, has_any_tag
 
 import numpy as np
 import pandas as pd
@@ -20,7 +21,10 @@ def get_user_incorrect_ratio(ratings: pd.DataFrame) -> pd.DataFrame:
     to assign "incorrect" tag
   """
   # Filter down to just ratings with some nh tags used.
-  nhTagRatings = ratings.loc[ratings[c.notHelpfulTagsTSVOrder].sum(axis=1) > 0]
+  nhTagRatings = get_columns(
+    ratings.loc[has_any_tag(ratings, c.notHelpfulTagsTSVOrder)],
+    [c.raterParticipantIdKey, c.noteIdKey, c.notHelpfulIncorrectTagKey],
+  )
 
   user_incorrect = (
     (
@@ -143,7 +147,10 @@ def get_incorrect_aggregates_final_scoring(
     distance between the rater and the note and ratios based on the adjusted weight totals.
   """
   # consider only ratings with some NH tag
-  notHelpfulTaggedRatings = ratings.loc[ratings[c.notHelpfulTagsTSVOrder].sum(axis=1) > 0]
+  notHelpfulTaggedRatings = get_columns(
+    ratings.loc[has_any_tag(ratings, c.notHelpfulTagsTSVOrder)],
+    [c.raterParticipantIdKey, c.noteIdKey, c.notHelpfulIncorrectTagKey],
+  )
 
   # join user totals, note factors, and rater factors with each rating
   ratings_w_user_totals = (
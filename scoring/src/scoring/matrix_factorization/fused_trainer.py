@@ -0,0 +1,385 @@
+from contextlib import contextmanager
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .wandb_utils import wandb
+
+import numpy as np
+import torch
+
+
+logger = logging.getLogger("birdwatch.fused_trainer")
+logger.setLevel(logging.INFO)
+
+
+_threadState = threading.local()
+
+
+class _FitRequest:
+  def __init__(self, mf) -> None:
+    self.mf = mf
+    self.result: Optional[Tuple[int, float]] = None
+    self.error: Optional[BaseException] = None
+    # Set if the fit has no fusion partner and should run on its own thread.
+    self.solo = False
+
+
+class FusedTrainer:
+  """Train the matrix factorization models of several scorers as one block-diagonal model.
+
+  Each participating scorer runs in its own thread of the same process, but participants take
+  turns: only one runs at a time, and it hands over to the next participant when it submits the
+  full-batch phase of MatrixFactorization._fit_model or finishes.  Once every unfinished
+  participant has submitted a fit, the submitted models are grouped by fusion key and each group
+  is trained in a single optimization: the parameter tables of all models are concatenated into
+  segments, each rating indexes into the segment of its own model, and the per-model losses are
+  summed.  Since no parameter is shared between segments, every model receives the same
+  gradients and elementwise Adam updates as in its own fit, and a model stops updating once it
+  meets the convergence criterion of _fit_model.
+
+  Turns are handed over in a fixed order, and each participant keeps its own torch and numpy RNG
+  state and torch intra-op parallelism across turns, so scorers produce the same results as when
+  run in series.
+  """
+
+  def __init__(self, numParticipants: int, numThreads: Optional[int] = None) -> None:
+    """
+    Args:
+      numParticipants: number of threads which will each enter participant() exactly once.
+      numThreads: torch intra-op parallelism used while training fused models.
+    """
+    self._numParticipants = numParticipants
+    self._numThreads = numThreads
+    self._condition = threading.Condition()
+    self._turn: Optional[int] = 0
+    self._finished = [False] * numParticipants
+    self._pending: Dict[int, _FitRequest] = {}
+    initialState = _get_thread_state()
+    self._savedStates = [initialState] * numParticipants
+    # One entry per fused optimization, describing models, epochs and wall time.
+    self.fitReports: List[dict] = []
+
+  @staticmethod
+  def current() -> Optional["FusedTrainer"]:
+    """Return the trainer the calling thread participates in, if any."""
+    return getattr(_threadState, "trainer", None)
+
+  @contextmanager
+  def participant(self, index: int):
+    """Run the block as participant index, routing eligible fits through this trainer."""
+    self._acquire(index)
+    _threadState.trainer = self
+    _threadState.index = index
+    try:
+      yield
+    finally:
+      _threadState.trainer = None
+      self._finished[index] = True
+      self._release(index)
+
+  @staticmethod
+  def can_fuse(mf, maxEpochs: Optional[int] = None) -> bool:
+    """Whether the full-batch phase of mf._fit_model can be trained as part of a fused model.
+
+    Fits with a normalized loss, an epoch limit, update restrictions, an optimizer which already
+    has state or wandb logging keep running on their own.
+    """
+    return (
+      maxEpochs is None
+      and mf._lossModule is None
+      and not mf.mf_model._update_restriction_hooks
+      and len(mf.optimizer.param_groups) == 1
+      and len(mf.optimizer.state) == 0
+      and str(mf.mf_model.device) == "cpu"
+      and not wandb._enabled
+    )
+
+  def fit(self, mf) -> Tuple[int, float]:
+    """Run the full-batch phase of mf._fit_model, as part of a fused model if possible.
+
+    Returns:
+        Tuple[int, float]: number of epochs run and the final regularized loss of mf
+    """
+    index = _threadState.index
+    request = _FitRequest(mf)
+    self._pending[index] = request
+    self._release(index)
+    self._acquire(index)
+    if request.solo:
+      return mf._run_full_batch_epochs()
+    if request.error is not None:
+      raise RuntimeError("Fused matrix factorization training failed") from request.error
+    assert request.result is not None
+    return request.result
+
+  def _acquire(self, index: int) -> None:
+    with self._condition:
+      while self._turn != index:
+        self._condition.wait()
+    _set_thread_state(self._savedStates[index])
+
+  def _release(self, index: int) -> None:
+    """Hand the turn to the first runnable participant, training pending fits if none is."""
+    self._savedStates[index] = _get_thread_state()
+    runnable = self._get_runnable()
+    if not runnable and self._pending:
+      self._fit_pending()
+      runnable = self._get_runnable()
+    with self._condition:
+      self._turn = runnable[0] if runnable else None
+      self._condition.notify_all()
+
+  def _get_runnable(self) -> List[int]:
+    return [
+      i for i in range(self._numParticipants) if not self._finished[i] and i not in self._pending
+    ]
+
+  def _fit_pending(self) -> None:
+    """Train all pending fits, fusing those with the same fusion key.
+
+    Fits without a fusion partner are released to run on their own thread."""
+    requests, self._pending = self._pending, {}
+    batches: Dict[tuple, List[_FitRequest]] = {}
+    for index in sorted(requests):
+      batches.setdefault(_get_fusion_key(requests[index].mf), []).append(requests[index])
+    for batch in batches.values():
+      if len(batch) == 1:
+        batch[0].solo = True
+        continue
+      try:
+        self._fit_batch(batch)
+      except Exception as e:
+        for request in batch:
+          request.error = e
+
+  def _fit_batch(self, batch: List[_FitRequest]) -> None:
+    startTime = time.time()
+    prevThreads = torch.get_num_threads()
+    if self._numThreads is not None:
+      torch.set_num_threads(self._numThreads)
+    try:
+      results = _FusedModel([request.mf for request in batch]).fit()
+    finally:
+      torch.set_num_threads(prevThreads)
+    for request, result in zip(batch, results):
+      request.result = result
+    fitReport = {
+      "models": len(batch),
+      "ratings": sum(len(request.mf.trainModelData.rating_labels) for request in batch),
+      "epochs": [epochs for (epochs, _) in results],
+      "seconds": time.time() - startTime,
+    }
+    self.fitReports.append(fitReport)
+    logger.info(f"Fused fit report: {fitReport}")
+
+
+def _get_thread_state() -> tuple:
+  return (torch.get_rng_state(), np.random.get_state(), torch.get_num_threads())
+
+
+def _set_thread_state(state: tuple) -> None:
+  torchRngState, numpyRngState, numThreads = state
+  torch.set_rng_state(torchRngState)
+  np.random.set_state(numpyRngState)
+  torch.set_num_threads(numThreads)
+
+
+def _get_fusion_key(mf) -> tuple:
+  """Fits are fused if their parameter tables can share one optimizer.
+
+  Losses, regularization and convergence are evaluated per model, so they may differ."""
+  if not FusedTrainer.can_fuse(mf):
+    return ("solo", id(mf))
+  optimizerArgs = tuple(
+    sorted((k, repr(v)) for (k, v) in mf.optimizer.param_groups[0].items() if k != "params")
+  )
+  return (
+    type(mf.optimizer),
+    optimizerArgs,
+    mf._numFactors,
+    tuple(param.requires_grad for param in mf.mf_model.parameters()),
+  )
+
+
+class _FusedModel:
+  """Block-diagonal concatenation of the models of several MatrixFactorization fits."""
+
+  def __init__(self, mfs: List) -> None:
+    self._mfs = mfs
+    self._models = [mf.mf_model for mf in mfs]
+    self._numSegments = len(mfs)
+    self._numUsers = [m.user_factors.weight.shape[0] for m in self._models]
+    self._numNotes = [m.note_factors.weight.shape[0] for m in self._models]
+    self._numRatings = [len(mf.trainModelData.rating_labels) for mf in mfs]
+    self._userOffsets = np.concatenate([[0], np.cumsum(self._numUsers)])
+    self._noteOffsets = np.concatenate([[0], np.cumsum(self._numNotes)])
+
+    def concat(tensors: List[torch.Tensor], like: torch.Tensor) -> torch.nn.Parameter:
+      return torch.nn.Parameter(
+        torch.cat([t.detach() for t in tensors]), requires_grad=like.requires_grad
+      )
+
+    first = self._models[0]
+    self._userFactors = concat(
+      [m.user_factors.weight for m in self._models], first.user_factors.weight
+    )
+    self._noteFactors = concat(
+      [m.note_factors.weight for m in self._models], first.note_factors.weight
+    )
+    self._userIntercepts = concat(
+      [m.user_intercepts.weight for m in self._models], first.user_intercepts.weight
+    )
+    self._noteIntercepts = concat(
+      [m.note_intercepts.weight for m in self._models], first.note_intercepts.weight
+    )
+    self._globalIntercepts = concat(
+      [m.global_intercept for m in self._models], first.global_intercept
+    )
+    self._active = np.ones(self._numSegments, dtype=bool)
+    self._set_working_ratings()
+
+  def _parameters(self) -> List[torch.nn.Parameter]:
+    return [
+      self._userFactors,
+      self._noteFactors,
+      self._userIntercepts,
+      self._noteIntercepts,
+      self._globalIntercepts,
+    ]
+
+  def _set_working_ratings(self) -> None:
+    """Concatenate the ratings of active models, offsetting indexes into their segments."""
+    self._workingSegments = np.flatnonzero(self._active)
+    self._workingSizes = [self._numRatings[s] for s in self._workingSegments]
+    self._labels = [self._mfs[s].trainModelData.rating_labels for s in self._workingSegments]
+    self._userIndexes = torch.cat(
+      [
+        self._mfs[s].trainModelData.user_indexes.long() + int(self._userOffsets[s])
+        for s in self._workingSegments
+      ]
+    )
+    self._noteIndexes = torch.cat(
+      [
+        self._mfs[s].trainModelData.note_indexes.long() + int(self._noteOffsets[s])
+        for s in self._workingSegments
+      ]
+    )
+
+  def _get_losses(self) -> Dict[int, torch.Tensor]:
+    """Regularized loss of each active model, computed as in MatrixFactorization._get_loss."""
+    # index_select gathers the same rows as the embedding lookups of BiasedMatrixFactorization,
+    # but its backward pass (index_add) is far cheaper than the dense embedding backward on CPU.
+    pred = self._userIntercepts.index_select(0, self._userIndexes)
+    pred = pred + self._noteIntercepts.index_select(0, self._noteIndexes)
+    pred += (
+      self._userFactors.index_select(0, self._userIndexes)
+      * self._noteFactors.index_select(0, self._noteIndexes)
+    ).sum(1, keepdim=True)
+    userFactors = torch.split(self._userFactors, self._numUsers)
+    noteFactors = torch.split(self._noteFactors, self._numNotes)
+    userIntercepts = torch.split(self._userIntercepts, self._numUsers)
+    noteIntercepts = torch.split(self._noteIntercepts, self._numNotes)
+    globalIntercepts = torch.split(self._globalIntercepts, 1)
+    losses = {}
+    for s, segmentPred, labels in zip(
+      self._workingSegments, torch.split(pred, self._workingSizes), self._labels
+    ):
+      if not self._active[s]:
+        continue
+      mf = self._mfs[s]
+      if mf.mf_model.use_global_intercept == True:
+        segmentPred = segmentPred + globalIntercepts[s]
+      loss = mf.criterion(segmentPred.squeeze(), labels).mean()
+      loss += mf._get_reg_loss(
+        userFactors[s], userIntercepts[s], noteFactors[s], noteIntercepts[s], globalIntercepts[s]
+      )
+      assert not torch.isnan(loss).any()
+      losses[s] = loss
+    return losses
+
+  def _deactivate(self, segments: List[int], optimizer: torch.optim.Optimizer) -> None:
+    """Stop updating converged models.
+
+    Converged models are excluded from the objective, so their gradients are zero; clearing
+    their first moment estimates makes their Adam updates exactly zero as well."""
+    self._active[segments] = False
+    if not self._active.any():
+      return
+    for param, offsets in zip(
+      self._parameters(),
+      [
+        self._userOffsets,
+        self._noteOffsets,
+        self._userOffsets,
+        self._noteOffsets,
+        np.arange(self._numSegments + 1),
+      ],
+    ):
+      state = optimizer.state.get(param)
+      if not state:
+        continue
+      for s in segments:
+        state["exp_avg"][offsets[s] : offsets[s + 1]] = 0
+    # Compact the working set once most of its ratings belong to converged models.
+    activeRatings = sum(self._numRatings[s] for s in np.flatnonzero(self._active))
+    if activeRatings < 0.5 * sum(self._workingSizes):
+      self._set_working_ratings()
+
+  def fit(self) -> List[Tuple[int, float]]:
+    """Train all models, applying the stopping rule of MatrixFactorization._fit_model to each.
+
+    Returns:
+        List[Tuple[int, float]]: number of epochs run and final regularized loss of each model
+    """
+    optimizer = self._mfs[0].optimizer
+    optimizer = type(optimizer)(
+      [param for param in self._parameters() if param.requires_grad],
+      **{k: v for (k, v) in optimizer.param_groups[0].items() if k != "params"},
+    )
+    convergence = np.array([mf._convergence for mf in self._mfs])
+    prevLoss = np.full(self._numSegments, 1e10)
+    lossValues = np.zeros(self._numSegments)
+    epochs = np.zeros(self._numSegments, dtype=np.int64)
+
+    def update_loss_values(losses: Dict[int, torch.Tensor]) -> None:
+      segments = list(losses)
+      lossValues[segments] = torch.stack([losses[s] for s in segments]).detach().numpy()
+      converged = [
+        s
+        for s in segments
+        if not (
+          abs(lossValues[s] - prevLoss[s]) > convergence[s]
+          and not (epochs[s] > 100 and lossValues[s] > prevLoss[s])
+        )
+      ]
+      if converged:
+        self._deactivate(converged, optimizer)
+
+    losses = self._get_losses()
+    update_loss_values(losses)
+    step = 0
+    while self._active.any():
+      active = self._active.copy()
+      prevLoss[active] = lossValues[active]
+      torch.stack([losses[s] for s in np.flatnonzero(active)]).sum().backward()
+      optimizer.step()
+      optimizer.zero_grad()
+      losses = self._get_losses()
+      epochs[active] += 1
+      update_loss_values(losses)
+      step += 1
+      if step % 20 == 0:
+        logger.info(f"fused step {step}: {self._active.sum()} of {self._numSegments} models active")
+
+    with torch.no_grad():
+      for s, model in enumerate(self._models):
+        users = slice(self._userOffsets[s], self._userOffsets[s + 1])
+        notes = slice(self._noteOffsets[s], self._noteOffsets[s + 1])
+        model.user_factors.weight.copy_(self._userFactors[users])
+        model.user_intercepts.weight.copy_(self._userIntercepts[users])
+        model.note_factors.weight.copy_(self._noteFactors[notes])
+        model.note_intercepts.weight.copy_(self._noteIntercepts[notes])
+        model.global_intercept.copy_(self._globalIntercepts[s : s + 1])
+    return [(int(epochs[s]), float(lossValues[s])) for s in range(self._numSegments)]
@@ -1,9 +1,10 @@
 import dataclasses
 import logging
 import time
-from typing import List, Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
 from .. import constants as c
+from .fused_trainer import FusedTrainer
 from .model import BiasedMatrixFactorization, ModelData
 from .normalized_loss import NormalizedLoss
 from .wandb_utils import wandb
@@ -23,7 +24,103 @@ class Constants:
   raterIndexKey = "raterIndex"
 
 
+@dataclasses.dataclass
+class WarmStart:
+  """Parameters from a previous run used to incrementally refit a model (see run_mf).
+
+  Notes and raters are "touched" if they have no previous parameters, if they appear in a
+  rating created after newRatingsAfterMillis, or if they are listed explicitly.
+
+  Attributes:
+      noteParams: previous note parameters, e.g. prescoringNoteModelOutput
+      raterParams: previous rater parameters, e.g. prescoringRaterModelOutput
+      globalIntercept: previous global intercept
+      scorerName: if set, only use rows of noteParams / raterParams with this scorerName
+      newRatingsAfterMillis: ratings created after this time are treated as new
+      touchedNoteIds: additional notes to treat as touched
+      touchedRaterIds: additional raters to treat as touched
+      polishMaxEpochs: maximum number of epochs for the global pass after the delta fit
+      learningRate: learning rate for both phases.  Lower than initLearningRate since the
+        parameters of untouched notes and raters should already be near their optimum.
+      driftTolerance: parameter changes larger than this are counted in the drift report
+      compareToFullRetrain: if True, also fit a model from scratch on the same ratings and report
+        the drift of the warm-started parameters from it.  Doubles the cost of the fit, so this is
+        intended for validating warm starts rather than for regular scoring runs.
+  """
+
+  noteParams: pd.DataFrame
+  raterParams: pd.DataFrame
+  globalIntercept: Optional[float] = None
+  scorerName: Optional[str] = None
+  newRatingsAfterMillis: Optional[int] = None
+  touchedNoteIds: Optional[Iterable] = None
+  touchedRaterIds: Optional[Iterable] = None
+  polishMaxEpochs: int = 200
+  learningRate: float = 0.02
+  driftTolerance: float = 0.01
+  compareToFullRetrain: bool = False
+
+
+def get_parameter_drift(
+  noteParams: pd.DataFrame,
+  raterParams: pd.DataFrame,
+  referenceNoteParams: pd.DataFrame,
+  referenceRaterParams: pd.DataFrame,
+  tolerance: float = 0.01,
+) -> pd.DataFrame:
+  """Summarize how far model parameters drift from a set of reference parameters.
+
+  Typically used to compare a warm-started fit against a full retrain, or against the
+  parameters it was initialized from.  Only notes and raters present in both sets are compared.
+
+  Args:
+      noteParams: note parameters to evaluate
+      raterParams: rater parameters to evaluate
+      referenceNoteParams: note parameters to compare against
+      referenceRaterParams: rater parameters to compare against
+      tolerance: absolute difference above which a parameter counts as drifted
+
+  Returns:
+      pd.DataFrame with one row per parameter column, including the number of notes or raters
+      compared, the mean / max absolute difference and the fraction exceeding tolerance.
+  """
+  rows = []
+  for params, referenceParams, idKey in [
+    (noteParams, referenceNoteParams, c.noteIdKey),
+    (raterParams, referenceRaterParams, c.raterParticipantIdKey),
+  ]:
+    paramCols = [
+      col
+      for col in [
+        c.internalNoteInterceptKey,
+        c.internalRaterInterceptKey,
+        c.internalNoteFactor1Key,
+        c.internalRaterFactor1Key,
+      ]
+      if col in params.columns and col in referenceParams.columns
+    ]
+    joined = params[[idKey] + paramCols].merge(
+      referenceParams[[idKey] + paramCols], on=idKey, suffixes=("", "_reference")
+    )
+    for col in paramCols:
+      absDiff = (joined[col] - joined[f"{col}_reference"]).abs().dropna()
+      rows.append(
+        {
+          "parameter": col,
+          "count": len(absDiff),
+          "meanAbsDiff": absDiff.mean() if len(absDiff) else 0.0,
+          "maxAbsDiff": absDiff.max() if len(absDiff) else 0.0,
+          "fracAboveTolerance": (absDiff > tolerance).mean() if len(absDiff) else 0.0,
+        }
+      )
+  drift = pd.DataFrame(rows)
+  drift["withinTolerance"] = drift["maxAbsDiff"] <= tolerance
+  return drift
+
+
 class MatrixFactorization:
+  trainingEngines = {"full", "minibatch"}
+
   def __init__(
     self,
     initLearningRate=0.2,
@@ -45,8 +142,25 @@ class MatrixFactorization:
     diamondLambda=0,
     normalizedLossHyperparameters=None,
     seed: Optional[int] = None,
+    trainingEngine: str = "full",
+    miniBatchSize: int = 2**16,
+    miniBatchMaxEpochs: int = 20,
+    miniBatchConvergence: float = 1e-5,
+    miniBatchLearningRate: float = 0.05,
   ) -> None:
-    """Configure matrix factorization note ranking."""
+    """Configure matrix factorization note ranking.
+
+    Args:
+      trainingEngine: "full" runs full-batch gradient descent until convergence.  "minibatch"
+        first runs epochs of shuffled mini-batches (of miniBatchSize ratings) until the
+        full-batch loss improves by less than miniBatchConvergence per epoch or
+        miniBatchMaxEpochs is reached, then refines with full-batch gradient descent until the
+        usual convergence criterion is met.  Mini-batch steps use a separate Adam optimizer with
+        miniBatchLearningRate, since the full-batch learning rates are too large for noisy
+        mini-batch gradients.
+    """
+    if trainingEngine not in self.trainingEngines:
+      raise ValueError(f"Unknown trainingEngine: {trainingEngine}")
     self._initLearningRate = initLearningRate
     self._noInitLearningRate = noInitLearningRate
     self._convergence = convergence
@@ -66,6 +180,11 @@ class MatrixFactorization:
     self._normalizedLossHyperparameters = normalizedLossHyperparameters
     self._lossModule: Optional[NormalizedLoss] = None
     self._seed = seed
+    self._trainingEngine = trainingEngine
+    self._miniBatchSize = miniBatchSize
+    self._miniBatchMaxEpochs = miniBatchMaxEpochs
+    self._miniBatchConvergence = miniBatchConvergence
+    self._miniBatchLearningRate = miniBatchLearningRate
 
     if self._useSigmoidCrossEntropy:
       if self._posWeight:
@@ -85,6 +204,10 @@ class MatrixFactorization:
 
     self.train_errors: List[float] = []
     self.test_errors: List[float] = []
+    # One entry per call to _fit_model, describing epochs, wall time and final loss.
+    self.fitReports: List[dict] = []
+    # Set by run_mf when a warm start requests a comparison against a full retrain.
+    self.warmStartDriftFromFullRetrain: Optional[pd.DataFrame] = None
     self.mf_model = model
 
     self.modelData: Optional[ModelData] = None
@@ -113,6 +236,44 @@ class MatrixFactorization:
       userInterceptLambda=self._userInterceptLambda,
       noteInterceptLambda=self._noteInterceptLambda,
       globalInterceptLambda=self._globalInterceptLambda,
+      trainingEngine=self._trainingEngine,
+      miniBatchSize=self._miniBatchSize,
+      miniBatchMaxEpochs=self._miniBatchMaxEpochs,
+      miniBatchConvergence=self._miniBatchConvergence,
+      miniBatchLearningRate=self._miniBatchLearningRate,
+    )
+
+  def _get_new_mf_with_all_args(self):
+    """Return an unfitted MatrixFactorization configured exactly like this one.
+
+    Unlike get_new_mf_with_same_args, the loss (sigmoid cross entropy, posWeight and normalized
+    loss), diamond regularization and seed are also carried over.
+    """
+    return MatrixFactorization(
+      initLearningRate=self._initLearningRate,
+      noInitLearningRate=self._noInitLearningRate,
+      convergence=self._convergence,
+      numFactors=self._numFactors,
+      useGlobalIntercept=self._useGlobalIntercept,
+      log=self._log,
+      model=None,
+      featureCols=self._featureCols,
+      labelCol=self._labelCol,
+      useSigmoidCrossEntropy=self._useSigmoidCrossEntropy,
+      posWeight=self._posWeight,
+      userFactorLambda=self._userFactorLambda,
+      noteFactorLambda=self._noteFactorLambda,
+      userInterceptLambda=self._userInterceptLambda,
+      noteInterceptLambda=self._noteInterceptLambda,
+      globalInterceptLambda=self._globalInterceptLambda,
+      diamondLambda=self._diamondLambda,
+      normalizedLossHyperparameters=self._normalizedLossHyperparameters,
+      seed=self._seed,
+      trainingEngine=self._trainingEngine,
+      miniBatchSize=self._miniBatchSize,
+      miniBatchMaxEpochs=self._miniBatchMaxEpochs,
+      miniBatchConvergence=self._miniBatchConvergence,
+      miniBatchLearningRate=self._miniBatchLearningRate,
     )
 
   def _initialize_note_and_rater_id_maps(
@@ -141,24 +302,22 @@ class MatrixFactorization:
     noteData = ratings[self._featureCols + [self._labelCol]]
     assert not pd.isna(noteData).values.any(), "noteData must not contain nan values"
 
-    raterIdMap = (
-      pd.DataFrame(noteData[c.raterParticipantIdKey].unique())
-      .reset_index()
-      .set_index(0)
-      .reset_index()
-      .rename(columns={0: c.raterParticipantIdKey, "index": Constants.raterIndexKey})
+    # Indices are assigned in order of first appearance.  factorize returns the same indices
+    # (and leaves the ratings in the same order) as merging the ratings with maps built from
+    # unique(), without hashing every ID a second time for each merge.
+    raterCodes, raterIds = pd.factorize(noteData[c.raterParticipantIdKey])
+    raterIdMap = pd.DataFrame(
+      {c.raterParticipantIdKey: raterIds, Constants.raterIndexKey: np.arange(len(raterIds))}
     )
 
-    noteIdMap = (
-      pd.DataFrame(noteData[c.noteIdKey].unique())
-      .reset_index()
-      .set_index(0)
-      .reset_index()
-      .rename(columns={0: c.noteIdKey, "index": Constants.noteIndexKey})
+    noteCodes, noteIds = pd.factorize(noteData[c.noteIdKey])
+    noteIdMap = pd.DataFrame(
+      {c.noteIdKey: noteIds, Constants.noteIndexKey: np.arange(len(noteIds))}
     )
 
-    ratingFeaturesAndLabels = noteData.merge(noteIdMap, on=c.noteIdKey)
-    ratingFeaturesAndLabels = ratingFeaturesAndLabels.merge(raterIdMap, on=c.raterParticipantIdKey)
+    ratingFeaturesAndLabels = noteData.reset_index(drop=True)
+    ratingFeaturesAndLabels[Constants.noteIndexKey] = noteCodes.astype(np.int64)
+    ratingFeaturesAndLabels[Constants.raterIndexKey] = raterCodes.astype(np.int64)
 
     return noteIdMap, raterIdMap, ratingFeaturesAndLabels
 
@@ -257,6 +416,20 @@ class MatrixFactorization:
 
     return noteParams, raterParams
 
+  def _freeze_parameters(
+    self,
+    freezeNoteParameters: bool = False,
+    freezeRaterParameters: bool = False,
+    freezeGlobalParameters: bool = False,
+  ) -> None:
+    assert self.mf_model is not None
+    if freezeRaterParameters:
+      self.mf_model._freeze_parameters(set({"user"}))
+    if freezeGlobalParameters:
+      self.mf_model._freeze_parameters(set({"global"}))
+    if freezeNoteParameters:
+      self.mf_model._freeze_parameters(set({"note"}))
+
   def _create_mf_model(
     self,
     noteInit: Optional[pd.DataFrame] = None,
@@ -389,76 +562,145 @@ class MatrixFactorization:
     else:
       self.trainModelData = self.modelData
 
-  def _get_loss(self, epoch: Optional[int] = None):
+  def _get_loss(self, epoch: Optional[int] = None, modelData: Optional[ModelData] = None):
+    """Compute the regularized loss.
+
+    Args:
+        epoch (int, optional)
+        modelData (ModelData, optional): subset of trainModelData (e.g. a mini-batch) to compute
+          the data loss on.  Regularization is always computed over all parameters.
+    """
     assert self.mf_model is not None
-    y_pred = self.mf_model(self.trainModelData)
+    if modelData is None:
+      modelData = self.trainModelData
+    y_pred = self.mf_model(modelData)
     if self._lossModule is not None:
+      assert modelData is self.trainModelData, "normalized loss requires full-batch training"
       loss = self._lossModule(y_pred)
     else:
-      assert self.trainModelData is not None
-      loss = self.criterion(y_pred, self.trainModelData.rating_labels).mean()
+      assert modelData is not None
+      loss = self.criterion(y_pred, modelData.rating_labels).mean()
     regularizationLoss = self._get_reg_loss()
     loss += regularizationLoss
     assert not torch.isnan(loss).any()
     return loss
 
-  def _get_reg_loss(self):
+  def _get_reg_loss(
+    self,
+    userFactors: Optional[torch.Tensor] = None,
+    userIntercepts: Optional[torch.Tensor] = None,
+    noteFactors: Optional[torch.Tensor] = None,
+    noteIntercepts: Optional[torch.Tensor] = None,
+    globalIntercept: Optional[torch.Tensor] = None,
+  ):
+    """Compute the regularization loss.
+
+    Parameters default to those of mf_model; FusedTrainer passes the segments of a fused model.
+    """
+    if userFactors is None:
+      userFactors = self.mf_model.user_factors.weight
+      userIntercepts = self.mf_model.user_intercepts.weight
+      noteFactors = self.mf_model.note_factors.weight
+      noteIntercepts = self.mf_model.note_intercepts.weight
+      globalIntercept = self.mf_model.global_intercept
     l2_reg_loss = torch.tensor(0.0, dtype=torch.float32).to(self.mf_model.device)
 
     if self._ratingPerUserLossRatio is None:
-      l2_reg_loss += self._userFactorLambda * (self.mf_model.user_factors.weight**2).mean()
-      l2_reg_loss += self._userInterceptLambda * (self.mf_model.user_intercepts.weight**2).mean()
+      l2_reg_loss += self._userFactorLambda * (userFactors**2).mean()
+      l2_reg_loss += self._userInterceptLambda * (userIntercepts**2).mean()
     else:
       simulatedNumberOfRatersForLoss = (
         len(self.trainModelData.rating_labels) / self._ratingPerUserLossRatio
       )
       l2_reg_loss += (
         self._userFactorLambda
-        * (self.mf_model.user_factors.weight**2).sum()
+        * (userFactors**2).sum()
         / simulatedNumberOfRatersForLoss
       )
       l2_reg_loss += (
         self._userInterceptLambda
-        * (self.mf_model.user_intercepts.weight**2).sum()
+        * (userIntercepts**2).sum()
         / simulatedNumberOfRatersForLoss
       )
 
     if self._ratingPerNoteLossRatio is None:
-      l2_reg_loss += self._noteFactorLambda * (self.mf_model.note_factors.weight**2).mean()
-      l2_reg_loss += self._noteInterceptLambda * (self.mf_model.note_intercepts.weight**2).mean()
-      l2_reg_loss += (
-        self._diamondLambda
-        * (self.mf_model.note_factors.weight * self.mf_model.note_intercepts.weight).abs().mean()
-      )
+      l2_reg_loss += self._noteFactorLambda * (noteFactors**2).mean()
+      l2_reg_loss += self._noteInterceptLambda * (noteIntercepts**2).mean()
+      l2_reg_loss += self._diamondLambda * (noteFactors * noteIntercepts).abs().mean()
     else:
       simulatedNumberOfNotesForLoss = (
         len(self.trainModelData.rating_labels) / self._ratingPerNoteLossRatio
       )
       l2_reg_loss += (
         self._noteFactorLambda
-        * (self.mf_model.note_factors.weight**2).sum()
+        * (noteFactors**2).sum()
         / simulatedNumberOfNotesForLoss
       )
       l2_reg_loss += (
         self._noteInterceptLambda
-        * (self.mf_model.note_intercepts.weight**2).sum()
+        * (noteIntercepts**2).sum()
         / simulatedNumberOfNotesForLoss
       )
       l2_reg_loss += (
         self._diamondLambda
-        * (self.mf_model.note_factors.weight * self.mf_model.note_intercepts.weight).abs().sum()
+        * (noteFactors * noteIntercepts).abs().sum()
         / simulatedNumberOfNotesForLoss
       )
 
-    l2_reg_loss += self._globalInterceptLambda * (self.mf_model.global_intercept**2).mean()
+    l2_reg_loss += self._globalInterceptLambda * (globalIntercept**2).mean()
 
     return l2_reg_loss
 
+  def _fit_mini_batches(self, print_interval: int = 1, run_name: str = "") -> int:
+    """Run epochs of shuffled mini-batch gradient descent over trainModelData.
+
+    Each step minimizes the data loss on one mini-batch plus the full regularization loss from
+    _get_reg_loss, so the expected gradient matches the full-batch objective.
+
+    Returns:
+        int: number of mini-batch epochs run
+    """
+    assert self.mf_model is not None
+    assert self.trainModelData is not None
+    numRatings = len(self.trainModelData.rating_labels)
+    optimizer = torch.optim.Adam(
+      [param for param in self.mf_model.parameters() if param.requires_grad],
+      lr=self._miniBatchLearningRate,
+    )
+    with torch.no_grad():
+      prev_loss = self._get_loss().item()
+    epoch = 0
+    while epoch < self._miniBatchMaxEpochs:
+      permutation = torch.randperm(numRatings, device=self.mf_model.device)
+      for start in range(0, numRatings, self._miniBatchSize):
+        batchIndices = permutation[start : start + self._miniBatchSize]
+        batch = ModelData(
+          *[
+            getattr(self.trainModelData, field.name)[batchIndices]
+            for field in dataclasses.fields(ModelData)
+          ]
+        )
+        loss = self._get_loss(epoch=epoch, modelData=batch)
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+      epoch += 1
+
+      with torch.no_grad():
+        loss_value = self._get_loss().item()
+      if self._log and epoch % print_interval == 0:
+        logger.info(f"{run_name}mini-batch epoch {epoch} {loss_value}")
+      if prev_loss - loss_value < self._miniBatchConvergence:
+        break
+      prev_loss = loss_value
+    return epoch
+
   def _fit_model(
     self,
     validate_percent: Optional[float] = None,
     print_interval: int = 20,
     run_name: str = "",
+    maxEpochs: Optional[int] = None,
   ) -> Tuple[float, float, Optional[float]]:
     """Run gradient descent to train the model.
 
@@ -469,17 +711,66 @@ class MatrixFactorization:
         row (torch.LongTensor)
         col (torch.LongTensor)
         rating (torch.FloatTensor)
+        maxEpochs (int, optional): stop after this many epochs even if not converged
     """
     assert self.mf_model is not None
+    startTime = time.time()
     self._create_train_validate_sets(validate_percent)
     assert self.trainModelData is not None
 
+    miniBatchEpochs = 0
+    learningRates = [group["lr"] for group in self.optimizer.param_groups]
+    if self._trainingEngine == "minibatch" and self._lossModule is None:
+      miniBatchEpochs = self._fit_mini_batches(run_name=run_name)
+      # Parameters are now initialized, so refine with at most the learning rate used for
+      # initialized models.
+      for group in self.optimizer.param_groups:
+        group["lr"] = min(group["lr"], self._initLearningRate)
+
+    try:
+      trainer = FusedTrainer.current()
+      if trainer is not None and trainer.can_fuse(self, maxEpochs):
+        epoch, lossValue = trainer.fit(self)
+      else:
+        epoch, lossValue = self._run_full_batch_epochs(print_interval, run_name, maxEpochs)
+    finally:
+      # Later fits on the same optimizer (e.g. warm start phases) use the configured rates.
+      for group, learningRate in zip(self.optimizer.param_groups, learningRates):
+        group["lr"] = learningRate
+
+    if self._log:
+      logger.info(f"Num epochs: {epoch}")
+    fitReport = {
+      "runName": run_name,
+      "trainingEngine": self._trainingEngine,
+      "miniBatchEpochs": miniBatchEpochs,
+      "fullBatchEpochs": epoch,
+      "seconds": time.time() - startTime,
+      "loss": lossValue,
+    }
+    self.fitReports.append(fitReport)
+    logger.info(f"Fit report: {fitReport}")
+    return self._compute_and_print_loss(lossValue, epoch, run_name=run_name, final=True)
+
+  def _run_full_batch_epochs(
+    self,
+    print_interval: int = 20,
+    run_name: str = "",
+    maxEpochs: Optional[int] = None,
+  ) -> Tuple[int, float]:
+    """Run full-batch gradient descent on trainModelData until convergence.
+
+    Returns:
+        Tuple[int, float]: number of epochs run and the final regularized loss
+    """
     prev_loss = 1e10
     loss = self._get_loss()
     epoch = 0
 
-    while (abs(loss.item() - prev_loss) > self._convergence) and (
-      not (epoch > 100 and loss.item() > prev_loss)
+    while (
+      (abs(loss.item() - prev_loss) > self._convergence)
+      and (not (epoch > 100 and loss.item() > prev_loss))
+      and (maxEpochs is None or epoch < maxEpochs)
     ):
       prev_loss = loss.item()
 
@@ -500,10 +791,118 @@ class MatrixFactorization:
         # Log histograms with adaptive handling
 
       epoch += 1
+    return epoch, loss.item()
 
-    if self._log:
-      logger.info(f"Num epochs: {epoch}")
-    return self._compute_and_print_loss(loss.item(), epoch, run_name=run_name, final=True)
+  def _get_touched_masks(
+    self, ratings: pd.DataFrame, warmStart: WarmStart
+  ) -> Tuple[np.ndarray, np.ndarray]:
+    """Identify notes and raters whose parameters should be refit in the delta phase.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: boolean masks aligned with noteIdMap and raterIdMap
+    """
+    noteIds = self.noteIdMap[c.noteIdKey]
+    raterIds = self.raterIdMap[c.raterParticipantIdKey]
+    noteTouched = ~noteIds.isin(
+      warmStart.noteParams.loc[
+        warmStart.noteParams[c.internalNoteInterceptKey].notna(), c.noteIdKey
+      ]
+    )
+    raterTouched = ~raterIds.isin(
+      warmStart.raterParams.loc[
+        warmStart.raterParams[c.internalRaterInterceptKey].notna(), c.raterParticipantIdKey
+      ]
+    )
+    if warmStart.newRatingsAfterMillis is not None:
+      newRatings = ratings[ratings[c.createdAtMillisKey] > warmStart.newRatingsAfterMillis]
+      noteTouched |= noteIds.isin(newRatings[c.noteIdKey])
+      raterTouched |= raterIds.isin(newRatings[c.raterParticipantIdKey])
+    if warmStart.touchedNoteIds is not None:
+      noteTouched |= noteIds.isin(list(warmStart.touchedNoteIds))
+    if warmStart.touchedRaterIds is not None:
+      raterTouched |= raterIds.isin(list(warmStart.touchedRaterIds))
+    return noteTouched.to_numpy(), raterTouched.to_numpy()
+
+  def _fit_model_warm_start(
+    self,
+    ratings: pd.DataFrame,
+    warmStart: WarmStart,
+    run_name: str = "",
+  ) -> Tuple[float, float, Optional[float]]:
+    """Refit a model initialized from warmStart in two phases.
+
+    1. Delta fit: only parameters of touched notes and raters are updated until convergence.
+       The global intercept is held fixed if warmStart provides one, and is fit along with the
+       touched parameters otherwise.
+    2. Polish: all unfrozen parameters are updated for at most warmStart.polishMaxEpochs epochs.
+    """
+    assert self.mf_model is not None
+    noteTouched, raterTouched = self._get_touched_masks(ratings, warmStart)
+    logger.info(
+      f"Warm start: {noteTouched.sum()} of {len(noteTouched)} notes and "
+      f"{raterTouched.sum()} of {len(raterTouched)} raters touched"
+    )
+
+    if noteTouched.any() or raterTouched.any():
+      startTime = time.time()
+      globalInterceptTrainable = self.mf_model.global_intercept.requires_grad
+      if warmStart.globalIntercept is not None:
+        self.mf_model.global_intercept.requires_grad_(False)
+      self.mf_model.restrict_updates(user_mask=raterTouched, note_mask=noteTouched)
+      self.optimizer = torch.optim.Adam(
+        [param for param in self.mf_model.parameters() if param.requires_grad],
+        lr=warmStart.learningRate,
+      )
+      self._fit_model(run_name=f"{run_name}delta/")
+      self.mf_model.clear_update_restrictions()
+      self.mf_model.global_intercept.requires_grad_(globalInterceptTrainable)
+      logger.info(f"Warm start delta fit took {time.time() - startTime:.2f} secs")
+
+    startTime = time.time()
+    self.optimizer = torch.optim.Adam(
+      [param for param in self.mf_model.parameters() if param.requires_grad],
+      lr=warmStart.learningRate,
+    )
+    result = self._fit_model(run_name=f"{run_name}polish/", maxEpochs=warmStart.polishMaxEpochs)
+    logger.info(f"Warm start polish took {time.time() - startTime:.2f} secs")
+    return result
+
+  def _get_drift_from_full_retrain(
+    self,
+    ratings: pd.DataFrame,
+    noteParams: pd.DataFrame,
+    raterParams: pd.DataFrame,
+    warmStart: WarmStart,
+    ratingPerNoteLossRatio: Optional[float] = None,
+    ratingPerUserLossRatio: Optional[float] = None,
+    flipFactorsForIdentification: bool = True,
+    run_name: str = "",
+  ) -> pd.DataFrame:
+    """Fit a model from scratch on ratings and report how far the warm-started parameters are from it.
+
+    The reference model is trained by a new MatrixFactorization with all of the same arguments
+    (see _get_new_mf_with_all_args), so the state of this model (including fitReports) is
+    unaffected.
+    """
+    startTime = time.time()
+    referenceNoteParams, referenceRaterParams, _ = self._get_new_mf_with_all_args().run_mf(
+      ratings,
+      ratingPerNoteLossRatio=ratingPerNoteLossRatio,
+      ratingPerUserLossRatio=ratingPerUserLossRatio,
+      flipFactorsForIdentification=flipFactorsForIdentification,
+      run_name=f"{run_name}full_retrain_reference",
+    )
+    drift = get_parameter_drift(
+      noteParams,
+      raterParams,
+      referenceNoteParams,
+      referenceRaterParams,
+      tolerance=warmStart.driftTolerance,
+    )
+    logger.info(
+      f"Warm start drift from full retrain ({time.time() - startTime:.2f} secs):\n{drift.to_string()}"
+    )
+    return drift
 
   def prepare_features_and_labels(
     self,
@@ -542,6 +941,7 @@ class MatrixFactorization:
     ratingPerUserLossRatio: Optional[float] = None,
     flipFactorsForIdentification: bool = True,
     run_name: str = "",
+    warmStart: Optional[WarmStart] = None,
   ):
     """Train matrix factorization model.
 
@@ -553,6 +953,10 @@ class MatrixFactorization:
         userInit (pd.DataFrame, optional)
         globalInterceptInit (float, optional).
         specificNoteId (int, optional) Do approximate analysis to score a particular note
+        warmStart (WarmStart, optional) Initialize from a previous run's parameters and only
+          refit notes and raters touched by new ratings, followed by a short global polish.
+          Overrides noteInit, userInit and globalInterceptInit.  With normalizedLossHyperparameters,
+          the normalized-loss refit is warm started the same way.
 
     Returns:
         Tuple[pd.DataFrame, pd.DataFrame, float]:
@@ -588,12 +992,30 @@ class MatrixFactorization:
       "freezeGlobalParameters": freezeGlobalParameters,
       "validatePercent": validatePercent,
       "flipFactorsForIdentification": flipFactorsForIdentification,
+      "warmStart": warmStart is not None,
     }
     logger.info(f"Reinitializing wandb run with enabled state: {wandb._enabled}")
     wandb.reinitialize(unique_run_id, config=config)
     self._ratingPerNoteLossRatio = ratingPerNoteLossRatio
     self._ratingPerUserLossRatio = ratingPerUserLossRatio
 
+    if warmStart is not None:
+      assert validatePercent is None, "warm start does not support validation splits"
+      assert specificNoteId is None, "warm start does not support specificNoteId"
+      if warmStart.scorerName is not None:
+        warmStart = dataclasses.replace(
+          warmStart,
+          noteParams=warmStart.noteParams[
+            warmStart.noteParams[c.scorerNameKey] == warmStart.scorerName
+          ],
+          raterParams=warmStart.raterParams[
+            warmStart.raterParams[c.scorerNameKey] == warmStart.scorerName
+          ],
+        )
+      noteInit = warmStart.noteParams
+      userInit = warmStart.raterParams
+      globalInterceptInit = warmStart.globalIntercept
+
     self._initialize_note_and_rater_id_maps(ratings)
 
     self._create_mf_model(noteInit, userInit, globalInterceptInit)
@@ -614,17 +1036,17 @@ class MatrixFactorization:
         f"Correcting loss function to simulate rating per user loss ratio = {ratingPerUserLossRatio}"
       )
 
-    if freezeRaterParameters:
-      self.mf_model._freeze_parameters(set({"user"}))
-    if freezeGlobalParameters:
-      self.mf_model._freeze_parameters(set({"global"}))
-    if freezeNoteParameters:
-      self.mf_model._freeze_parameters(set({"note"}))
+    self._freeze_parameters(freezeNoteParameters, freezeRaterParameters, freezeGlobalParameters)
     if specificNoteId is not None:
       self.mf_model.freeze_rater_and_global_parameters()
     self.prepare_features_and_labels(specificNoteId)
 
-    train_loss, loss, validate_loss = self._fit_model(validatePercent, run_name=run_name)
+    if warmStart is not None:
+      train_loss, loss, validate_loss = self._fit_model_warm_start(
+        ratings, warmStart, run_name=run_name
+      )
+    else:
+      train_loss, loss, validate_loss = self._fit_model(validatePercent, run_name=run_name)
     if self._normalizedLossHyperparameters is not None:
       _, raterParams = self._get_parameters_from_trained_model(flipFactorsForIdentification)
       assert self.modelData is not None
@@ -637,8 +1059,17 @@ class MatrixFactorization:
         raterParams,
         device=self.mf_model.device,
       )
-      self._create_mf_model(None, userInit, None)
-      train_loss, loss, validate_loss = self._fit_model(validatePercent, run_name=run_name)
+      if warmStart is not None:
+        # Refit under the normalized loss from the warm-start parameters again, so that only
+        # touched notes and raters are refit before the polish.
+        self._create_mf_model(noteInit, userInit, globalInterceptInit)
+        self._freeze_parameters(freezeNoteParameters, freezeRaterParameters, freezeGlobalParameters)
+        train_loss, loss, validate_loss = self._fit_model_warm_start(
+          ratings, warmStart, run_name=f"{run_name}normalized_loss/"
+        )
+      else:
+        self._create_mf_model(None, userInit, None)
+        train_loss, loss, validate_loss = self._fit_model(validatePercent, run_name=run_name)
       self._lossModule = None
 
     assert self.mf_model.note_factors.weight.data.cpu().numpy().shape[0] == self.noteIdMap.shape[0]
@@ -655,6 +1086,27 @@ class MatrixFactorization:
 
     wandb.finish()
 
+    if warmStart is not None:
+      drift = get_parameter_drift(
+        fitNoteParams,
+        fitRaterParams,
+        warmStart.noteParams,
+        warmStart.raterParams,
+        tolerance=warmStart.driftTolerance,
+      )
+      logger.info(f"Warm start drift from previous parameters:\n{drift.to_string()}")
+      if warmStart.compareToFullRetrain:
+        self.warmStartDriftFromFullRetrain = self._get_drift_from_full_retrain(
+          ratings,
+          fitNoteParams,
+          fitRaterParams,
+          warmStart,
+          ratingPerNoteLossRatio=ratingPerNoteLossRatio,
+          ratingPerUserLossRatio=ratingPerUserLossRatio,
+          flipFactorsForIdentification=flipFactorsForIdentification,
+          run_name=run_name,
+        )
+
     fitRaterParams.drop(Constants.raterIndexKey, axis=1, inplace=True)
     if validatePercent is None:
       return fitNoteParams, fitRaterParams, globalIntercept
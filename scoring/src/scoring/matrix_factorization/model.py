@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 import logging
-from typing import Optional
+from typing import List, Optional
 
+import numpy as np
 import torch
 
 
@@ -56,6 +57,7 @@ class BiasedMatrixFactorization(torch.nn.Module):
     self.user_intercepts.weight.data.fill_(0.0)
     self.note_intercepts.weight.data.fill_(0.0)
     self.device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+    self._update_restriction_hooks: List[torch.utils.hooks.RemovableHandle] = []
 
   def forward(self, data: ModelData):
     """
@@ -92,3 +94,33 @@ class BiasedMatrixFactorization(torch.nn.Module):
           if self._log:
             logger.info(f"Freezing parameter: {name}")
           param.requires_grad_(False)
+
+  def restrict_updates(
+    self, user_mask: Optional[np.ndarray] = None, note_mask: Optional[np.ndarray] = None
+  ):
+    """Only allow gradient updates to the users and notes selected by the masks.
+
+    Gradients for unselected rows of the user (resp. note) embedding tables are zeroed, so
+    optimizers without weight decay leave those rows unchanged.
+
+    Args:
+        user_mask (np.ndarray, optional): boolean array of length n_users. None allows all users.
+        note_mask (np.ndarray, optional): boolean array of length n_notes. None allows all notes.
+    """
+    for mask, tables in [
+      (user_mask, [self.user_factors, self.user_intercepts]),
+      (note_mask, [self.note_factors, self.note_intercepts]),
+    ]:
+      if mask is None:
+        continue
+      rowMask = torch.tensor(np.asarray(mask), dtype=torch.float32, device=self.device).unsqueeze(1)
+      for table in tables:
+        self._update_restriction_hooks.append(
+          table.weight.register_hook(lambda grad, rowMask=rowMask: grad * rowMask)
+        )
+
+  def clear_update_restrictions(self):
+    """Remove restrictions set by restrict_updates."""
+    for handle in self._update_restriction_hooks:
+      handle.remove()
+    self._update_restriction_hooks = []
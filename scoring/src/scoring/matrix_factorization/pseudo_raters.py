@@ -35,8 +35,17 @@ class PseudoRatersRunner:
     mfRanker: MatrixFactorization,
     log=True,
     checkParamsSame=True,
+    batchScenarios=False,
   ):
+    """
+    Args:
+      batchScenarios: if True, refit note parameters for all extreme rating scenarios in a single
+        batched optimization.  If False, run a separate MF fit for each scenario.  The batched
+        fit sums float32 losses across scenarios, so note parameters can differ from the
+        separate fits by about 1e-7.
+    """
     self._log = log
+    self._batchScenarios = batchScenarios
     self._mfRanker = mfRanker
     self._checkParamsSame = checkParamsSame
     self.ratings = ratings
@@ -56,7 +65,10 @@ class PseudoRatersRunner:
       self._create_extreme_ratings()
 
     with c.time_block("Pseudoraters: fit models"):
-      noteParamsList = self._fit_note_params_for_each_dataset_with_extreme_ratings()
+      if self._batchScenarios:
+        noteParamsList = self._fit_note_params_for_all_scenarios_batched()
+      else:
+        noteParamsList = self._fit_note_params_for_each_dataset_with_extreme_ratings()
 
     with c.time_block("Pseudoraters: aggregate"):
       notesWithConfidenceBounds = self._aggregate_note_params(noteParamsList)
@@ -66,10 +78,13 @@ class PseudoRatersRunner:
     return noteParams
 
   def _check_rater_parameters_same(self, newMatrixFactorization: MatrixFactorization):
+    """Assert that the new model holds the original parameters of every original rater."""
     (
       noteParamsFromNewModel,
       raterParamsFromNewModel,
-    ) = newMatrixFactorization._get_parameters_from_trained_model()
+    ) = newMatrixFactorization._get_parameters_from_trained_model(
+      flipFactorsForIdentification=False
+    )
     raterParamsCols = [
       c.raterParticipantIdKey,
       c.internalRaterInterceptKey,
@@ -79,6 +94,12 @@ class PseudoRatersRunner:
     oldParams = self.raterParams.loc[:, raterParamsCols].set_index(c.raterParticipantIdKey)
     overlapParticipantIds = newParams.index.intersection(oldParams.index)
     assert len(overlapParticipantIds) == len(oldParams)
+    # The model stores parameters as float32, so compare at that precision.
+    assert np.array_equal(
+      newParams.loc[oldParams.index].to_numpy(dtype=np.float32),
+      oldParams.to_numpy(dtype=np.float32),
+      equal_nan=True,
+    ), "rater parameters changed"
 
   def _check_note_parameters_same(self, newMatrixFactorization: MatrixFactorization):
     (
@@ -244,12 +265,13 @@ class PseudoRatersRunner:
         [c.internalRaterInterceptKey, c.internalRaterFactor1Key], axis=1
       )
       extremeRatingsToAdd[c.noteIdKey] = extremeRatingsToAdd[c.noteIdKey].astype(np.int64)
-      if isinstance(self.ratingFeaturesAndLabels[c.raterParticipantIdKey].dtype, pd.Int64Dtype):
-        # Only convert ID type from string to Int64 if is necessary to match existing IDs (which is
-        # expected when running in prod, but not always in unit tests or public data.)
+      raterIdDtype = self.ratingFeaturesAndLabels[c.raterParticipantIdKey].dtype
+      if raterIdDtype != object:
+        # Only convert ID type from string if is necessary to match existing IDs (which is
+        # expected when participant IDs have been encoded as integers, but not always in unit tests.)
         extremeRatingsToAdd[c.raterParticipantIdKey] = extremeRatingsToAdd[
           c.raterParticipantIdKey
-        ].astype(pd.Int64Dtype())
+        ].astype(raterIdDtype)
       ratingFeaturesAndLabelsWithExtremeRatings = pd.concat(
         [self.ratingFeaturesAndLabels, extremeRatingsToAdd]
       )
@@ -283,6 +305,145 @@ class PseudoRatersRunner:
       noteParamsList.append(fitNoteParams)
     return noteParamsList
 
+  def _fit_note_params_for_all_scenarios_batched(self):
+    """Refit note parameters for every extreme rating scenario in one batched optimization.
+
+    Equivalent to _fit_note_params_for_each_dataset_with_extreme_ratings: rater and global
+    parameters are frozen, so the fits for each scenario are independent.  Rater and global
+    parameters are read once from baseMF, whose rater parameters are checked against the
+    originals when it is created, and only note parameters are passed to the optimizer.  Note parameters are
+    stacked along a leading scenario dimension and the per-scenario losses are summed, so each
+    scenario receives exactly the gradients (and elementwise Adam updates) of its own fit.  Each
+    scenario stops updating once it meets the convergence criterion from
+    MatrixFactorization._fit_model.
+    """
+    baseMF = self._create_new_model_with_extreme_raters_from_original_params(
+      self.ratingFeaturesAndLabels
+    )
+    model = baseMF.mf_model
+    assert model is not None
+    device = model.device
+    scenarios = self.extremeRatingsToAddWithoutNotes
+    numScenarios = len(scenarios)
+
+    # Original ratings, shared by all scenarios.
+    noteIndexes = torch.LongTensor(self.ratingFeaturesAndLabels[mf_c.noteIndexKey].values).to(
+      device
+    )
+    raterIndexes = torch.LongTensor(self.ratingFeaturesAndLabels[mf_c.raterIndexKey].values).to(
+      device
+    )
+    labels = torch.FloatTensor(self.ratingFeaturesAndLabels[baseMF._labelCol].values).to(device)
+    # Extra ratings: each scenario with an extreme rater adds one rating to every note.
+    extraNoteIndexes = torch.LongTensor(
+      self.ratingFeaturesAndLabels[mf_c.noteIndexKey].drop_duplicates().values
+    ).to(device)
+    hasExtra = torch.tensor(
+      [scenario[c.helpfulNumKey] is not None for scenario in scenarios], device=device
+    )
+    extraRaterIndexes = torch.LongTensor(
+      [
+        scenario[mf_c.raterIndexKey] if scenario[c.helpfulNumKey] is not None else 0
+        for scenario in scenarios
+      ]
+    ).to(device)
+    extraLabels = torch.FloatTensor(
+      [
+        scenario[c.helpfulNumKey] if scenario[c.helpfulNumKey] is not None else 0.0
+        for scenario in scenarios
+      ]
+    ).to(device)
+    numRatings = hasExtra * len(extraNoteIndexes) + len(labels)
+
+    with torch.no_grad():
+      raterIntercepts = model.user_intercepts.weight[raterIndexes, 0]
+      raterFactors = model.user_factors.weight[raterIndexes].T
+      extraRaterIntercepts = model.user_intercepts.weight[extraRaterIndexes]
+      extraRaterFactors = model.user_factors.weight[extraRaterIndexes].unsqueeze(2)
+      globalIntercept = model.global_intercept[0, 0] if model.use_global_intercept else 0.0
+      # Rater and global regularization is constant, but included so losses match _fit_model.
+      constantRegLoss = (
+        baseMF._userFactorLambda * (model.user_factors.weight**2).mean()
+        + baseMF._userInterceptLambda * (model.user_intercepts.weight**2).mean()
+        + baseMF._globalInterceptLambda * (model.global_intercept**2).mean()
+      )
+
+    noteIntercepts = torch.nn.Parameter(
+      model.note_intercepts.weight.detach()[:, 0].repeat(numScenarios, 1)
+    )
+    # Factors are stored as (scenario, factor, note) so notes are indexed along the last
+    # dimension, which keeps the backward index_add fast.
+    noteFactors = torch.nn.Parameter(
+      model.note_factors.weight.detach().T.repeat(numScenarios, 1, 1).contiguous()
+    )
+    optimizer = torch.optim.Adam([noteIntercepts, noteFactors], lr=baseMF._initLearningRate)
+
+    def get_scenario_losses():
+      pred = raterIntercepts + noteIntercepts.index_select(1, noteIndexes)
+      pred = pred + (raterFactors * noteFactors.index_select(2, noteIndexes)).sum(1)
+      pred = pred + globalIntercept
+      dataLoss = baseMF.criterion(pred, labels.expand(numScenarios, -1)).sum(1)
+      extraPred = extraRaterIntercepts + noteIntercepts.index_select(1, extraNoteIndexes)
+      extraPred = extraPred + (
+        extraRaterFactors * noteFactors.index_select(2, extraNoteIndexes)
+      ).sum(1)
+      extraPred = extraPred + globalIntercept
+      extraLoss = baseMF.criterion(extraPred, extraLabels.unsqueeze(1).expand_as(extraPred))
+      dataLoss = (dataLoss + (extraLoss * hasExtra.unsqueeze(1)).sum(1)) / numRatings
+      regLoss = (
+        baseMF._noteFactorLambda * (noteFactors**2).mean(dim=(1, 2))
+        + baseMF._noteInterceptLambda * (noteIntercepts**2).mean(dim=1)
+        + baseMF._diamondLambda * (noteFactors * noteIntercepts.unsqueeze(1)).abs().mean(dim=(1, 2))
+      )
+      return dataLoss + regLoss + constantRegLoss
+
+    losses = get_scenario_losses()
+    prevLosses = torch.full((numScenarios,), 1e10, dtype=torch.float64, device=device)
+    active = torch.ones(numScenarios, dtype=torch.bool, device=device)
+    epochs = torch.zeros(numScenarios, dtype=torch.int64, device=device)
+    epoch = 0
+    while True:
+      lossValues = losses.detach().double()
+      active &= ((lossValues - prevLosses).abs() > baseMF._convergence) & ~(
+        (epoch > 100) & (lossValues > prevLosses)
+      )
+      if not active.any():
+        break
+      prevLosses = torch.where(active, lossValues, prevLosses)
+      epochs += active
+
+      losses.sum().backward()
+      savedIntercepts = noteIntercepts.detach().clone()
+      savedFactors = noteFactors.detach().clone()
+      optimizer.step()
+      optimizer.zero_grad()
+      with torch.no_grad():
+        # Converged scenarios keep their final parameters.
+        noteIntercepts[~active] = savedIntercepts[~active]
+        noteFactors[~active] = savedFactors[~active]
+
+      losses = get_scenario_losses()
+      epoch += 1
+
+    if self._log:
+      logger.info(f"Pseudoraters: batched refit epochs per scenario: {epochs.tolist()}")
+
+    noteParamsList = []
+    for i, ratingToAddWithoutNoteId in enumerate(scenarios):
+      fitNoteParams = self.noteIdMap.copy(deep=True)
+      fitNoteParams[c.internalNoteInterceptKey] = noteIntercepts[i].detach().cpu().numpy()
+      for j in range(baseMF._numFactors):
+        fitNoteParams[c.note_factor_key(j + 1)] = noteFactors[i, j].detach().cpu().numpy()
+      fitNoteParams[Constants.extraRaterInterceptKey] = ratingToAddWithoutNoteId[
+        c.internalRaterInterceptKey
+      ]
+      fitNoteParams[Constants.extraRaterFactor1Key] = ratingToAddWithoutNoteId[
+        c.internalRaterFactor1Key
+      ]
+      fitNoteParams[Constants.extraRatingHelpfulNumKey] = ratingToAddWithoutNoteId[c.helpfulNumKey]
+      noteParamsList.append(fitNoteParams)
+    return noteParamsList
+
   def _aggregate_note_params(self, noteParamsList, joinOrig=False):
     rawRescoredNotesWithEachExtraRater = pd.concat(
       noteParamsList,
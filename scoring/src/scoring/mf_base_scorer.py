@@ -11,14 +11,15 @@ from . import (
   tag_filter,
 )
 from .incorrect_filter import get_user_incorrect_ratio
-from .matrix_factorization.matrix_factorization import MatrixFactorization
+from .matrix_factorization.matrix_factorization import MatrixFactorization, WarmStart
 from .matrix_factorization.pseudo_raters import PseudoRatersRunner
-from .pandas_utils import get_df_fingerprint, keep_columns
+from .pandas_utils import get_df_fingerprint, get_first_valid_values, keep_columns
 from .reputation_matrix_factorization.diligence_model import (
   fit_low_diligence_model_final,
   fit_low_diligence_model_prescoring,
 )
 from .scorer import Scorer
+from .tag_mask import select_columns
 
 import numpy as np
 import pandas as pd
@@ -54,16 +55,12 @@ def coalesce_columns(df: pd.DataFrame, columnPrefix: str) -> pd.DataFrame:
   columns = [col for col in df.columns if col.startswith(f"{columnPrefix}_")]
   if not columns:
     return df
-  # Validate that at most one column is set, and store which rows have a column set
-  rowResults = np.invert(df[columns].isna()).sum(axis=1)
-  assert all(rowResults <= 1), "each row should only be in one modeling group"
+  # Validate that at most one column is set
+  rowResults = df[columns].notna().to_numpy().sum(axis=1)
+  assert (rowResults <= 1).all(), "each row should only be in one modeling group"
 
   # Coalesce results
-  def _get_value(row):
-    idx = row.first_valid_index()
-    return row[idx] if idx is not None else np.nan
-
-  coalesced = df[columns].apply(_get_value, axis=1)
+  coalesced = get_first_valid_values(df, columns)
   # Drop old columns and replace with new
   df = df.drop(columns=columns)
   df[columnPrefix] = coalesced
@@ -196,6 +193,8 @@ class MFBaseScorer(Scorer):
     firmRejectThreshold: Optional[float] = None,
     minMinorityNetHelpfulRatings: Optional[int] = None,
     minMinorityNetHelpfulRatio: Optional[float] = None,
+    mfTrainingEngine: Optional[str] = None,
+    batchPseudoRaterScenarios: bool = False,
   ):
     """Configure MatrixFactorizationScorer object.
 
@@ -234,6 +233,9 @@ class MFBaseScorer(Scorer):
       threads: number of threads to use for intra-op parallelism in pytorch
       maxFirstMFTrainError: maximum error allowed for the first MF training process
       maxFinalMFTrainError: maximum error allowed for the final MF training process
+      mfTrainingEngine: if set, training engine for matrix factorization (see MatrixFactorization)
+      batchPseudoRaterScenarios: if True, refit pseudorater scenarios in one batched optimization
+        (see PseudoRatersRunner)
     """
     super().__init__(
       includedTopics=includedTopics,
@@ -246,6 +248,7 @@ class MFBaseScorer(Scorer):
       threads=threads,
     )
     self._pseudoraters = pseudoraters
+    self._batchPseudoRaterScenarios = batchPseudoRaterScenarios
     self._minNumRatingsPerRater = minNumRatingsPerRater
     self._minNumRatersPerNote = minNumRatersPerNote
     self._minRatingsNeeded = minRatingsNeeded
@@ -294,6 +297,7 @@ class MFBaseScorer(Scorer):
           ("initLearningRate", 0.02 if normalizedLossHyperparameters is not None else 0.2),
           ("noInitLearningRate", 0.02 if normalizedLossHyperparameters is not None else 1.0),
           ("seed", seed) if seed is not None else None,
+          ("trainingEngine", mfTrainingEngine) if mfTrainingEngine is not None else None,
         ]
         if pair is not None
       ]
@@ -417,13 +421,17 @@ class MFBaseScorer(Scorer):
     """
     if final:
       return process_data.filter_ratings(
-        ratings, minNumRatingsPerRater=0, minNumRatersPerNote=self._minNumRatersPerNote
+        ratings,
+        minNumRatingsPerRater=0,
+        minNumRatersPerNote=self._minNumRatersPerNote,
+        ratingsIndex=self._ratingsIndex,
       )
     else:
       return process_data.filter_ratings(
         ratings,
         minNumRatingsPerRater=self._minNumRatingsPerRater,
         minNumRatersPerNote=self._minNumRatersPerNote,
+        ratingsIndex=self._ratingsIndex,
       )
 
   def _run_regular_matrix_factorization(self, ratingsForTraining: pd.DataFrame):
@@ -487,6 +495,24 @@ class MFBaseScorer(Scorer):
       )
     return modelResult
 
+  def _get_warm_start(self) -> Optional[WarmStart]:
+    """Return a WarmStart from this scorer's previous prescoring output, if one was provided."""
+    prescoringWarmStart = self._prescoringWarmStart
+    if prescoringWarmStart is None:
+      return None
+    metaScorerOutput = prescoringWarmStart.metaOutput.metaScorerOutput.get(self.get_name())
+    if metaScorerOutput is None:
+      logger.info(f"No previous prescoring output for {self.get_name()}; training from scratch.")
+      return None
+    return WarmStart(
+      noteParams=prescoringWarmStart.noteModelOutput,
+      raterParams=prescoringWarmStart.raterModelOutput,
+      globalIntercept=metaScorerOutput.globalIntercept,
+      scorerName=self.get_name(),
+      newRatingsAfterMillis=prescoringWarmStart.newRatingsAfterMillis,
+      compareToFullRetrain=prescoringWarmStart.compareToFullRetrain,
+    )
+
   def compute_tag_thresholds_for_percentile(
     self, scoredNotes, raterParams, ratings
   ) -> Dict[str, float]:
@@ -541,7 +567,8 @@ class MFBaseScorer(Scorer):
 
     with self.time_block("Prepare ratings"):
       ratingsForTraining = self._prepare_data_for_scoring(
-        ratings[
+        select_columns(
+          ratings,
           [
             c.noteIdKey,
             c.raterParticipantIdKey,
@@ -553,8 +580,8 @@ class MFBaseScorer(Scorer):
             c.notHelpfulSourcesMissingOrUnreliableTagKey,
             c.notHelpfulSpamHarassmentOrAbuseTagKey,
             c.notHelpfulOtherTagKey,
-          ]
-        ]
+          ],
+        )
       )
     logger.info(
       f"ratingsForTraining summary {self.get_name()}: {get_df_fingerprint(ratingsForTraining, [c.noteIdKey, c.raterParticipantIdKey])}"
@@ -570,14 +597,25 @@ class MFBaseScorer(Scorer):
 
     # TODO: Save parameters from this first run in note_model_output next time we add extra fields to model output TSV.
     with self.time_block("First MF/stable init"):
-      (
-        noteParamsUnfiltered,
-        raterParamsUnfiltered,
-        globalBias,
-      ) = self._run_stable_matrix_factorization(
-        ratingsForTraining[[c.noteIdKey, c.raterParticipantIdKey, c.helpfulNumKey]],
-        userEnrollmentRaw[[c.participantIdKey, c.modelingGroupKey]],
-      )
+      warmStart = self._get_warm_start()
+      if warmStart is not None:
+        # Start from the previous prescoring parameters instead of the stable initialization.
+        noteParamsUnfiltered, raterParamsUnfiltered, globalBias = self._mfRanker.run_mf(
+          ratingsForTraining[
+            [c.noteIdKey, c.raterParticipantIdKey, c.helpfulNumKey, c.createdAtMillisKey]
+          ],
+          warmStart=warmStart,
+          run_name=f"{self.get_name()}/warm_start",
+        )
+      else:
+        (
+          noteParamsUnfiltered,
+          raterParamsUnfiltered,
+          globalBias,
+        ) = self._run_stable_matrix_factorization(
+          ratingsForTraining[[c.noteIdKey, c.raterParticipantIdKey, c.helpfulNumKey]],
+          userEnrollmentRaw[[c.participantIdKey, c.modelingGroupKey]],
+        )
     if self._saveIntermediateState:
       self.noteParamsUnfiltered = noteParamsUnfiltered
       self.raterParamsUnfiltered = raterParamsUnfiltered
@@ -620,7 +658,8 @@ class MFBaseScorer(Scorer):
       # Get a dataframe of scored notes based on the algorithm results above
       with self.time_block("Compute scored notes"):
         scoredNotes = note_ratings.compute_scored_notes(
-          ratings[
+          select_columns(
+            ratings,
             [
               c.noteIdKey,
               c.raterParticipantIdKey,
@@ -628,8 +667,8 @@ class MFBaseScorer(Scorer):
               c.createdAtMillisKey,
             ]
             + c.notHelpfulTagsTSVOrder
-            + c.helpfulTagsTSVOrder
-          ],
+            + c.helpfulTagsTSVOrder,
+          ),
           keep_columns(
             noteParamsUnfiltered,
             [
@@ -739,7 +778,8 @@ class MFBaseScorer(Scorer):
       with self.time_block("Filtering by helpfulness score"):
         ratingsHelpfulnessScoreFilteredPreHarassmentFilter = (
           helpfulness_scores.filter_ratings_by_helpfulness_scores(
-            ratingsForTraining[
+            select_columns(
+              ratingsForTraining,
               [
                 c.noteIdKey,
                 c.raterParticipantIdKey,
@@ -747,8 +787,8 @@ class MFBaseScorer(Scorer):
                 c.createdAtMillisKey,
                 c.helpfulnessLevelKey,
                 c.notHelpfulOtherTagKey,
-              ]
-            ],
+              ],
+            ),
             helpfulnessScoresPreHarassmentFilter,
           )
         )
@@ -821,7 +861,8 @@ class MFBaseScorer(Scorer):
       # Filter ratings based on prev helpfulness scores
       with c.time_block("Final round MF"):
         finalRoundRatings = helpfulness_scores.filter_ratings_by_helpfulness_scores(
-          ratingsForTraining[
+          select_columns(
+            ratingsForTraining,
             [
               c.noteIdKey,
               c.raterParticipantIdKey,
@@ -829,8 +870,8 @@ class MFBaseScorer(Scorer):
               c.notHelpfulIncorrectTagKey,
               c.notHelpfulSourcesMissingOrUnreliableTagKey,
               c.notHelpfulIrrelevantSourcesTagKey,
-            ]
-          ],
+            ],
+          ),
           helpfulnessScores[[c.raterParticipantIdKey, c.aboveHelpfulnessThresholdKey]],
         )
         noteParams, raterParams, globalBias = self._mfRanker.run_mf(
@@ -862,15 +903,16 @@ class MFBaseScorer(Scorer):
         diligenceRaterParams,
         diligenceGlobalIntercept,
       ) = fit_low_diligence_model_prescoring(
-        finalRoundRatings[
+        select_columns(
+          finalRoundRatings,
           [
             c.noteIdKey,
             c.raterParticipantIdKey,
             c.notHelpfulIncorrectTagKey,
             c.notHelpfulSourcesMissingOrUnreliableTagKey,
             c.notHelpfulIrrelevantSourcesTagKey,
-          ]
-        ],
+          ],
+        ),
         raterInitStateDiligence=raterParamsDiligenceInit,
       )
       noteParams = noteParams.merge(diligenceNoteParams, on=c.noteIdKey)
@@ -886,7 +928,8 @@ class MFBaseScorer(Scorer):
 
     # Compute scored notes -- currently not returned; only used for downstream computation.
     scoredNotes = note_ratings.compute_scored_notes(
-      ratings[
+      select_columns(
+        ratings,
         [
           c.noteIdKey,
           c.raterParticipantIdKey,
@@ -894,8 +937,8 @@ class MFBaseScorer(Scorer):
           c.createdAtMillisKey,
         ]
         + c.notHelpfulTagsTSVOrder
-        + c.helpfulTagsTSVOrder
-      ],
+        + c.helpfulTagsTSVOrder,
+      ),
       keep_columns(
         noteParamsUnfiltered,
         [
@@ -947,13 +990,14 @@ class MFBaseScorer(Scorer):
           suffixes=("", "_dup"),
         ),
         raterParams=raterParams[[c.raterParticipantIdKey, c.internalRaterFactor1Key]],
-        ratings=ratings[
+        ratings=select_columns(
+          ratings,
           [
             c.noteIdKey,
             c.raterParticipantIdKey,
           ]
-          + c.notHelpfulTagsTSVOrder
-        ],
+          + c.notHelpfulTagsTSVOrder,
+        ),
       ),
       finalRoundNumRatings=len(finalRoundRatings),
       finalRoundNumNotes=finalRoundRatings[c.noteIdKey].nunique(),
@@ -962,13 +1006,14 @@ class MFBaseScorer(Scorer):
 
     # Compute user incorrect tag aggregates
     userIncorrectTagUsageDf = get_user_incorrect_ratio(
-      ratings[
+      select_columns(
+        ratings,
         [
           c.noteIdKey,
           c.raterParticipantIdKey,
         ]
-        + c.notHelpfulTagsTSVOrder
-      ]
+        + c.notHelpfulTagsTSVOrder,
+      )
     )
 
     raterModelOutput = raterParams.merge(
@@ -1110,7 +1155,12 @@ class MFBaseScorer(Scorer):
     if self._pseudoraters:
       with self.time_block("Pseudoraters"):
         noteParams = PseudoRatersRunner(
-          finalRoundRatings, noteParams, raterParams, globalBias, self._mfRanker
+          finalRoundRatings,
+          noteParams,
+          raterParams,
+          globalBias,
+          self._mfRanker,
+          batchScenarios=self._batchPseudoRaterScenarios,
         ).compute_note_parameter_confidence_bounds_with_pseudo_raters()
         if self._saveIntermediateState:
           self.prePseudoratersNoteParams = self.noteParams
@@ -1233,6 +1283,7 @@ class MFBaseScorer(Scorer):
     c.scorerNameKey field of those dataframes.
     """
     torch.set_num_threads(self._threads)
+    self._ratingsIndex = scoringArgs.ratingsIndex
     logger.info(
       f"score_final: Torch intra-op parallelism for {self.get_name()} set to: {torch.get_num_threads()}"
     )
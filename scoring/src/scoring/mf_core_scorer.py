@@ -15,6 +15,8 @@ class MFCoreScorer(MFBaseScorer):
     firmRejectThreshold: Optional[float] = 0.3,
     minMinorityNetHelpfulRatings: Optional[int] = 4,
     minMinorityNetHelpfulRatio: Optional[float] = 0.05,
+    mfTrainingEngine: Optional[str] = None,
+    batchPseudoRaterScenarios: bool = False,
   ) -> None:
     """Configure MFCoreScorer object.
 
@@ -22,6 +24,8 @@ class MFCoreScorer(MFBaseScorer):
       seed: if not None, seed value to ensure deterministic execution
       pseudoraters: if True, compute optional pseudorater confidence intervals
       threads: number of threads to use for intra-op parallelism in pytorch
+      mfTrainingEngine: if set, training engine for matrix factorization (see MatrixFactorization)
+      batchPseudoRaterScenarios: if True, refit pseudorater scenarios in one batched optimization
     """
     super().__init__(
       excludeTopics=True,
@@ -36,6 +40,8 @@ class MFCoreScorer(MFBaseScorer):
       firmRejectThreshold=firmRejectThreshold,
       minMinorityNetHelpfulRatings=minMinorityNetHelpfulRatings,
       minMinorityNetHelpfulRatio=minMinorityNetHelpfulRatio,
+      mfTrainingEngine=mfTrainingEngine,
+      batchPseudoRaterScenarios=batchPseudoRaterScenarios,
     )
 
   def get_name(self):
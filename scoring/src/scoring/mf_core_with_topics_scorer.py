@@ -15,6 +15,8 @@ class MFCoreWithTopicsScorer(MFBaseScorer):
     firmRejectThreshold: Optional[float] = None,
     minMinorityNetHelpfulRatings: Optional[int] = 4,
     minMinorityNetHelpfulRatio: Optional[float] = 0.05,
+    mfTrainingEngine: Optional[str] = None,
+    batchPseudoRaterScenarios: bool = False,
   ) -> None:
     """Configure MFCoreWithTopicsScorer object.
 
@@ -22,6 +24,8 @@ class MFCoreWithTopicsScorer(MFBaseScorer):
       seed: if not None, seed value to ensure deterministic execution
       pseudoraters: if True, compute optional pseudorater confidence intervals
       threads: number of threads to use for intra-op parallelism in pytorch
+      mfTrainingEngine: if set, training engine for matrix factorization (see MatrixFactorization)
+      batchPseudoRaterScenarios: if True, refit pseudorater scenarios in one batched optimization
     """
     super().__init__(
       includedGroups=c.coreGroups,
@@ -35,6 +39,8 @@ class MFCoreWithTopicsScorer(MFBaseScorer):
       firmRejectThreshold=firmRejectThreshold,
       minMinorityNetHelpfulRatings=minMinorityNetHelpfulRatings,
       minMinorityNetHelpfulRatio=minMinorityNetHelpfulRatio,
+      mfTrainingEngine=mfTrainingEngine,
+      batchPseudoRaterScenarios=batchPseudoRaterScenarios,
     )
 
   def get_name(self):
@@ -13,12 +13,14 @@ class MFExpansionPlusScorer(MFBaseScorer):
     threads: int = c.defaultNumThreads,
     minMinorityNetHelpfulRatings: Optional[int] = 4,
     minMinorityNetHelpfulRatio: Optional[float] = 0.05,
+    mfTrainingEngine: Optional[str] = None,
   ) -> None:
     """Configure MFExpansionPlusScorer object.
 
     Args:
       seed: if not None, seed value to ensure deterministic execution
       threads: number of threads to use for intra-op parallelism in pytorch
+      mfTrainingEngine: if set, training engine for matrix factorization (see MatrixFactorization)
     """
     super().__init__(
       includedGroups=(c.coreGroups | c.expansionGroups | c.expansionPlusGroups),
@@ -30,6 +32,7 @@ class MFExpansionPlusScorer(MFBaseScorer):
       threads=threads,
       minMinorityNetHelpfulRatings=minMinorityNetHelpfulRatings,
       minMinorityNetHelpfulRatio=minMinorityNetHelpfulRatio,
+      mfTrainingEngine=mfTrainingEngine,
     )
 
   def get_name(self):
@@ -17,12 +17,14 @@ class MFExpansionScorer(MFBaseScorer):
     firmRejectThreshold: Optional[float] = 0.3,
     minMinorityNetHelpfulRatings: Optional[int] = 4,
     minMinorityNetHelpfulRatio: Optional[float] = 0.05,
+    mfTrainingEngine: Optional[str] = None,
   ) -> None:
     """Configure MFExpansionScorer object.
 
     Args:
       seed: if not None, seed value to ensure deterministic execution
       threads: number of threads to use for intra-op parallelism in pytorch
+      mfTrainingEngine: if set, training engine for matrix factorization (see MatrixFactorization)
     """
     super().__init__(
       includedGroups=(c.coreGroups | c.expansionGroups),
@@ -36,6 +38,7 @@ class MFExpansionScorer(MFBaseScorer):
       firmRejectThreshold=firmRejectThreshold,
       minMinorityNetHelpfulRatings=minMinorityNetHelpfulRatings,
       minMinorityNetHelpfulRatio=minMinorityNetHelpfulRatio,
+      mfTrainingEngine=mfTrainingEngine,
     )
 
   def get_name(self):
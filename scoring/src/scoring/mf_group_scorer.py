@@ -97,6 +97,7 @@ class MFGroupScorer(MFBaseScorer):
     threads: int = 4,
     minMinorityNetHelpfulRatings: Optional[int] = 4,
     minMinorityNetHelpfulRatio: Optional[float] = 0.05,
+    mfTrainingEngine: Optional[str] = None,
   ) -> None:
     """Configure MFGroupScorer object.
 
@@ -113,6 +114,7 @@ class MFGroupScorer(MFBaseScorer):
       pseudoraters: if True, compute optional pseudorater confidence intervals
       groupThreshold: float indicating what fraction of ratings must be from within a group
         for the model to be active
+      mfTrainingEngine: if set, training engine for matrix factorization (see MatrixFactorization)
     """
     super().__init__(
       includedGroups=includedGroups,
@@ -150,6 +152,7 @@ class MFGroupScorer(MFBaseScorer):
       incorrectFilterThreshold=incorrectFilterThreshold,
       minMinorityNetHelpfulRatings=minMinorityNetHelpfulRatings,
       minMinorityNetHelpfulRatio=minMinorityNetHelpfulRatio,
+      mfTrainingEngine=mfTrainingEngine,
     )
     assert groupId > 0, "groupNumber must be positive.  0 is reserved for unassigned."
     self._groupId = groupId
@@ -65,6 +65,8 @@ class MFTopicScorer(MFBaseScorer):
     multiplyPenaltyByHarassmentScore: bool = True,
     minimumHarassmentScoreToPenalize: float = 2.0,
     tagConsensusHarassmentHelpfulRatingPenalty: int = 10,
+    mfTrainingEngine: Optional[str] = None,
+    batchPseudoRaterScenarios: bool = False,
   ) -> None:
     """Configure MFTopicScorer object.
 
@@ -79,6 +81,8 @@ class MFTopicScorer(MFBaseScorer):
       topicName: str indicating which topic this scorer instance should filter for.
       seed: if not None, seed value to ensure deterministic execution
       pseudoraters: if True, compute optional pseudorater confidence intervals
+      mfTrainingEngine: if set, training engine for matrix factorization (see MatrixFactorization)
+      batchPseudoRaterScenarios: if True, refit pseudorater scenarios in one batched optimization
     """
     super().__init__(
       includedTopics={topicName},
@@ -110,6 +114,8 @@ class MFTopicScorer(MFBaseScorer):
       minimumHarassmentScoreToPenalize=minimumHarassmentScoreToPenalize,
       tagConsensusHarassmentHelpfulRatingPenalty=tagConsensusHarassmentHelpfulRatingPenalty,
       useReputation=False,
+      mfTrainingEngine=mfTrainingEngine,
+      batchPseudoRaterScenarios=batchPseudoRaterScenarios,
     )
     self._topicName = topicName
     self._topicNoteInterceptKey = f"{c.topicNoteInterceptKey}_{self._topicName}"
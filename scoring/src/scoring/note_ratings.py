@@ -1,9 +1,10 @@
 from datetime import datetime, timedelta, timezone
 import logging
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, Optional, Set
 
 from . import constants as c, incorrect_filter, scoring_rules, tag_filter
 from .scoring_rules import RuleID
+from .tag_counts import NoteTagCounts
 
 import numpy as np
 import pandas as pd
@@ -71,50 +72,76 @@ def is_crnh_ratio(
   )
 
 
-def get_ratings_before_note_status_and_public_tsv(
-  ratings: pd.DataFrame,
-  noteStatusHistory: pd.DataFrame,
-  log: bool = True,
-  doTypeCheck: bool = True,
-) -> pd.DataFrame:
-  """Determine which ratings are made before note's most recent non-NMR status,
-  and before we could've released any information in the public TSV (48 hours after note creation).
+class RatingsWithNoteState:
+  """Ratings joined to the note-level columns of note status history.
 
-  For old notes (created pre-tombstones launch May 19, 2022), take first 5 ratings.
+  Ratings are sorted by note once, so the ratings on each note form a contiguous segment and
+  note-level values are broadcast to ratings by repeating one value per segment instead of
+  through a hash merge.  Any frame with one row per note (e.g. scored notes) is joined to the
+  ratings the same way, reusing the sort.
 
-  Args:
-      ratings (pd.DataFrame)
-      noteStatusHistory (pd.DataFrame)
-      log (bool, optional). Defaults to True.
-      doTypeCheck (bool): do asserts to check types.
-  Returns:
-      pd.DataFrame combinedRatingsBeforeStatus ratings that were created early enough to be valid ratings
+  Callers deriving several rating aggregates from the same inputs build one view and pass it
+  to each (see _get_visible_rating_counts in contributor_state), so the ratings which were
+  created before note status are only computed once.
   """
-  right_suffix = "_note"
-  ratingsWithNoteLabelInfo = ratings[
-    [c.raterParticipantIdKey, c.noteIdKey, c.helpfulNumKey, c.createdAtMillisKey]
-  ].merge(
-    noteStatusHistory[
+
+  def __init__(self, ratings: pd.DataFrame, noteStatusHistory: pd.DataFrame):
+    self._ratings = ratings[
+      [c.raterParticipantIdKey, c.noteIdKey, c.helpfulNumKey, c.createdAtMillisKey]
+    ].reset_index(drop=True)
+    noteIds = self._ratings[c.noteIdKey].to_numpy(dtype=np.int64)
+    self._order = np.argsort(noteIds, kind="stable")
+    sortedNoteIds = noteIds[self._order]
+    isSegmentStart = np.ones(len(sortedNoteIds), dtype=bool)
+    isSegmentStart[1:] = sortedNoteIds[1:] != sortedNoteIds[:-1]
+    segmentStarts = np.flatnonzero(isSegmentStart)
+    self._segmentNoteIds = sortedNoteIds[segmentStarts]
+    self._segmentLengths = np.diff(np.append(segmentStarts, len(sortedNoteIds)))
+    self._noteStatusHistory = noteStatusHistory[
       [c.noteIdKey, c.createdAtMillisKey, c.timestampMillisOfNoteMostRecentNonNMRLabelKey]
-    ],
-    on=c.noteIdKey,
-    how="left",
-    suffixes=("", right_suffix),
-    unsafeAllowed={c.createdAtMillisKey},
-  )
-  # Note that the column types for c.createdAtMillisKey and
-  # c.timestampMillisOfNoteMostRecentNonNMRLabelKey are determined at runtime and cannot be statically
-  # determined from the code above.  If noteStatusHistory is missing any noteIdKey which is found in
-  # ratings, then the missing rows will have NaN values for c.createdAtMillisKey and
-  # c.timestampMillisOfNoteMostRecentNonNMRLabelKey, forcing the entire colum to have type float.
-  # However, if there are no missing values in column noteIdKey then c.createdAtMillisKey and
-  # c.timestampMillisOfNoteMostRecentNonNMRLabelKey will retain their int64 types.  The code below
-  # coerces both columns to always have float types so the typecheck below will pass.
-  ratingsWithNoteLabelInfo[
-    [c.createdAtMillisKey + right_suffix, c.timestampMillisOfNoteMostRecentNonNMRLabelKey]
-  ] *= 1.0
+    ]
+    self._statusRows = self.get_note_rows(self._noteStatusHistory)
+    # Ratings joined to note status history, and the positions of the ratings created before
+    # note status, computed on first use.
+    self._ratingsWithNoteLabelInfo: Optional[pd.DataFrame] = None
+    self._labelInfoColumns: Set[str] = set()
+    self._beforeStatusRows: Optional[np.ndarray] = None
+    self._numOldNoteRatings = 0
+    self._numNewNotesBeforeStatus = 0
+
+  def get_note_rows(self, notes: pd.DataFrame) -> np.ndarray:
+    """Return the position in notes of the note of each rating, or -1 if the note is missing.
+
+    Args:
+      notes: pd.DataFrame with one row per noteId
+    """
+    noteIds = notes[c.noteIdKey].to_numpy(dtype=np.int64)
+    order = np.argsort(noteIds, kind="stable")
+    sortedNoteIds = noteIds[order]
+    assert (sortedNoteIds[1:] != sortedNoteIds[:-1]).all(), "noteIds must be unique"
+    segmentRows = np.full(len(self._segmentNoteIds), -1, dtype=np.int64)
+    if len(sortedNoteIds):
+      positions = np.minimum(
+        np.searchsorted(sortedNoteIds, self._segmentNoteIds), len(sortedNoteIds) - 1
+      )
+      found = sortedNoteIds[positions] == self._segmentNoteIds
+      segmentRows[found] = order[positions[found]]
+    rows = np.empty(len(self._order), dtype=np.int64)
+    rows[self._order] = np.repeat(segmentRows, self._segmentLengths)
+    return rows
+
+  def _broadcast_status_values(self, col: str) -> np.ndarray:
+    """Return col of noteStatusHistory for each rating as floats, NaN if the note is missing."""
+    values = np.full(len(self._statusRows), np.nan)
+    found = self._statusRows >= 0
+    values[found] = self._noteStatusHistory[col].to_numpy(dtype=np.float64, na_value=np.nan)[
+      self._statusRows[found]
+    ]
+    return values
 
-  if doTypeCheck:
+  def check_types(self) -> None:
+    """Assert the types of ratings joined to note status history."""
+    ratingsWithNoteLabelInfo = self.get_ratings_with_note_label_info()
     ratingsWithNoteLabelInfoTypes = c.ratingTSVTypeMapping
     ratingsWithNoteLabelInfoTypes[
       c.createdAtMillisKey + "_note"
@@ -124,62 +151,142 @@ def get_ratings_before_note_status_and_public_tsv(
     ] = float  # float because nullable.
     ratingsWithNoteLabelInfoTypes[c.helpfulNumKey] = float
 
-    assert len(ratingsWithNoteLabelInfo) == len(ratings)
     mismatches = [
       (col, dtype, ratingsWithNoteLabelInfoTypes[col])
       for col, dtype in zip(ratingsWithNoteLabelInfo, ratingsWithNoteLabelInfo.dtypes)
-      if ("participantid" not in col.lower()) and (dtype != ratingsWithNoteLabelInfoTypes[col])
+      if (col in self._labelInfoColumns)
+      and ("participantid" not in col.lower())
+      and (dtype != ratingsWithNoteLabelInfoTypes[col])
     ]
     assert not len(mismatches), f"Mismatch columns: {mismatches}"
 
-  ratingsWithNoteLabelInfo[c.ratingCreatedBeforeMostRecentNMRLabelKey] = (
-    pd.isna(ratingsWithNoteLabelInfo[c.timestampMillisOfNoteMostRecentNonNMRLabelKey])
-  ) | (
-    ratingsWithNoteLabelInfo[c.createdAtMillisKey]
-    < ratingsWithNoteLabelInfo[c.timestampMillisOfNoteMostRecentNonNMRLabelKey]
-  )
-
-  ratingsWithNoteLabelInfo[c.ratingCreatedBeforePublicTSVReleasedKey] = (
-    ratingsWithNoteLabelInfo[c.createdAtMillisKey]
-    - ratingsWithNoteLabelInfo[c.createdAtMillisKey + "_note"]
-    < c.publicTSVTimeDelay
-  )
-
-  noteCreatedBeforeNoteStatusHistory = (
-    ratingsWithNoteLabelInfo[c.createdAtMillisKey + "_note"] < c.deletedNoteTombstonesLaunchTime
-  )
-
-  first5RatingsOldNotes = (
+  def get_ratings_with_note_label_info(self) -> pd.DataFrame:
+    """Return ratings with note creation and label times, and whether each rating preceded them.
+
+    Callers must not modify the returned frame, since it is shared by every use of the view.
+    """
+    if self._ratingsWithNoteLabelInfo is not None:
+      return self._ratingsWithNoteLabelInfo
+    # The view owns its copy of the ratings, so note columns are added to it in place.
+    ratingsWithNoteLabelInfo = self._ratings
+    # Both note columns are floats, since ratings on notes missing from noteStatusHistory have NaN
+    # values and the most recent non-NMR label time is nullable.
+    ratingsWithNoteLabelInfo[c.createdAtMillisKey + "_note"] = self._broadcast_status_values(
+      c.createdAtMillisKey
+    )
     ratingsWithNoteLabelInfo[
+      c.timestampMillisOfNoteMostRecentNonNMRLabelKey
+    ] = self._broadcast_status_values(c.timestampMillisOfNoteMostRecentNonNMRLabelKey)
+    self._labelInfoColumns = set(ratingsWithNoteLabelInfo.columns)
+
+    ratingsWithNoteLabelInfo[c.ratingCreatedBeforeMostRecentNMRLabelKey] = (
+      pd.isna(ratingsWithNoteLabelInfo[c.timestampMillisOfNoteMostRecentNonNMRLabelKey])
+    ) | (
+      ratingsWithNoteLabelInfo[c.createdAtMillisKey]
+      < ratingsWithNoteLabelInfo[c.timestampMillisOfNoteMostRecentNonNMRLabelKey]
+    )
+
+    ratingsWithNoteLabelInfo[c.ratingCreatedBeforePublicTSVReleasedKey] = (
+      ratingsWithNoteLabelInfo[c.createdAtMillisKey]
+      - ratingsWithNoteLabelInfo[c.createdAtMillisKey + "_note"]
+      < c.publicTSVTimeDelay
+    )
+    self._ratingsWithNoteLabelInfo = ratingsWithNoteLabelInfo
+    return ratingsWithNoteLabelInfo
+
+  def get_ratings_before_note_status_rows(self) -> np.ndarray:
+    """Return the positions of ratings created before note status, post-tombstones notes first.
+
+    See get_ratings_before_note_status_and_public_tsv.
+    """
+    if self._beforeStatusRows is not None:
+      return self._beforeStatusRows
+    ratingsWithNoteLabelInfo = self.get_ratings_with_note_label_info()
+    noteCreatedBeforeNoteStatusHistory = (
+      ratingsWithNoteLabelInfo[c.createdAtMillisKey + "_note"] < c.deletedNoteTombstonesLaunchTime
+    )
+    # Each rater rates a note at most once, so the first 5 ratings of old notes are selected by
+    # position instead of merging them back on (rater, note).
+    first5RatingsOldNotes = (
+      ratingsWithNoteLabelInfo[
+        (
+          noteCreatedBeforeNoteStatusHistory
+          & ratingsWithNoteLabelInfo[c.ratingCreatedBeforePublicTSVReleasedKey]
+        )
+      ][[c.noteIdKey, c.createdAtMillisKey]]
+      .sort_values(c.createdAtMillisKey)
+      .groupby(c.noteIdKey)
+      .head(_maxHistoricalValidRatings)
+    ).index.to_numpy()
+    ratingsBeforeStatusNewNotes = np.flatnonzero(
       (
-        noteCreatedBeforeNoteStatusHistory
+        np.invert(noteCreatedBeforeNoteStatusHistory)
         & ratingsWithNoteLabelInfo[c.ratingCreatedBeforePublicTSVReleasedKey]
-      )
-    ][[c.raterParticipantIdKey, c.noteIdKey, c.createdAtMillisKey]]
-    .sort_values(c.createdAtMillisKey)
-    .groupby(c.noteIdKey)
-    .head(_maxHistoricalValidRatings)
-  )[[c.raterParticipantIdKey, c.noteIdKey]].merge(ratingsWithNoteLabelInfo)
-
-  ratingsBeforeStatusNewNotes = ratingsWithNoteLabelInfo[
-    (
-      np.invert(noteCreatedBeforeNoteStatusHistory)
-      & ratingsWithNoteLabelInfo[c.ratingCreatedBeforePublicTSVReleasedKey]
-      & ratingsWithNoteLabelInfo[c.ratingCreatedBeforeMostRecentNMRLabelKey]
+        & ratingsWithNoteLabelInfo[c.ratingCreatedBeforeMostRecentNMRLabelKey]
+      ).to_numpy()
     )
-  ]
-
-  combinedRatingsBeforeStatus = pd.concat([ratingsBeforeStatusNewNotes, first5RatingsOldNotes])
+    self._numOldNoteRatings = int(noteCreatedBeforeNoteStatusHistory.sum())
+    self._numNewNotesBeforeStatus = len(ratingsBeforeStatusNewNotes)
+    self._beforeStatusRows = np.concatenate([ratingsBeforeStatusNewNotes, first5RatingsOldNotes])
+    return self._beforeStatusRows
+
+  def get_ratings_before_note_status(self) -> pd.DataFrame:
+    """Return the ratings created before note status.
+
+    See get_ratings_before_note_status_and_public_tsv.
+    """
+    beforeStatusRows = self.get_ratings_before_note_status_rows()
+    ratingsBeforeStatus = self.get_ratings_with_note_label_info().take(beforeStatusRows)
+    # Ratings on old notes are indexed by their rank, as when they were merged back on (rater, note).
+    ratingsBeforeStatus.index = np.concatenate(
+      [
+        beforeStatusRows[: self._numNewNotesBeforeStatus],
+        np.arange(len(beforeStatusRows) - self._numNewNotesBeforeStatus),
+      ]
+    )
+    return ratingsBeforeStatus
 
-  if log:
+  def log_ratings_before_note_status(self) -> None:
+    beforeStatusRows = self.get_ratings_before_note_status_rows()
     logger.info(
-      f"Total ratings: {np.invert(noteCreatedBeforeNoteStatusHistory).sum()} post-tombstones and {(noteCreatedBeforeNoteStatusHistory).sum()} pre-tombstones"
+      f"Total ratings: {len(self._ratings) - self._numOldNoteRatings} post-tombstones and {self._numOldNoteRatings} pre-tombstones"
     )
     logger.info(
-      f"Total ratings created before statuses: {len(combinedRatingsBeforeStatus)}, including {len(ratingsBeforeStatusNewNotes)} post-tombstones and {len(first5RatingsOldNotes)} pre-tombstones."
+      f"Total ratings created before statuses: {len(beforeStatusRows)}, including {self._numNewNotesBeforeStatus} post-tombstones and {len(beforeStatusRows) - self._numNewNotesBeforeStatus} pre-tombstones."
     )
 
-  assert len(combinedRatingsBeforeStatus) <= len(ratingsWithNoteLabelInfo)
+
+def get_ratings_before_note_status_and_public_tsv(
+  ratings: pd.DataFrame,
+  noteStatusHistory: pd.DataFrame,
+  log: bool = True,
+  doTypeCheck: bool = True,
+  ratingsWithNoteState: Optional[RatingsWithNoteState] = None,
+) -> pd.DataFrame:
+  """Determine which ratings are made before note's most recent non-NMR status,
+  and before we could've released any information in the public TSV (48 hours after note creation).
+
+  For old notes (created pre-tombstones launch May 19, 2022), take first 5 ratings.
+
+  Args:
+      ratings (pd.DataFrame)
+      noteStatusHistory (pd.DataFrame)
+      log (bool, optional). Defaults to True.
+      doTypeCheck (bool): do asserts to check types.
+      ratingsWithNoteState (RatingsWithNoteState, optional): view of ratings and
+        noteStatusHistory to reuse.  Built from them if not set.
+  Returns:
+      pd.DataFrame combinedRatingsBeforeStatus ratings that were created early enough to be valid ratings
+  """
+  if ratingsWithNoteState is None:
+    ratingsWithNoteState = RatingsWithNoteState(ratings, noteStatusHistory)
+  if doTypeCheck:
+    ratingsWithNoteState.check_types()
+  beforeStatusRows = ratingsWithNoteState.get_ratings_before_note_status_rows()
+  if log:
+    ratingsWithNoteState.log_ratings_before_note_status()
+  combinedRatingsBeforeStatus = ratingsWithNoteState.get_ratings_before_note_status()
+  assert len(combinedRatingsBeforeStatus) <= len(ratings)
   return combinedRatingsBeforeStatus
 
 
@@ -189,6 +296,7 @@ def get_ratings_with_scores(
   scoredNotes: pd.DataFrame,
   log: bool = True,
   doTypeCheck: bool = True,
+  ratingsWithNoteState: Optional[RatingsWithNoteState] = None,
 ) -> pd.DataFrame:
   """
   This funciton merges the note status history, ratings, and scores for later aggregation.
@@ -197,25 +305,36 @@ def get_ratings_with_scores(
       ratings (pd.DataFrame): all ratings
       noteStatusHistory (pd.DataFrame): history of note statuses
       scoredNotes (pd.DataFrame): Notes scored from MF + contributor stats
+      ratingsWithNoteState (RatingsWithNoteState, optional): view of ratings and
+        noteStatusHistory to reuse.  Built from them if not set.
   Returns:
       pd.DataFrame: binaryRatingsOnNotesWithStatusLabels Binary ratings with status labels
   """
-  ratingsBeforeNoteStatus = get_ratings_before_note_status_and_public_tsv(
-    ratings, noteStatusHistory, log, doTypeCheck
-  )
+  if ratingsWithNoteState is None:
+    ratingsWithNoteState = RatingsWithNoteState(ratings, noteStatusHistory)
+  if doTypeCheck:
+    ratingsWithNoteState.check_types()
+  beforeStatusRows = ratingsWithNoteState.get_ratings_before_note_status_rows()
+  if log:
+    ratingsWithNoteState.log_ratings_before_note_status()
 
-  ratingsWithScores = ratingsBeforeNoteStatus[
-    [c.raterParticipantIdKey, c.helpfulNumKey, c.noteIdKey, c.createdAtMillisKey]
-  ].merge(
-    scoredNotes[
-      [
-        c.noteIdKey,
-        c.currentlyRatedHelpfulBoolKey,
-        c.currentlyRatedNotHelpfulBoolKey,
-        c.awaitingMoreRatingsBoolKey,
+  scoreCols = [
+    c.currentlyRatedHelpfulBoolKey,
+    c.currentlyRatedNotHelpfulBoolKey,
+    c.awaitingMoreRatingsBoolKey,
+  ]
+  noteRows = ratingsWithNoteState.get_note_rows(scoredNotes)[beforeStatusRows]
+  scored = noteRows >= 0
+  ratingsWithScores = pd.concat(
+    [
+      ratingsWithNoteState.get_ratings_with_note_label_info()[
+        [c.raterParticipantIdKey, c.helpfulNumKey, c.noteIdKey, c.createdAtMillisKey]
       ]
+      .take(beforeStatusRows[scored])
+      .reset_index(drop=True),
+      scoredNotes[scoreCols].take(noteRows[scored]).reset_index(drop=True),
     ],
-    on=c.noteIdKey,
+    axis=1,
   )
   return ratingsWithScores
 
@@ -226,6 +345,7 @@ def get_valid_ratings(
   scoredNotes: pd.DataFrame,
   log: bool = True,
   doTypeCheck: bool = True,
+  ratingsWithNoteState: Optional[RatingsWithNoteState] = None,
 ) -> pd.DataFrame:
   """Determine which ratings are "valid" (used to determine rater helpfulness score)
 
@@ -237,11 +357,13 @@ def get_valid_ratings(
       scoredNotes (pd.DataFrame)
       log (bool, optional): Defaults to True.
       doTypeCheck (bool): do asserts to check types.
+      ratingsWithNoteState (RatingsWithNoteState, optional): view of ratings and
+        noteStatusHistory to reuse.  Built from them if not set.
   Returns:
       pd.DataFrame: binaryRatingsOnNotesWithStatusLabels CRH/CRNH notes group by helpfulness
   """
   ratingsWithScores = get_ratings_with_scores(
-    ratings, noteStatusHistory, scoredNotes, log, doTypeCheck
+    ratings, noteStatusHistory, scoredNotes, log, doTypeCheck, ratingsWithNoteState
   )
   ratingsWithScores[c.ratingCountKey] = 1
 
@@ -337,13 +459,15 @@ def compute_note_stats(ratings: pd.DataFrame, noteStatusHistory: pd.DataFrame) -
       - timedelta(days=c.emergingWriterDays)
     ).timestamp()
   )
-  ratingsToUse = pd.DataFrame(
-    ratings[[c.noteIdKey] + c.helpfulTagsTSVOrder + c.notHelpfulTagsTSVOrder]
+  # Count ratings and tags on each note from one note-sorted pass over the ratings.
+  tagCounts = NoteTagCounts(ratings, c.helpfulTagsTSVOrder + c.notHelpfulTagsTSVOrder)
+  noteStats = tagCounts.to_df()
+  noteStats[c.numRatingsKey] = tagCounts.numRatings
+  noteStats[c.numRatingsLast28DaysKey] = tagCounts.count(
+    (ratings[c.createdAtMillisKey] > last28Days).to_numpy()
   )
-  ratingsToUse.loc[:, c.numRatingsKey] = 1
-  ratingsToUse.loc[:, c.numRatingsLast28DaysKey] = False
-  ratingsToUse.loc[ratings[c.createdAtMillisKey] > last28Days, c.numRatingsLast28DaysKey] = True
-  noteStats = ratingsToUse.groupby(c.noteIdKey).sum()
+  # Release the packed tags before merging.
+  del tagCounts
 
   noteStats = noteStats.merge(
     noteStatusHistory[
@@ -191,6 +191,139 @@ def _update_single_note_status_history(mergedNote, currentTimeMillis, newScoredN
   return mergedNote
 
 
+def _update_note_status_history_vectorized(
+  mergedStatuses: pd.DataFrame, currentTimeMillis, newScoredNotesSuffix: str = "_sn"
+) -> pd.DataFrame:
+  """Compute the new note status history for all notes at once.
+
+  Column-wise equivalent of applying _update_single_note_status_history to every row of
+  mergedStatuses: each branch of the row-wise logic becomes a boolean mask and the
+  corresponding assignments are applied to all matching notes together.
+
+  Args:
+      mergedStatuses: result of joining noteStatusHistory with scoredNotes
+      currentTimeMillis: the timestamp to use for the notes' new status in note_status_history
+      newScoredNotesSuffix (str, optional): Defaults to "_sn". Merge suffix to distinguish
+        fields from previous noteStatusHistory vs new note status.
+
+  Returns:
+      pd.DataFrame: one row per note, with the same columns as the row-wise update
+  """
+  newNoteStatusHistory = mergedStatuses.copy()
+  # Status columns may be categorical, which would reject values outside the existing
+  # categories.  Operate on plain objects, matching the row-wise update where each row
+  # is materialized as an object Series.
+  for col in newNoteStatusHistory.columns:
+    if isinstance(newNoteStatusHistory[col].dtype, pd.CategoricalDtype):
+      newNoteStatusHistory[col] = newNoteStatusHistory[col].astype(object)
+
+  # This TS will be set by run_combine_scoring_outputs.
+  newNoteStatusHistory[c.timestampMinuteOfFinalScoringOutput] = np.nan
+
+  # Set the most recent status change timestamp for notes which changed status vs. the previous
+  # run, and default the timestamp to -1 for notes which have never changed status.
+  finalStatus = newNoteStatusHistory[c.finalRatingStatusKey]
+  assert not pd.isna(finalStatus).any()
+  statusChanged = (finalStatus != newNoteStatusHistory[c.currentLabelKey]).to_numpy()
+  if c.timestampMillisOfMostRecentStatusChangeKey in newNoteStatusHistory.columns:
+    previousChange = newNoteStatusHistory[c.timestampMillisOfMostRecentStatusChangeKey]
+    previousChange = previousChange.where(previousChange.notna(), -1).to_numpy()
+  else:
+    previousChange = np.full(len(newNoteStatusHistory), -1)
+  newNoteStatusHistory[c.timestampMillisOfMostRecentStatusChangeKey] = np.where(
+    statusChanged, currentTimeMillis, previousChange
+  )
+
+  # Update the current status in accordance with this scoring run.
+  newNoteStatusHistory[c.currentLabelKey] = finalStatus
+  newNoteStatusHistory[c.currentCoreStatusKey] = newNoteStatusHistory[c.coreRatingStatusKey]
+  newNoteStatusHistory[c.currentExpansionStatusKey] = newNoteStatusHistory[
+    c.expansionRatingStatusKey
+  ]
+  newNoteStatusHistory[c.currentGroupStatusKey] = newNoteStatusHistory[c.groupRatingStatusKey]
+  newNoteStatusHistory[c.currentDecidedByKey] = newNoteStatusHistory[c.decidedByKey]
+  newNoteStatusHistory[c.currentModelingGroupKey] = newNoteStatusHistory[c.modelingGroupKey]
+  newNoteStatusHistory[c.timestampMillisOfNoteCurrentLabelKey] = currentTimeMillis
+  newNoteStatusHistory[c.currentMultiGroupStatusKey] = newNoteStatusHistory[
+    c.multiGroupRatingStatusKey
+  ]
+  newNoteStatusHistory[c.currentModelingMultiGroupKey] = newNoteStatusHistory[
+    c.modelingMultiGroupKey
+  ]
+
+  # Lock notes which are (1) not already locked, (2) old enough to lock and (3) were decided by
+  # logic which has global display impact.  See _update_single_note_status_history for details.
+  notAlreadyLocked = newNoteStatusHistory[c.lockedStatusKey].isna()
+  lockEligible = c.noteLockMillis < (currentTimeMillis - newNoteStatusHistory[c.createdAtMillisKey])
+  trustedRule = newNoteStatusHistory[c.decidedByKey].isin(
+    {rule.get_name() for rule in RuleID if rule.value.lockingEnabled}
+  )
+  lockNow = notAlreadyLocked & lockEligible & trustedRule
+  newNoteStatusHistory.loc[lockNow, c.lockedStatusKey] = finalStatus[lockNow]
+  newNoteStatusHistory.loc[lockNow, c.timestampMillisOfStatusLockKey] = currentTimeMillis
+
+  # Clear timestampMillisOfNmrDueToMinStableCrhTimeKey if the note is locked, otherwise allow
+  # updates to the stabilization timestamp and first stabilization timestamp.
+  locked = newNoteStatusHistory[c.lockedStatusKey].notna()
+  newNoteStatusHistory.loc[locked, c.timestampMillisOfNmrDueToMinStableCrhTimeKey] = -1
+  stabilizationUpdated = (~locked) & newNoteStatusHistory[
+    c.updatedTimestampMillisOfNmrDueToMinStableCrhTimeKey
+  ].notna()
+  newNoteStatusHistory.loc[
+    stabilizationUpdated, c.timestampMillisOfNmrDueToMinStableCrhTimeKey
+  ] = newNoteStatusHistory.loc[
+    stabilizationUpdated, c.updatedTimestampMillisOfNmrDueToMinStableCrhTimeKey
+  ]
+  firstStabilization = (
+    stabilizationUpdated
+    & newNoteStatusHistory[c.timestampMillisOfFirstNmrDueToMinStableCrhTimeKey].isna()
+  )
+  newNoteStatusHistory.loc[
+    firstStabilization, c.timestampMillisOfFirstNmrDueToMinStableCrhTimeKey
+  ] = newNoteStatusHistory.loc[firstStabilization, c.timestampMillisOfNmrDueToMinStableCrhTimeKey]
+
+  # Retain the old label history for notes which used to be scored but aren't now, and for
+  # notes created before the deleted note cutoff.
+  createdAt = newNoteStatusHistory[c.createdAtMillisKey]
+  newCreatedAt = newNoteStatusHistory[c.createdAtMillisKey + newScoredNotesSuffix]
+  updateLabels = newCreatedAt.notna() & ~(createdAt < c.deletedNoteTombstonesLaunchTime)
+  assert not (
+    updateLabels & createdAt.notna() & newCreatedAt.notna() & (createdAt != newCreatedAt)
+  ).any()
+  if (updateLabels & createdAt.isna()).any():
+    raise Exception("This should be impossible, we already called add new notes")
+
+  nonNmr = updateLabels & (finalStatus != c.needsMoreRatings)
+  # First time note has a status.
+  firstNonNmr = nonNmr & newNoteStatusHistory[c.firstNonNMRLabelKey].isna()
+  newNoteStatusHistory.loc[firstNonNmr, c.firstNonNMRLabelKey] = finalStatus[firstNonNmr]
+  newNoteStatusHistory.loc[
+    firstNonNmr, c.timestampMillisOfNoteFirstNonNMRLabelKey
+  ] = currentTimeMillis
+  newNoteStatusHistory.loc[firstNonNmr, c.mostRecentNonNMRLabelKey] = finalStatus[firstNonNmr]
+  newNoteStatusHistory.loc[
+    firstNonNmr, c.timestampMillisOfNoteMostRecentNonNMRLabelKey
+  ] = currentTimeMillis
+  # NOTE: By design, this captures label flips between CRH and CRNH but not NMR.
+  labelFlipped = nonNmr & (finalStatus != newNoteStatusHistory[c.mostRecentNonNMRLabelKey])
+  newNoteStatusHistory.loc[labelFlipped, c.mostRecentNonNMRLabelKey] = finalStatus[labelFlipped]
+  newNoteStatusHistory.loc[
+    labelFlipped, c.timestampMillisOfNoteMostRecentNonNMRLabelKey
+  ] = currentTimeMillis
+
+  # The row-wise update materializes every row as an object Series, so nullable integer columns
+  # come back as int64 when fully populated and as object otherwise.  Match those dtypes, since
+  # downstream type checks (e.g. in note_ratings) expect numpy integer timestamps.
+  for col in newNoteStatusHistory.columns:
+    if isinstance(newNoteStatusHistory[col].dtype, pd.Int64Dtype):
+      if newNoteStatusHistory[col].isna().any():
+        newNoteStatusHistory[col] = newNoteStatusHistory[col].astype(object)
+      else:
+        newNoteStatusHistory[col] = newNoteStatusHistory[col].astype(np.int64)
+
+  return newNoteStatusHistory
+
+
 def check_flips(mergedStatuses: pd.DataFrame, noteSubset: c.NoteSubset) -> Tuple[bool, str]:
   """Validate that number of CRH notes remains within an accepted bound.
 
@@ -322,8 +455,20 @@ def merge_old_and_new_note_statuses(
 def update_note_status_history(
   mergedStatuses: pd.DataFrame,
   newScoredNotesSuffix: str = "_sn",
+  vectorized: bool = True,
 ) -> pd.DataFrame:
-  """Generate new noteStatusHistory by merging in new note labels."""
+  """Generate new noteStatusHistory by merging in new note labels.
+
+  Args:
+      mergedStatuses: result of merge_old_and_new_note_statuses
+      newScoredNotesSuffix (str, optional): Defaults to "_sn". Merge suffix to distinguish
+        fields from previous noteStatusHistory vs new note status.
+      vectorized (bool, optional): Defaults to True. If False, update each note with a row-wise
+        apply of _update_single_note_status_history (slow; kept as a reference implementation).
+
+  Returns:
+      pd.DataFrame: newNoteStatusHistory
+  """
   if c.useCurrentTimeInsteadOfEpochMillisForNoteStatusHistory:
     # When running in prod, we use the latest time possible, so as to include as many valid ratings
     # as possible, and be closest to the time the new note statuses are user-visible.
@@ -332,12 +477,18 @@ def update_note_status_history(
     # When running in test, we use the overridable epochMillis constant.
     currentTimeMillis = c.epochMillis
 
-  def apply_update(mergedNote):
-    return _update_single_note_status_history(
-      mergedNote, currentTimeMillis=currentTimeMillis, newScoredNotesSuffix=newScoredNotesSuffix
+  if vectorized:
+    newNoteStatusHistory = _update_note_status_history_vectorized(
+      mergedStatuses, currentTimeMillis=currentTimeMillis, newScoredNotesSuffix=newScoredNotesSuffix
     )
+  else:
+
+    def apply_update(mergedNote):
+      return _update_single_note_status_history(
+        mergedNote, currentTimeMillis=currentTimeMillis, newScoredNotesSuffix=newScoredNotesSuffix
+      )
 
-  newNoteStatusHistory = mergedStatuses.apply(apply_update, axis=1)
+    newNoteStatusHistory = mergedStatuses.apply(apply_update, axis=1)
 
   assert pd.isna(newNoteStatusHistory[c.noteAuthorParticipantIdKey]).sum() == 0
   assert pd.isna(newNoteStatusHistory[c.createdAtMillisKey]).sum() == 0
@@ -32,7 +32,7 @@ from threading import Lock
 import traceback
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from . import constants as c
+from . import constants as c, profiling
 
 import numpy as np
 import pandas as pd
@@ -51,11 +51,76 @@ def get_df_fingerprint(df, cols):
     return sha256(",".join(strs).encode("utf-8")).hexdigest()
 
 
+def get_df_content_fingerprint(df: pd.DataFrame) -> str:
+  """Fingerprint the column names, dtypes and row-ordered values of a dataframe.
+
+  Unlike get_df_fingerprint, every column contributes its exact values (floats are not truncated
+  and strings are not joined in Python), so the fingerprint can key caches of values derived
+  from df.
+  """
+  hasher = sha256(",".join(f"{col}:{dtype}" for (col, dtype) in df.dtypes.items()).encode())
+  for i in range(df.shape[1]):
+    values = df.iloc[:, i]
+    try:
+      hashes = pd.util.hash_pandas_object(values, index=False)
+    except TypeError:
+      # Unhashable values (e.g. sets) are fingerprinted by their repr.
+      hashes = pd.util.hash_pandas_object(values.map(repr), index=False)
+    hasher.update(hashes.to_numpy().tobytes())
+  return hasher.hexdigest()
+
+
 def keep_columns(df: pd.DataFrame, cols: List[str]):
   cols = [col for col in cols if col in df]
   return df[cols]
 
 
+def get_first_valid_values(df: pd.DataFrame, cols: List[str]) -> pd.Series:
+  """Return the first non-NaN value of each row across cols, or NaN if every value is NaN.
+
+  Vectorized equivalent of applying row.first_valid_index() to each row of df[cols]: the column
+  of the first valid value is located with a NumPy mask and values are gathered column by
+  column.  The result dtype follows the values which were selected, as with a row-wise apply
+  (e.g. float32 and nullable integer columns with missing rows become float64 and booleans with
+  missing rows remain object).
+
+  Args:
+    df: DataFrame containing cols
+    cols: columns to search, in order of preference
+
+  Returns:
+    pd.Series indexed like df
+  """
+  if len(df) == 0:
+    return pd.Series(np.nan, index=df.index, dtype=np.float64)
+  valid = df[cols].notna().to_numpy()
+  firstValid = np.where(valid.any(axis=1), valid.argmax(axis=1), -1)
+  dtypes = {df[col].dtype for col in cols}
+  if len(dtypes) == 1 and isinstance(next(iter(dtypes)), np.dtype):
+    dtype = next(iter(dtypes))
+    if np.issubdtype(dtype, np.floating):
+      # Fast path: gather into a float array, where NaN already marks rows without a value.
+      # As with a row-wise apply, rows without a value (float64 NaN) upcast the result.
+      if (firstValid < 0).any():
+        dtype = np.dtype(np.float64)
+      values = np.full(len(df), np.nan, dtype=dtype)
+      for i, col in enumerate(cols):
+        rows = firstValid == i
+        values[rows] = df[col].to_numpy()[rows]
+      return pd.Series(values, index=df.index)
+  values = np.full(len(df), np.nan, dtype=object)
+  for i, col in enumerate(cols):
+    rows = firstValid == i
+    values[rows] = df[col].to_numpy(dtype=object)[rows]
+  values = pd.Series(values, index=df.index).infer_objects()
+  # Rows spanning integer and float columns are upcast to float before a value is selected.
+  if pd.api.types.is_integer_dtype(values.dtype) and any(
+    pd.api.types.is_float_dtype(dtype) for dtype in dtypes
+  ):
+    values = values.astype(np.float64)
+  return values
+
+
 def get_df_info(
   df: pd.DataFrame,
   name: Optional[str] = None,
@@ -75,6 +140,7 @@ def get_df_info(
     .rename(columns={"index": "column", 0: "RAM"})
   )
   ramBytes = stats["RAM"].sum()
+  profiling.record_frame("DataFrame" if name is None else name, df, ramBytes)
   if name is not None:
     lines = [f"""{name} total RAM: {ramBytes} bytes ({ramBytes * 1e-9:.3f} GB)"""]
   else:
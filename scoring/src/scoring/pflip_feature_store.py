@@ -0,0 +1,172 @@
+# Std libraries
+import glob
+import logging
+import os
+from typing import List, Optional, Tuple
+
+# Project libraries
+from . import constants as c
+
+# 3rd-party libraries
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger("birdwatch.pflip_feature_store")
+logger.setLevel(logging.INFO)
+
+
+_segmentPrefix = "segment-{featureVersion}-"
+_segmentSuffix = ".pkl"
+_segmentKey = "segment"
+postDigestKey = "postDigest"
+postRecentRatingsKey = "postRecentRatings"
+modelVersionKey = "modelVersion"
+
+# Keys used to salt the row hashes of each input, so identical rows in different inputs do not
+# cancel out.
+_notesHashKey = "pflipStoreNotes0"
+_ratingsHashKey = "pflipStoreRating"
+_noteStatusHistoryHashKey = "pflipStoreStatus"
+
+
+def get_post_digests(
+  notes: pd.DataFrame,
+  ratings: pd.DataFrame,
+  noteStatusHistory: pd.DataFrame,
+) -> pd.DataFrame:
+  """Return a digest of all notes, ratings and note status history rows on each post.
+
+  Each row is hashed and row hashes are summed per post, so the digest does not depend on row
+  order and changes whenever a row on the post is added, removed or modified (e.g. a new rating,
+  a rating removed by post selection similarity or a status change on a peer note).
+
+  Args:
+    notes: pd.DataFrame with one row per note
+    ratings: pd.DataFrame with one row per rating
+    noteStatusHistory: pd.DataFrame with one row per note
+
+  Returns:
+    pd.DataFrame with tweetId and postDigest columns.
+  """
+  noteTweets = notes[[c.noteIdKey, c.tweetIdKey]]
+  digests = []
+  for frame, hashKey in [
+    (notes, _notesHashKey),
+    (ratings, _ratingsHashKey),
+    (noteStatusHistory, _noteStatusHistoryHashKey),
+  ]:
+    rowHashes = frame[[c.noteIdKey]].copy()
+    rowHashes[postDigestKey] = pd.util.hash_pandas_object(
+      frame, index=False, hash_key=hashKey
+    ).to_numpy()
+    digests.append(rowHashes.merge(noteTweets)[[c.tweetIdKey, postDigestKey]])
+  # Summing uint64 hashes wraps around, which keeps the digest order independent.
+  return (
+    pd.concat(digests)
+    .groupby(c.tweetIdKey)[postDigestKey]
+    .sum()
+    .astype(np.uint64)
+    .reset_index(drop=False)
+  )
+
+
+class PFlipFeatureStore:
+  """On-disk store of PFlip features and predictions, updated incrementally across scoring runs.
+
+  The store holds one row per post with a digest of every input row on the post (see
+  get_post_digests), and one row per scored note with the note's features, predicted label and
+  the version of the model which predicted it.  Features on a post only depend on the notes,
+  ratings and status history of that post and on rater factors, so a post needs new features
+  only when its digest changes.  Rater factors are covered by the feature version the store is
+  keyed by, which changes with each prescoring run.
+
+  Updates are appended as new segment files holding the posts which changed, and segments are
+  compacted into one once there are more than maxSegments.
+  """
+
+  def __init__(self, storeDir: str, maxSegments: int = 16):
+    """
+    Args:
+      storeDir: directory holding the store
+      maxSegments: number of appended segments to keep before compacting them
+    """
+    self.storeDir = storeDir
+    self.maxSegments = maxSegments
+
+  def _get_segment_paths(self, featureVersion: str) -> List[str]:
+    """Return the segments for the feature version, oldest first."""
+    prefix = _segmentPrefix.format(featureVersion=featureVersion)
+    return sorted(
+      glob.glob(os.path.join(self.storeDir, glob.escape(prefix) + "*" + _segmentSuffix))
+    )
+
+  def load(self, featureVersion: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Return the stored (posts, notes) for the feature version, or None on a store miss."""
+    paths = self._get_segment_paths(featureVersion)
+    if not paths:
+      logger.info(f"PFlip feature store miss for feature version {featureVersion}")
+      return None
+    with c.time_block("PFlip feature store: load"):
+      segments = [pd.read_pickle(path) for path in paths]
+      posts = pd.concat(
+        [segment["posts"].assign(**{_segmentKey: i}) for i, segment in enumerate(segments)],
+        ignore_index=True,
+      )
+      notes = pd.concat(
+        [segment["notes"].assign(**{_segmentKey: i}) for i, segment in enumerate(segments)],
+        ignore_index=True,
+      )
+      # Each segment holds complete posts, so the latest segment containing a post holds all of
+      # its current notes.
+      posts = posts.drop_duplicates(subset=c.tweetIdKey, keep="last")
+      notes = notes.merge(posts[[c.tweetIdKey, _segmentKey]])
+      posts = posts.drop(columns=_segmentKey).reset_index(drop=True)
+      notes = notes.drop(columns=_segmentKey)
+    logger.info(
+      f"PFlip feature store hit: {len(posts)} posts and {len(notes)} notes in {len(paths)} segments"
+    )
+    return posts, notes
+
+  def append(
+    self,
+    featureVersion: str,
+    posts: pd.DataFrame,
+    notes: pd.DataFrame,
+    livePosts: Optional[pd.DataFrame] = None,
+    liveNotes: Optional[pd.DataFrame] = None,
+  ) -> None:
+    """Append posts and notes which changed since the last update.
+
+    Args:
+      featureVersion: version of the features in posts and notes
+      posts: one row per changed post with tweetId, postDigest and postRecentRatings
+      notes: one row per scored note on a changed post
+      livePosts: all posts in the current scoring run.  Used when compacting segments, so that
+        posts no longer being scored are dropped from the store.
+      liveNotes: all notes on livePosts
+    """
+    os.makedirs(self.storeDir, exist_ok=True)
+    paths = self._get_segment_paths(featureVersion)
+    compact = livePosts is not None and len(paths) >= self.maxSegments
+    if compact:
+      posts, notes = livePosts, liveNotes
+    sequence = 0
+    if paths:
+      sequence = int(os.path.basename(paths[-1])[: -len(_segmentSuffix)].split("-")[-1]) + 1
+    path = os.path.join(
+      self.storeDir,
+      _segmentPrefix.format(featureVersion=featureVersion) + f"{sequence:06d}{_segmentSuffix}",
+    )
+    tmpPath = f"{path}.{os.getpid()}.tmp"
+    pd.to_pickle({"posts": posts, "notes": notes}, tmpPath)
+    os.replace(tmpPath, path)
+    # Segments for other feature versions are stale, and compacted segments are superseded.
+    stalePaths = set(
+      glob.glob(os.path.join(self.storeDir, _segmentPrefix.format(featureVersion="*") + "*"))
+    ) - set(paths)
+    if compact:
+      stalePaths |= set(paths)
+    for stalePath in stalePaths - {path}:
+      logger.info(f"PFlip feature store: removing {os.path.basename(stalePath)}")
+      os.remove(stalePath)
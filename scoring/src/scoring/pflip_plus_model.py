@@ -30,14 +30,27 @@ The feature extraction and model training are implemented entirely in scikit-lea
 """
 
 # Standard libraries
+from collections import OrderedDict
+from hashlib import sha256
 from io import BytesIO
 import logging
+import time
 from typing import Any, Dict, List, Optional, Tuple, Union
+import uuid
 
 # Project libraries
 from . import constants as c
 from .enums import Scorers
-from .pandas_utils import get_df_fingerprint
+from .feature_dag import FeatureDag
+from .pandas_utils import get_df_content_fingerprint, get_df_fingerprint
+from .pflip_feature_store import (
+  PFlipFeatureStore,
+  get_post_digests,
+  modelVersionKey,
+  postDigestKey,
+  postRecentRatingsKey,
+)
+from .rating_windows import RatingWindows
 
 # 3rd party libraries
 import joblib
@@ -71,6 +84,8 @@ FLIP = "FLIP"
 _MAX = "MAX"
 _MIN = "MIN"
 _MIN_TWEET_ID = 1825679568688054351
+# Increment when feature extraction changes so features in a PFlipFeatureStore are recomputed
+_FEATURE_VERSION = 1
 
 # Internal column names
 _RATER_FACTOR = "RATER_FACTOR"
@@ -126,6 +141,26 @@ _TOTAL_PEER_NON_MISLEADING_NOTES = "TOTAL_PEER_NON_MISLEADING_NOTES"
 _TOTAL_PEER_STABILIZATION_NOTES = "TOTAL_PEER_STABILIZATION_NOTES"
 _TOTAL_PEER_CRH_NOTES = "TOTAL_PEER_CRH_NOTES"
 
+# Feature DAG input and family names
+_SHARED_INPUTS = "SHARED_INPUTS"
+_SCORED_NOTES = "SCORED_NOTES"
+_NOTES = "NOTES"
+_NOTE_STATUS_HISTORY = "NOTE_STATUS_HISTORY"
+_EFFECTIVE_PRESENT = "EFFECTIVE_PRESENT"
+_SCORED_NOTE_STATUS_HISTORY = "SCORED_NOTE_STATUS_HISTORY"
+_SCORED_RATINGS = "SCORED_RATINGS"
+_LABELS = "LABELS"
+_CUTOFF_RATINGS = "CUTOFF_RATINGS"
+_RATING_WINDOWS = "RATING_WINDOWS"
+_QUICK_RATINGS = "QUICK_RATINGS"
+_BURST_RATINGS = "BURST_RATINGS"
+_RECENT_RATINGS = "RECENT_RATINGS"
+_PEER_NOTE_COUNTS = "PEER_NOTE_COUNTS"
+_HELPFULNESS_RATINGS = "HELPFULNESS_RATINGS"
+_BUCKET_COUNTS = "BUCKET_COUNTS"
+_HELPFUL_STATS = "HELPFUL_STATS"
+_TAG_RATIOS = "TAG_RATIOS"
+
 
 # Define helper functions at module level so feature extraction pipeline doesn't require
 # any lambda functions (and consequently can be pickled.)
@@ -183,6 +218,8 @@ class PFlipPlusModel(object):
     burst_bins: int = 5,
     latency_bins: int = 10,
     peer_note_count_bins: int = 4,
+    numFeatureWorkers: int = 1,
+    featureCacheEntries: int = 0,
   ):
     """Configure PFlipModel.
 
@@ -193,6 +230,11 @@ class PFlipPlusModel(object):
         rating creation through to when a rating becomes available in final scoring (e.g. if we know
         a note was set CRH at a particular point in time then we require ratings be created at least
         ratingRecencyCutoffMinutes minutes earlier).
+      numFeatureWorkers: Number of threads computing independent feature families concurrently.
+      featureCacheEntries: Number of feature family outputs cached in memory, keyed by a
+        fingerprint of the family inputs.  0 disables the cache.  Every family depends on the
+        scored notes, which differ between scoring cutoffs and between training and prediction,
+        so the cache only pays off when the same inputs are featurized repeatedly.
     """
     self._pipeline: Optional[Pipeline] = None
     self._predictionThreshold: Optional[float] = None
@@ -218,6 +260,32 @@ class PFlipPlusModel(object):
     self._latency_bins = latency_bins
     self._peer_note_count_bins = peer_note_count_bins
     self._column_thresholds: Dict[str, float] = dict()
+    self._numFeatureWorkers = numFeatureWorkers
+    self._featureCacheEntries = featureCacheEntries
+    self._featureCache: Optional["OrderedDict[str, Any]"] = (
+      OrderedDict() if featureCacheEntries > 0 else None
+    )
+    self._featureTimings: Dict[str, float] = dict()
+    self._featureCacheHits: Dict[str, int] = dict()
+    self._fitId: Optional[str] = None
+
+  def __getstate__(self) -> Dict[str, Any]:
+    # Cached feature families are only useful within this process and may be large.
+    state = self.__dict__.copy()
+    if state["_featureCache"] is not None:
+      state["_featureCache"] = OrderedDict()
+    return state
+
+  def __setstate__(self, state: Dict[str, Any]) -> None:
+    # Models serialized by earlier versions lack these attributes.
+    state.setdefault("_numFeatureWorkers", 1)
+    state.setdefault("_featureCacheEntries", 0)
+    state.setdefault("_featureCache", None)
+    state.setdefault("_featureTimings", dict())
+    state.setdefault("_featureCacheHits", dict())
+    self.__dict__.update(state)
+    if "_fitId" not in state:
+      self._fitId = self._get_fitted_model_digest() if self._pipeline is not None else None
 
   def _get_notes(
     self,
@@ -523,39 +591,20 @@ class PFlipPlusModel(object):
     notes[_NOTE_WRITING_LATENCY] = notes[_NOTE_CREATION_MILLIS] - notes[_TWEET_CREATION_MILLIS]
     return notes[[c.noteIdKey, _NOTE_WRITING_LATENCY]]
 
-  def _get_quick_rating_stats(self, notes: pd.DataFrame, ratings: pd.DataFrame) -> pd.DataFrame:
+  def _get_quick_rating_stats(self, notes: pd.DataFrame, windows: RatingWindows) -> pd.DataFrame:
     """Return counts and ratios of how many ratings occurred in the first 1/5/15/60 minutes.
 
     Args:
-      notes: DF specifying note creation timestamps.
-      ratings: DF specifying local rating timestamps.
+      notes: DF specifying note creation timestamps, with notes in the same order as windows.
+      windows: RatingWindows over local ratings.
     """
-    ratingTotals = (
-      ratings[[c.noteIdKey]]
-      .value_counts()
-      .to_frame()
-      .reset_index(drop=False)
-      .rename(columns={"count": "total"})
-    )
-    ratingTotals = notes[[c.noteIdKey]].merge(ratingTotals, how="left")
-    ratingTotals = ratingTotals.fillna({"total": 0}).astype(pd.Int64Dtype())
+    ratingTotals = notes[[c.noteIdKey]].copy()
+    ratingTotals["total"] = windows.totals
+    noteCreationMillis = notes[_NOTE_CREATION_MILLIS].to_numpy(dtype=np.float64)
     for cutoff in _RATING_TIME_BUCKETS:
-      beforeCutoff = ratings[[c.noteIdKey, c.createdAtMillisKey]].rename(
-        columns={c.createdAtMillisKey: "ratingCreationMts"}
+      ratingTotals[f"FIRST_{cutoff}_TOTAL"] = windows.count_before(
+        noteCreationMillis + (1000 * 60 * cutoff)
       )
-      beforeCutoff = beforeCutoff.merge(notes[[c.noteIdKey, _NOTE_CREATION_MILLIS]])
-      beforeCutoff = beforeCutoff[
-        beforeCutoff["ratingCreationMts"]
-        < (beforeCutoff[_NOTE_CREATION_MILLIS] + (1000 * 60 * cutoff))
-      ]
-      cutoffCount = (
-        beforeCutoff[[c.noteIdKey]]
-        .value_counts()
-        .to_frame()
-        .reset_index(drop=False)
-        .rename(columns={"count": f"FIRST_{cutoff}_TOTAL"})
-      )
-      ratingTotals = ratingTotals.merge(cutoffCount, how="left").fillna(0)
     ratingTotals = ratingTotals.astype(pd.Int64Dtype())
     for cutoff in _RATING_TIME_BUCKETS:
       ratingTotals[f"FIRST_{cutoff}_RATIO"] = ratingTotals[f"FIRST_{cutoff}_TOTAL"] / (
@@ -563,58 +612,34 @@ class PFlipPlusModel(object):
       )
     return ratingTotals[[c.noteIdKey] + _QUICK_RATING_COLS]
 
-  def _get_burst_rating_stats(self, notes: pd.DataFrame, ratings: pd.DataFrame) -> pd.DataFrame:
+  def _get_burst_rating_stats(self, notes: pd.DataFrame, windows: RatingWindows) -> pd.DataFrame:
     """Return counts and ratios of the max ratings in 1/5/15/60 minute windows.
 
+    Windows start on minute boundaries.
+
     Args:
-      ratings: DF specifying local rating timestamps.
+      notes: DF specifying notes in the same order as windows.
+      windows: RatingWindows over local ratings.
     """
-    ratingTotals = (
-      ratings[[c.noteIdKey]]
-      .value_counts()
-      .to_frame()
-      .reset_index(drop=False)
-      .rename(columns={"count": "total"})
-    )
-    initialNotes = len(notes)
-    ratingTotals = notes[[c.noteIdKey]].merge(ratingTotals, how="left")
-    ratingTotals = ratingTotals.fillna({"total": 0}).astype(pd.Int64Dtype())
+    ratingTotals = notes[[c.noteIdKey]].copy()
+    ratingTotals["total"] = windows.totals
     for cutoff in _RATING_TIME_BUCKETS:
-      ratingCounts = []
-      for offset in range(cutoff):
-        offsetRatings = ratings[[c.noteIdKey, c.createdAtMillisKey]].copy()
-        offsetRatings[c.createdAtMillisKey] = (
-          offsetRatings[c.createdAtMillisKey] + (1000 * 60 * offset)
-        ) // (1000 * 60 * cutoff)
-        offsetRatings = (
-          offsetRatings.value_counts()
-          .to_frame()
-          .reset_index(drop=False)[[c.noteIdKey, "count"]]
-          .groupby(c.noteIdKey)
-          .max()
-          .reset_index(drop=False)
-        )
-        ratingCounts.append(offsetRatings)
-      ratingCounts = (
-        pd.concat(ratingCounts)
-        .groupby(c.noteIdKey)
-        .max()
-        .reset_index(drop=False)
-        .rename(columns={"count": f"BURST_{cutoff}_TOTAL"})
-      ).astype(pd.Int64Dtype())
-      ratingTotals = ratingTotals.merge(ratingCounts, how="left").fillna(
-        {f"BURST_{cutoff}_TOTAL": 0}
+      ratingTotals[f"BURST_{cutoff}_TOTAL"] = windows.max_window_counts(
+        1000 * 60 * cutoff, 1000 * 60
       )
+    ratingTotals = ratingTotals.astype(pd.Int64Dtype())
+    for cutoff in _RATING_TIME_BUCKETS:
       ratingTotals[f"BURST_{cutoff}_RATIO"] = ratingTotals[f"BURST_{cutoff}_TOTAL"] / (
         ratingTotals["total"].clip(lower=1)
       )
-    assert (
-      len(ratingTotals) == initialNotes
-    ), f"unexpected length mismatch: {len(ratingTotals)} vs. {initialNotes}"
     return ratingTotals[[c.noteIdKey] + _BURST_RATING_COLS]
 
   def _get_recent_rating_stats(
-    self, scoredNotes: pd.DataFrame, ratings: pd.DataFrame, prepareForTraining: bool
+    self,
+    scoredNotes: pd.DataFrame,
+    windows: RatingWindows,
+    prepareForTraining: bool,
+    effectivePresentMillis: Optional[int] = None,
   ):
     """Generate counts of ratings within the last 1/5/15/20 minutes.
 
@@ -624,47 +649,30 @@ class PFlipPlusModel(object):
     based on that timestamp.
 
     Args:
-      scoredNotes: pd.DataFrame specifying scoring cutoff timestamps
-      ratings: pd.DataFrame containing local ratings.
+      scoredNotes: pd.DataFrame specifying scoring cutoff timestamps, with notes in the same
+        order as windows.
+      windows: RatingWindows over local ratings.
       prepareForTraining: bool specifying whether to prune ratings.
+      effectivePresentMillis: time at which scoring occurred in production.  Defaults to the
+        time of the latest rating.
     """
-    # Define notion of effective present for each rating
-    initialRatings = len(ratings)
-    ratings = ratings[[c.noteIdKey, c.createdAtMillisKey]].copy()
+    # Define notion of effective present for each note
     if prepareForTraining:
-      ratings = ratings.merge(
-        scoredNotes[[c.noteIdKey, _SCORING_CUTOFF_MTS]].rename(
-          columns={_SCORING_CUTOFF_MTS: "effectivePresent"}
-        )
-      )
+      effectivePresent = scoredNotes[_SCORING_CUTOFF_MTS].to_numpy(dtype=np.float64)
+    elif effectivePresentMillis is None:
+      effectivePresent = np.float64(windows.latestMillis)
     else:
-      ratings["effectivePresent"] = ratings[c.createdAtMillisKey].max()
-    assert len(ratings) == initialRatings
-    assert (ratings[c.createdAtMillisKey] > ratings["effectivePresent"]).sum() == 0
-    assert ratings[c.createdAtMillisKey].isna().sum() == 0
-    assert ratings["effectivePresent"].isna().sum() == 0
+      effectivePresent = np.float64(effectivePresentMillis)
+    effectivePresent = np.broadcast_to(effectivePresent, len(scoredNotes))
+    assert np.isnan(effectivePresent[windows.totals > 0]).sum() == 0
+    assert windows.count_after(effectivePresent).sum() == 0
     # Develop counts and ratios of recent ratings in specific time ranges
-    ratingTotals = (
-      ratings[[c.noteIdKey]]
-      .value_counts()
-      .to_frame()
-      .reset_index(drop=False)
-      .rename(columns={"count": "total"})
-    )
-    ratingTotals = scoredNotes[[c.noteIdKey]].merge(ratingTotals, how="left")
-    ratingTotals = ratingTotals.fillna({"total": 0}).astype(pd.Int64Dtype())
+    ratingTotals = scoredNotes[[c.noteIdKey]].copy()
+    ratingTotals["total"] = windows.totals
     for cutoff in _RATING_TIME_BUCKETS:
-      afterCutoff = ratings[
-        ratings[c.createdAtMillisKey] > (ratings["effectivePresent"] - (1000 * 60 * cutoff))
-      ]
-      cutoffCount = (
-        afterCutoff[[c.noteIdKey]]
-        .value_counts()
-        .to_frame()
-        .reset_index(drop=False)
-        .rename(columns={"count": f"RECENT_{cutoff}_TOTAL"})
+      ratingTotals[f"RECENT_{cutoff}_TOTAL"] = windows.count_after(
+        effectivePresent - (1000 * 60 * cutoff)
       )
-      ratingTotals = ratingTotals.merge(cutoffCount, how="left").fillna(0)
     ratingTotals = ratingTotals.astype(pd.Int64Dtype())
     for cutoff in _RATING_TIME_BUCKETS:
       ratingTotals[f"RECENT_{cutoff}_RATIO"] = ratingTotals[f"RECENT_{cutoff}_TOTAL"] / (
@@ -677,18 +685,14 @@ class PFlipPlusModel(object):
 
     Args:
       notes: pd.DataFrame used to determine full set of notes
-      ratings: pd.DataFrame containing ratings that should contribute to model features.
+      ratings: pd.DataFrame containing ratings that should contribute to model features, with
+        per-rating tokens added by _add_user_rating_tokens.
 
     Returns:
       pd.DataFrame with two columns: noteIds and all user helpfulness ratings on the note.
     """
-    raters = ratings[c.raterParticipantIdKey].astype(str)
-    helpfulnessRatings = ratings[[c.noteIdKey]].copy()
-    helpfulnessRatings.loc[:, _USER_HELPFULNESS_RATINGS] = (
-      raters + ":" + ratings[c.helpfulnessLevelKey].astype(str)
-    )
     helpfulnessRatings = (
-      helpfulnessRatings[[c.noteIdKey, _USER_HELPFULNESS_RATINGS]]
+      ratings[[c.noteIdKey, _USER_HELPFULNESS_RATINGS]]
       .groupby(c.noteIdKey)
       .agg(set)
       .reset_index(drop=False)
@@ -719,32 +723,53 @@ class PFlipPlusModel(object):
     tags = notes[[c.noteIdKey]].merge(tags.drop(columns=total_ratings), how="left")
     return tags[[c.noteIdKey] + c.helpfulTagsTSVOrder + c.notHelpfulTagsTSVOrder]
 
+  def _add_user_rating_tokens(self, ratings: pd.DataFrame) -> pd.DataFrame:
+    """Add the per-rating tokens aggregated by _get_helpfulness_ratings and _get_user_tag_ratings.
+
+    Each rating appears in the local or peer ratings of every scored note on the same post (and
+    during training in the ratings for both cutoffs), so tokens are built once per rating.
+
+    Args:
+      ratings: pd.DataFrame containing all ratings for feature extraction.
+
+    Returns:
+      ratings with _USER_HELPFULNESS_RATINGS, _USER_HELPFUL_TAGS and _USER_NOT_HELPFUL_TAGS
+        columns.
+    """
+    raters = ratings[c.raterParticipantIdKey].astype(str)
+    ratings[_USER_HELPFULNESS_RATINGS] = raters + ":" + ratings[c.helpfulnessLevelKey].astype(str)
+    for outCol, tagCols in [
+      (_USER_HELPFUL_TAGS, c.helpfulTagsTSVOrder),
+      (_USER_NOT_HELPFUL_TAGS, c.notHelpfulTagsTSVOrder),
+    ]:
+      # Most ratings have few tags, so build "rater:tag" tokens for the set tags only.
+      rows, cols = np.nonzero(ratings[tagCols].values)
+      tokens = raters.values[rows].astype(object) + ":" + np.array(tagCols, dtype=object)[cols]
+      userTags: List[set] = [set() for _ in range(len(ratings))]
+      for row, token in zip(rows.tolist(), tokens.tolist()):
+        userTags[row].add(token)
+      ratings[outCol] = userTags
+    return ratings
+
   def _get_user_tag_ratings(
     self,
     notes: pd.DataFrame,
     ratings: pd.DataFrame,
     outCol: str,
-    tagCols: List[str],
   ) -> pd.DataFrame:
     """Return a DataFrame with one row per note and a column with a nested list of user rating tags.
 
     Args:
       notes: pd.DataFrame used to specify the universe of all notes to include.
-      ratings: pd.DataFrame containing all ratings for feature extraction.
-      outCol: str identifying output column to contain list of user tag ratings
-      tagCols: List of tag columns to include in outCol
+      ratings: pd.DataFrame containing all ratings for feature extraction, with per-rating
+        tokens added by _add_user_rating_tokens.
+      outCol: _USER_HELPFUL_TAGS or _USER_NOT_HELPFUL_TAGS
 
     Returns:
       pd.DataFrame containing one row per note and one column containing all user rating tags.
     """
-    ratingTags = ratings[[c.noteIdKey, c.raterParticipantIdKey] + tagCols].copy()
-    tagStrs = np.array(tagCols)
-    ratingTags[outCol] = [
-      {f"{rater}:{tag}" for tag in tagStrs[np.where(row)[0]]}
-      for rater, row in zip(ratingTags[c.raterParticipantIdKey], ratingTags[tagCols].values)
-    ]
     ratingTags = (
-      ratingTags[[c.noteIdKey, outCol]]
+      ratings[[c.noteIdKey, outCol]]
       .groupby(c.noteIdKey)
       .agg(lambda x: set().union(*x))
       .reset_index(drop=False)
@@ -847,39 +872,78 @@ class PFlipPlusModel(object):
     notes[_MEAN_DIFF] = notes[_MEAN_POS_HELPFUL] + notes[_MEAN_NEG_HELPFUL]
     return notes
 
+  def _add_rating_feature_families(self, dag: FeatureDag, prefix: str, ratingsInput: str) -> None:
+    """Add the families of features derived from peer or local ratings associated with a note.
+
+    Generated features include user helpfulness and tag ratings, buckets of rating counts,
+    stats about rater factor distributions and ratios of tags across ratings.
+
+    Args:
+      dag: FeatureDag with a scoredNotes source
+      prefix: prefix of the family names
+      ratingsInput: name of the DAG input containing peer or local ratings
+    """
+    inputs = [_SCORED_NOTES, ratingsInput]
+    dag.add(
+      f"{prefix}_{_HELPFULNESS_RATINGS}",
+      lambda notes, ratings: self._get_helpfulness_ratings(notes[[c.noteIdKey]], ratings),
+      inputs,
+    )
+    dag.add(
+      f"{prefix}_{_USER_HELPFUL_TAGS}",
+      lambda notes, ratings: self._get_user_tag_ratings(
+        notes[[c.noteIdKey]], ratings, _USER_HELPFUL_TAGS
+      ),
+      inputs,
+    )
+    dag.add(
+      f"{prefix}_{_USER_NOT_HELPFUL_TAGS}",
+      lambda notes, ratings: self._get_user_tag_ratings(
+        notes[[c.noteIdKey]], ratings, _USER_NOT_HELPFUL_TAGS
+      ),
+      inputs,
+    )
+    dag.add(
+      f"{prefix}_{_BUCKET_COUNTS}",
+      lambda notes, ratings: self._get_bucket_count_totals(notes[[c.noteIdKey]], ratings),
+      inputs,
+    )
+    dag.add(
+      f"{prefix}_{_HELPFUL_STATS}",
+      lambda notes, ratings: self._get_helpful_rating_stats(notes[[c.noteIdKey]], ratings),
+      inputs,
+    )
+    dag.add(
+      f"{prefix}_{_TAG_RATIOS}",
+      lambda notes, ratings: self._get_tag_ratios(notes[[c.noteIdKey]], ratings),
+      inputs,
+    )
+
   def _make_note_info_from_ratings(
     self,
     notes: pd.DataFrame,
-    ratings: pd.DataFrame,
+    families: Dict[str, pd.DataFrame],
+    prefix: str,
   ) -> pd.DataFrame:
-    """Generate features derived from peer or local ratings associated with a note.
-
-    Generated features include user helpfulness and tag ratings, buckets of rating counts,
-    stats about rater factor distributions and ratios of tags across ratings.
+    """Augment notes with the features added by _add_rating_feature_families.
 
     Args:
       notes: DF specifying which notes should be included in the output
-      ratings: DF containing peer or local ratings to base the features on
+      families: outputs of the feature DAG
+      prefix: prefix passed to _add_rating_feature_families
     """
     # Augment notes with features.  Note that attributes of the note (e.g. author,
     # creation time) should always be available because we filter to notes with the creation time
     # in the last year, inherently removing any deleted notes where the creation time is unavailable.
-    helpfulnessRatings = self._get_helpfulness_ratings(notes[[c.noteIdKey]], ratings)
-    notes = notes.merge(helpfulnessRatings, how="inner")
-    userHelpfulTags = self._get_user_tag_ratings(
-      notes[[c.noteIdKey]], ratings, _USER_HELPFUL_TAGS, c.helpfulTagsTSVOrder
-    )
-    notes = notes.merge(userHelpfulTags, how="inner")
-    userNotHelpfulTags = self._get_user_tag_ratings(
-      notes[[c.noteIdKey]], ratings, _USER_NOT_HELPFUL_TAGS, c.notHelpfulTagsTSVOrder
-    )
-    notes = notes.merge(userNotHelpfulTags, how="inner")
-    bucketCounts = self._get_bucket_count_totals(notes[[c.noteIdKey]], ratings)
-    notes = notes.merge(bucketCounts, how="inner")
-    helpfulStats = self._get_helpful_rating_stats(notes[[c.noteIdKey]], ratings)
-    notes = notes.merge(helpfulStats, how="inner")
-    tagRatios = self._get_tag_ratios(notes[[c.noteIdKey]], ratings)
-    notes = notes.merge(tagRatios, how="inner")
+    for family in [
+      _HELPFULNESS_RATINGS,
+      _USER_HELPFUL_TAGS,
+      _USER_NOT_HELPFUL_TAGS,
+      _BUCKET_COUNTS,
+      _HELPFUL_STATS,
+      _TAG_RATIOS,
+    ]:
+      notes = notes.merge(families[f"{prefix}_{family}"], how="inner")
     return notes
 
   def _get_note_counts(
@@ -998,79 +1062,65 @@ class PFlipPlusModel(object):
       .astype(pd.Int64Dtype())
     )
 
-  def _prepare_note_info(
+  def _prepare_shared_inputs(
     self,
     notes: pd.DataFrame,
     ratings: pd.DataFrame,
     noteStatusHistory: pd.DataFrame,
     prescoringRaterModelOutput: pd.DataFrame,
     prepareForTraining: bool,
-    cutoff: Optional[str],
-  ) -> pd.DataFrame:
-    """Generate a DataFrame with one row per note containing all feature information.
+  ) -> Dict[str, pd.DataFrame]:
+    """Compute the joins shared by every feature family, independently of the scoring cutoff.
 
-    Note that some columns contain list values (e.g. a single column contains all
-    Helpfulness ratings, where each rating is a unique string containing the rater ID
-    and their Helpfulness rating).
+    Training prepares note info for both the _MIN and _MAX cutoffs, which differ only in
+    which ratings are available, so the notes being scored, their labels and the local and peer
+    rating datasets are computed once and reused for both.
 
     Args:
       notes: pd.DataFrame
       ratings: pd.DataFrame
       noteStatusHistory: pd.DataFrame
       prescoringRaterModelOutput: pd.DataFrame
-      prepareForTraining: True if ratings should be filtered to discard data after the
-        point of scoring to avoid skew.
-      cutoff: Whether to prune ratings to those available when a note enters stabilization
-        or gains CRH status.  None if prepareForTraining=False.
+      prepareForTraining: True if notes should be pruned to those with a label.
 
     Returns:
-      pd.DataFrame containing all feature information with one row per note.
+      Dict mapping input names to DataFrames.
     """
+    start = time.perf_counter()
     # Validate and normalize types
-    assert ((prepareForTraining == False) & (cutoff is None)) | (
-      prepareForTraining & (cutoff in {_MIN, _MAX})
-    )
     notes[c.tweetIdKey] = notes[c.tweetIdKey].astype(pd.Int64Dtype())
     noteStatusHistory[c.createdAtMillisKey] = noteStatusHistory[c.createdAtMillisKey].astype(
       pd.Int64Dtype()
     )
 
     # Prep notes
+    shared = dict()
     scoredNotes = self._get_notes(notes, noteStatusHistory)
     if prepareForTraining:
-      assert cutoff is not None
       # Prune to recent notes
       scoredNotes = scoredNotes[scoredNotes[c.tweetIdKey] > _MIN_TWEET_ID]
       # Validate that stabilization timestamps are valid
+      scoredNoteStatusHistory = noteStatusHistory.merge(scoredNotes[[c.noteIdKey]])
       assert (
-        noteStatusHistory[[c.noteIdKey, c.timestampMillisOfFirstNmrDueToMinStableCrhTimeKey]].merge(
-          scoredNotes[[c.noteIdKey]]
-        )[c.timestampMillisOfFirstNmrDueToMinStableCrhTimeKey]
-        < 0
+        scoredNoteStatusHistory[c.timestampMillisOfFirstNmrDueToMinStableCrhTimeKey] < 0
       ).sum() == 0
       # Compute flip labels
-      labels = self._label_notes(noteStatusHistory.merge(scoredNotes[[c.noteIdKey]]))
-      # Compute scoring cutoffs based on when the note entered and left stabilization
-      scoringCutoff = self._compute_scoring_cutoff(
-        noteStatusHistory.merge(scoredNotes[[c.noteIdKey]]),
-        ratings.merge(scoredNotes[[c.noteIdKey]]),
-        cutoff,
-      )
-      # Validate and merge data, effectively pruning to notes that have a label
-      scoredNotes = scoredNotes.merge(scoringCutoff, on=c.noteIdKey)
-      assert len(scoredNotes) == len(scoringCutoff)
-      assert len(labels) == len(
-        scoringCutoff.merge(labels)
-      )  # labels should be a subset of scoringCutoff
-      scoredNotes = scoredNotes.merge(labels)
-      assert len(scoredNotes) == len(labels)
-    totalScoredNotes = len(scoredNotes)
+      labels = self._label_notes(scoredNoteStatusHistory)
+      shared[_SCORED_NOTE_STATUS_HISTORY] = scoredNoteStatusHistory
+      shared[_SCORED_RATINGS] = ratings.merge(scoredNotes[[c.noteIdKey]])
+      shared[_LABELS] = labels
+      # Notes with a label are exactly the notes which remain after merging with the scoring
+      # cutoff and labels in _make_note_info, regardless of the cutoff.
+      labeledNotes = scoredNotes[[c.noteIdKey, c.tweetIdKey]].merge(labels[[c.noteIdKey]])
+    else:
+      labeledNotes = scoredNotes[[c.noteIdKey, c.tweetIdKey]]
+    shared[_SCORED_NOTES] = scoredNotes
 
     # Prep ratings
     # Prune ratings to only include scored notes and other notes on the same post
-    assert scoredNotes[c.tweetIdKey].min() > 0  # tweet should be set for all notes being scored
+    assert labeledNotes[c.tweetIdKey].min() > 0  # tweet should be set for all notes being scored
     adjacentNotes = notes[[c.noteIdKey, c.tweetIdKey]].merge(
-      scoredNotes[[c.tweetIdKey]].drop_duplicates()
+      labeledNotes[[c.tweetIdKey]].drop_duplicates()
     )[[c.noteIdKey]]
     assert len(adjacentNotes) == adjacentNotes[c.noteIdKey].nunique()
     ratings = ratings.merge(adjacentNotes)
@@ -1079,55 +1129,166 @@ class PFlipPlusModel(object):
     raterFactors = self._compute_rater_factors(prescoringRaterModelOutput)
     assert len(raterFactors) == raterFactors[c.raterParticipantIdKey].nunique()
     ratings = ratings.merge(raterFactors, how="left")
+    ratings = self._add_user_rating_tokens(ratings)
     # Generate rating datasets for self, peer misleading and peer non-misleading notes
-    localRatings = self._prepare_local_ratings(ratings, scoredNotes[[c.noteIdKey]])
+    shared[_LOCAL] = self._prepare_local_ratings(ratings, labeledNotes[[c.noteIdKey]])
     peerRatings = self._prepare_peer_ratings(
       ratings,
       notes[[c.noteIdKey, c.tweetIdKey, c.classificationKey]],
-      scoredNotes[[c.noteIdKey, c.tweetIdKey]],
+      labeledNotes[[c.noteIdKey, c.tweetIdKey]],
     )
-    peerMisleadingRatings = peerRatings[
+    shared[_PEER_MISLEADING] = peerRatings[
       peerRatings[c.classificationKey] == c.notesSaysTweetIsMisleadingKey
     ]
-    peerNonMisleadingRatings = peerRatings[
+    shared[_PEER_NON_MISLEADING] = peerRatings[
       peerRatings[c.classificationKey] == c.noteSaysTweetIsNotMisleadingKey
     ]
-    if prepareForTraining:
-      localRatings = self._apply_cutoff(localRatings, scoredNotes)
-      peerMisleadingRatings = self._apply_cutoff(peerMisleadingRatings, scoredNotes)
-      peerNonMisleadingRatings = self._apply_cutoff(peerNonMisleadingRatings, scoredNotes)
+    self._featureTimings[_SHARED_INPUTS] = self._featureTimings.get(_SHARED_INPUTS, 0.0) + (
+      time.perf_counter() - start
+    )
+    return shared
 
-    # Extract featuers
+  def _get_feature_dag(self, prepareForTraining: bool) -> FeatureDag:
+    """Return the DAG of feature families computed from the inputs of _make_note_info.
+
+    When preparing for training, ratings are first pruned to the scoring cutoff.
+    """
+    dag = FeatureDag(
+      [
+        _SCORED_NOTES,
+        _NOTES,
+        _NOTE_STATUS_HISTORY,
+        _LOCAL,
+        _PEER_MISLEADING,
+        _PEER_NON_MISLEADING,
+        _EFFECTIVE_PRESENT,
+      ],
+      numWorkers=self._numFeatureWorkers,
+      cache=self._featureCache,
+      maxCacheEntries=self._featureCacheEntries,
+    )
+    ratingsInputs = dict()
+    for prefix in [_LOCAL, _PEER_MISLEADING, _PEER_NON_MISLEADING]:
+      if prepareForTraining:
+        ratingsInputs[prefix] = f"{prefix}_{_CUTOFF_RATINGS}"
+        dag.add(ratingsInputs[prefix], self._apply_cutoff, [prefix, _SCORED_NOTES])
+      else:
+        ratingsInputs[prefix] = prefix
     # Generate features that depend on self ratings only
-    writingLatency = self._get_note_writing_latency(
-      scoredNotes[[c.noteIdKey, _TWEET_CREATION_MILLIS, _NOTE_CREATION_MILLIS]]
+    dag.add(
+      _NOTE_WRITING_LATENCY,
+      lambda notes: self._get_note_writing_latency(
+        notes[[c.noteIdKey, _TWEET_CREATION_MILLIS, _NOTE_CREATION_MILLIS]]
+      ),
+      [_SCORED_NOTES],
     )
-    scoredNotes = scoredNotes.merge(writingLatency, how="inner")
-    noteAuthors = noteStatusHistory[[c.noteIdKey, c.noteAuthorParticipantIdKey]]
-    scoredNotes = scoredNotes.merge(noteAuthors, how="inner")
-    quickRatings = self._get_quick_rating_stats(
-      scoredNotes[[c.noteIdKey, _NOTE_CREATION_MILLIS]], localRatings
+    # Sort local ratings by note and time once for all windowed rating counts
+    dag.add(
+      _RATING_WINDOWS,
+      lambda notes, ratings: RatingWindows(
+        notes[c.noteIdKey], ratings[c.noteIdKey], ratings[c.createdAtMillisKey]
+      ),
+      [_SCORED_NOTES, ratingsInputs[_LOCAL]],
+    )
+    dag.add(
+      _QUICK_RATINGS,
+      lambda notes, windows: self._get_quick_rating_stats(
+        notes[[c.noteIdKey, _NOTE_CREATION_MILLIS]], windows
+      ),
+      [_SCORED_NOTES, _RATING_WINDOWS],
     )
-    scoredNotes = scoredNotes.merge(quickRatings, how="inner")
-    burstRatings = self._get_burst_rating_stats(
-      scoredNotes[[c.noteIdKey]], localRatings[[c.noteIdKey, c.createdAtMillisKey]]
+    dag.add(
+      _BURST_RATINGS,
+      lambda notes, windows: self._get_burst_rating_stats(notes[[c.noteIdKey]], windows),
+      [_SCORED_NOTES, _RATING_WINDOWS],
     )
-    scoredNotes = scoredNotes.merge(burstRatings, how="inner")
-    recentRatings = self._get_recent_rating_stats(
-      scoredNotes, localRatings[[c.noteIdKey, c.createdAtMillisKey]], prepareForTraining
+    dag.add(
+      _RECENT_RATINGS,
+      lambda notes, windows, effectivePresentMillis: self._get_recent_rating_stats(
+        notes, windows, prepareForTraining, effectivePresentMillis
+      ),
+      [_SCORED_NOTES, _RATING_WINDOWS, _EFFECTIVE_PRESENT],
+      params={"prepareForTraining": prepareForTraining},
     )
-    scoredNotes = scoredNotes.merge(recentRatings, how="inner")
-    peerNoteCounts = self._get_note_counts(
-      scoredNotes, notes, noteStatusHistory, prepareForTraining
+    dag.add(
+      _PEER_NOTE_COUNTS,
+      lambda scoredNotes, notes, noteStatusHistory: self._get_note_counts(
+        scoredNotes, notes, noteStatusHistory, prepareForTraining
+      ),
+      [_SCORED_NOTES, _NOTES, _NOTE_STATUS_HISTORY],
+      params={"prepareForTraining": prepareForTraining},
     )
-    scoredNotes = scoredNotes.merge(peerNoteCounts, how="inner")
     # Generate features based on self and peer ratings
-    for df, prefix in [
-      (localRatings, _LOCAL),
-      (peerMisleadingRatings, _PEER_MISLEADING),
-      (peerNonMisleadingRatings, _PEER_NON_MISLEADING),
-    ]:
-      features = self._make_note_info_from_ratings(scoredNotes, df)
+    for prefix in [_LOCAL, _PEER_MISLEADING, _PEER_NON_MISLEADING]:
+      self._add_rating_feature_families(dag, prefix, ratingsInputs[prefix])
+    return dag
+
+  def _make_note_info(
+    self,
+    shared: Dict[str, pd.DataFrame],
+    notes: pd.DataFrame,
+    noteStatusHistory: pd.DataFrame,
+    prepareForTraining: bool,
+    cutoff: Optional[str],
+    effectivePresentMillis: Optional[int] = None,
+  ) -> pd.DataFrame:
+    """Generate a DataFrame with one row per note containing all feature information.
+
+    Args:
+      shared: inputs returned by _prepare_shared_inputs
+      notes: pd.DataFrame
+      noteStatusHistory: pd.DataFrame
+      prepareForTraining: True if ratings should be filtered to discard data after the
+        point of scoring to avoid skew.
+      cutoff: Whether to prune ratings to those available when a note enters stabilization
+        or gains CRH status.  None if prepareForTraining=False.
+      effectivePresentMillis: time at which scoring occurs when prepareForTraining=False.
+        Defaults to the time of the latest rating on a scored note.
+    """
+    scoredNotes = shared[_SCORED_NOTES]
+    if prepareForTraining:
+      assert cutoff is not None
+      labels = shared[_LABELS]
+      # Compute scoring cutoffs based on when the note entered and left stabilization
+      scoringCutoff = self._compute_scoring_cutoff(
+        shared[_SCORED_NOTE_STATUS_HISTORY], shared[_SCORED_RATINGS], cutoff
+      )
+      # Validate and merge data, effectively pruning to notes that have a label
+      scoredNotes = scoredNotes.merge(scoringCutoff, on=c.noteIdKey)
+      assert len(scoredNotes) == len(scoringCutoff)
+      assert len(labels) == len(
+        scoringCutoff.merge(labels)
+      )  # labels should be a subset of scoringCutoff
+      scoredNotes = scoredNotes.merge(labels)
+      assert len(scoredNotes) == len(labels)
+    totalScoredNotes = len(scoredNotes)
+    assert scoredNotes[c.tweetIdKey].min() > 0  # tweet should be set for all notes being scored
+
+    # Extract featuers
+    dag = self._get_feature_dag(prepareForTraining)
+    families = dag.run(
+      {
+        _SCORED_NOTES: scoredNotes,
+        _NOTES: notes,
+        _NOTE_STATUS_HISTORY: noteStatusHistory,
+        _LOCAL: shared[_LOCAL],
+        _PEER_MISLEADING: shared[_PEER_MISLEADING],
+        _PEER_NON_MISLEADING: shared[_PEER_NON_MISLEADING],
+        _EFFECTIVE_PRESENT: effectivePresentMillis,
+      }
+    )
+    for name, seconds in dag.timings.items():
+      self._featureTimings[name] = self._featureTimings.get(name, 0.0) + seconds
+    for name in dag.cacheHits:
+      self._featureTimings.setdefault(name, 0.0)
+      self._featureCacheHits[name] = self._featureCacheHits.get(name, 0) + 1
+    scoredNotes = scoredNotes.merge(families[_NOTE_WRITING_LATENCY], how="inner")
+    noteAuthors = noteStatusHistory[[c.noteIdKey, c.noteAuthorParticipantIdKey]]
+    scoredNotes = scoredNotes.merge(noteAuthors, how="inner")
+    for family in [_QUICK_RATINGS, _BURST_RATINGS, _RECENT_RATINGS, _PEER_NOTE_COUNTS]:
+      scoredNotes = scoredNotes.merge(families[family], how="inner")
+    for prefix in [_LOCAL, _PEER_MISLEADING, _PEER_NON_MISLEADING]:
+      features = self._make_note_info_from_ratings(scoredNotes, families, prefix)
       overlapCols = (set(scoredNotes.columns) & set(features.columns)) - {c.noteIdKey}
       features = features[[col for col in features.columns if col not in overlapCols]]
       features = features.rename(
@@ -1136,6 +1297,10 @@ class PFlipPlusModel(object):
       scoredNotes = scoredNotes.merge(features, how="left")
 
     # Merge rating totals for debugging / info
+    localRatings, peerMisleadingRatings, peerNonMisleadingRatings = [
+      families[f"{prefix}_{_CUTOFF_RATINGS}" if prepareForTraining else prefix]
+      for prefix in [_LOCAL, _PEER_MISLEADING, _PEER_NON_MISLEADING]
+    ]
     scoredNotes = scoredNotes.merge(
       localRatings[[c.noteIdKey]]
       .value_counts()
@@ -1172,6 +1337,47 @@ class PFlipPlusModel(object):
     assert len(scoredNotes) == totalScoredNotes, f"{len(scoredNotes)} vs {totalScoredNotes}"
     return scoredNotes
 
+  def _prepare_note_info(
+    self,
+    notes: pd.DataFrame,
+    ratings: pd.DataFrame,
+    noteStatusHistory: pd.DataFrame,
+    prescoringRaterModelOutput: pd.DataFrame,
+    prepareForTraining: bool,
+    cutoff: Optional[str],
+    effectivePresentMillis: Optional[int] = None,
+  ) -> pd.DataFrame:
+    """Generate a DataFrame with one row per note containing all feature information.
+
+    Note that some columns contain list values (e.g. a single column contains all
+    Helpfulness ratings, where each rating is a unique string containing the rater ID
+    and their Helpfulness rating).
+
+    Args:
+      notes: pd.DataFrame
+      ratings: pd.DataFrame
+      noteStatusHistory: pd.DataFrame
+      prescoringRaterModelOutput: pd.DataFrame
+      prepareForTraining: True if ratings should be filtered to discard data after the
+        point of scoring to avoid skew.
+      cutoff: Whether to prune ratings to those available when a note enters stabilization
+        or gains CRH status.  None if prepareForTraining=False.
+      effectivePresentMillis: time at which scoring occurs when prepareForTraining=False.
+        Defaults to the time of the latest rating on a scored note.
+
+    Returns:
+      pd.DataFrame containing all feature information with one row per note.
+    """
+    assert ((prepareForTraining == False) & (cutoff is None)) | (
+      prepareForTraining & (cutoff in {_MIN, _MAX})
+    )
+    shared = self._prepare_shared_inputs(
+      notes, ratings, noteStatusHistory, prescoringRaterModelOutput, prepareForTraining
+    )
+    return self._make_note_info(
+      shared, notes, noteStatusHistory, prepareForTraining, cutoff, effectivePresentMillis
+    )
+
   def _get_feature_pipeline(self, noteInfo: pd.DataFrame) -> Pipeline:
     # Begin with author pipeline
     columnPipes: List[Tuple[str, Any, Union[str, List[str]]]] = [
@@ -1506,7 +1712,8 @@ class PFlipPlusModel(object):
 
     For each feature, we examine the dimensionality and sparsity of the feature.  For low
     dimensional features representing discretized continuous values, we also profile the
-    size and boundaries of each bin.
+    size and boundaries of each bin.  The profile ends with the time spent computing each
+    feature family since the model was last fit.
     """
     # Generate feature matrix
     matrix = pipe.transform(noteInfo)
@@ -1535,6 +1742,11 @@ class PFlipPlusModel(object):
         columns.append(str(transformer[-1].bin_edges_[0].round(3).tolist()))
       lines.append("    ".join(columns))
       start = end
+    lines.append("feature family timings:")
+    for name, seconds in sorted(self._featureTimings.items(), key=lambda item: -item[1]):
+      lines.append(
+        f"{name:<60}secs={seconds:9.2f}    cacheHits={self._featureCacheHits.get(name, 0):4}"
+      )
     return "\n".join(lines)
 
   def fit(
@@ -1560,27 +1772,23 @@ class PFlipPlusModel(object):
     if self._seed is not None:
       logger.info(f"seeding pflip: {self._seed}")
       np.random.seed(self._seed)
-    # Prepare datasets
+    # Prepare datasets, sharing the cutoff-independent joins between both cutoffs
+    self._featureTimings = dict()
+    self._featureCacheHits = dict()
+    shared = self._prepare_shared_inputs(
+      notes, ratings, noteStatusHistory, prescoringRaterModelOutput, prepareForTraining=True
+    )
     noteInfo = pd.concat(
       [
-        self._prepare_note_info(
-          notes,
-          ratings,
-          noteStatusHistory,
-          prescoringRaterModelOutput,
-          prepareForTraining=True,
-          cutoff=_MIN,
+        self._make_note_info(
+          shared, notes, noteStatusHistory, prepareForTraining=True, cutoff=_MIN
         ),
-        self._prepare_note_info(
-          notes,
-          ratings,
-          noteStatusHistory,
-          prescoringRaterModelOutput,
-          prepareForTraining=True,
-          cutoff=_MAX,
+        self._make_note_info(
+          shared, notes, noteStatusHistory, prepareForTraining=True, cutoff=_MAX
         ),
       ]
     )
+    del shared
     noteInfo = self._convert_col_types(noteInfo)
     noteInfo = noteInfo.sort_values(c.noteIdKey)
     if len(noteInfo) == 0:
@@ -1606,6 +1814,9 @@ class PFlipPlusModel(object):
     logger.info("Training Results:")
     threshold, _, _, _ = self._evaluate_model(trainDataFrame)
     self._predictionThreshold = threshold
+    # Pickling the pipeline is not deterministic across processes (e.g. sets of stop words), so
+    # identify the fitted model for PFlipFeatureStore by a random ID instead of its contents.
+    self._fitId = uuid.uuid4().hex
     logger.info("Validation Results:")
     self._evaluate_model(validationDataFrame, threshold=threshold)
 
@@ -1623,6 +1834,135 @@ class PFlipPlusModel(object):
     joblib.dump(self, buffer)
     return buffer.getvalue()
 
+  def _get_feature_version(self, prescoringRaterModelOutput: pd.DataFrame) -> str:
+    """Fingerprint everything shared by all notes which prediction features depend on."""
+    raterFactors = self._compute_rater_factors(prescoringRaterModelOutput)
+    return sha256(
+      f"{_FEATURE_VERSION},{get_df_content_fingerprint(raterFactors)}".encode()
+    ).hexdigest()[:32]
+
+  def _get_fitted_model_digest(self) -> str:
+    """Fingerprint the fitted pipeline by the values which determine its predictions.
+
+    Used to identify models serialized before _fitId was set at fit time, so that every load of
+    the same model file yields the same model version.  The digest covers the feature families,
+    the features kept by the variance threshold, the regression coefficients and the tag ratio
+    thresholds.  Feature names are left out since listing them takes seconds.
+    """
+    hasher = sha256()
+    hasher.update(repr([name for (name, _, _) in self._pipeline[0].transformers_]).encode())
+    hasher.update(self._pipeline[1].get_support().tobytes())
+    hasher.update(np.ascontiguousarray(self._pipeline[-1].coef_, dtype=np.float64).tobytes())
+    hasher.update(np.ascontiguousarray(self._pipeline[-1].intercept_, dtype=np.float64).tobytes())
+    hasher.update(repr(sorted(self._column_thresholds.items())).encode())
+    return hasher.hexdigest()[:32]
+
+  def _get_model_version(self) -> str:
+    """Identify the fitted pipeline and threshold used to predict labels from features."""
+    return f"{self._fitId}-{self._predictionThreshold!r}"
+
+  def _predict_labels(self, noteInfo: pd.DataFrame) -> pd.DataFrame:
+    """Return noteIds and predicted labels for noteInfo prepared by _convert_col_types."""
+    noteInfo = self._transform_note_info(noteInfo)
+    predictions = self._pipeline.decision_function(noteInfo)
+    return pd.DataFrame(
+      {
+        c.noteIdKey: noteInfo[c.noteIdKey],
+        LABEL: [FLIP if p > self._predictionThreshold else CRH for p in predictions],
+      }
+    )
+
+  def _predict_batch_from_store(
+    self,
+    notes: pd.DataFrame,
+    ratings: pd.DataFrame,
+    noteStatusHistory: pd.DataFrame,
+    prescoringRaterModelOutput: pd.DataFrame,
+    stored: Optional[Tuple[pd.DataFrame, pd.DataFrame]],
+    modelVersion: str,
+  ) -> Tuple[pd.DataFrame, pd.DataFrame, Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+    """Predict labels for a batch of posts, reusing stored features for unchanged posts.
+
+    Features are recomputed for a post when its digest changed since the features were stored,
+    and when its notes have ratings within the longest recent rating window of the current or
+    stored effective present (see _get_recent_rating_stats), since recent rating counts change
+    as time passes even if the post does not.  Stored labels are reused when they were predicted
+    by the same model.
+
+    Args:
+      notes: pd.DataFrame containing every note on the posts in the batch
+      ratings: pd.DataFrame
+      noteStatusHistory: pd.DataFrame
+      prescoringRaterModelOutput: pd.DataFrame
+      stored: posts and notes returned by PFlipFeatureStore.load
+      modelVersion: version returned by _get_model_version
+
+    Returns:
+      Tuple with all posts and notes in the batch for the store, followed by the posts and
+        notes which changed (None if nothing changed).
+    """
+    # Compute the effective present over local ratings, matching _prepare_note_info.
+    scoredNoteIds = notes.loc[
+      (notes[c.tweetIdKey] > 0) & (notes[c.classificationKey].notna()), [c.noteIdKey]
+    ]
+    localRatings = ratings[[c.noteIdKey, c.createdAtMillisKey]].merge(scoredNoteIds)
+    effectivePresentMillis = localRatings[c.createdAtMillisKey].max()
+    recentNoteIds = localRatings.loc[
+      localRatings[c.createdAtMillisKey]
+      > (effectivePresentMillis - (1000 * 60 * max(_RATING_TIME_BUCKETS))),
+      c.noteIdKey,
+    ]
+    posts = get_post_digests(notes, ratings, noteStatusHistory)
+    posts = posts[posts[c.tweetIdKey].isin(notes[c.tweetIdKey].loc[scoredNoteIds.index])]
+    posts[postRecentRatingsKey] = posts[c.tweetIdKey].isin(
+      notes.loc[notes[c.noteIdKey].isin(recentNoteIds), c.tweetIdKey]
+    )
+
+    # Reuse stored notes on posts which did not change, along with their labels if predicted by
+    # the current model
+    liveNotes = []
+    noteInfos = []
+    cleanTweetIds = pd.Series([], dtype=np.int64)
+    if stored is not None:
+      storedPosts, storedNotes = stored
+      cleanPosts = posts[~posts[postRecentRatingsKey]].merge(
+        storedPosts.loc[~storedPosts[postRecentRatingsKey], [c.tweetIdKey, postDigestKey]]
+      )
+      cleanTweetIds = cleanPosts[c.tweetIdKey]
+      cleanNotes = storedNotes[storedNotes[c.tweetIdKey].isin(cleanTweetIds)]
+      currentModel = cleanNotes[modelVersionKey] == modelVersion
+      liveNotes.append(cleanNotes[currentModel])
+      if (~currentModel).any():
+        logger.info(f"pflip feature store: predicting {(~currentModel).sum()} notes with new model")
+        noteInfos.append(cleanNotes[~currentModel].drop(columns=[LABEL, modelVersionKey]))
+    changedTweetIds = posts.loc[~posts[c.tweetIdKey].isin(cleanTweetIds), c.tweetIdKey]
+    logger.info(
+      f"pflip feature store: computing features for {len(changedTweetIds)} of {len(posts)} posts"
+    )
+
+    # Compute features for changed posts
+    if len(changedTweetIds):
+      changedNoteIds = notes.loc[notes[c.tweetIdKey].isin(changedTweetIds), [c.noteIdKey]]
+      noteInfo = self._prepare_note_info(
+        notes.merge(changedNoteIds),
+        ratings.merge(changedNoteIds),
+        noteStatusHistory.merge(changedNoteIds),
+        prescoringRaterModelOutput,
+        prepareForTraining=False,
+        cutoff=None,
+        effectivePresentMillis=effectivePresentMillis,
+      )
+      noteInfos.insert(0, self._convert_col_types(noteInfo))
+    if not noteInfos:
+      return posts, pd.concat(liveNotes, ignore_index=True) if liveNotes else None, None, None
+    changedNotes = pd.concat(noteInfos, ignore_index=True)
+    changedNotes = changedNotes.assign(
+      **{LABEL: self._predict_labels(changedNotes)[LABEL].values, modelVersionKey: modelVersion}
+    )
+    liveNotes.append(changedNotes)
+    changedPosts = posts[posts[c.tweetIdKey].isin(changedNotes[c.tweetIdKey])]
+    return posts, pd.concat(liveNotes, ignore_index=True), changedPosts, changedNotes
+
   def predict(
     self,
     notes: pd.DataFrame,
@@ -1630,6 +1970,7 @@ class PFlipPlusModel(object):
     noteStatusHistory: pd.DataFrame,
     prescoringRaterModelOutput: pd.DataFrame,
     maxBatchSize: int = 10000,
+    featureStore: Optional[PFlipFeatureStore] = None,
   ) -> pd.DataFrame:
     """Given input DataFrames, predict which notes will flip and lose CRH status.
 
@@ -1638,6 +1979,8 @@ class PFlipPlusModel(object):
       ratings: pd.DataFrame
       noteStatusHistory: pd.DataFrame
       prescoringRaterModelOutput: pd.DataFrame
+      featureStore: if set, only compute features for posts which changed since features were
+        stored by a previous run, and update the store.
 
     Returns:
       pd.DataFrame containing noteIds and predicted labels
@@ -1646,6 +1989,11 @@ class PFlipPlusModel(object):
     assert (
       self._predictionThreshold is not None
     ), "threshold must be initialized prior to prediction"
+    if featureStore is not None:
+      featureVersion = self._get_feature_version(prescoringRaterModelOutput)
+      modelVersion = self._get_model_version()
+      stored = featureStore.load(featureVersion)
+      storeUpdates: List[Tuple[pd.DataFrame, ...]] = []
     # Build list of unique tweetIds
     tweetIds = notes[[c.tweetIdKey]].drop_duplicates()
     tweetIds = tweetIds[tweetIds[c.tweetIdKey] != "-1"]
@@ -1659,24 +2007,37 @@ class PFlipPlusModel(object):
       noteBatch = (
         notes[[c.noteIdKey, c.tweetIdKey]].merge(tweetBatch)[[c.noteIdKey]].drop_duplicates()
       )
-      noteInfo = self._prepare_note_info(
-        notes.merge(noteBatch),
-        ratings.merge(noteBatch),
-        noteStatusHistory.merge(noteBatch),
-        prescoringRaterModelOutput,
-        prepareForTraining=False,
-        cutoff=None,
-      )
-      noteInfo = self._convert_col_types(noteInfo)
-      noteInfo = self._transform_note_info(noteInfo)
-      predictions = self._pipeline.decision_function(noteInfo)
-      results.append(
-        pd.DataFrame(
-          {
-            c.noteIdKey: noteInfo[c.noteIdKey],
-            LABEL: [FLIP if p > self._predictionThreshold else CRH for p in predictions],
-          }
+      if featureStore is None:
+        noteInfo = self._prepare_note_info(
+          notes.merge(noteBatch),
+          ratings.merge(noteBatch),
+          noteStatusHistory.merge(noteBatch),
+          prescoringRaterModelOutput,
+          prepareForTraining=False,
+          cutoff=None,
         )
-      )
+        results.append(self._predict_labels(self._convert_col_types(noteInfo)))
+      else:
+        storeUpdate = self._predict_batch_from_store(
+          notes.merge(noteBatch),
+          ratings.merge(noteBatch),
+          noteStatusHistory.merge(noteBatch),
+          prescoringRaterModelOutput,
+          stored,
+          modelVersion,
+        )
+        if storeUpdate[1] is not None:
+          results.append(storeUpdate[1][[c.noteIdKey, LABEL]])
+        storeUpdates.append(storeUpdate)
       start += maxBatchSize
+    if featureStore is not None and storeUpdates:
+      with c.time_block("PFlip feature store: append"):
+        livePosts, liveNotes, changedPosts, changedNotes = [
+          pd.concat([frame for frame in frames if frame is not None], ignore_index=True)
+          if any(frame is not None for frame in frames)
+          else None
+          for frames in zip(*storeUpdates)
+        ]
+        if changedPosts is not None:
+          featureStore.append(featureVersion, changedPosts, changedNotes, livePosts, liveNotes)
     return pd.concat(results)
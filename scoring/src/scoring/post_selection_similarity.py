@@ -24,6 +24,7 @@ class PostSelectionSimilarity:
     minUniquePosts: int = 10,
     minSimPseudocounts: int = 10,
     windowMillis: int = 1000 * 60 * 20,
+    pairCountsEngine: str = "vectorized",
   ):
     # Compute rater affinity and writer coverage.  Apply thresholds to identify linked pairs.
     helpfulRatings = ratings[ratings[c.helpfulnessLevelKey] == c.helpfulValueTsv]
@@ -32,8 +33,15 @@ class PostSelectionSimilarity:
 
     # Compute MinSim and NPMI
     self.ratings = _preprocess_ratings(notes, ratings)
-    with c.time_block("Compute pair counts dict"):
-      self.pairCountsDict = _get_pair_counts_dict(self.ratings, windowMillis=windowMillis)
+    with c.time_block(f"Compute pair counts dict ({pairCountsEngine})"):
+      if pairCountsEngine == "vectorized":
+        self.pairCountsDict = _get_pair_counts_dict_vectorized(
+          self.ratings, windowMillis=windowMillis
+        )
+      elif pairCountsEngine == "loop":
+        self.pairCountsDict = _get_pair_counts_dict(self.ratings, windowMillis=windowMillis)
+      else:
+        raise ValueError(f"Unknown pairCountsEngine: {pairCountsEngine}")
 
     self.uniqueRatingsOnTweets = self.ratings[
       [c.tweetIdKey, c.raterParticipantIdKey]
@@ -418,3 +426,100 @@ def _get_pair_counts_dict(ratings, windowMillis):
               pair_counts[pair] += 1
 
   return pair_counts
+
+
+def _get_pair_counts_dict_vectorized(
+  ratings: pd.DataFrame, windowMillis: int, maxPairsPerChunk: int = 50_000_000
+) -> Dict:
+  """Array-based equivalent of _get_pair_counts_dict.
+
+  Raters are encoded as integer codes which preserve the sort order of the original IDs, so
+  each co-rating pair can be packed into a single int64 key (left * numRaters + right) with
+  left < right.  Ratings are sorted by (tweet, note, time) once and the sliding window for
+  every rating is located with a single searchsorted call, after which candidate pairs are
+  materialized in chunks of whole tweets, deduplicated per tweet and counted.
+
+  Returns:
+    Dict mapping (leftRaterId, rightRaterId) to the number of tweets on which the pair rated
+    the same note within windowMillis of each other, identical to _get_pair_counts_dict.
+  """
+  tweetCodes, _ = pd.factorize(ratings[c.tweetIdKey])
+  noteCodes, _ = pd.factorize(ratings[c.noteIdKey])
+  raterCodes, raterIds = pd.factorize(ratings[c.raterParticipantIdKey], sort=True)
+  times = ratings[c.createdAtMillisKey].to_numpy(dtype=np.int64)
+  # Skip ratings with missing keys, which groupby would drop in _get_pair_counts_dict.
+  valid = (tweetCodes >= 0) & (noteCodes >= 0) & (raterCodes >= 0)
+  tweetCodes, noteCodes, raterCodes, times = (
+    tweetCodes[valid],
+    noteCodes[valid],
+    raterCodes[valid].astype(np.int64),
+    times[valid],
+  )
+  numRaters = len(raterIds)
+  if len(times) == 0:
+    return dict()
+
+  # Sort by (tweet, note, time) and identify the contiguous segment of ratings for each note.
+  order = np.lexsort((times, noteCodes, tweetCodes))
+  tweetCodes, noteCodes, raterCodes, times = (
+    tweetCodes[order],
+    noteCodes[order],
+    raterCodes[order],
+    times[order],
+  )
+  segmentStart = np.concatenate(
+    [[True], (noteCodes[1:] != noteCodes[:-1]) | (tweetCodes[1:] != tweetCodes[:-1])]
+  )
+  segmentIds = np.cumsum(segmentStart) - 1
+  segmentStarts = np.flatnonzero(segmentStart)
+  segmentEnds = np.append(segmentStarts[1:], len(times))
+  segmentMin = times[segmentStarts]
+  segmentSpan = times[segmentEnds - 1] - segmentMin
+  # Shift timestamps so that each note segment is separated from the previous segment by more
+  # than windowMillis, allowing one global searchsorted to find each window start.
+  segmentOffsets = np.concatenate([[0], np.cumsum(segmentSpan + windowMillis + 1)[:-1]])
+  shiftedTimes = times - segmentMin[segmentIds] + segmentOffsets[segmentIds]
+  windowStarts = np.searchsorted(shiftedTimes, shiftedTimes - windowMillis, side="left")
+  pairsPerRating = np.arange(len(times)) - windowStarts
+
+  # Split work into chunks which contain whole tweets so per-tweet deduplication stays local.
+  tweetStarts = np.flatnonzero(np.concatenate([[True], tweetCodes[1:] != tweetCodes[:-1]]))
+  pairsBeforeTweet = (np.cumsum(pairsPerRating) - pairsPerRating)[tweetStarts]
+  chunkIds = pairsBeforeTweet // maxPairsPerChunk
+  chunkStarts = tweetStarts[np.concatenate([[True], chunkIds[1:] != chunkIds[:-1]])]
+  chunkEnds = np.append(chunkStarts[1:], len(times))
+
+  chunkKeys = []
+  for start, end in zip(chunkStarts, chunkEnds):
+    counts = pairsPerRating[start:end]
+    total = counts.sum()
+    if total == 0:
+      continue
+    right = np.repeat(np.arange(start, end), counts)
+    left = (
+      np.arange(total)
+      - np.repeat(np.cumsum(counts) - counts, counts)
+      + np.repeat(windowStarts[start:end], counts)
+    )
+    leftRaters = raterCodes[left]
+    rightRaters = raterCodes[right]
+    distinct = leftRaters != rightRaters
+    pairTweets = tweetCodes[right][distinct]
+    pairKeys = (
+      np.minimum(leftRaters, rightRaters)[distinct] * numRaters
+      + np.maximum(leftRaters, rightRaters)[distinct]
+    )
+    # Count each pair at most once per tweet.
+    pairOrder = np.lexsort((pairKeys, pairTweets))
+    pairKeys, pairTweets = pairKeys[pairOrder], pairTweets[pairOrder]
+    firstInTweet = np.concatenate(
+      [[True], (pairKeys[1:] != pairKeys[:-1]) | (pairTweets[1:] != pairTweets[:-1])]
+    )
+    chunkKeys.append(pairKeys[firstInTweet])
+
+  if len(chunkKeys) == 0:
+    return dict()
+  uniqueKeys, pairCounts = np.unique(np.concatenate(chunkKeys), return_counts=True)
+  leftIds = raterIds.take(uniqueKeys // numRaters).tolist()
+  rightIds = raterIds.take(uniqueKeys % numRaters).tolist()
+  return dict(zip(zip(leftIds, rightIds), pairCounts.tolist()))
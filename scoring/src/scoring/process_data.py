@@ -1,16 +1,24 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from io import StringIO
 import logging
 import os
+import resource
+import time
 from typing import Dict, List, Optional, Tuple
 
 from . import constants as c, note_status_history
 from .pandas_utils import get_df_info
 from .pflip_plus_model import PFlipPlusModel
+from .snapshot_cache import SnapshotCache
 
 import joblib
 import numpy as np
 import pandas as pd
+from pandas._libs.parsers import STR_NA_VALUES
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 from sklearn.pipeline import Pipeline
 
 
@@ -101,61 +109,189 @@ def tsv_parser(
         usecols=useCols,
       )
     if convertNAToNone:
-      logger.info("Logging size effect of convertNAToNone")
-      logger.info("Before conversion:")
-      logger.info(get_df_info(data))
-      # float types will be nan if missing; newer nullable types like "StringDtype" or "Int64Dtype" will by default
-      # be pandas._libs.missing.NAType if missing. Set those to None and change the dtype back to object.
-      for colname, coltype in mapping.items():
-        # check if coltype is pd.BooleanDtype
-        if coltype in set(
-          [
-            pd.StringDtype(),
-            pd.BooleanDtype(),
-            pd.Int64Dtype(),
-            pd.Int32Dtype(),
-            "boolean",
-          ]
-        ):
-          data[colname] = data[colname].astype(object)
-          data.loc[pd.isna(data[colname]), colname] = None
-      logger.info("After conversion:")
-      logger.info(get_df_info(data))
+      _convert_na_to_none(data, mapping)
     return data
   except (ValueError, IndexError) as e:
     raise ValueError(f"Invalid input: {e}")
 
 
+def _convert_na_to_none(data: pd.DataFrame, mapping: Dict[str, type]) -> None:
+  """Convert missing values in nullable extension type columns to None, in place."""
+  logger.info("Logging size effect of convertNAToNone")
+  logger.info("Before conversion:")
+  logger.info(get_df_info(data))
+  # float types will be nan if missing; newer nullable types like "StringDtype" or "Int64Dtype" will by default
+  # be pandas._libs.missing.NAType if missing. Set those to None and change the dtype back to object.
+  for colname, coltype in mapping.items():
+    if colname not in data.columns:
+      continue
+    # check if coltype is pd.BooleanDtype
+    if coltype in set(
+      [
+        pd.StringDtype(),
+        pd.BooleanDtype(),
+        pd.Int64Dtype(),
+        pd.Int32Dtype(),
+        "boolean",
+      ]
+    ):
+      data[colname] = data[colname].astype(object)
+      data.loc[pd.isna(data[colname]), colname] = None
+  logger.info("After conversion:")
+  logger.info(get_df_info(data))
+
+
+def _get_arrow_type(dtype) -> pa.DataType:
+  """Return the Arrow type to parse a column into before converting it to dtype."""
+  if dtype in (object, str, "category") or isinstance(
+    dtype, (pd.StringDtype, pd.CategoricalDtype)
+  ):
+    return pa.string()
+  if dtype == "boolean" or isinstance(dtype, pd.BooleanDtype):
+    return pa.bool_()
+  pandasDtype = pd.api.types.pandas_dtype(dtype)
+  return pa.from_numpy_dtype(getattr(pandasDtype, "numpy_dtype", pandasDtype))
+
+
+def _arrow_column_to_pandas(column: pa.ChunkedArray, dtype) -> pd.Series:
+  """Convert a parsed Arrow column to the pandas dtype pd.read_csv would produce."""
+  series = column.to_pandas()
+  if series.dtype == object:
+    # Arrow represents missing strings as None, while pd.read_csv uses NaN.
+    series = series.where(series.notna(), np.nan)
+  if dtype in (object, str):
+    return series.astype(object)
+  return series.astype(dtype)
+
+
+def tsv_parser_streaming(
+  path: str,
+  mapping: Dict[str, type],
+  columns: List[str],
+  header: bool,
+  useCols: Optional[List[str]] = None,
+  convertNAToNone: bool = True,
+  blockSize: int = 64 << 20,
+) -> pd.DataFrame:
+  """Parse a TSV file directly from disk and raise an Exception if it is not formatted as expected.
+
+  Produces the same DataFrame as tsv_parser, but never materializes the file as a Python str:
+  pyarrow reads the file in blocks of blockSize bytes, parsing only useCols and parsing each
+  column directly into the type from mapping.
+
+  Args:
+    path: path to the TSV file
+    mapping: Dict mapping column names to types
+    columns: List of column names
+    header: bool indicating whether the input will have a header
+    useCols: Optional list of columns to return
+    blockSize: number of bytes to parse at a time
+
+  Returns:
+    pd.DataFrame containing parsed data
+  """
+  try:
+    with open(path, "r", encoding="utf-8") as handle:
+      firstLine = handle.readline().rstrip("\n")
+    num_fields = len(firstLine.split("\t"))
+    if num_fields != len(columns):
+      raise ValueError(f"Expected {len(columns)} columns, but got {num_fields}")
+
+    includedColumns = useCols if useCols else columns
+    reader = pa_csv.open_csv(
+      path,
+      read_options=pa_csv.ReadOptions(
+        column_names=columns, skip_rows=1 if header else 0, block_size=blockSize
+      ),
+      parse_options=pa_csv.ParseOptions(delimiter="\t", newlines_in_values=True),
+      convert_options=pa_csv.ConvertOptions(
+        column_types={col: _get_arrow_type(mapping.get(col, object)) for col in includedColumns},
+        include_columns=includedColumns,
+        null_values=sorted(STR_NA_VALUES),
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=True,
+      ),
+    )
+    table = pa.Table.from_batches(list(reader), schema=reader.schema)
+    # Convert one column at a time, releasing each Arrow column once it has been converted.
+    data = {}
+    while table.num_columns > 0:
+      colname = table.column_names[0]
+      column = table.column(0)
+      table = table.remove_column(0)
+      data[colname] = _arrow_column_to_pandas(column, mapping.get(colname, object))
+      del column
+    data = pd.DataFrame(data, columns=includedColumns)
+    if convertNAToNone:
+      _convert_na_to_none(data, mapping)
+    return data
+  except (ValueError, IndexError, pa.ArrowInvalid) as e:
+    raise ValueError(f"Invalid input: {e}")
+
+
+def _get_peak_rss_mb() -> float:
+  """Return the peak resident set size of this process in MB."""
+  # ru_maxrss is reported in KB on Linux.
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
 def tsv_reader_single(
-  path: str, mapping, columns, header=False, parser=tsv_parser, convertNAToNone=True
+  path: str,
+  mapping,
+  columns,
+  header=False,
+  parser=tsv_parser,
+  convertNAToNone=True,
+  engine: c.TSVReaderEngine = c.TSVReaderEngine.PANDAS,
 ):
   """Read a single TSV file."""
+  if engine == c.TSVReaderEngine.PYARROW:
+    return tsv_parser_streaming(path, mapping, columns, header, convertNAToNone=convertNAToNone)
   with open(path, "r", encoding="utf-8") as handle:
     return tsv_parser(handle.read(), mapping, columns, header, convertNAToNone=convertNAToNone)
 
 
 def tsv_reader(
-  path: str, mapping, columns, header=False, parser=tsv_parser, convertNAToNone=True
+  path: str,
+  mapping,
+  columns,
+  header=False,
+  parser=tsv_parser,
+  convertNAToNone=True,
+  engine: c.TSVReaderEngine = c.TSVReaderEngine.PANDAS,
 ) -> pd.DataFrame:
-  """Read a single TSV file or a directory of TSV files."""
+  """Read a single TSV file or a directory of TSV files.
+
+  With the PYARROW engine, the files in a directory are read in parallel threads.
+  """
+  startTime = time.time()
+  startPeakRss = _get_peak_rss_mb()
+
+  def read_single(singlePath: str) -> pd.DataFrame:
+    return tsv_reader_single(
+      singlePath, mapping, columns, header, parser, convertNAToNone=convertNAToNone, engine=engine
+    )
+
   if os.path.isdir(path):
-    dfs = [
-      tsv_reader_single(
-        os.path.join(path, filename),
-        mapping,
-        columns,
-        header,
-        parser,
-        convertNAToNone=convertNAToNone,
-      )
-      for filename in os.listdir(path)
-      if filename.endswith(".tsv")
+    paths = [
+      os.path.join(path, filename) for filename in os.listdir(path) if filename.endswith(".tsv")
     ]
-    return pd.concat(dfs, ignore_index=True)
+    if engine == c.TSVReaderEngine.PYARROW and len(paths) > 1:
+      with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+        dfs = list(executor.map(read_single, paths))
+    else:
+      dfs = [read_single(singlePath) for singlePath in paths]
+    data = pd.concat(dfs, ignore_index=True)
   else:
-    return tsv_reader_single(
-      path, mapping, columns, header, parser, convertNAToNone=convertNAToNone
-    )
+    data = read_single(path)
+
+  peakRss = _get_peak_rss_mb()
+  logger.info(
+    f"Read {len(data)} rows from {path} with {engine.value} reader in "
+    f"{time.time() - startTime:.2f} secs. Peak RSS: {peakRss:.0f} MB "
+    f"(+{peakRss - startPeakRss:.0f} MB during read)"
+  )
+  return data
 
 
 def read_from_tsv(
@@ -164,6 +300,7 @@ def read_from_tsv(
   noteStatusHistoryPath: Optional[str],
   userEnrollmentPath: Optional[str],
   headers: bool,
+  tsvReaderEngine: c.TSVReaderEngine = c.TSVReaderEngine.PANDAS,
 ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
   """Mini function to read notes, ratings, and noteStatusHistory from TSVs.
 
@@ -173,6 +310,7 @@ def read_from_tsv(
       noteStatusHistoryPath (str): path
       userEnrollmentPath (str): path
       headers: If true, expect first row of input files to be headers.
+      tsvReaderEngine: engine used to parse the TSVs.
   Returns:
       Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: notes, ratings, noteStatusHistory, userEnrollment
   """
@@ -185,6 +323,7 @@ def read_from_tsv(
       c.noteTSVColumns,
       header=headers,
       convertNAToNone=False,
+      engine=tsvReaderEngine,
     )
     assert len(notes.columns) == len(c.noteTSVColumns) and all(notes.columns == c.noteTSVColumns), (
       f"note columns don't match: \n{[col for col in notes.columns if not col in c.noteTSVColumns]} are extra columns, "
@@ -200,6 +339,7 @@ def read_from_tsv(
       c.ratingTSVColumns,
       header=headers,
       convertNAToNone=False,
+      engine=tsvReaderEngine,
     )
     assert len(ratings.columns.values) == len(c.ratingTSVColumns) and all(
       ratings.columns == c.ratingTSVColumns
@@ -219,6 +359,7 @@ def read_from_tsv(
         c.noteStatusHistoryTSVColumns,
         header=headers,
         convertNAToNone=False,
+        engine=tsvReaderEngine,
       )
       assert len(noteStatusHistory.columns.values) == len(c.noteStatusHistoryTSVColumns) and all(
         noteStatusHistory.columns == c.noteStatusHistoryTSVColumns
@@ -233,6 +374,7 @@ def read_from_tsv(
         c.noteStatusHistoryTSVColumnsOld,
         header=headers,
         convertNAToNone=False,
+        engine=tsvReaderEngine,
       )
       noteStatusHistory[c.timestampMillisOfFirstNmrDueToMinStableCrhTimeKey] = np.nan
       assert len(noteStatusHistory.columns.values) == len(c.noteStatusHistoryTSVColumns) and all(
@@ -251,6 +393,7 @@ def read_from_tsv(
       c.userEnrollmentTSVColumns,
       header=headers,
       convertNAToNone=False,
+      engine=tsvReaderEngine,
     )
     assert len(userEnrollment.columns.values) == len(c.userEnrollmentTSVColumns) and all(
       userEnrollment.columns == c.userEnrollmentTSVColumns
@@ -508,6 +651,7 @@ def filter_ratings(
   minNumRatingsPerRater: int,
   minNumRatersPerNote: int,
   log: bool = True,
+  ratingsIndex: Optional[c.RatingsIndex] = None,
 ) -> pd.DataFrame:
   """Apply min number of ratings for raters & notes. Instead of iterating these filters
   until convergence, simply stop after going back and force once.
@@ -519,10 +663,22 @@ def filter_ratings(
       minNumRatersPerNote: Minimum number of ratings which a note must have to be included
         in scoring.  Notes with fewer ratings are removed.
       log: Debug output. Defaults to True.
+      ratingsIndex: If set and covering every note and rater in ratings, count ratings with
+        np.bincount over the index codes instead of value_counts and isin.
 
   Returns:
       pd.DataFrame: filtered ratings
   """
+  codes = ratingsIndex.get_codes(ratings) if ratingsIndex is not None else None
+  if codes is not None:
+    return _filter_ratings_with_index(
+      ratings,
+      codes,
+      (len(ratingsIndex.noteIds), len(ratingsIndex.raterIds)),
+      minNumRatingsPerRater,
+      minNumRatersPerNote,
+      log,
+    )
 
   def filter_notes(ratings):
     note_counts = ratings[c.noteIdKey].value_counts()
@@ -550,6 +706,120 @@ def filter_ratings(
   return ratings
 
 
+def _filter_ratings_with_index(
+  ratings: pd.DataFrame,
+  codes: Tuple[np.ndarray, np.ndarray],
+  indexSizes: Tuple[int, int],
+  minNumRatingsPerRater: int,
+  minNumRatersPerNote: int,
+  log: bool,
+) -> pd.DataFrame:
+  """Equivalent of filter_ratings which counts ratings over dense RatingsIndex codes and
+  selects the surviving ratings with a single boolean mask."""
+  noteCodes, raterCodes = codes
+  numNotes, numRaters = indexSizes
+  keep = np.ones(len(ratings), dtype=bool)
+
+  def filter_notes(keep):
+    noteCounts = np.bincount(noteCodes[keep], minlength=numNotes)
+    return keep & (noteCounts >= minNumRatersPerNote)[noteCodes]
+
+  def filter_raters(keep):
+    raterCounts = np.bincount(raterCodes[keep], minlength=numRaters)
+    return keep & (raterCounts >= minNumRatingsPerRater)[raterCodes]
+
+  keep = filter_notes(keep)
+  keep = filter_raters(keep)
+  keep = filter_notes(keep)
+  ratings = ratings[keep]
+
+  if log:
+    # Log final details
+    unique_notes = np.count_nonzero(np.bincount(noteCodes[keep], minlength=numNotes))
+    unique_raters = np.count_nonzero(np.bincount(raterCodes[keep], minlength=numRaters))
+    logger.info(
+      f"After applying min {minNumRatingsPerRater} ratings per rater and min {minNumRatersPerNote} raters per note: \n"
+      + f"Num Ratings: {len(ratings)}, Num Unique Notes Rated: {unique_notes}, Num Unique Raters: {unique_raters}"
+    )
+
+  return ratings
+
+
+@dataclass
+class ParticipantIdEncoding:
+  """Dictionary mapping participant IDs to dense int32 codes.
+
+  Codes are assigned in sorted ID order, so sorting or grouping by code orders participants the
+  same way as sorting or grouping by the original IDs.
+  """
+
+  ids: pd.Index
+
+  @classmethod
+  def from_columns(cls, idColumns: List[pd.Series]) -> "ParticipantIdEncoding":
+    ids = pd.Index(
+      pd.unique(pd.concat([column.dropna() for column in idColumns], ignore_index=True))
+    ).sort_values()
+    assert len(ids) < np.iinfo(np.int32).max, "too many participants for int32 codes"
+    return cls(ids)
+
+  def encode(self, values: pd.Series) -> pd.Series:
+    """Return the code for each ID.  Missing IDs are encoded as <NA> in an Int32 column."""
+    codes = self.ids.get_indexer(values)
+    missing = codes < 0
+    assert not (missing & values.notna().to_numpy()).any(), "IDs missing from encoding"
+    if missing.any():
+      encoded = pd.arrays.IntegerArray(codes.astype(np.int32), missing)
+    else:
+      encoded = codes.astype(np.int32)
+    return pd.Series(encoded, index=values.index, name=values.name)
+
+  def decode(self, codes: pd.Series) -> pd.Series:
+    """Return the original ID for each code.  Missing codes are decoded as NaN."""
+    codeValues = codes.to_numpy(dtype=np.int64, na_value=-1)
+    missing = codeValues < 0
+    assert (codeValues < len(self.ids)).all(), "codes missing from encoding"
+    decoded = self.ids.take(np.where(missing, 0, codeValues)).to_numpy()
+    if missing.any():
+      decoded = decoded.astype(object)
+      decoded[missing] = np.nan
+    return pd.Series(decoded, index=codes.index, name=codes.name)
+
+
+def encode_participant_ids(
+  idColumns: List[Tuple[str, pd.DataFrame, str]],
+) -> ParticipantIdEncoding:
+  """Build one encoding over all ID columns and replace each column with its codes, in place.
+
+  A single dictionary is shared by every column so that codes remain joinable across DataFrames
+  (e.g. raterParticipantId in ratings and participantId in userEnrollment).
+
+  Args:
+    idColumns: (name, DataFrame, column) for each participant ID column to encode.
+
+  Returns:
+    ParticipantIdEncoding used to decode the columns with decode_participant_ids.
+  """
+  with c.time_block("Encode participant IDs"):
+    for name, df, column in idColumns:
+      logger.info(get_df_info(df[[column]], f"{name} before ID encoding", deep=True))
+    encoding = ParticipantIdEncoding.from_columns([df[column] for _, df, column in idColumns])
+    for name, df, column in idColumns:
+      df[column] = encoding.encode(df[column])
+      logger.info(get_df_info(df[[column]], f"{name} after ID encoding", deep=True))
+    logger.info(f"Encoded {len(encoding.ids)} participant IDs as int32 codes.")
+  return encoding
+
+
+def decode_participant_ids(
+  encoding: ParticipantIdEncoding, idColumns: List[Tuple[str, pd.DataFrame, str]]
+) -> None:
+  """Replace each encoded ID column with the original participant IDs, in place."""
+  with c.time_block("Decode participant IDs"):
+    for _, df, column in idColumns:
+      df[column] = encoding.decode(df[column])
+
+
 def write_prescoring_output(
   prescoringNoteModelOutput: pd.DataFrame,
   prescoringRaterModelOutput: pd.DataFrame,
@@ -582,6 +852,64 @@ def write_prescoring_output(
   joblib.dump(prescoringMetaOutput, prescoringMetaOutputPath)
 
 
+def read_prescoring_warm_start(
+  noteModelOutputPath: str,
+  raterModelOutputPath: str,
+  prescoringMetaOutputPath: str,
+  newRatingsAfterMillis: Optional[int] = None,
+  compareToFullRetrain: bool = False,
+  headers: bool = True,
+  engine: c.TSVReaderEngine = c.TSVReaderEngine.PANDAS,
+) -> c.PrescoringWarmStart:
+  """Read prescoring output written by write_prescoring_output to warm start the next prescoring.
+
+  Only the columns needed to initialize matrix factorization are kept, since the warm start is
+  passed to every scorer.
+
+  Args:
+    noteModelOutputPath: path of the previous prescoring note model output
+    raterModelOutputPath: path of the previous prescoring rater model output
+    prescoringMetaOutputPath: path of the previous prescoring meta output
+    newRatingsAfterMillis: ratings created after this time are treated as new (see WarmStart)
+    compareToFullRetrain: also fit each warm-started model from scratch and log the drift
+  """
+  logger.info(
+    f"Reading prescoring warm start from {noteModelOutputPath}, {raterModelOutputPath}, {prescoringMetaOutputPath}"
+  )
+  noteModelOutput = tsv_reader(
+    noteModelOutputPath,
+    c.prescoringNoteModelOutputTSVTypeMapping,
+    c.prescoringNoteModelOutputTSVColumns,
+    header=headers,
+    engine=engine,
+  )
+  raterModelOutput = tsv_reader(
+    raterModelOutputPath,
+    c.prescoringRaterModelOutputTSVTypeMapping,
+    c.prescoringRaterModelOutputTSVColumns,
+    header=headers,
+    engine=engine,
+  )
+  prescoringMetaOutput = joblib.load(prescoringMetaOutputPath)
+  assert type(prescoringMetaOutput) == c.PrescoringMetaOutput
+  return c.PrescoringWarmStart(
+    noteModelOutput=noteModelOutput[
+      [c.noteIdKey, c.scorerNameKey, c.internalNoteInterceptKey, c.internalNoteFactor1Key]
+    ],
+    raterModelOutput=raterModelOutput[
+      [
+        c.raterParticipantIdKey,
+        c.scorerNameKey,
+        c.internalRaterInterceptKey,
+        c.internalRaterFactor1Key,
+      ]
+    ],
+    metaOutput=prescoringMetaOutput,
+    newRatingsAfterMillis=newRatingsAfterMillis,
+    compareToFullRetrain=compareToFullRetrain,
+  )
+
+
 def write_tsv_local(df: pd.DataFrame, path: str, headers: bool = True) -> None:
   """Write DF as a TSV stored to local disk.
 
@@ -652,6 +980,8 @@ class LocalDataLoader(CommunityNotesDataLoader):
     prescoringNoteTopicClassifierPath: Optional[str] = None,
     prescoringPflipClassifierPath: Optional[str] = None,
     prescoringMetaOutputPath: Optional[str] = None,
+    tsvReaderEngine: c.TSVReaderEngine = c.TSVReaderEngine.PANDAS,
+    snapshotCache: Optional[SnapshotCache] = None,
   ) -> None:
     """
     Args:
@@ -662,6 +992,9 @@ class LocalDataLoader(CommunityNotesDataLoader):
         headers: If true, expect first row of input files to be headers.
         shouldFilterNotMisleadingNotes (bool, optional): Throw out not-misleading notes if True. Defaults to True.
         log (bool, optional): Print out debug output. Defaults to True.
+        tsvReaderEngine (c.TSVReaderEngine, optional): engine used to parse input TSVs.
+        snapshotCache (SnapshotCache, optional): if set, reuse preprocessed input DataFrames
+          cached from a previous run on identical inputs instead of re-parsing the TSVs.
     """
     self.notesPath = notesPath
     self.ratingsPath = ratingsPath
@@ -675,6 +1008,8 @@ class LocalDataLoader(CommunityNotesDataLoader):
     self.headers = headers
     self.shouldFilterNotMisleadingNotes = shouldFilterNotMisleadingNotes
     self.log = log
+    self.tsvReaderEngine = tsvReaderEngine
+    self.snapshotCache = snapshotCache
 
   def get_data(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """All-in-one function for reading Birdwatch notes and ratings from TSV files.
@@ -683,16 +1018,34 @@ class LocalDataLoader(CommunityNotesDataLoader):
     Returns:
         Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: notes, ratings, noteStatusHistory, userEnrollment
     """
+    frameNames = ["notes", "ratings", "noteStatusHistory", "userEnrollment"]
+    if self.snapshotCache is not None:
+      snapshotKey = self.snapshotCache.get_key(
+        [self.notesPath, self.ratingsPath, self.noteStatusHistoryPath, self.userEnrollmentPath],
+        {
+          "headers": self.headers,
+          "shouldFilterNotMisleadingNotes": self.shouldFilterNotMisleadingNotes,
+        },
+      )
+      frames = self.snapshotCache.load(snapshotKey)
+      if frames is not None:
+        return tuple(frames[name] for name in frameNames)
+
     notes, ratings, noteStatusHistory, userEnrollment = read_from_tsv(
       self.notesPath,
       self.ratingsPath,
       self.noteStatusHistoryPath,
       self.userEnrollmentPath,
       self.headers,
+      tsvReaderEngine=self.tsvReaderEngine,
     )
     notes, ratings, noteStatusHistory = preprocess_data(
       notes, ratings, noteStatusHistory, self.shouldFilterNotMisleadingNotes, self.log
     )
+    if self.snapshotCache is not None:
+      self.snapshotCache.save(
+        snapshotKey, dict(zip(frameNames, [notes, ratings, noteStatusHistory, userEnrollment]))
+      )
     return notes, ratings, noteStatusHistory, userEnrollment
 
   def get_prescoring_model_output(
@@ -709,6 +1062,7 @@ class LocalDataLoader(CommunityNotesDataLoader):
         c.prescoringRaterModelOutputTSVTypeMapping,
         c.prescoringRaterModelOutputTSVColumns,
         header=self.headers,
+        engine=self.tsvReaderEngine,
       )
       assert len(prescoringRaterModelOutput.columns) == len(
         c.prescoringRaterModelOutputTSVColumns
@@ -725,6 +1079,7 @@ class LocalDataLoader(CommunityNotesDataLoader):
         c.prescoringNoteModelOutputTSVTypeMapping,
         c.prescoringNoteModelOutputTSVColumns,
         header=self.headers,
+        engine=self.tsvReaderEngine,
       )
       assert len(prescoringNoteModelOutput.columns) == len(
         c.prescoringNoteModelOutputTSVColumns
@@ -0,0 +1,499 @@
+"""Structured profiling of scoring runs.
+
+While profiling is enabled, every c.time_block and Scorer.time_block records a span with its wall
+time, process CPU time, growth of the process peak RSS and the sizes of DataFrames logged within
+it.  Spans nest per thread, and spans recorded in scorer worker processes are returned with the
+worker's result and merged into the parent's profile.  A profile can be written as a Chrome trace
+(chrome://tracing, Perfetto) or as a speedscope profile, and may also include stacks sampled from
+every thread at a fixed interval.
+
+Profiling is off unless enabled (see runner.py --profile-output), in which case span() is a no-op.
+"""
+
+# Std libraries
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+import functools
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# 3rd-party libraries
+import pandas as pd
+
+
+logger = logging.getLogger("birdwatch.profiling")
+logger.setLevel(logging.INFO)
+
+
+class ProfileFormat(Enum):
+  # Trace Event Format, viewable in chrome://tracing or https://ui.perfetto.dev.
+  CHROME = "chrome"
+  # https://www.speedscope.app file format.
+  SPEEDSCOPE = "speedscope"
+
+
+@dataclass
+class FrameSize:
+  rows: int
+  columns: int
+  bytes: int
+
+
+@dataclass
+class Span:
+  """A timed block of a profiled run.
+
+  Attributes:
+      name: label of the time_block
+      pid: process which ran the block
+      tid: thread which ran the block
+      startSeconds: start time, in seconds since the epoch
+      wallSeconds: elapsed wall time
+      cpuSeconds: CPU time used by all threads of the process during the block
+      peakRssDeltaBytes: growth of the peak resident set size of the process during the block
+      frames: size of each DataFrame logged during the block (see record_frame)
+      children: blocks nested within this block on the same thread
+  """
+
+  name: str
+  pid: int
+  tid: int
+  startSeconds: float
+  wallSeconds: float = 0.0
+  cpuSeconds: float = 0.0
+  peakRssDeltaBytes: int = 0
+  frames: Dict[str, FrameSize] = field(default_factory=dict)
+  children: List["Span"] = field(default_factory=list)
+
+
+@dataclass
+class StackSamples:
+  """Stacks of every thread of a process, sampled at a fixed interval.
+
+  Attributes:
+      pid: sampled process
+      intervalSeconds: time between samples
+      frameNames: name of each distinct frame
+      stacks: distinct stacks, as frameNames positions from the outermost frame
+      samples: (time in seconds since the epoch, thread id, stacks position) of each sample
+  """
+
+  pid: int
+  intervalSeconds: float
+  frameNames: List[str] = field(default_factory=list)
+  stacks: List[Tuple[int, ...]] = field(default_factory=list)
+  samples: List[Tuple[float, int, int]] = field(default_factory=list)
+
+
+def _get_peak_rss_bytes() -> int:
+  # ru_maxrss is in KiB on Linux.
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _StackSampler(threading.Thread):
+  """Samples the stack of every other thread of the process until stopped."""
+
+  def __init__(self, intervalSeconds: float):
+    super().__init__(name="profiling-stack-sampler", daemon=True)
+    self.result = StackSamples(os.getpid(), intervalSeconds)
+    self._stopped = threading.Event()
+    self._frameIds: Dict[Any, int] = {}
+    self._stackIds: Dict[Tuple[int, ...], int] = {}
+
+  def _get_frame_id(self, code) -> int:
+    frameId = self._frameIds.get(code)
+    if frameId is None:
+      frameId = self._frameIds[code] = len(self.result.frameNames)
+      name = getattr(code, "co_qualname", code.co_name)
+      self.result.frameNames.append(
+        f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+      )
+    return frameId
+
+  def _get_stack_id(self, frame) -> int:
+    stack = []
+    while frame is not None:
+      stack.append(self._get_frame_id(frame.f_code))
+      frame = frame.f_back
+    stackKey = tuple(reversed(stack))
+    stackId = self._stackIds.get(stackKey)
+    if stackId is None:
+      stackId = self._stackIds[stackKey] = len(self.result.stacks)
+      self.result.stacks.append(stackKey)
+    return stackId
+
+  def run(self) -> None:
+    while not self._stopped.wait(self.result.intervalSeconds):
+      now = time.time()
+      for tid, frame in sys._current_frames().items():
+        if tid != self.ident:
+          self.result.samples.append((now, tid, self._get_stack_id(frame)))
+
+  def stop(self) -> StackSamples:
+    self._stopped.set()
+    self.join()
+    return self.result
+
+
+class Profile:
+  """Spans and stack samples recorded by one or more processes of a profiled run."""
+
+  def __init__(self, samplingIntervalSeconds: Optional[float] = None):
+    self.samplingIntervalSeconds = samplingIntervalSeconds
+    self.spans: List[Span] = []
+    self.stackSamples: List[StackSamples] = []
+    self._lock = threading.Lock()
+    self._local = threading.local()
+    self._sampler: Optional[_StackSampler] = None
+    # Spans are timed with perf_counter and placed on the epoch timeline with a fixed offset, so
+    # spans of one process nest exactly.
+    self._epochOffset = time.time() - time.perf_counter()
+
+  def _start(self) -> None:
+    if self.samplingIntervalSeconds:
+      self._sampler = _StackSampler(self.samplingIntervalSeconds)
+      self._sampler.start()
+
+  def _stop(self) -> None:
+    if self._sampler is not None:
+      self.stackSamples.append(self._sampler.stop())
+      self._sampler = None
+
+  def _get_stack(self) -> List[Span]:
+    if not hasattr(self._local, "stack"):
+      self._local.stack = []
+    return self._local.stack
+
+  @contextmanager
+  def span(self, name: str) -> Iterator[Span]:
+    stack = self._get_stack()
+    startCounter = time.perf_counter()
+    startCpu = time.process_time()
+    startPeakRss = _get_peak_rss_bytes()
+    span = Span(name, os.getpid(), threading.get_ident(), startCounter + self._epochOffset)
+    if stack:
+      stack[-1].children.append(span)
+    else:
+      with self._lock:
+        self.spans.append(span)
+    stack.append(span)
+    try:
+      yield span
+    finally:
+      stack.pop()
+      span.wallSeconds = time.perf_counter() - startCounter
+      span.cpuSeconds = time.process_time() - startCpu
+      span.peakRssDeltaBytes = _get_peak_rss_bytes() - startPeakRss
+
+  def record_frame(self, name: str, df: pd.DataFrame, nbytes: Optional[int] = None) -> None:
+    stack = self._get_stack()
+    if not stack:
+      return
+    if nbytes is None:
+      nbytes = int(df.memory_usage(index=True, deep=False).sum())
+    stack[-1].frames[name] = FrameSize(len(df), len(df.columns), int(nbytes))
+
+  def merge(self, other: "Profile") -> None:
+    """Add the spans and samples of a profile recorded in another process."""
+    with self._lock:
+      self.spans.extend(other.spans)
+      self.stackSamples.extend(other.stackSamples)
+
+  def __getstate__(self) -> Dict[str, Any]:
+    # Only recorded data is returned from worker processes.
+    return {
+      "samplingIntervalSeconds": self.samplingIntervalSeconds,
+      "spans": self.spans,
+      "stackSamples": self.stackSamples,
+    }
+
+  def __setstate__(self, state: Dict[str, Any]) -> None:
+    self.__init__(state["samplingIntervalSeconds"])
+    self.spans = state["spans"]
+    self.stackSamples = state["stackSamples"]
+
+  def log_summary(self, maxDepth: int = 1) -> None:
+    """Log the wall time, CPU time and peak RSS growth of spans up to maxDepth."""
+    lines = []
+
+    def _add_lines(span: Span, depth: int) -> None:
+      lines.append(
+        f"{'  ' * depth}{span.name} [pid {span.pid}]: {span.wallSeconds:.2f} secs wall, "
+        f"{span.cpuSeconds:.2f} secs CPU, peak RSS +{span.peakRssDeltaBytes * 1e-6:.1f}MB"
+      )
+      if depth < maxDepth:
+        for child in span.children:
+          _add_lines(child, depth + 1)
+
+    for span in sorted(self.spans, key=lambda span: span.startSeconds):
+      _add_lines(span, 0)
+    logger.info("Profile summary:\n" + "\n".join(lines))
+
+  def _get_start_seconds(self) -> float:
+    starts = [span.startSeconds for span in self.spans]
+    starts.extend(t for samples in self.stackSamples for (t, _, _) in samples.samples)
+    return min(starts, default=0.0)
+
+  def to_chrome_trace(self) -> Dict[str, Any]:
+    """Return spans as complete events and samples in the Trace Event Format."""
+    startSeconds = self._get_start_seconds()
+
+    def _micros(seconds: float) -> float:
+      return round((seconds - startSeconds) * 1e6, 3)
+
+    events: List[Dict[str, Any]] = []
+    pids = set()
+
+    def _add_events(span: Span) -> None:
+      pids.add(span.pid)
+      events.append(
+        {
+          "name": span.name,
+          "cat": "time_block",
+          "ph": "X",
+          "ts": _micros(span.startSeconds),
+          "dur": round(span.wallSeconds * 1e6, 3),
+          "pid": span.pid,
+          "tid": span.tid,
+          "args": {
+            "cpuSeconds": span.cpuSeconds,
+            "peakRssDeltaBytes": span.peakRssDeltaBytes,
+            "frames": {name: vars(size) for (name, size) in span.frames.items()},
+          },
+        }
+      )
+      for child in span.children:
+        _add_events(child)
+
+    for span in self.spans:
+      _add_events(span)
+    stackFrames: Dict[str, Dict[str, Any]] = {}
+    samples: List[Dict[str, Any]] = []
+    for stackSamples in self.stackSamples:
+      pids.add(stackSamples.pid)
+      # Stack frame ids are unique across processes, and a node is shared by all stacks with the
+      # same prefix.
+      nodeIds: Dict[Tuple[int, ...], str] = {}
+      stackNodeIds = []
+      for stack in stackSamples.stacks:
+        parentId = None
+        for depth in range(len(stack)):
+          prefix = stack[: depth + 1]
+          nodeId = nodeIds.get(prefix)
+          if nodeId is None:
+            nodeId = nodeIds[prefix] = f"{stackSamples.pid}:{len(nodeIds)}"
+            stackFrames[nodeId] = {"name": stackSamples.frameNames[stack[depth]]}
+            if parentId is not None:
+              stackFrames[nodeId]["parent"] = parentId
+          parentId = nodeId
+        stackNodeIds.append(parentId)
+      samples.extend(
+        {
+          "pid": stackSamples.pid,
+          "tid": tid,
+          "ts": _micros(t),
+          "sf": stackNodeIds[stackId],
+          "weight": 1,
+        }
+        for (t, tid, stackId) in stackSamples.samples
+        if stackNodeIds[stackId] is not None
+      )
+    for pid in sorted(pids):
+      events.append(
+        {
+          "name": "process_name",
+          "ph": "M",
+          "pid": pid,
+          "args": {"name": "scoring" if pid == os.getpid() else f"scorer worker {pid}"},
+        }
+      )
+    return {
+      "traceEvents": events,
+      "stackFrames": stackFrames,
+      "samples": samples,
+      "displayTimeUnit": "ms",
+    }
+
+  def to_speedscope(self) -> Dict[str, Any]:
+    """Return one evented profile of spans and one sampled profile per process and thread."""
+    startSeconds = self._get_start_seconds()
+    frames: List[Dict[str, str]] = []
+    frameIds: Dict[str, int] = {}
+
+    def _get_frame_id(name: str) -> int:
+      if name not in frameIds:
+        frameIds[name] = len(frames)
+        frames.append({"name": name})
+      return frameIds[name]
+
+    threadSpans: Dict[Tuple[int, int], List[Span]] = {}
+    for span in sorted(self.spans, key=lambda span: span.startSeconds):
+      threadSpans.setdefault((span.pid, span.tid), []).append(span)
+    profiles = []
+    for (pid, tid), spans in sorted(threadSpans.items()):
+      events: List[Dict[str, Any]] = []
+
+      def _add_events(span: Span, endLimit: float) -> None:
+        # Clamp to the enclosing span and the previous sibling so events stay well nested.
+        start = max(span.startSeconds - startSeconds, events[-1]["at"] if events else 0.0)
+        end = min(max(start, span.startSeconds - startSeconds + span.wallSeconds), endLimit)
+        start = min(start, end)
+        frameId = _get_frame_id(span.name)
+        events.append({"type": "O", "frame": frameId, "at": start})
+        for child in span.children:
+          _add_events(child, end)
+        events.append({"type": "C", "frame": frameId, "at": max(end, events[-1]["at"])})
+
+      for span in spans:
+        _add_events(span, float("inf"))
+      profiles.append(
+        {
+          "type": "evented",
+          "name": f"time_blocks pid {pid} thread {tid}",
+          "unit": "seconds",
+          "startValue": events[0]["at"],
+          "endValue": events[-1]["at"],
+          "events": events,
+        }
+      )
+    for stackSamples in self.stackSamples:
+      threadSamples: Dict[int, List[Tuple[float, int]]] = {}
+      for (t, tid, stackId) in stackSamples.samples:
+        threadSamples.setdefault(tid, []).append((t, stackId))
+      for tid, samples in sorted(threadSamples.items()):
+        stacks = [
+          [_get_frame_id(stackSamples.frameNames[f]) for f in stackSamples.stacks[stackId]]
+          for (_, stackId) in samples
+        ]
+        profiles.append(
+          {
+            "type": "sampled",
+            "name": f"samples pid {stackSamples.pid} thread {tid}",
+            "unit": "seconds",
+            "startValue": samples[0][0] - startSeconds,
+            "endValue": samples[-1][0] - startSeconds + stackSamples.intervalSeconds,
+            "samples": stacks,
+            "weights": [stackSamples.intervalSeconds] * len(stacks),
+          }
+        )
+    return {
+      "$schema": "https://www.speedscope.app/file-format-schema.json",
+      "shared": {"frames": frames},
+      "profiles": profiles,
+      "name": "Community Notes scoring",
+      "exporter": "scoring.profiling",
+    }
+
+  def write(self, path: str, profileFormat: ProfileFormat = ProfileFormat.CHROME) -> None:
+    if profileFormat == ProfileFormat.SPEEDSCOPE:
+      data = self.to_speedscope()
+    else:
+      data = self.to_chrome_trace()
+    with open(path, "w") as f:
+      json.dump(data, f)
+    logger.info(f"Wrote {profileFormat.value} profile with {len(self.spans)} root spans to {path}")
+
+
+_profile: Optional[Profile] = None
+
+
+def is_enabled() -> bool:
+  return _profile is not None
+
+
+def get_profile() -> Optional[Profile]:
+  return _profile
+
+
+def enable(samplingIntervalSeconds: Optional[float] = None) -> Profile:
+  """Start recording spans, and stack samples if samplingIntervalSeconds is set."""
+  global _profile
+  assert _profile is None, "profiling is already enabled"
+  _profile = Profile(samplingIntervalSeconds)
+  _profile._start()
+  return _profile
+
+
+def disable() -> Profile:
+  """Stop recording and return the recorded profile."""
+  global _profile
+  assert _profile is not None, "profiling is not enabled"
+  profile, _profile = _profile, None
+  profile._stop()
+  return profile
+
+
+@contextmanager
+def span(name: str) -> Iterator[Optional[Span]]:
+  """Record a span named name if profiling is enabled."""
+  profile = _profile
+  if profile is None:
+    yield None
+    return
+  with profile.span(name) as s:
+    yield s
+
+
+def record_frame(name: str, df: pd.DataFrame, nbytes: Optional[int] = None) -> None:
+  """Record the size of df in the innermost span of the calling thread, if profiling is enabled.
+
+  Args:
+    name: name of the DataFrame
+    df: DataFrame to record
+    nbytes: memory used by df, if already known.  Defaults to the shallow memory usage.
+  """
+  profile = _profile
+  if profile is not None:
+    profile.record_frame(name, df, nbytes)
+
+
+@dataclass
+class ProfiledResult:
+  """Result of a function run with run_profiled, and the profile recorded while it ran."""
+
+  result: Any
+  profile: Profile
+
+
+def run_profiled(
+  name: str, samplingIntervalSeconds: Optional[float], fn: Callable, *fnArgs, **fnKwargs
+) -> ProfiledResult:
+  """Run fn in a worker process with profiling enabled, returning its result and profile.
+
+  Worker processes do not inherit the profiling state of the parent, so tasks submitted while
+  profiling is enabled are wrapped with run_profiled and unwrapped with unwrap_result.
+  """
+  profile = enable(samplingIntervalSeconds)
+  try:
+    with span(name):
+      result = fn(*fnArgs, **fnKwargs)
+  finally:
+    disable()
+  return ProfiledResult(result, profile)
+
+
+def profiled_task(name: str, fn: Callable) -> Callable:
+  """Return fn, wrapped with run_profiled if profiling is enabled.
+
+  Use for tasks mapped over a process pool; their results must be passed to unwrap_result.
+  """
+  profile = _profile
+  if profile is None:
+    return fn
+  return functools.partial(run_profiled, name, profile.samplingIntervalSeconds, fn)
+
+
+def unwrap_result(result: Any) -> Any:
+  """Return the result of a task, merging its profile if it was run with run_profiled."""
+  if not isinstance(result, ProfiledResult):
+    return result
+  if _profile is not None:
+    _profile.merge(result.profile)
+  return result.result
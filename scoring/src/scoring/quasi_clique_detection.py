@@ -1,18 +1,169 @@
 # Std libraries
+import concurrent.futures
+from dataclasses import dataclass
 import logging
-from typing import Set, Tuple
+import multiprocessing
+from typing import List, Optional, Set, Tuple
 
 # Project libraries
-from . import constants as c
+from . import constants as c, profiling
 
 # 3rd-party libraries
+import numpy as np
 import pandas as pd
+import scipy.sparse as sps
 
 
 logger = logging.getLogger("birdwatch.quasi_clique_detection")
 logger.setLevel(logging.INFO)
 
 
+@dataclass
+class RatingIncidence:
+  """Sparse rater x rating event incidence, where each event is a (tweet, note, helpfulNum).
+
+  raterEvents and eventRaters hold the same 0/1 matrix in CSR and CSC layouts so that both
+  rater rows and event columns can be sliced cheaply.
+  """
+
+  raterIds: pd.Index
+  tweetIds: pd.Index
+  eventTweets: np.ndarray  # tweet code for each event
+  raterEvents: sps.csr_matrix
+  eventRaters: sps.csc_matrix
+
+
+@dataclass
+class CliqueGrowthParams:
+  maxCliqueSize: int
+  noteInclusionThreshold: float
+  raterInclusionThreshold: float
+  minCliqueTweets: int
+  minInclusionRatings: int
+
+
+def _build_rating_incidence(ratings: pd.DataFrame) -> RatingIncidence:
+  """Build the sparse rater x (tweet, note, helpfulNum) incidence matrix for ratings."""
+  raterCodes, raterIds = pd.factorize(ratings[c.raterParticipantIdKey], sort=True)
+  eventCodes, events = pd.factorize(
+    pd.MultiIndex.from_frame(ratings[[c.tweetIdKey, c.noteIdKey, c.helpfulNumKey]])
+  )
+  eventTweets, tweetIds = pd.factorize(events.get_level_values(0))
+  raterEvents = sps.csr_matrix(
+    (np.ones(len(ratings), dtype=np.int32), (raterCodes, eventCodes)),
+    shape=(len(raterIds), len(events)),
+  )
+  # Each rater rates each note at most once, so duplicates should not exist, but clip to
+  # guarantee a 0/1 incidence matrix.
+  raterEvents.sum_duplicates()
+  raterEvents.data[:] = 1
+  return RatingIncidence(
+    raterIds=raterIds,
+    tweetIds=tweetIds,
+    eventTweets=eventTweets,
+    raterEvents=raterEvents,
+    eventRaters=raterEvents.tocsc(),
+  )
+
+
+def _group_events(
+  groupCounts: np.ndarray, touchedEvents: np.ndarray, numRaters: int, params: CliqueGrowthParams
+) -> np.ndarray:
+  """Return the events with enough agreement among numRaters raters to count as group actions."""
+  counts = groupCounts[touchedEvents]
+  return touchedEvents[
+    (counts >= (numRaters * params.noteInclusionThreshold))
+    & (counts >= min(numRaters, params.minInclusionRatings))
+  ]
+
+
+def _tweets_per_rater(
+  incidence: RatingIncidence, events: np.ndarray, raterMask: np.ndarray
+) -> np.ndarray:
+  """Count the distinct tweets among events for each rater selected by raterMask."""
+  numTweets = len(incidence.tweetIds)
+  columns = incidence.eventRaters[:, events]
+  raters = columns.indices
+  tweets = np.repeat(incidence.eventTweets[events], np.diff(columns.indptr))
+  keep = raterMask[raters]
+  raterTweets = np.unique(raters[keep].astype(np.int64) * numTweets + tweets[keep])
+  return np.bincount(raterTweets // numTweets, minlength=len(incidence.raterIds))
+
+
+def _grow_clique_sparse(
+  seed: Tuple[int, int], incidence: RatingIncidence, params: CliqueGrowthParams
+) -> Tuple[Set[int], Set[int]]:
+  """Grow a clique from a seed pair of rater codes.  Return included rater and tweet codes.
+
+  The number of clique members performing each rating event is kept in groupCounts and
+  updated in place by adding the incidence row of each candidate, so each step only touches
+  the events rated by clique members rather than recomputing counts over all ratings.
+  """
+  raterEvents = incidence.raterEvents
+  inClique = np.zeros(len(incidence.raterIds), dtype=bool)
+  groupCounts = np.zeros(raterEvents.shape[1], dtype=np.int32)
+  touchedEvents = np.array([], dtype=np.int64)
+
+  def _rater_events(rater: int) -> np.ndarray:
+    return raterEvents.indices[raterEvents.indptr[rater] : raterEvents.indptr[rater + 1]]
+
+  for rater in set(seed):
+    inClique[rater] = True
+    groupCounts[_rater_events(rater)] += 1
+    touchedEvents = np.union1d(touchedEvents, _rater_events(rater))
+  includedTweets: Set[int] = set()
+  for _ in range(params.maxCliqueSize):
+    # Identify the ratings where there is enough agreement that the rating constitutes a group action
+    numIncluded = int(inClique.sum())
+    groupEvents = _group_events(groupCounts, touchedEvents, numIncluded, params)
+    includedTweets = set(np.unique(incidence.eventTweets[groupEvents]).tolist())
+    # Find the rater not in the group that most aligned with the group rating events.  Ties are
+    # broken in favor of the rater with the smallest ID.
+    alignedTweetPerRater = _tweets_per_rater(incidence, groupEvents, ~inClique)
+    if len(alignedTweetPerRater) == 0 or alignedTweetPerRater.max() == 0:
+      break
+    candidate = int(np.argmax(alignedTweetPerRater))
+    # Calculate how many tweets would meet the inclusion threshold if the candidate were added
+    candidateEvents = _rater_events(candidate)
+    groupCounts[candidateEvents] += 1
+    candidateTouchedEvents = np.union1d(touchedEvents, candidateEvents)
+    candidateGroupEvents = _group_events(
+      groupCounts, candidateTouchedEvents, numIncluded + 1, params
+    )
+    satisfiedTweets = len(np.unique(incidence.eventTweets[candidateGroupEvents]))
+    # Calculate how many raters would be below the inclusion threshold if we add the candidate
+    candidateMask = inClique.copy()
+    candidateMask[candidate] = True
+    raterCounts = _tweets_per_rater(incidence, candidateGroupEvents, candidateMask)
+    ratersBelowThreshold = (
+      (raterCounts > 0) & (raterCounts < (params.raterInclusionThreshold * satisfiedTweets))
+    ).sum()
+    # Check standards
+    if satisfiedTweets >= params.minCliqueTweets and ratersBelowThreshold == 0:
+      inClique[candidate] = True
+      touchedEvents = candidateTouchedEvents
+    else:
+      groupCounts[candidateEvents] -= 1
+      break
+  return set(np.flatnonzero(inClique).tolist()), includedTweets
+
+
+# Rating incidence and growth parameters shared with clique growth worker processes.
+_workerIncidence: Optional[RatingIncidence] = None
+_workerParams: Optional[CliqueGrowthParams] = None
+
+
+def _init_clique_worker(incidence: RatingIncidence, params: CliqueGrowthParams) -> None:
+  global _workerIncidence, _workerParams
+  _workerIncidence = incidence
+  _workerParams = params
+
+
+def _grow_clique_in_worker(seed: Tuple[int, int]) -> Tuple[Set[int], Set[int]]:
+  assert _workerIncidence is not None and _workerParams is not None
+  return _grow_clique_sparse(seed, _workerIncidence, _workerParams)
+
+
 class QuasiCliqueDetection:
   def __init__(
     self,
@@ -24,6 +175,7 @@ class QuasiCliqueDetection:
     maxCliqueSize: int = 2000,
     minInclusionRatings: int = 4,
     minRaterPairCount: int = 50,
+    numWorkers: int = 1,
   ):
     """Initialize QuasiCliqueDetection.
 
@@ -38,6 +190,7 @@ class QuasiCliqueDetection:
         least this many ratings from included raters (or be rated by all included raters, whichever is
         fewer)
       minRaterPairCount: Raters must have at least this many matching ratings (roughly 1/day) to be considered
+      numWorkers: Number of processes used to grow cliques from independent seeds in parallel
     """
     self._recencyCutoff = recencyCutoff
     self._minCliqueTweets = minCliqueTweets
@@ -47,6 +200,16 @@ class QuasiCliqueDetection:
     self._raterInclusionThreshold = raterInclusionThreshold
     self._minInclusionRatings = minInclusionRatings
     self._minRaterPairCount = minRaterPairCount
+    self._numWorkers = numWorkers
+
+  def _get_growth_params(self) -> CliqueGrowthParams:
+    return CliqueGrowthParams(
+      maxCliqueSize=self._maxCliqueSize,
+      noteInclusionThreshold=self._noteInclusionThreshold,
+      raterInclusionThreshold=self._raterInclusionThreshold,
+      minCliqueTweets=self._minCliqueTweets,
+      minInclusionRatings=self._minInclusionRatings,
+    )
 
   def _get_pair_counts(
     self,
@@ -54,8 +217,8 @@ class QuasiCliqueDetection:
     notes: pd.DataFrame,
     cutoff: int,
     minAlignedRatings: int = 5,
-  ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Return counts of how many times raters rate notes in the same way, and all ratings for raters who do so >5 times."""
+  ) -> Tuple[pd.DataFrame, RatingIncidence]:
+    """Return counts of how many times raters rate notes in the same way, and the sparse rating incidence for raters who do so >5 times."""
     # Identify ratings that are in scope
     logger.info("initial rating length:", len(ratings))
     ratings = ratings[[c.noteIdKey, c.raterParticipantIdKey, c.helpfulNumKey]]
@@ -113,12 +276,16 @@ class QuasiCliqueDetection:
     counts = pd.DataFrame({"left": left, "right": right, "count": count})
     ratings = ratings.merge(pd.DataFrame({c.raterParticipantIdKey: list(set(left + right))}))
     logger.info(f"ratings after filter to raters included in pair counts: {len(ratings)}")
-    return counts, ratings
+    incidence = _build_rating_incidence(ratings)
+    logger.info(
+      f"rating incidence: {incidence.raterEvents.shape[0]} raters x {incidence.raterEvents.shape[1]} events"
+    )
+    return counts, incidence
 
   def _grow_clique(
     self,
     includedRaters: Set[str],
-    raterRatings: pd.DataFrame,
+    incidence: RatingIncidence,
   ):
     """Grow a clique from an initial set of raters.  Return all included raters and tweets.
 
@@ -129,114 +296,93 @@ class QuasiCliqueDetection:
 
     Args:
       includedRaters: Set of raters to use to initialize a clique
-      raterRatings: DF containing ratings from all raters with 5 or more rating collisions
+      incidence: Sparse incidence of ratings from all raters with 5 or more rating collisions
 
     Returns:
       Set of raters and tweets that meet density criteria.
     """
-    # Expand cliques 1 rater at a time, checking to see if density thresholds are satisifed after expansion
-    for _ in range(self._maxCliqueSize):
-      # Identify the ratings where there is enough agreement that the rating constitutes a group action
-      ratings = raterRatings[raterRatings[c.raterParticipantIdKey].isin(includedRaters)]
-      groupRatingCounts = (
-        ratings[[c.tweetIdKey, c.noteIdKey, c.helpfulNumKey]].value_counts().reset_index(drop=False)
-      )
-      groupRatingCounts = groupRatingCounts[
-        groupRatingCounts["count"] >= (len(includedRaters) * self._noteInclusionThreshold)
-      ]
-      groupRatingCounts = groupRatingCounts[
-        groupRatingCounts["count"] >= min(len(includedRaters), self._minInclusionRatings)
-      ]
-      # Find the rater not in the group that most aligned with the group rating events
-      alignedRatings = raterRatings.merge(
-        groupRatingCounts[[c.tweetIdKey, c.noteIdKey, c.helpfulNumKey]]
-      )
-      alignedRatings = alignedRatings[~alignedRatings[c.raterParticipantIdKey].isin(includedRaters)]
-      alignedTweetPerRater = (
-        alignedRatings[[c.tweetIdKey, c.raterParticipantIdKey]]
-        .drop_duplicates()[c.raterParticipantIdKey]
-        .value_counts()
-        .reset_index(drop=False)
-      )
-      candidate = (
-        alignedTweetPerRater.sort_values("count", ascending=False)
-        .head(1)[c.raterParticipantIdKey]
-        .item()
-      )
-      # Preserve current set of tweets incase we decide not to add the candidate
-      includedTweets = set(groupRatingCounts[c.tweetIdKey].drop_duplicates())
-      # Calculate how many tweets would meet the inclusion threshold if the candidate were added
-      candidateRaters = includedRaters | {candidate}
-      ratings = raterRatings[raterRatings[c.raterParticipantIdKey].isin(candidateRaters)]
-      groupRatingCounts = (
-        ratings[[c.tweetIdKey, c.noteIdKey, c.helpfulNumKey]].value_counts().reset_index(drop=False)
-      )
-      groupRatingCounts = groupRatingCounts[
-        groupRatingCounts["count"] >= (len(candidateRaters) * self._noteInclusionThreshold)
-      ]
-      groupRatingCounts = groupRatingCounts[
-        groupRatingCounts["count"] >= min(len(candidateRaters), self._minInclusionRatings)
-      ]
-      satisfiedTweets = groupRatingCounts[c.tweetIdKey].nunique()
-      # Calculate how many raters would be below the inclusion threshold if we add the candidate
-      matchingRatings = ratings.merge(
-        groupRatingCounts[[c.tweetIdKey, c.noteIdKey, c.helpfulNumKey]]
-      )
-      raterCounts = (
-        matchingRatings[[c.raterParticipantIdKey, c.tweetIdKey]]
-        .drop_duplicates()
-        .value_counts(c.raterParticipantIdKey)
-        .reset_index(drop=False)
-      )
-      ratersBelowThreshold = (
-        raterCounts["count"] < (self._raterInclusionThreshold * satisfiedTweets)
-      ).sum()
-      # Check standards
-      if satisfiedTweets >= self._minCliqueTweets and ratersBelowThreshold == 0:
-        includedRaters = candidateRaters
-      else:
-        return includedRaters, includedTweets
-    return includedRaters, includedTweets
+    seed = tuple(incidence.raterIds.get_indexer(list(includedRaters)))
+    raterCodes, tweetCodes = _grow_clique_sparse(seed, incidence, self._get_growth_params())
+    return (
+      set(incidence.raterIds.take(sorted(raterCodes)).tolist()),
+      set(incidence.tweetIds.take(sorted(tweetCodes)).tolist()),
+    )
 
   def _build_clusters(
     self,
     raterPairCounts: pd.DataFrame,
-    raterPairRatings: pd.DataFrame,
+    incidence: RatingIncidence,
   ):
     """Identify disjoint quasi-cliques using a greedy clustering approach.
 
+    Growing a clique only depends on its seed, so when numWorkers > 1 the next numWorkers
+    seeds are grown speculatively in a process pool.  Results are then consumed in seed order
+    and any seed that would have been pruned by an earlier clique is discarded, which yields
+    the same cliques as growing one seed at a time.
+
     Args:
       raterPairCounts: DF containing counts of how often pairs of raters colide.
-      raterPairRatings: All ratings from raters with >5 collisions with another rater
+      incidence: Sparse incidence of ratings from raters with >5 collisions with another rater
     """
     cliques = []
     # Attempt to cluster every rater with at least minRaterPairCount collisions
     logger.info(f"orig raterPairCounts: {len(raterPairCounts)}")
     raterPairCounts = raterPairCounts[raterPairCounts["count"] > self._minRaterPairCount]
     logger.info(f"pruned raterPairCounts: {len(raterPairCounts)}")
-    # Build cliques
-    while len(raterPairCounts) > 0:
-      # Identify seed
-      raterPairCounts = raterPairCounts.sort_values("count", ascending=False)
-      leftRater, rightRater = raterPairCounts.head(1)[["left", "right"]].values.flatten()
-      # Build clique and prune candidate set
-      cliqueRaters, cliquePosts = self._grow_clique({leftRater, rightRater}, raterPairRatings)
-      raterPairCounts = raterPairCounts[
-        ~(
-          (raterPairCounts["left"].isin(cliqueRaters))
-          | (raterPairCounts["right"].isin(cliqueRaters))
-        )
-      ]
-      # Augment results if clique is large enough
-      if len(cliqueRaters) >= self._minCliqueRaters:
-        logger.info(
-          f"Adding clique  (raters={len(cliqueRaters)}, tweets={len(cliquePosts)}).  Remaining ratePairCounts: {len(raterPairCounts)}"
-        )
-        cliques.append((cliqueRaters, cliquePosts))
-      else:
-        logger.info(
-          f"Skipping clique  (raters={len(cliqueRaters)}, tweets={len(cliquePosts)}).  Remaining ratePairCounts: {len(raterPairCounts)}"
-        )
+    params = self._get_growth_params()
+    executor = None
+    if self._numWorkers > 1:
+      executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=self._numWorkers,
+        mp_context=multiprocessing.get_context("forkserver"),
+        initializer=_init_clique_worker,
+        initargs=(incidence, params),
+      )
+    try:
+      # Build cliques
+      while len(raterPairCounts) > 0:
+        # Identify seeds
+        raterPairCounts = raterPairCounts.sort_values("count", ascending=False, kind="stable")
+        seeds: List[Tuple[int, int]] = [
+          tuple(incidence.raterIds.get_indexer([leftRater, rightRater]))
+          for leftRater, rightRater in raterPairCounts.head(max(self._numWorkers, 1))[
+            ["left", "right"]
+          ].values
+        ]
+        # Build cliques
+        if executor is None:
+          results = [_grow_clique_sparse(seed, incidence, params) for seed in seeds]
+        else:
+          task = profiling.profiled_task("Grow quasi-clique", _grow_clique_in_worker)
+          results = [profiling.unwrap_result(result) for result in executor.map(task, seeds)]
+        claimedRaters: Set[int] = set()
+        for seed, (cliqueRaterCodes, cliqueTweetCodes) in zip(seeds, results):
+          if claimedRaters & set(seed):
+            # An earlier clique in this batch pruned the seed, so it would never have been grown.
+            continue
+          claimedRaters |= cliqueRaterCodes
+          cliqueRaters = set(incidence.raterIds.take(sorted(cliqueRaterCodes)).tolist())
+          cliquePosts = set(incidence.tweetIds.take(sorted(cliqueTweetCodes)).tolist())
+          # Prune candidate set
+          raterPairCounts = raterPairCounts[
+            ~(
+              (raterPairCounts["left"].isin(cliqueRaters))
+              | (raterPairCounts["right"].isin(cliqueRaters))
+            )
+          ]
+          # Augment results if clique is large enough
+          if len(cliqueRaters) >= self._minCliqueRaters:
+            logger.info(
+              f"Adding clique  (raters={len(cliqueRaters)}, tweets={len(cliquePosts)}).  Remaining ratePairCounts: {len(raterPairCounts)}"
+            )
+            cliques.append((cliqueRaters, cliquePosts))
+          else:
+            logger.info(
+              f"Skipping clique  (raters={len(cliqueRaters)}, tweets={len(cliquePosts)}).  Remaining ratePairCounts: {len(raterPairCounts)}"
+            )
+    finally:
+      if executor is not None:
+        executor.shutdown()
     # Order from largest to smallest and return
     cliques.sort(key=lambda clique: len(clique[0]))
     return cliques
@@ -253,8 +399,8 @@ class QuasiCliqueDetection:
     posts and minium density of ratings connecting the raters and posts.
     """
     # Obtain quasi-cliques
-    raterPairCounts, raterPairRatings = self._get_pair_counts(ratings, notes, self._recencyCutoff)
-    quasiCliques = self._build_clusters(raterPairCounts, raterPairRatings)
+    raterPairCounts, incidence = self._get_pair_counts(ratings, notes, self._recencyCutoff)
+    quasiCliques = self._build_clusters(raterPairCounts, incidence)
     # Convert to data frame
     cliqueIds = []
     raterIds = []
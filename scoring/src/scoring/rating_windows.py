@@ -0,0 +1,114 @@
+# Std libraries
+from typing import Optional, Union
+
+# 3rd-party libraries
+import numpy as np
+import pandas as pd
+
+
+class RatingWindows:
+  """Counts of each note's ratings within time windows.
+
+  Ratings are sorted once by (note, creation time), so the ratings on each note form a
+  contiguous segment sorted by time and counting the ratings in a window is a binary search for
+  each edge of the window within the segment.  Searches for all notes run as a single
+  np.searchsorted over keys which combine the position of the note and the rating time.  When
+  the keys would overflow int64 (many notes and a very wide range of rating times), searches
+  lexsort the (note, time) pairs of the ratings and the window edges together instead.
+  """
+
+  def __init__(self, noteIds: pd.Series, ratingNoteIds: pd.Series, ratingMillis: pd.Series):
+    """
+    Args:
+      noteIds: unique noteIds to compute counts for.  Counts are returned in this order.
+      ratingNoteIds: noteId of each rating.  Ratings on notes not in noteIds are ignored.
+      ratingMillis: creation time of each rating
+    """
+    assert noteIds.is_unique, "noteIds must be unique"
+    self._numNotes = len(noteIds)
+    codes = pd.Index(noteIds).get_indexer(ratingNoteIds)
+    millis = ratingMillis.to_numpy(dtype=np.int64)[codes >= 0]
+    codes = codes[codes >= 0].astype(np.int64)
+    order = np.lexsort((millis, codes))
+    self._codes = codes[order]
+    self._millis = millis[order]
+    self.totals = np.bincount(self._codes, minlength=self._numNotes)
+    self.latestMillis = self._millis.max() if len(self._millis) else np.nan
+    self._ends = np.cumsum(self.totals)
+    self._starts = self._ends - self.totals
+    # Offset times by one from the earliest rating so window edges before the earliest rating
+    # clip to 0 and edges after the latest rating clip to _span - 1, keeping every note's keys
+    # in a disjoint range.
+    self._minMillis = self._millis.min() - 1 if len(self._millis) else 0
+    self._span = (self._millis.max() - self._minMillis + 2) if len(self._millis) else 1
+    self._keys: Optional[np.ndarray] = None
+    if self._numNotes * int(self._span) < np.iinfo(np.int64).max:
+      self._keys = self._codes * self._span + (self._millis - self._minMillis)
+
+  def _search(self, codes: np.ndarray, edgeMillis: np.ndarray, side: str) -> np.ndarray:
+    """Return the position of each (note code, edge time) within the sorted ratings.
+
+    Matches np.searchsorted with side over the ratings sorted by (note code, time).
+    """
+    if self._keys is None:
+      return self._search_pairs(codes, edgeMillis, side)
+    edges = np.clip(edgeMillis - self._minMillis, 0, self._span - 1)
+    return np.searchsorted(self._keys, codes * self._span + edges, side=side)
+
+  def _search_pairs(self, codes: np.ndarray, edgeMillis: np.ndarray, side: str) -> np.ndarray:
+    """_search without combined keys, for when they would overflow int64."""
+    numRatings = len(self._codes)
+    # Edges sort before ratings at the same time for side="left" and after them for "right".
+    edgeRank = 0 if side == "left" else 2
+    ranks = np.concatenate(
+      [np.ones(numRatings, dtype=np.int8), np.full(len(codes), edgeRank, dtype=np.int8)]
+    )
+    order = np.lexsort(
+      (
+        ranks,
+        np.concatenate([self._millis, edgeMillis]),
+        np.concatenate([self._codes, codes]),
+      )
+    )
+    # The position of an edge among the ratings is its position in the merged order less the
+    # number of edges before it.
+    edgePositions = np.flatnonzero(order >= numRatings)
+    positions = np.empty(len(codes), dtype=np.int64)
+    positions[order[edgePositions] - numRatings] = edgePositions - np.arange(len(codes))
+    return positions
+
+  def count_before(self, edgeMillis: Union[np.ndarray, pd.Series, float]) -> np.ndarray:
+    """Return the number of ratings on each note created strictly before edgeMillis."""
+    if len(self._codes) == 0:
+      return np.zeros(self._numNotes, dtype=np.int64)
+    # Ratings have integer timestamps, so t < edge iff t < ceil(edge).
+    edges = np.ceil(np.broadcast_to(np.asarray(edgeMillis, dtype=np.float64), self._numNotes))
+    codes = np.arange(self._numNotes, dtype=np.int64)
+    return self._search(codes, edges.astype(np.int64), "left") - self._starts
+
+  def count_after(self, edgeMillis: Union[np.ndarray, pd.Series, float]) -> np.ndarray:
+    """Return the number of ratings on each note created strictly after edgeMillis."""
+    if len(self._codes) == 0:
+      return np.zeros(self._numNotes, dtype=np.int64)
+    # Ratings have integer timestamps, so t > edge iff t > floor(edge).
+    edges = np.floor(np.broadcast_to(np.asarray(edgeMillis, dtype=np.float64), self._numNotes))
+    codes = np.arange(self._numNotes, dtype=np.int64)
+    return self._ends - self._search(codes, edges.astype(np.int64), "right")
+
+  def max_window_counts(self, widthMillis: int, alignMillis: int) -> np.ndarray:
+    """Return the most ratings on each note within any window of widthMillis.
+
+    Windows start at multiples of alignMillis.  The busiest window can always be shifted
+    forward until it starts at the aligned time just before one of its ratings without losing
+    any ratings, so only windows starting at the aligned time of each rating are counted.
+    """
+    counts = np.zeros(self._numNotes, dtype=np.int64)
+    if len(self._codes) == 0:
+      return counts
+    starts = (self._millis // alignMillis) * alignMillis
+    windowCounts = self._search(self._codes, starts + widthMillis, "left") - self._search(
+      self._codes, starts, "left"
+    )
+    rated = self.totals > 0
+    counts[rated] = np.maximum.reduceat(windowCounts, self._starts[rated])
+    return counts
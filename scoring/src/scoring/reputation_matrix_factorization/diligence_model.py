@@ -2,6 +2,7 @@ import logging
 from typing import Optional, Tuple
 
 from .. import constants as c
+from ..tag_mask import get_tag
 from .dataset import build_dataset
 from .reputation_matrix_factorization import (
   ReputationModelHyperparameters,
@@ -26,9 +27,9 @@ def _setup_dataset_and_hparams(
   # Define dataset
   targets = (
     (
-      filteredRatings[c.notHelpfulIncorrectTagKey]
-      + filteredRatings[c.notHelpfulIrrelevantSourcesTagKey]
-      + filteredRatings[c.notHelpfulSourcesMissingOrUnreliableTagKey]
+      get_tag(filteredRatings, c.notHelpfulIncorrectTagKey)
+      + get_tag(filteredRatings, c.notHelpfulIrrelevantSourcesTagKey)
+      + get_tag(filteredRatings, c.notHelpfulSourcesMissingOrUnreliableTagKey)
     )
     .clip(0, 1)
     .values
@@ -115,7 +115,12 @@ class ReputationScorer(Scorer):
     if self._seed is not None:
       logger.info(f"seeding with {self._seed}")
       torch.manual_seed(self._seed)
-    ratings = filter_ratings(ratings, self._minNumRatingsPerRater, self._minNumRatersPerNote)
+    ratings = filter_ratings(
+      ratings,
+      self._minNumRatingsPerRater,
+      self._minNumRatersPerNote,
+      ratingsIndex=self._ratingsIndex,
+    )
     # Calculate initialization factors if necessary
     noteParamsInit = None
     raterParamsInit = None
@@ -171,7 +176,12 @@ class ReputationScorer(Scorer):
     if self._seed is not None:
       logger.info(f"seeding with {self._seed}")
       torch.manual_seed(self._seed)
-    ratings = filter_ratings(ratings, self._minNumRatingsPerRater, self._minNumRatersPerNote)
+    ratings = filter_ratings(
+      ratings,
+      self._minNumRatingsPerRater,
+      self._minNumRatersPerNote,
+      ratingsIndex=self._ratingsIndex,
+    )
     if len(ratings) == 0:
       raise EmptyRatingException()
 
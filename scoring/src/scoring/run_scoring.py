@@ -6,19 +6,30 @@ intergrated into main files for execution in internal and external environments.
 """
 import concurrent.futures
 import copy
+import dataclasses
 import gc
 import io
 from itertools import chain
 import logging
+import mmap
 import multiprocessing
 from multiprocessing import shared_memory  # type: ignore
 import os
+import pickle
 import time
-from typing import Callable, Dict, List, Optional, Set, Tuple
-
-from . import constants as c, contributor_state, note_ratings, note_status_history, scoring_rules
-from .constants import FinalScoringArgs, ModelResult, PrescoringArgs, ScoringArgs
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from . import (
+  constants as c,
+  contributor_state,
+  note_ratings,
+  note_status_history,
+  profiling,
+  scoring_rules,
+)
+from .constants import FinalScoringArgs, ModelResult, PrescoringArgs, RatingsIndex, ScoringArgs
 from .enums import Scorers, Topics
+from .matrix_factorization.fused_trainer import FusedTrainer
 from .matrix_factorization.normalized_loss import NormalizedLossHyperparameters
 from .mf_core_scorer import MFCoreScorer
 from .mf_core_with_topics_scorer import MFCoreWithTopicsScorer
@@ -40,14 +51,31 @@ from .mf_multi_group_scorer import (
 )
 from .mf_topic_scorer import MFTopicScorer, coalesce_topic_models
 from .pandas_utils import get_df_fingerprint, get_df_info, keep_columns, patch_pandas
+from .pflip_feature_store import PFlipFeatureStore
 from .pflip_plus_model import LABEL as PFLIP_LABEL, PFlipPlusModel
 from .post_selection_similarity import PostSelectionSimilarity, apply_post_selection_similarity
-from .process_data import CommunityNotesDataLoader, filter_input_data_for_testing, preprocess_data
+from .process_data import (
+  CommunityNotesDataLoader,
+  decode_participant_ids,
+  encode_participant_ids,
+  filter_input_data_for_testing,
+  preprocess_data,
+)
 from .quasi_clique_detection import QuasiCliqueDetection
 from .reputation_scorer import ReputationScorer
 from .scorer import Scorer
+from .scorer_scheduler import (
+  ScheduledTask,
+  ScorerStats,
+  get_available_memory_bytes,
+  get_peak_memory_bytes,
+  next_task_within_memory_budget,
+  plan_schedule,
+)
 from .scoring_rules import RuleID
+from .tag_mask import log_tag_memory_report, pack_tags
 from .topic_model import TopicModel
+from .topic_model_cache import TopicModelCache
 
 import numpy as np
 import pandas as pd
@@ -62,12 +90,17 @@ def _get_scorers(
   seed: Optional[int],
   pseudoraters: Optional[bool],
   useStableInitialization: bool = True,
+  mfTrainingEngine: Optional[str] = None,
+  batchPseudoRaterScenarios: bool = False,
 ) -> Dict[Scorers, List[Scorer]]:
   """Instantiate all Scorer objects which should be used for note ranking.
 
   Args:
     seed (int, optional): if not None, base distinct seeds for the first and second MF rounds on this value
     pseudoraters (bool, optional): if True, compute optional pseudorater confidence intervals
+    mfTrainingEngine (str, optional): if set, training engine for the matrix factorization scorers
+    batchPseudoRaterScenarios (bool): if True, refit pseudorater scenarios in one batched
+      optimization
 
   Returns:
     Dict[Scorers, List[Scorer]] containing instantiated Scorer objects for note ranking.
@@ -75,17 +108,39 @@ def _get_scorers(
   scorers: Dict[Scorers, List[Scorer]] = dict()
   scorers[Scorers.MFCoreWithTopicsScorer] = [
     MFCoreWithTopicsScorer(
-      seed, pseudoraters, useStableInitialization=useStableInitialization, threads=12
+      seed,
+      pseudoraters,
+      useStableInitialization=useStableInitialization,
+      threads=12,
+      mfTrainingEngine=mfTrainingEngine,
+      batchPseudoRaterScenarios=batchPseudoRaterScenarios,
     )
   ]
   scorers[Scorers.MFCoreScorer] = [
-    MFCoreScorer(seed, pseudoraters, useStableInitialization=useStableInitialization, threads=12)
+    MFCoreScorer(
+      seed,
+      pseudoraters,
+      useStableInitialization=useStableInitialization,
+      threads=12,
+      mfTrainingEngine=mfTrainingEngine,
+      batchPseudoRaterScenarios=batchPseudoRaterScenarios,
+    )
   ]
   scorers[Scorers.MFExpansionScorer] = [
-    MFExpansionScorer(seed, useStableInitialization=useStableInitialization, threads=12)
+    MFExpansionScorer(
+      seed,
+      useStableInitialization=useStableInitialization,
+      threads=12,
+      mfTrainingEngine=mfTrainingEngine,
+    )
   ]
   scorers[Scorers.MFExpansionPlusScorer] = [
-    MFExpansionPlusScorer(seed, useStableInitialization=useStableInitialization, threads=12)
+    MFExpansionPlusScorer(
+      seed,
+      useStableInitialization=useStableInitialization,
+      threads=12,
+      mfTrainingEngine=mfTrainingEngine,
+    )
   ]
   scorers[Scorers.ReputationScorer] = [
     ReputationScorer(seed, useStableInitialization=useStableInitialization, threads=12)
@@ -95,7 +150,14 @@ def _get_scorers(
   scorers[Scorers.MFGroupScorer] = [
     # Scoring Group 13 is currently the largest by far, so total runtime benefits from
     # adding the group scorers in descending order so we start work on Group 13 first.
-    MFGroupScorer(includedGroups={i}, groupId=i, threads=groupScorerParalleism.get(i, 4), seed=seed)
+    # (With scorerStatsPath, _run_scheduled_units orders scorers by recorded runtime instead.)
+    MFGroupScorer(
+      includedGroups={i},
+      groupId=i,
+      threads=groupScorerParalleism.get(i, 4),
+      seed=seed,
+      mfTrainingEngine=mfTrainingEngine,
+    )
     for i in range(groupScorerCount, 0, -1)
     if i != trialScoringGroup
   ]
@@ -131,6 +193,7 @@ def _get_scorers(
       tagConsensusHarassmentHelpfulRatingPenalty=10,
       tagFilterPercentile=90,
       incorrectFilterThreshold=1.5,
+      mfTrainingEngine=mfTrainingEngine,
     )
   )
   scorers[Scorers.MFGroupScorer].append(
@@ -141,13 +204,21 @@ def _get_scorers(
       groupId=nmrScoringGroup,
       threads=groupScorerParalleism.get(nmrScoringGroup, 4),
       seed=seed,
+      mfTrainingEngine=mfTrainingEngine,
     )
   )
   scorers[Scorers.MFTopicScorer] = [
-    MFTopicScorer(topicName=topic.name, seed=seed) for topic in Topics
+    MFTopicScorer(topicName=topic.name, seed=seed, mfTrainingEngine=mfTrainingEngine)
+    for topic in Topics
   ]
   scorers[Scorers.MFMultiGroupScorer] = [
-    MFMultiGroupScorer(includedGroups={4, 5, 7, 12, 26}, groupId=1, threads=4, seed=seed),
+    MFMultiGroupScorer(
+      includedGroups={4, 5, 7, 12, 26},
+      groupId=1,
+      threads=4,
+      seed=seed,
+      mfTrainingEngine=mfTrainingEngine,
+    ),
   ]
 
   return scorers
@@ -236,27 +307,82 @@ def _load_data_with_data_loader_parallelizable(
 
 
 def _load_data_from_shared_memory_parallelizable(
-  scoringArgsSharedMemory: c.ScoringArgsSharedMemory, scoringArgs: ScoringArgs
+  scoringArgsSharedMemory: c.ScoringArgsSharedMemory,
+  scoringArgs: ScoringArgs,
+  scorerName: str = "",
 ) -> ScoringArgs:
   """
   Load data from shared memory into the scoringArgs object. This function is designed to be run
   in a multiprocessing pool.
+
+  Logs the number of bytes read from shared memory and the seconds spent loading each
+  DataFrame so the cost of each transport can be compared per worker.
   """
-  scoringArgs.noteTopics = get_df_from_shared_memory(scoringArgsSharedMemory.noteTopics)
-  scoringArgs.ratings = get_df_from_shared_memory(scoringArgsSharedMemory.ratings)
-  scoringArgs.noteStatusHistory = get_df_from_shared_memory(
-    scoringArgsSharedMemory.noteStatusHistory
+  loadStats: List[Tuple[str, int, float]] = []
+
+  def _load(name: str, sharedMemoryDfInfo: c.SharedMemoryDataframeInfo) -> pd.DataFrame:
+    start = time.perf_counter()
+    df = get_df_from_shared_memory(sharedMemoryDfInfo)
+    loadStats.append((name, sharedMemoryDfInfo.dataSize, time.perf_counter() - start))
+    return df
+
+  scoringArgs.noteTopics = _load("noteTopics", scoringArgsSharedMemory.noteTopics)
+  # Tags stay packed in the tagMask column; scorers read them through the tag_mask accessors.
+  scoringArgs.ratings = _load("ratings", scoringArgsSharedMemory.ratings)
+  scoringArgs.noteStatusHistory = _load(
+    "noteStatusHistory", scoringArgsSharedMemory.noteStatusHistory
   )
-  scoringArgs.userEnrollment = get_df_from_shared_memory(scoringArgsSharedMemory.userEnrollment)
+  scoringArgs.userEnrollment = _load("userEnrollment", scoringArgsSharedMemory.userEnrollment)
 
   if type(scoringArgs) == FinalScoringArgs:
     assert type(scoringArgsSharedMemory) == c.FinalScoringArgsSharedMemory
-    scoringArgs.prescoringNoteModelOutput = get_df_from_shared_memory(
-      scoringArgsSharedMemory.prescoringNoteModelOutput
+    scoringArgs.prescoringNoteModelOutput = _load(
+      "prescoringNoteModelOutput", scoringArgsSharedMemory.prescoringNoteModelOutput
     )
-    scoringArgs.prescoringRaterModelOutput = get_df_from_shared_memory(
-      scoringArgsSharedMemory.prescoringRaterModelOutput
+    scoringArgs.prescoringRaterModelOutput = _load(
+      "prescoringRaterModelOutput", scoringArgsSharedMemory.prescoringRaterModelOutput
     )
+  totalBytes = sum(size for (_, size, _) in loadStats)
+  totalSecs = sum(secs for (_, _, secs) in loadStats)
+  logger.info(
+    f"""{scorerName} loaded {totalBytes} bytes from shared memory in {totalSecs:.2f} secs ({scoringArgsSharedMemory.ratings.transport.value}).
+    Per DataFrame: (name, bytes, secs): {[(name, size, round(secs, 2)) for (name, size, secs) in loadStats]}"""
+  )
+  return scoringArgs
+
+
+def _load_data_parallelizable(
+  name: str,
+  scoringArgs: ScoringArgs,
+  dataLoader: Optional[CommunityNotesDataLoader] = None,
+  scoringArgsSharedMemory=None,
+) -> ScoringArgs:
+  """
+  Load input dataframes into a copy of scoringArgs in a worker process, preferably from shared
+  memory and otherwise (deprecated) with the dataLoader.
+  """
+  scoringArgs.remove_large_args_for_multiprocessing()  # Should be redundant
+  scoringArgs = copy.deepcopy(scoringArgs)
+
+  if scoringArgsSharedMemory is not None:
+    logger.info(
+      f"{name} run_scorer_parallelizable just started in parallel: loading data from shared memory."
+    )
+    scoringArgs = _load_data_from_shared_memory_parallelizable(
+      scoringArgsSharedMemory, scoringArgs, name
+    )
+    logger.info(f"{name} run_scorer_parallelizable just finished loading data from shared memory.")
+  elif dataLoader is not None:
+    logger.info(
+      f"{name} run_scorer_parallelizable just started in parallel: loading data with dataLoader."
+    )
+    scoringArgs = _load_data_with_data_loader_parallelizable(dataLoader, scoringArgs)
+  else:
+    raise ValueError("Must provide either scoringArgsSharedMemory or dataLoader to run parallel")
+  if profiling.is_enabled():
+    for argName, value in vars(scoringArgs).items():
+      if isinstance(value, pd.DataFrame):
+        profiling.record_frame(argName, value)
   return scoringArgs
 
 
@@ -308,28 +434,9 @@ def _run_scorer_parallelizable(
   # Load data if multiprocessing
   if runParallel:
     with c.time_block(f"{scorer.get_name()} run_scorer_parallelizable: Loading data"):
-      scoringArgs.remove_large_args_for_multiprocessing()  # Should be redundant
-      scoringArgs = copy.deepcopy(scoringArgs)
-
-      if scoringArgsSharedMemory is not None:
-        logger.info(
-          f"{scorer.get_name()} run_scorer_parallelizable just started in parallel: loading data from shared memory."
-        )
-        scoringArgs = _load_data_from_shared_memory_parallelizable(
-          scoringArgsSharedMemory, scoringArgs
-        )
-        logger.info(
-          f"{scorer.get_name()} run_scorer_parallelizable just finished loading data from shared memory."
-        )
-      elif dataLoader is not None:
-        logger.info(
-          f"{scorer.get_name()} run_scorer_parallelizable just started in parallel: loading data with dataLoader."
-        )
-        scoringArgs = _load_data_with_data_loader_parallelizable(dataLoader, scoringArgs)
-      else:
-        raise ValueError(
-          "Must provide either scoringArgsSharedMemory or dataLoader to run parallel"
-        )
+      scoringArgs = _load_data_parallelizable(
+        scorer.get_name(), scoringArgs, dataLoader, scoringArgsSharedMemory
+      )
 
   # Run scoring
   scorerStartTime = time.perf_counter()
@@ -344,21 +451,227 @@ def _run_scorer_parallelizable(
   return scoringResults, (scorerEndTime - scorerStartTime)
 
 
-def save_df_to_shared_memory(df: pd.DataFrame, shms: List) -> c.SharedMemoryDataframeInfo:
+# patch_pandas is needed since we're using 'forkserver' to create new process.
+@patch_pandas
+def _run_fused_scorers_in_parallel(
+  args,
+  scorers: List[Scorer],
+  scoringArgs: ScoringArgs,
+  dataLoader: Optional[CommunityNotesDataLoader] = None,
+  scoringArgsSharedMemory=None,
+) -> List[Tuple[ModelResult, float]]:
+  return _run_fused_scorers_parallelizable(
+    scorers, True, scoringArgs, dataLoader, scoringArgsSharedMemory
+  )
+
+
+def _run_fused_scorers_parallelizable(
+  scorers: List[Scorer],
+  runParallel: bool,
+  scoringArgs: ScoringArgs,
+  dataLoader: Optional[CommunityNotesDataLoader] = None,
+  scoringArgsSharedMemory=None,
+) -> List[Tuple[ModelResult, float]]:
+  """
+  Run scoring for several scorers in threads of a single process, training their matrix
+  factorization models together with a FusedTrainer.
+
+  Input dataframes are loaded once and shared by all scorers.  Fused models are trained with the
+  intra-op parallelism of the largest scorer instead of a separate pool of threads per scorer.
+  """
+  if runParallel:
+    with c.time_block(f"Fused scorers ({len(scorers)}) run_scorer_parallelizable: Loading data"):
+      scoringArgs = _load_data_parallelizable(
+        f"Fused scorers ({len(scorers)})", scoringArgs, dataLoader, scoringArgsSharedMemory
+      )
+
+  trainer = FusedTrainer(len(scorers), numThreads=max(scorer.get_threads() for scorer in scorers))
+
+  def _run_participant(index: int, scorer: Scorer) -> Tuple[ModelResult, float]:
+    with trainer.participant(index):
+      # Input dataframes are shared by all scorers, so they must be preserved.
+      return _run_scorer_parallelizable(scorer, False, scoringArgs)
+
+  with concurrent.futures.ThreadPoolExecutor(max_workers=len(scorers)) as executor:
+    futures = [
+      executor.submit(_run_participant, index, scorer) for (index, scorer) in enumerate(scorers)
+    ]
+    modelResultsAndTimes = [f.result() for f in futures]
+  logger.info(f"Fused fit reports: {trainer.fitReports}")
+  return modelResultsAndTimes
+
+
+# Alignment (in bytes) of each column buffer laid out by the columnar shared memory transport.
+_columnarBufferAlignment = 64
+# Directory holding the files backing POSIX shared memory objects on Linux.
+_posixSharedMemoryDir = "/dev/shm"
+
+
+def _align(offset: int) -> int:
+  return -(-offset // _columnarBufferAlignment) * _columnarBufferAlignment
+
+
+def _encode_columnar_values(
+  values: Union[pd.Series, pd.Index], buffers: List[np.ndarray]
+) -> Dict[str, Any]:
+  """Return a picklable spec describing values and append any raw buffers to buffers.
+
+  Numeric, boolean and datetime columns (including nullable masked arrays and the codes of
+  categoricals) are stored as raw buffers which workers can map without copying.  Any
+  remaining columns (e.g. object columns containing strings) are pickled.
+  """
+  dtype = values.dtype
+  if isinstance(dtype, np.dtype):
+    if dtype.kind in "biufmM":
+      buffers.append(np.ascontiguousarray(values.to_numpy()))
+      return {"kind": "numpy", "data": len(buffers) - 1}
+    values = values.to_numpy()
+  else:
+    values = values.array
+  if isinstance(values, (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)):
+    buffers.append(values.to_numpy(dtype=dtype.numpy_dtype, na_value=dtype.type(0)))
+    buffers.append(np.asarray(values.isna()))
+    return {"kind": "masked", "dtype": dtype, "data": len(buffers) - 2, "mask": len(buffers) - 1}
+  if isinstance(values, pd.Categorical):
+    buffers.append(np.ascontiguousarray(values.codes))
+    return {"kind": "categorical", "dtype": dtype, "codes": len(buffers) - 1}
+  buffers.append(np.frombuffer(pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL), np.uint8))
+  return {"kind": "pickle", "data": len(buffers) - 1}
+
+
+def _decode_columnar_values(spec: Dict[str, Any], arrays: List[np.ndarray]) -> Any:
+  """Inverse of _encode_columnar_values, wrapping mapped buffers without copying."""
+  if spec["kind"] == "numpy":
+    return arrays[spec["data"]]
+  if spec["kind"] == "masked":
+    data, mask = arrays[spec["data"]], arrays[spec["mask"]]
+    if isinstance(spec["dtype"], pd.BooleanDtype):
+      return pd.arrays.BooleanArray(data, mask)
+    if isinstance(spec["dtype"], (pd.Float32Dtype, pd.Float64Dtype)):
+      return pd.arrays.FloatingArray(data, mask)
+    return pd.arrays.IntegerArray(data, mask)
+  if spec["kind"] == "categorical":
+    return pd.Categorical.from_codes(arrays[spec["codes"]], dtype=spec["dtype"])
+  assert spec["kind"] == "pickle", f"unexpected column spec: {spec['kind']}"
+  return pickle.loads(arrays[spec["data"]])
+
+
+def _save_df_to_shared_memory_columnar(df: pd.DataFrame) -> shared_memory.SharedMemory:
+  """Lay out df as a pickled header followed by one aligned raw buffer per column.
+
+  The segment starts with the header length (8 bytes), followed by the pickled header
+  describing each column and the offsets of the column buffers relative to the data region.
+  """
+  buffers: List[np.ndarray] = []
+  if isinstance(df.index, pd.RangeIndex):
+    indexSpec = {
+      "kind": "range",
+      "start": df.index.start,
+      "stop": df.index.stop,
+      "step": df.index.step,
+    }
+  else:
+    indexSpec = _encode_columnar_values(df.index, buffers)
+  columnSpecs = [
+    (column, _encode_columnar_values(df.iloc[:, i], buffers))
+    for i, column in enumerate(df.columns)
+  ]
+  bufferSpecs = []
+  dataSize = 0
+  for buffer in buffers:
+    dataSize = _align(dataSize)
+    bufferSpecs.append((dataSize, buffer.dtype, len(buffer)))
+    dataSize += buffer.nbytes
+  header = pickle.dumps(
+    {
+      "index": indexSpec,
+      "indexName": df.index.name,
+      "columns": columnSpecs,
+      "buffers": bufferSpecs,
+    },
+    protocol=pickle.HIGHEST_PROTOCOL,
+  )
+  dataStart = _align(8 + len(header))
+  shm = shared_memory.SharedMemory(create=True, size=max(dataStart + dataSize, 1))
+  shm.buf[:8] = len(header).to_bytes(8, "little")
+  shm.buf[8 : 8 + len(header)] = header
+  for buffer, (offset, _, _) in zip(buffers, bufferSpecs):
+    start = dataStart + offset
+    shm.buf[start : start + buffer.nbytes] = buffer.view(np.uint8).reshape(-1)
+  return shm
+
+
+def _get_df_from_shared_memory_columnar(
+  sharedMemoryDfInfo: c.SharedMemoryDataframeInfo,
+) -> pd.DataFrame:
+  """Map a DataFrame written by _save_df_to_shared_memory_columnar.
+
+  The segment is mapped copy-on-write, so column arrays reference the shared pages directly
+  and remain writable: any in-place update made by a scorer only copies the touched pages
+  into the worker and is never visible to other workers.
+  """
+  # SharedMemory.buf is a shared mapping, so writes through it would reach other workers.
+  # Instead, open the file backing the POSIX shared memory object and map it privately.
+  fd = os.open(
+    os.path.join(_posixSharedMemoryDir, sharedMemoryDfInfo.sharedMemoryName.lstrip("/")),
+    os.O_RDONLY,
+  )
+  try:
+    mapped = mmap.mmap(fd, sharedMemoryDfInfo.dataSize, access=mmap.ACCESS_COPY)
+  finally:
+    os.close(fd)
+  headerSize = int.from_bytes(mapped[:8], "little")
+  header = pickle.loads(mapped[8 : 8 + headerSize])
+  dataStart = _align(8 + headerSize)
+  arrays = [
+    np.frombuffer(mapped, dtype=dtype, count=count, offset=dataStart + offset)
+    for (offset, dtype, count) in header["buffers"]
+  ]
+  if header["index"]["kind"] == "range":
+    index = pd.RangeIndex(
+      header["index"]["start"],
+      header["index"]["stop"],
+      header["index"]["step"],
+      name=header["indexName"],
+    )
+  else:
+    index = pd.Index(
+      _decode_columnar_values(header["index"], arrays), name=header["indexName"], copy=False
+    )
+  columns = [column for (column, _) in header["columns"]]
+  df = pd.DataFrame(
+    {i: _decode_columnar_values(spec, arrays) for i, (_, spec) in enumerate(header["columns"])},
+    index=index,
+    copy=False,
+  )
+  df.columns = pd.Index(columns)
+  return df
+
+
+def save_df_to_shared_memory(
+  df: pd.DataFrame,
+  shms: List,
+  transport: c.SharedMemoryTransport = c.SharedMemoryTransport.PARQUET,
+) -> c.SharedMemoryDataframeInfo:
   """
   Intended to be called before beginning multiprocessing: saves the df to shared memory
   and returns the info needed to access it, as well as appends it to the list of shared memory objects
   so it's not garbage collected and can be closed later.
   """
-  with io.BytesIO() as buf:
-    df.to_parquet(buf, compression="gzip", engine="pyarrow")
-    size = len(buf.getvalue())
-    shm = shared_memory.SharedMemory(create=True, size=size)
-    shm.buf[:size] = buf.getvalue()
+  if transport == c.SharedMemoryTransport.COLUMNAR:
+    shm = _save_df_to_shared_memory_columnar(df)
+    size = shm.size
+  else:
+    with io.BytesIO() as buf:
+      df.to_parquet(buf, compression="gzip", engine="pyarrow")
+      size = len(buf.getvalue())
+      shm = shared_memory.SharedMemory(create=True, size=size)
+      shm.buf[:size] = buf.getvalue()
   shms.append(shm)  # save the shared memory object so we can close it later
   return c.SharedMemoryDataframeInfo(
     sharedMemoryName=shm.name,
     dataSize=size,
+    transport=transport,
   )
 
 
@@ -369,6 +682,8 @@ def get_df_from_shared_memory(
   Intended to be called from a process within a multiprocessing pool in parallel.
   Read a dataframe from shared memory and return it.
   """
+  if sharedMemoryDfInfo.transport == c.SharedMemoryTransport.COLUMNAR:
+    return _get_df_from_shared_memory_columnar(sharedMemoryDfInfo)
   existing_shm = shared_memory.SharedMemory(name=sharedMemoryDfInfo.sharedMemoryName)
   size = sharedMemoryDfInfo.dataSize
   with io.BytesIO(existing_shm.buf[:size]) as buf:
@@ -377,18 +692,21 @@ def get_df_from_shared_memory(
 
 def _save_dfs_to_shared_memory(
   scoringArgs: ScoringArgs,
+  transport: c.SharedMemoryTransport = c.SharedMemoryTransport.PARQUET,
 ) -> Tuple[List[shared_memory.SharedMemory], c.ScoringArgsSharedMemory]:
   """
   Save large dfs to shared memory. Called before beginning multiprocessing.
   """
   shms: List[shared_memory.SharedMemory] = []
-  noteTopics = save_df_to_shared_memory(scoringArgs.noteTopics, shms)
+  noteTopics = save_df_to_shared_memory(scoringArgs.noteTopics, shms, transport)
   # Order ratings by highVolumeRaterKey so that later we can split ratings
   # to remove ratings from high volume users without having to make a copy.
   sortedRatings = scoringArgs.ratings.sort_values(
     [c.highVolumeRaterKey, c.correlatedRaterKey], ascending=True
   )
-  ratings = save_df_to_shared_memory(
+  # Tags are shared packed into one mask column, which scorers read without unpacking (see
+  # tag_mask.py).
+  sharedRatings = pack_tags(
     keep_columns(
       sortedRatings,
       [
@@ -402,18 +720,19 @@ def _save_dfs_to_shared_memory(
       ]
       + c.notHelpfulTagsTSVOrder
       + c.helpfulTagsTSVOrder,
-    ),
-    shms,
+    )
   )
-  noteStatusHistory = save_df_to_shared_memory(scoringArgs.noteStatusHistory, shms)
-  userEnrollment = save_df_to_shared_memory(scoringArgs.userEnrollment, shms)
+  log_tag_memory_report(sharedRatings)
+  ratings = save_df_to_shared_memory(sharedRatings, shms, transport)
+  noteStatusHistory = save_df_to_shared_memory(scoringArgs.noteStatusHistory, shms, transport)
+  userEnrollment = save_df_to_shared_memory(scoringArgs.userEnrollment, shms, transport)
 
   if type(scoringArgs) == FinalScoringArgs:
     prescoringNoteModelOutput = save_df_to_shared_memory(
-      scoringArgs.prescoringNoteModelOutput, shms
+      scoringArgs.prescoringNoteModelOutput, shms, transport
     )
     prescoringRaterModelOutput = save_df_to_shared_memory(
-      scoringArgs.prescoringRaterModelOutput, shms
+      scoringArgs.prescoringRaterModelOutput, shms, transport
     )
     return shms, c.FinalScoringArgsSharedMemory(
       noteTopics,
@@ -429,6 +748,145 @@ def _save_dfs_to_shared_memory(
     )
 
 
+def _submit_scorer_unit(
+  executor: concurrent.futures.Executor,
+  args,
+  unitScorers: List[Scorer],
+  scoringArgs: ScoringArgs,
+  dataLoader: Optional[CommunityNotesDataLoader],
+  scoringArgsSharedMemory,
+  measureCost: bool = False,
+) -> concurrent.futures.Future:
+  """Submit a unit of scorers which runs in one worker process.
+
+  A unit of several scorers is run with _run_fused_scorers_in_parallel.  If measureCost, the
+  future's result also includes the unit's runtime and peak memory.  If profiling is enabled, the
+  unit is profiled in the worker and the future's result must be passed to
+  profiling.unwrap_result.
+  """
+  kwargs: Dict[str, Any] = dict(
+    args=args,
+    scoringArgs=copy.deepcopy(scoringArgs),
+    dataLoader=dataLoader,
+    scoringArgsSharedMemory=copy.deepcopy(scoringArgsSharedMemory),
+  )
+  if len(unitScorers) > 1:
+    runUnit: Callable = _run_fused_scorers_in_parallel
+    kwargs["scorers"] = unitScorers
+    unitName = f"Fused scorers ({len(unitScorers)})"
+  else:
+    runUnit = _run_scorer_in_parallel
+    kwargs["scorer"] = unitScorers[0]
+    unitName = unitScorers[0].get_name()
+  runArgs: List[Any] = [runUnit]
+  if measureCost:
+    runArgs = [_run_unit_and_measure_cost] + runArgs
+  profile = profiling.get_profile()
+  if profile is not None:
+    runArgs = [
+      profiling.run_profiled,
+      f"{type(scoringArgs).__name__} worker: {unitName}",
+      profile.samplingIntervalSeconds,
+    ] + runArgs
+  return executor.submit(*runArgs, **kwargs)
+
+
+def _run_unit_and_measure_cost(runUnit: Callable, **kwargs) -> Tuple[Any, float, int]:
+  """Run a unit of scorers in a fresh worker process, also returning its runtime and peak memory.
+
+  The shared memory segments holding the scoring inputs are counted once for all workers (they
+  are part of the memory in use when the budget is measured), so they are excluded from the
+  peak memory of each unit.
+  """
+  startTime = time.perf_counter()
+  unitResult = runUnit(**kwargs)
+  sharedMemoryBytes = sum(
+    info.dataSize
+    for info in vars(kwargs["scoringArgsSharedMemory"]).values()
+    if isinstance(info, c.SharedMemoryDataframeInfo)
+  )
+  return (
+    unitResult,
+    time.perf_counter() - startTime,
+    get_peak_memory_bytes(sharedMemoryBytes),
+  )
+
+
+def _run_scheduled_units(
+  executor: concurrent.futures.Executor,
+  args,
+  scorers: List[Scorer],
+  units: List[List[int]],
+  scoringArgs: ScoringArgs,
+  dataLoader: Optional[CommunityNotesDataLoader],
+  scoringArgsSharedMemory,
+  scorerStats: ScorerStats,
+  maxWorkers: Optional[int] = None,
+  memoryBudgetBytes: Optional[int] = None,
+) -> List[Any]:
+  """Run units of scorers longest-job-first within the cores and memory of this machine.
+
+  The runtime and peak memory of each unit are recorded in scorerStats for the next run.  Each
+  unit must run in a fresh worker process so that its peak memory can be measured.
+
+  Returns:
+    List[Any]: result of each unit, in the order of units
+  """
+  phase = type(scoringArgs).__name__
+  unitNames = [
+    f"{phase}/{scorers[unit[0]].get_name() if len(unit) == 1 else 'FusedGroupScorers'}"
+    for unit in units
+  ]
+  schedule = plan_schedule(
+    unitNames,
+    [max(scorers[i].get_threads() for i in unit) for unit in units],
+    scorerStats,
+    maxWorkers,
+  )
+  for task in schedule:
+    for i in units[task.index]:
+      scorers[i].set_threads(min(scorers[i].get_threads(), task.threads))
+  if memoryBudgetBytes is None:
+    memoryBudgetBytes = get_available_memory_bytes()
+  logger.info(
+    f"""Scorer schedule with memory budget {memoryBudgetBytes} bytes: (name, threads, expected cost):
+    {[(task.name, task.threads, task.expectedCost) for task in schedule]}"""
+  )
+
+  numWorkers = maxWorkers or os.cpu_count() or 1
+  pending = list(schedule)
+  running: Dict[concurrent.futures.Future, ScheduledTask] = {}
+  unitResults: List[Any] = [None] * len(units)
+  while pending or running:
+    while pending and len(running) < numWorkers:
+      task = next_task_within_memory_budget(pending, list(running.values()), memoryBudgetBytes)
+      if task is None:
+        break
+      pending.remove(task)
+      future = _submit_scorer_unit(
+        executor,
+        args,
+        [scorers[i] for i in units[task.index]],
+        scoringArgs,
+        dataLoader,
+        scoringArgsSharedMemory,
+        measureCost=True,
+      )
+      running[future] = task
+    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+    for future in done:
+      task = running.pop(future)
+      unitResult, seconds, peakMemoryBytes = profiling.unwrap_result(future.result())
+      unitResults[task.index] = unitResult
+      scorerStats.record(task.name, seconds, peakMemoryBytes)
+      logger.info(
+        f"{task.name} finished in {seconds:.2f} secs with peak memory {peakMemoryBytes} bytes "
+        f"(expected: {task.expectedCost})"
+      )
+  scorerStats.save()
+  return unitResults
+
+
 def _run_scorers(
   args,
   scorers: List[Scorer],
@@ -436,6 +894,10 @@ def _run_scorers(
   runParallel: bool = True,
   maxWorkers: Optional[int] = None,
   dataLoader: Optional[CommunityNotesDataLoader] = None,
+  sharedMemoryTransport: c.SharedMemoryTransport = c.SharedMemoryTransport.PARQUET,
+  fuseGroupScorers: bool = False,
+  scorerStatsPath: Optional[str] = None,
+  scorerMemoryBudgetBytes: Optional[int] = None,
 ) -> List[ModelResult]:
   """Applies all Community Notes models to user ratings and returns merged result.
 
@@ -450,6 +912,14 @@ def _run_scorers(
     ratings (pd.DataFrame): Complete DF containing all ratings after preprocessing.
     noteStatusHistory (pd.DataFrame): one row per note; history of when note had each status
     userEnrollment (pd.DataFrame): The enrollment state for each contributor
+    sharedMemoryTransport: format used to share large DataFrames with worker processes
+    fuseGroupScorers: if True, run all MFGroupScorers in one process and train their matrix
+      factorization models together (see FusedTrainer).
+    scorerStatsPath: if set and running in parallel, schedule scorers by the runtime and peak
+      memory recorded in this JSON file by previous runs, and record them for the next run.
+    scorerMemoryBudgetBytes: memory available to concurrently running scorers when scheduling
+      with scorerStatsPath, not counting the shared memory holding scoring inputs.  Defaults to
+      the memory available when scorers are submitted.
 
   Returns:
     List[ModelResult]
@@ -457,29 +927,64 @@ def _run_scorers(
   # Apply scoring algorithms
   overallStartTime = time.perf_counter()
 
+  # Each unit lists the indices of scorers which run together in one process.  Fused group
+  # scorers form a single unit at the position of the first group scorer.
+  units: List[List[int]] = []
+  fusedUnit: List[int] = []
+  for i, scorer in enumerate(scorers):
+    if fuseGroupScorers and isinstance(scorer, MFGroupScorer):
+      if not fusedUnit:
+        units.append(fusedUnit)
+      fusedUnit.append(i)
+    else:
+      units.append([i])
+
   if runParallel:
-    shms, scoringArgsSharedMemory = _save_dfs_to_shared_memory(scoringArgs)
+    with c.time_block(f"Saving dfs to shared memory ({sharedMemoryTransport.value})"):
+      shms, scoringArgsSharedMemory = _save_dfs_to_shared_memory(
+        scoringArgs, sharedMemoryTransport
+      )
+      logger.info(
+        f"Shared memory segments total {sum(shm.size for shm in shms)} bytes across {len(shms)} segments."
+      )
 
+    scorerStats = ScorerStats(scorerStatsPath) if scorerStatsPath is not None else None
     with concurrent.futures.ProcessPoolExecutor(
       mp_context=multiprocessing.get_context("forkserver"),
       max_workers=maxWorkers,
+      # Scheduling needs each scorer's peak memory, which is only observable in a fresh process.
+      max_tasks_per_child=1 if scorerStats is not None else None,
     ) as executor:
       logger.info(f"Starting parallel scorer execution with {len(scorers)} scorers.")
       # Pass mostly-empty scoringArgs: the data is too large to be copied in-memory to
       # each process, so must be re-loaded from disk by every scorer's dataLoader.
       scoringArgs.remove_large_args_for_multiprocessing()
-      futures = [
-        executor.submit(
-          _run_scorer_in_parallel,
-          args=args,
-          scorer=scorer,
-          scoringArgs=copy.deepcopy(scoringArgs),
-          dataLoader=dataLoader,
-          scoringArgsSharedMemory=copy.deepcopy(scoringArgsSharedMemory),
+      if scorerStats is not None:
+        unitResults = _run_scheduled_units(
+          executor,
+          args,
+          scorers,
+          units,
+          scoringArgs,
+          dataLoader,
+          scoringArgsSharedMemory,
+          scorerStats,
+          maxWorkers,
+          scorerMemoryBudgetBytes,
         )
-        for scorer in scorers
-      ]
-      modelResultsAndTimes = [f.result() for f in futures]
+      else:
+        futures = [
+          _submit_scorer_unit(
+            executor,
+            args,
+            [scorers[i] for i in unit],
+            scoringArgs,
+            dataLoader,
+            scoringArgsSharedMemory,
+          )
+          for unit in units
+        ]
+        unitResults = [profiling.unwrap_result(f.result()) for f in futures]
       logger.info("Got model results from all scorers.")
 
       for i, shm in enumerate(shms):
@@ -494,14 +999,18 @@ def _run_scorers(
     scoringArgs.ratings = scoringArgs.ratings.sort_values(
       [c.highVolumeRaterKey, c.correlatedRaterKey], ascending=True
     )
-    modelResultsAndTimes = [
-      _run_scorer_in_series(
-        scorer=scorer,
-        scoringArgs=scoringArgs,
-      )
-      for scorer in scorers
+    unitResults = [
+      _run_fused_scorers_parallelizable([scorers[i] for i in unit], False, scoringArgs)
+      if len(unit) > 1
+      else _run_scorer_in_series(scorer=scorers[unit[0]], scoringArgs=scoringArgs)
+      for unit in units
     ]
 
+  # Restore the order of scorers.
+  modelResultsAndTimes: List[Tuple[ModelResult, float]] = [None] * len(scorers)  # type: ignore
+  for unit, results in zip(units, unitResults):
+    for i, result in zip(unit, results if len(unit) > 1 else [results]):
+      modelResultsAndTimes[i] = result
   modelResultsTuple, scorerTimesTuple = zip(*modelResultsAndTimes)
 
   overallTime = time.perf_counter() - overallStartTime
@@ -1135,14 +1644,16 @@ def _validate_contributor_scoring_output(
   return helpfulnessScores
 
 
-def run_rater_clustering(notes: pd.DataFrame, ratings: pd.DataFrame) -> pd.DataFrame:
+def run_rater_clustering(
+  notes: pd.DataFrame, ratings: pd.DataFrame, quasiCliqueWorkers: int = 1
+) -> pd.DataFrame:
   with c.time_block("Compute Post Selection Similarity"):
     pss = PostSelectionSimilarity(notes, ratings)
     postSelectionSimilarityValues = pss.get_post_selection_similarity_values()
     del pss
     gc.collect()
   with c.time_block("Compute Quasi-Cliques"):
-    qcd = QuasiCliqueDetection()
+    qcd = QuasiCliqueDetection(numWorkers=quasiCliqueWorkers)
     quasiCliques = qcd.get_quasi_cliques(notes, ratings)
     del qcd
     gc.collect()
@@ -1166,6 +1677,15 @@ def run_prescoring(
   checkFlips: bool = True,
   enableNmrDueToMinStableCrhTime: bool = True,
   previousRatingCutoffTimestampMillis: Optional[int] = None,
+  sharedMemoryTransport: c.SharedMemoryTransport = c.SharedMemoryTransport.PARQUET,
+  fuseGroupScorers: bool = False,
+  scorerStatsPath: Optional[str] = None,
+  scorerMemoryBudgetBytes: Optional[int] = None,
+  topicModelWorkers: int = 1,
+  topicModelCache: Optional[TopicModelCache] = None,
+  pflipFeatureWorkers: int = 1,
+  warmStart: Optional[c.PrescoringWarmStart] = None,
+  mfTrainingEngine: Optional[str] = None,
 ) -> Tuple[
   pd.DataFrame,
   pd.DataFrame,
@@ -1183,17 +1703,18 @@ def run_prescoring(
     logger.info(get_df_info(noteStatusHistory, "noteStatusHistory"))
     logger.info(get_df_info(userEnrollment, "userEnrollment"))
   with c.time_block("Note Topic Assignment"):
-    topicModel = TopicModel()
+    topicModel = TopicModel(numWorkers=topicModelWorkers)
     (
       noteTopicClassifierPipe,
       seedLabels,
       conflictedTexts,
-    ) = topicModel.train_note_topic_classifier(notes)
+    ) = topicModel.train_note_topic_classifier(notes, topicModelCache)
     noteTopics = topicModel.get_note_topics(
       notes,
       [noteTopicClassifierPipe],
       [seedLabels],
       conflictedTextSetsForAccuracyEval=[conflictedTexts],
+      cache=topicModelCache,
     )
 
   logger.info(
@@ -1211,32 +1732,35 @@ def run_prescoring(
     seed=seed,
     pseudoraters=False,
     useStableInitialization=useStableInitialization,
+    mfTrainingEngine=mfTrainingEngine,
   )
 
-  # Attempt to convert IDs to Int64 before prescoring.  We expect this to succeed in production,
-  # fail when running on public data and fail in some unit tests.
-  conversion = False
-  try:
-    # Complete all three conversions before doing any updates, so if there are any errors the
-    # updates don't happen.
-    ratingIds = ratings[c.raterParticipantIdKey].astype(pd.Int64Dtype())
-    noteStatusHistoryIds = noteStatusHistory[c.noteAuthorParticipantIdKey].astype(pd.Int64Dtype())
-    userEnrollmentIds = userEnrollment[c.participantIdKey].astype(pd.Int64Dtype())
-    ratings[c.raterParticipantIdKey] = ratingIds
-    noteStatusHistory[c.noteAuthorParticipantIdKey] = noteStatusHistoryIds
-    userEnrollment[c.participantIdKey] = userEnrollmentIds
-    del ratingIds, noteStatusHistoryIds, userEnrollmentIds
-    logger.info(
-      "User IDs for ratings, noteStatusHistory and userEnrollment converted to Int64Dtype."
+  # Dictionary-encode participant IDs as dense int32 codes for the duration of prescoring, so
+  # scorers join and group on integers instead of hashing strings.
+  participantIdColumns = [
+    ("ratings", ratings, c.raterParticipantIdKey),
+    ("noteStatusHistory", noteStatusHistory, c.noteAuthorParticipantIdKey),
+    ("userEnrollment", userEnrollment, c.participantIdKey),
+  ]
+  participantIdEncoding = encode_participant_ids(participantIdColumns)
+  if warmStart is not None:
+    # Previous rater parameters are keyed by participant ID, so encode them the same way.  Raters
+    # which no longer appear in the inputs are dropped.
+    warmStartRaters = warmStart.raterModelOutput
+    warmStartRaters = warmStartRaters[
+      warmStartRaters[c.raterParticipantIdKey].isin(participantIdEncoding.ids)
+    ].copy()
+    warmStartRaters[c.raterParticipantIdKey] = participantIdEncoding.encode(
+      warmStartRaters[c.raterParticipantIdKey]
     )
-    conversion = True
-  except ValueError as e:
-    logger.info(f"Error converting user IDs to ints.  IDs will remain as strings. {repr(e)}")
+    warmStart = dataclasses.replace(warmStart, raterModelOutput=warmStartRaters)
   with c.time_block("Logging Prescoring Inputs RAM usage before _run_scorers"):
     logger.info(get_df_info(notes, "notes"))
     logger.info(get_df_info(ratings, "ratings"))
     logger.info(get_df_info(noteStatusHistory, "noteStatusHistory"))
     logger.info(get_df_info(userEnrollment, "userEnrollment"))
+  with c.time_block("Build ratings index"):
+    ratingsIndex = RatingsIndex.from_ratings(ratings)
   prescoringModelResultsFromAllScorers = _run_scorers(
     args,
     scorers=list(chain(*scorers.values())),
@@ -1245,6 +1769,8 @@ def run_prescoring(
       ratings=ratings,
       noteStatusHistory=noteStatusHistory,
       userEnrollment=userEnrollment,
+      ratingsIndex=ratingsIndex,
+      warmStart=warmStart,
     ),
     runParallel=runParallel,
     dataLoader=dataLoader,
@@ -1252,6 +1778,10 @@ def run_prescoring(
     # processes and 6 is enough that the limiting factor continues to be the longest running
     # scorer (i.e. we would not finish faster with >6 worker processes.)
     maxWorkers=6,
+    sharedMemoryTransport=sharedMemoryTransport,
+    fuseGroupScorers=fuseGroupScorers,
+    scorerStatsPath=scorerStatsPath,
+    scorerMemoryBudgetBytes=scorerMemoryBudgetBytes,
   )
   (
     prescoringNoteModelOutput,
@@ -1269,19 +1799,13 @@ def run_prescoring(
     logger.info(get_df_info(userEnrollment, "userEnrollment"))
     logger.info(get_df_info(prescoringNoteModelOutput, "prescoringNoteModelOutput"))
     logger.info(get_df_info(prescoringRaterModelOutput, "prescoringRaterModelOutput"))
-  # Restore IDs as string objects now that prescoring is over and memory pressure is relaxed.
-  if conversion:
-    logger.info("Restoring string IDs.")
-    ratings[c.raterParticipantIdKey] = ratings[c.raterParticipantIdKey].astype(str)
-    noteStatusHistory[c.noteAuthorParticipantIdKey] = noteStatusHistory[
-      c.noteAuthorParticipantIdKey
-    ].astype(str)
-    userEnrollment[c.participantIdKey] = userEnrollment[c.participantIdKey].astype(str)
-    # Notice that we also do conversion on the prescoring results.
-    prescoringRaterModelOutput[c.raterParticipantIdKey] = prescoringRaterModelOutput[
-      c.raterParticipantIdKey
-    ].astype(str)
-    logger.info("Restoration of original string IDs complete.")
+  # Restore the original IDs now that prescoring is over and memory pressure is relaxed.
+  decode_participant_ids(
+    participantIdEncoding,
+    participantIdColumns
+    + [("prescoringRaterModelOutput", prescoringRaterModelOutput, c.raterParticipantIdKey)],
+  )
+  del participantIdEncoding, participantIdColumns
 
   with c.time_block("Logging Prescoring Results RAM usage (after conversion)"):
     logger.info(get_df_info(notes, "notes"))
@@ -1301,7 +1825,7 @@ def run_prescoring(
     logger.info(get_df_info(prescoringRaterModelOutput, "prescoringRaterModelOutput"))
 
   with c.time_block("Fitting pflip model"):
-    pflipPlusModel = PFlipPlusModel(seed=seed)
+    pflipPlusModel = PFlipPlusModel(seed=seed, numFeatureWorkers=pflipFeatureWorkers)
     pflipPlusModel.fit(notes, ratings, noteStatusHistory, prescoringRaterModelOutput)
 
   # Prescoring itself is now done. We will not run final_note_scoring to check note status flips.
@@ -1335,6 +1859,7 @@ def run_prescoring(
       checkFlips=checkFlips,
       enableNmrDueToMinStableCrhTime=enableNmrDueToMinStableCrhTime,
       previousRatingCutoffTimestampMillis=previousRatingCutoffTimestampMillis,
+      sharedMemoryTransport=sharedMemoryTransport,
     )
   else:
     scoredNotes = None
@@ -1599,6 +2124,15 @@ def run_final_note_scoring(
   previousAuxiliaryNoteInfo: Optional[pd.DataFrame] = None,
   previousRatingCutoffTimestampMillis: Optional[int] = 0,
   enableNmrDueToMinStableCrhTime: bool = True,
+  sharedMemoryTransport: c.SharedMemoryTransport = c.SharedMemoryTransport.PARQUET,
+  fuseGroupScorers: bool = False,
+  scorerStatsPath: Optional[str] = None,
+  scorerMemoryBudgetBytes: Optional[int] = None,
+  topicModelWorkers: int = 1,
+  topicModelCache: Optional[TopicModelCache] = None,
+  pflipFeatureStore: Optional[PFlipFeatureStore] = None,
+  mfTrainingEngine: Optional[str] = None,
+  batchPseudoRaterScenarios: bool = False,
 ):
   metrics = {}
   with c.time_block("Logging Final Scoring RAM usage"):
@@ -1646,7 +2180,11 @@ def run_final_note_scoring(
     )
     # Compute pflip scores
     pflipPredictions = pflipClassifier.predict(
-      pflipNotes, pflipRatings, pflipNoteStatusHistory, prescoringRaterModelOutput
+      pflipNotes,
+      pflipRatings,
+      pflipNoteStatusHistory,
+      prescoringRaterModelOutput,
+      featureStore=pflipFeatureStore,
     )
     logger.info(f"pflip prediction summary:\n{pflipPredictions[PFLIP_LABEL].value_counts()}")
 
@@ -1744,8 +2282,10 @@ def run_final_note_scoring(
     # np.int64 is necessary since datatypes can be inconsistent in unit tests.
     scoredTweets = set(notes[c.tweetIdKey].astype(np.int64))
     notesFull = notesFull[notesFull[c.tweetIdKey].astype(np.int64).isin(scoredTweets)]
-    topicModel = TopicModel()
-    noteTopics = topicModel.get_note_topics(notesFull, noteTopicClassifiers=[noteTopicClassifier])
+    topicModel = TopicModel(numWorkers=topicModelWorkers)
+    noteTopics = topicModel.get_note_topics(
+      notesFull, noteTopicClassifiers=[noteTopicClassifier], cache=topicModelCache
+    )
 
   with c.time_block("Post Selection Similarity: Final Scoring"):
     logger.info(f"Post Selection Similarity Final Scoring: begin with {len(ratings)} ratings.")
@@ -1758,7 +2298,13 @@ def run_final_note_scoring(
     )
     logger.info(f"Post Selection Similarity Final Scoring: {len(ratings)} ratings remaining.")
 
-  scorers = _get_scorers(seed, pseudoraters, useStableInitialization=useStableInitialization)
+  scorers = _get_scorers(
+    seed,
+    pseudoraters,
+    useStableInitialization=useStableInitialization,
+    mfTrainingEngine=mfTrainingEngine,
+    batchPseudoRaterScenarios=batchPseudoRaterScenarios,
+  )
 
   # Restrict parallelism to 6 processes.  Memory usage scales linearly with the number of
   # processes and 6 is enough that the limiting factor continues to be the longest running
@@ -1766,6 +2312,16 @@ def run_final_note_scoring(
   # system tests run with full scale data and previousScoredNotes=None.
   maxWorkers = 4 if previousScoredNotes is None else 6
   logger.info(f"Number of concurrent scoring workers: {maxWorkers}")
+  # Dictionary-encode participant IDs as dense int32 codes while the scorers run.
+  participantIdColumns = [
+    ("ratings", ratings, c.raterParticipantIdKey),
+    ("noteStatusHistory", noteStatusHistory, c.noteAuthorParticipantIdKey),
+    ("userEnrollment", userEnrollment, c.participantIdKey),
+    ("prescoringRaterModelOutput", prescoringRaterModelOutput, c.raterParticipantIdKey),
+  ]
+  participantIdEncoding = encode_participant_ids(participantIdColumns)
+  with c.time_block("Build ratings index"):
+    ratingsIndex = RatingsIndex.from_ratings(ratings)
   modelResults = _run_scorers(
     args,
     scorers=list(chain(*scorers.values())),
@@ -1777,11 +2333,18 @@ def run_final_note_scoring(
       prescoringNoteModelOutput=prescoringNoteModelOutput,
       prescoringRaterModelOutput=prescoringRaterModelOutput,
       prescoringMetaOutput=prescoringMetaOutput,
+      ratingsIndex=ratingsIndex,
     ),
     runParallel=runParallel,
     dataLoader=dataLoader,
     maxWorkers=maxWorkers,
+    sharedMemoryTransport=sharedMemoryTransport,
+    fuseGroupScorers=fuseGroupScorers,
+    scorerStatsPath=scorerStatsPath,
+    scorerMemoryBudgetBytes=scorerMemoryBudgetBytes,
   )
+  decode_participant_ids(participantIdEncoding, participantIdColumns)
+  del participantIdEncoding, participantIdColumns
 
   scoredNotes, auxiliaryNoteInfo = combine_final_scorer_results(modelResults, noteStatusHistory)
   scoredNotes = scoredNotes.merge(pflipPredictions, how="left")
@@ -1973,6 +2536,18 @@ def run_scoring(
   previousScoredNotes: Optional[pd.DataFrame] = None,
   previousAuxiliaryNoteInfo: Optional[pd.DataFrame] = None,
   previousRatingCutoffTimestampMillis: Optional[int] = 0,
+  sharedMemoryTransport: c.SharedMemoryTransport = c.SharedMemoryTransport.PARQUET,
+  fuseGroupScorers: bool = False,
+  scorerStatsPath: Optional[str] = None,
+  scorerMemoryBudgetBytes: Optional[int] = None,
+  topicModelWorkers: int = 1,
+  topicModelCache: Optional[TopicModelCache] = None,
+  pflipFeatureWorkers: int = 1,
+  pflipFeatureStore: Optional[PFlipFeatureStore] = None,
+  quasiCliqueWorkers: int = 1,
+  prescoringWarmStart: Optional[c.PrescoringWarmStart] = None,
+  mfTrainingEngine: Optional[str] = None,
+  batchPseudoRaterScenarios: bool = False,
 ):
   """Runs both phases of scoring consecutively. Only for adhoc/testing use.
   In prod, we run each phase as a separate binary.
@@ -1994,6 +2569,24 @@ def run_scoring(
     useStableInitialization
     writePrescoringScoringOutputCallback
     filterPrescoringInputToSimulateDelayInHours
+    sharedMemoryTransport: format used to share large DataFrames with parallel scorers
+    fuseGroupScorers: if True, train the matrix factorization models of all group scorers together
+    scorerStatsPath: if set, schedule parallel scorers using runtimes and peak memory recorded here
+    scorerMemoryBudgetBytes: memory available to concurrently running scheduled scorers
+    topicModelWorkers: number of processes used to predict note topics
+    topicModelCache: if set, reuse the note topic classifier, seed labels and topic probabilities
+      cached here
+    pflipFeatureWorkers: number of threads computing PFlip feature families concurrently
+    pflipFeatureStore: if set, only recompute PFlip features for posts which changed since the
+      features stored here were computed
+    quasiCliqueWorkers: number of processes used to grow quasi-cliques from independent seeds
+    prescoringWarmStart: if set, initialize prescoring matrix factorization from the output of a
+      previous prescoring run (see process_data.read_prescoring_warm_start)
+    mfTrainingEngine: if set, training engine for matrix factorization in the MF scorers (see
+      MatrixFactorization)
+    batchPseudoRaterScenarios: if True, refit all pseudorater scenarios in one batched
+      optimization instead of one fit per scenario.  Faster, but note parameters can differ from
+      the separate fits by about 1e-7 (float32 rounding), which can change outputs near thresholds.
 
   Returns:
     Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
@@ -2018,7 +2611,9 @@ def run_scoring(
     filterPrescoringInputToSimulateDelayInHours,
   )
 
-  postSelectionSimilarityValues = run_rater_clustering(notes=notes, ratings=ratings)
+  postSelectionSimilarityValues = run_rater_clustering(
+    notes=notes, ratings=ratings, quasiCliqueWorkers=quasiCliqueWorkers
+  )
 
   (
     prescoringNoteModelOutput,
@@ -2041,6 +2636,15 @@ def run_scoring(
     useStableInitialization=useStableInitialization,
     checkFlips=False,
     previousRatingCutoffTimestampMillis=previousRatingCutoffTimestampMillis,
+    sharedMemoryTransport=sharedMemoryTransport,
+    fuseGroupScorers=fuseGroupScorers,
+    scorerStatsPath=scorerStatsPath,
+    scorerMemoryBudgetBytes=scorerMemoryBudgetBytes,
+    topicModelWorkers=topicModelWorkers,
+    topicModelCache=topicModelCache,
+    pflipFeatureWorkers=pflipFeatureWorkers,
+    warmStart=prescoringWarmStart,
+    mfTrainingEngine=mfTrainingEngine,
   )
 
   logger.info("We invoked run_scoring and are now in between prescoring and scoring.")
@@ -2078,6 +2682,15 @@ def run_scoring(
     previousScoredNotes=previousScoredNotes,
     previousAuxiliaryNoteInfo=previousAuxiliaryNoteInfo,
     previousRatingCutoffTimestampMillis=previousRatingCutoffTimestampMillis,
+    sharedMemoryTransport=sharedMemoryTransport,
+    fuseGroupScorers=fuseGroupScorers,
+    scorerStatsPath=scorerStatsPath,
+    scorerMemoryBudgetBytes=scorerMemoryBudgetBytes,
+    topicModelWorkers=topicModelWorkers,
+    topicModelCache=topicModelCache,
+    pflipFeatureStore=pflipFeatureStore,
+    mfTrainingEngine=mfTrainingEngine,
+    batchPseudoRaterScenarios=batchPseudoRaterScenarios,
   )
 
   logger.info("Starting contributor scoring")
@@ -3,11 +3,21 @@ import logging
 import os
 import sys
 
-from . import constants as c
+from . import constants as c, profiling
 from .enums import scorers_from_csv
+from .matrix_factorization.matrix_factorization import MatrixFactorization
 from .pandas_utils import patch_pandas
-from .process_data import LocalDataLoader, tsv_reader, write_parquet_local, write_tsv_local
+from .pflip_feature_store import PFlipFeatureStore
+from .process_data import (
+  LocalDataLoader,
+  read_prescoring_warm_start,
+  tsv_reader,
+  write_parquet_local,
+  write_tsv_local,
+)
 from .run_scoring import run_scoring
+from .snapshot_cache import SnapshotCache
+from .topic_model_cache import TopicModelCache
 
 import pandas as pd
 
@@ -80,6 +90,35 @@ def parse_args():
     type=int,
     help="previous rating cutoff millis",
   )
+  parser.add_argument(
+    "--warm-start-note-model-output",
+    default=None,
+    help="Prescoring note model output of a previous run used to warm start prescoring MF. "
+    + "Requires --warm-start-rater-model-output and --warm-start-meta-output.",
+  )
+  parser.add_argument(
+    "--warm-start-rater-model-output",
+    default=None,
+    help="Prescoring rater model output of a previous run used to warm start prescoring MF.",
+  )
+  parser.add_argument(
+    "--warm-start-meta-output",
+    default=None,
+    help="Prescoring meta output of a previous run used to warm start prescoring MF.",
+  )
+  parser.add_argument(
+    "--warm-start-new-ratings-after-millis",
+    default=None,
+    type=int,
+    help="With a warm start, refit notes and raters with ratings created after this time first.",
+  )
+  parser.add_argument(
+    "--warm-start-compare-to-full-retrain",
+    help="With a warm start, also fit each model from scratch and log parameter drift.",
+    action="store_true",
+    dest="warm_start_compare_to_full_retrain",
+  )
+  parser.set_defaults(warm_start_compare_to_full_retrain=False)
   parser.add_argument("-o", "--outdir", default=".", help="directory for output files")
   parser.add_argument(
     "--pseudoraters",
@@ -130,6 +169,157 @@ def parse_args():
     dest="parallel",
   )
   parser.set_defaults(parallel=False)
+  parser.add_argument(
+    "--shared-memory-transport",
+    default=c.SharedMemoryTransport.PARQUET.value,
+    choices=[transport.value for transport in c.SharedMemoryTransport],
+    dest="shared_memory_transport",
+    help="Format used to share large DataFrames with parallel scorers.  'columnar' lets workers "
+    + "map column buffers without decoding them.",
+  )
+  parser.add_argument(
+    "--fuse-group-scorers",
+    help="Run all group scorers in one process and train their matrix factorization models "
+    + "together as one block-diagonal model.",
+    action="store_true",
+    dest="fuse_group_scorers",
+  )
+  parser.set_defaults(fuse_group_scorers=False)
+  parser.add_argument(
+    "--scorer-stats-path",
+    default=None,
+    dest="scorer_stats_path",
+    help="If set, parallel runs submit scorers longest-first within the available cores and "
+    + "memory, using the runtimes and peak memory recorded in this JSON file by previous runs.",
+  )
+  parser.add_argument(
+    "--scorer-memory-budget-gb",
+    default=None,
+    type=float,
+    dest="scorer_memory_budget_gb",
+    help="Memory available to concurrently running scorers when using --scorer-stats-path.  "
+    + "Defaults to the memory available when scorers are submitted.  The shared memory "
+    + "holding the scoring inputs is not counted against the budget.",
+  )
+  parser.add_argument(
+    "--topic-model-workers",
+    default=1,
+    type=int,
+    dest="topic_model_workers",
+    help="Number of processes used to predict note topics from shards of post text.",
+  )
+  parser.add_argument(
+    "--quasi-clique-workers",
+    default=1,
+    type=int,
+    dest="quasi_clique_workers",
+    help="Number of processes used to grow quasi-cliques from independent seeds.",
+  )
+  parser.add_argument(
+    "--mf-training-engine",
+    default="full",
+    choices=sorted(MatrixFactorization.trainingEngines),
+    dest="mf_training_engine",
+    help="Training engine for matrix factorization in the MF scorers.  'minibatch' runs epochs "
+    + "of shuffled mini-batches before refining with full-batch gradient descent.",
+  )
+  parser.add_argument(
+    "--batch-pseudo-rater-scenarios",
+    help="Refit all pseudorater scenarios in one batched optimization.  Faster, but note "
+    + "parameters can differ from separate fits by about 1e-7.",
+    action="store_true",
+    dest="batch_pseudo_rater_scenarios",
+  )
+  parser.set_defaults(batch_pseudo_rater_scenarios=False)
+  parser.add_argument(
+    "--topic-model-cache-dir",
+    default=None,
+    dest="topic_model_cache_dir",
+    help="If set, reuse the note topic classifier stored in this directory instead of retraining "
+    + "it, and only predict topics for posts which are new or whose note text changed.",
+  )
+  parser.add_argument(
+    "--topic-model-cache-keep-on-seed-term-change",
+    help="Keep reusing a cached note topic classifier after the topic seed terms change.",
+    action="store_false",
+    dest="topic_model_cache_invalidate_on_seed_term_change",
+  )
+  parser.set_defaults(topic_model_cache_invalidate_on_seed_term_change=True)
+  parser.add_argument(
+    "--topic-model-cache-max-age-hours",
+    default=7 * 24,
+    type=float,
+    dest="topic_model_cache_max_age_hours",
+    help="Retrain a cached note topic classifier trained longer ago than this many hours.",
+  )
+  parser.add_argument(
+    "--topic-model-cache-max-corpus-growth",
+    default=0.1,
+    type=float,
+    dest="topic_model_cache_max_corpus_growth",
+    help="Retrain a cached note topic classifier once the number of posts grew by more than "
+    + "this fraction since it was trained.",
+  )
+  parser.add_argument(
+    "--pflip-feature-workers",
+    default=1,
+    type=int,
+    dest="pflip_feature_workers",
+    help="Number of threads computing independent families of PFlip model features.",
+  )
+  parser.add_argument(
+    "--pflip-feature-store-dir",
+    default=None,
+    dest="pflip_feature_store_dir",
+    help="If set, store PFlip features in this directory and only recompute features for posts "
+    + "whose notes, ratings or status history changed since the previous run.",
+  )
+  parser.add_argument(
+    "--tsv-reader-engine",
+    default=c.TSVReaderEngine.PANDAS.value,
+    choices=[engine.value for engine in c.TSVReaderEngine],
+    dest="tsv_reader_engine",
+    help="Engine used to parse input TSVs.  'pyarrow' streams files from disk in blocks and "
+    + "reads directories of shards in parallel.",
+  )
+  parser.add_argument(
+    "--snapshot-cache-dir",
+    default=None,
+    dest="snapshot_cache_dir",
+    help="If set, cache preprocessed input DataFrames in this directory, keyed by the input "
+    + "files' contents, and reuse them on later runs with identical inputs.",
+  )
+  parser.add_argument(
+    "--snapshot-cache-max-gb",
+    default=50.0,
+    type=float,
+    dest="snapshot_cache_max_gb",
+    help="Evict least-recently-used snapshots once the snapshot cache exceeds this size.",
+  )
+  parser.add_argument(
+    "--profile-output",
+    default=None,
+    dest="profile_output",
+    help="If set, record the wall time, CPU time, peak memory growth and DataFrame sizes of "
+    + "every timed block, including blocks in scorer worker processes, and write them to this "
+    + "file.",
+  )
+  parser.add_argument(
+    "--profile-format",
+    default=profiling.ProfileFormat.CHROME.value,
+    choices=[profileFormat.value for profileFormat in profiling.ProfileFormat],
+    dest="profile_format",
+    help="Format of --profile-output.  'chrome' writes a trace for chrome://tracing or Perfetto, "
+    + "'speedscope' writes a profile for https://www.speedscope.app.",
+  )
+  parser.add_argument(
+    "--profile-sampling-interval-ms",
+    default=None,
+    type=float,
+    dest="profile_sampling_interval_ms",
+    help="If set with --profile-output, also sample the Python stacks of every thread at this "
+    + "interval and include them in the profile.",
+  )
 
   parser.add_argument(
     "--no-parquet",
@@ -197,6 +387,14 @@ def _run_scorer(
       args.status,
       args.enrollment,
       args.headers,
+      tsvReaderEngine=c.TSVReaderEngine(args.tsv_reader_engine),
+      snapshotCache=(
+        None
+        if args.snapshot_cache_dir is None
+        else SnapshotCache(
+          args.snapshot_cache_dir, maxBytes=int(args.snapshot_cache_max_gb * (1 << 30))
+        )
+      ),
     )
   notes, ratings, statusHistory, userEnrollment = dataLoader.get_data()
   if args.previous_scored_notes is not None:
@@ -206,6 +404,7 @@ def _run_scorer(
       c.noteModelOutputTSVColumns,
       header=False,
       convertNAToNone=False,
+      engine=c.TSVReaderEngine(args.tsv_reader_engine),
     )
     assert (
       args.previous_aux_note_info is not None
@@ -216,10 +415,26 @@ def _run_scorer(
       c.auxiliaryScoredNotesTSVColumns,
       header=False,
       convertNAToNone=False,
+      engine=c.TSVReaderEngine(args.tsv_reader_engine),
     )
   else:
     previousScoredNotes = None
     previousAuxiliaryNoteInfo = None
+  if args.warm_start_note_model_output is not None:
+    assert (
+      args.warm_start_rater_model_output is not None and args.warm_start_meta_output is not None
+    ), "warm_start_rater_model_output and warm_start_meta_output must be available for a warm start"
+    prescoringWarmStart = read_prescoring_warm_start(
+      args.warm_start_note_model_output,
+      args.warm_start_rater_model_output,
+      args.warm_start_meta_output,
+      newRatingsAfterMillis=args.warm_start_new_ratings_after_millis,
+      compareToFullRetrain=args.warm_start_compare_to_full_retrain,
+      headers=args.headers,
+      engine=c.TSVReaderEngine(args.tsv_reader_engine),
+    )
+  else:
+    prescoringWarmStart = None
 
   # Sample ratings to decrease runtime
   if args.sample_ratings:
@@ -248,6 +463,35 @@ def _run_scorer(
     previousScoredNotes=previousScoredNotes,
     previousAuxiliaryNoteInfo=previousAuxiliaryNoteInfo,
     previousRatingCutoffTimestampMillis=args.previous_rating_cutoff_millis,
+    sharedMemoryTransport=c.SharedMemoryTransport(args.shared_memory_transport),
+    fuseGroupScorers=args.fuse_group_scorers,
+    scorerStatsPath=args.scorer_stats_path,
+    scorerMemoryBudgetBytes=(
+      int(args.scorer_memory_budget_gb * (1 << 30))
+      if args.scorer_memory_budget_gb is not None
+      else None
+    ),
+    topicModelWorkers=args.topic_model_workers,
+    topicModelCache=(
+      None
+      if args.topic_model_cache_dir is None
+      else TopicModelCache(
+        args.topic_model_cache_dir,
+        invalidateOnSeedTermChange=args.topic_model_cache_invalidate_on_seed_term_change,
+        maxClassifierAgeSeconds=args.topic_model_cache_max_age_hours * 60 * 60,
+        maxCorpusGrowth=args.topic_model_cache_max_corpus_growth,
+      )
+    ),
+    pflipFeatureWorkers=args.pflip_feature_workers,
+    pflipFeatureStore=(
+      None
+      if args.pflip_feature_store_dir is None
+      else PFlipFeatureStore(args.pflip_feature_store_dir)
+    ),
+    quasiCliqueWorkers=args.quasi_clique_workers,
+    prescoringWarmStart=prescoringWarmStart,
+    mfTrainingEngine=args.mf_training_engine,
+    batchPseudoRaterScenarios=args.batch_pseudo_rater_scenarios,
     **extraScoringArgs,
   )
 
@@ -275,7 +519,18 @@ def main(
   logger.info(f"scorer pandas version: {pd.__version__}")
   # patch_pandas requires that args are available (which matches the production binary) so
   # we first parse the arguments then invoke the decorated _run_scorer.
-  return _run_scorer(args=args, dataLoader=dataLoader, extraScoringArgs=extraScoringArgs)
+  if args.profile_output is None:
+    return _run_scorer(args=args, dataLoader=dataLoader, extraScoringArgs=extraScoringArgs)
+  profiling.enable(
+    args.profile_sampling_interval_ms / 1000.0 if args.profile_sampling_interval_ms else None
+  )
+  try:
+    with profiling.span("Scoring run"):
+      return _run_scorer(args=args, dataLoader=dataLoader, extraScoringArgs=extraScoringArgs)
+  finally:
+    profile = profiling.disable()
+    profile.log_summary()
+    profile.write(args.profile_output, profiling.ProfileFormat(args.profile_format))
 
 
 if __name__ == "__main__":
@@ -5,7 +5,7 @@ import logging
 import time
 from typing import Dict, List, Optional, Set, Tuple
 
-from . import constants as c
+from . import constants as c, profiling
 from .constants import FinalScoringArgs, ModelResult, PrescoringArgs
 from .pandas_utils import keep_columns
 
@@ -57,12 +57,17 @@ class Scorer(ABC):
     self._strictInclusion = strictInclusion
     self._seed = seed
     self._threads = threads
+    # Set from the scoring args at the start of prescore / score_final.
+    self._ratingsIndex: Optional[c.RatingsIndex] = None
+    # Set from the scoring args at the start of prescore.
+    self._prescoringWarmStart: Optional[c.PrescoringWarmStart] = None
 
   @contextmanager
   def time_block(self, label):
     start = time.time()
     try:
-      yield
+      with profiling.span(f"{self.get_name()} {label}"):
+        yield
     finally:
       end = time.time()
       logger.info(
@@ -72,6 +77,13 @@ class Scorer(ABC):
   def get_name(self):
     return str(type(self))
 
+  def get_threads(self) -> int:
+    """Torch intra-op parallelism used by prescore and score_final."""
+    return self._threads
+
+  def set_threads(self, threads: int) -> None:
+    self._threads = threads
+
   @abstractmethod
   def get_scored_notes_cols(self) -> List[str]:
     """Returns a list of columns which should be present in the scoredNotes output."""
@@ -267,6 +279,8 @@ class Scorer(ABC):
     output that can be used to initialize and reduce the runtime of final scoring.
     """
     torch.set_num_threads(self._threads)
+    self._ratingsIndex = scoringArgs.ratingsIndex
+    self._prescoringWarmStart = scoringArgs.warmStart
     logger.info(
       f"prescore: Torch intra-op parallelism for {self.get_name()} set to: {torch.get_num_threads()}"
     )
@@ -282,6 +296,7 @@ class Scorer(ABC):
             c.helpfulNumKey,
             c.helpfulnessLevelKey,
             c.createdAtMillisKey,
+            c.tagMaskKey,
           ]
           + c.notHelpfulTagsTSVOrder
           + c.helpfulTagsTSVOrder,
@@ -364,6 +379,7 @@ class Scorer(ABC):
     c.scorerNameKey field of those dataframes.
     """
     torch.set_num_threads(self._threads)
+    self._ratingsIndex = scoringArgs.ratingsIndex
     logger.info(
       f"score_final: Torch intra-op parallelism for {self.get_name()} set to: {torch.get_num_threads()}"
     )
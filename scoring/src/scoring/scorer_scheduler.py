@@ -0,0 +1,147 @@
+"""Cost-aware scheduling of scorers in the _run_scorers process pool.
+
+The runtime and peak memory of each scorer are recorded after every parallel run in a small JSON
+stats file.  On the next run scorers are submitted longest-job-first, torch intra-op parallelism
+is capped so concurrently running scorers fit the available cores, and a scorer is only started
+once its expected peak memory fits in the memory budget next to the scorers already running.
+"""
+
+from dataclasses import asdict, dataclass
+import json
+import logging
+import os
+import resource
+from typing import Dict, List, Optional
+
+
+logger = logging.getLogger("birdwatch.scorer_scheduler")
+logger.setLevel(logging.INFO)
+
+
+@dataclass
+class ScorerCost:
+  """Runtime and peak memory of a unit, excluding the shared memory segments it read."""
+
+  seconds: float
+  peakMemoryBytes: int
+
+
+@dataclass
+class ScheduledTask:
+  """A unit of scorers which runs in one worker process.
+
+  Attributes:
+      index: position of the unit in the list passed to plan_schedule
+      name: key of the unit in ScorerStats
+      threads: torch intra-op parallelism of the unit's scorers
+      expectedCost: cost from the previous run, or None if the unit has not run before
+  """
+
+  index: int
+  name: str
+  threads: int
+  expectedCost: Optional[ScorerCost]
+
+  @property
+  def expectedPeakMemoryBytes(self) -> int:
+    return self.expectedCost.peakMemoryBytes if self.expectedCost is not None else 0
+
+
+class ScorerStats:
+  """Historical runtime and peak memory of each scorer, persisted as a JSON file."""
+
+  def __init__(self, path: str) -> None:
+    self._path = path
+    self._costs: Dict[str, ScorerCost] = {}
+    if os.path.exists(path):
+      try:
+        with open(path) as f:
+          self._costs = {name: ScorerCost(**cost) for (name, cost) in json.load(f).items()}
+      except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable scorer stats file {path}: {e}")
+
+  def get(self, name: str) -> Optional[ScorerCost]:
+    return self._costs.get(name)
+
+  def record(self, name: str, seconds: float, peakMemoryBytes: int) -> None:
+    self._costs[name] = ScorerCost(seconds, peakMemoryBytes)
+
+  def save(self) -> None:
+    """Atomically replace the stats file."""
+    tmpPath = f"{self._path}.tmp"
+    with open(tmpPath, "w") as f:
+      json.dump({name: asdict(cost) for (name, cost) in sorted(self._costs.items())}, f, indent=2)
+    os.replace(tmpPath, self._path)
+
+
+def get_num_cores() -> int:
+  """Number of cores this process may run on."""
+  if hasattr(os, "sched_getaffinity"):
+    return len(os.sched_getaffinity(0))
+  return os.cpu_count() or 1
+
+
+def get_available_memory_bytes() -> int:
+  return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+
+def get_peak_memory_bytes(sharedMemoryBytes: int = 0) -> int:
+  """Peak resident set size of the calling process, less sharedMemoryBytes.
+
+  ru_maxrss counts the pages of shared memory segments read by the process, so the DataFrames
+  shared with every worker would otherwise be counted once per worker when the peaks of
+  concurrently running workers are summed.  Passing the size of those segments leaves the
+  worker's own memory (less any shared pages it never touched).  ru_maxrss is in KiB on Linux.
+  """
+  peakBytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+  return max(0, peakBytes - sharedMemoryBytes)
+
+
+def plan_schedule(
+  names: List[str],
+  threads: List[int],
+  stats: ScorerStats,
+  maxWorkers: Optional[int] = None,
+  numCores: Optional[int] = None,
+) -> List[ScheduledTask]:
+  """Order units longest-job-first and cap their threads so concurrent units fit the cores.
+
+  Units without history are scheduled first (in their original order), since the longest
+  expected runtime cannot be ruled out.
+
+  Args:
+    names: stats key of each unit
+    threads: configured torch intra-op parallelism of each unit
+    stats: costs recorded by previous runs
+    maxWorkers: maximum number of concurrently running units
+    numCores: cores shared by all workers
+
+  Returns:
+    List[ScheduledTask]: units in the order they should be submitted
+  """
+  if numCores is None:
+    numCores = get_num_cores()
+  concurrency = min(maxWorkers or numCores, len(names))
+  coresPerWorker = max(1, numCores // max(1, concurrency))
+  tasks = [
+    ScheduledTask(index, name, max(1, min(numThreads, coresPerWorker)), stats.get(name))
+    for (index, (name, numThreads)) in enumerate(zip(names, threads))
+  ]
+  return sorted(
+    tasks,
+    key=lambda task: -task.expectedCost.seconds if task.expectedCost is not None else -float("inf"),
+  )
+
+
+def next_task_within_memory_budget(
+  pending: List[ScheduledTask], running: List[ScheduledTask], memoryBudgetBytes: int
+) -> Optional[ScheduledTask]:
+  """Return the first pending task whose expected peak memory fits next to the running tasks.
+
+  A task which exceeds the budget on its own is only started once nothing else is running.
+  """
+  runningBytes = sum(task.expectedPeakMemoryBytes for task in running)
+  for task in pending:
+    if not running or runningBytes + task.expectedPeakMemoryBytes <= memoryBudgetBytes:
+      return task
+  return None
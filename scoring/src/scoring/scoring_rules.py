@@ -2,11 +2,13 @@ from abc import ABC, abstractmethod
 from collections import namedtuple
 from enum import Enum
 import logging
+import time
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from . import constants as c
 from .enums import Topics
 from .explanation_tags import get_top_two_tags_for_note
+from .pandas_utils import get_first_valid_values
 from .pflip_plus_model import CRH, LABEL as PFLIP_LABEL
 
 import numpy as np
@@ -1068,23 +1070,14 @@ class ApplyGroupModelResult(ScoringRule):
       )
     noteStats.loc[noteStats[c.expansionNoteInterceptKey].isna(), "expansion"] = np.nan
 
-    # Prioritize core over expansion intercepts when available
-    def _get_value(row):
-      idx = row.first_valid_index()
-      # If either core or expansion had an intercept then return whether it was in the valid
-      # range.  If neither had an intercept, return False.  Preference is given to core due
-      # to the ordering when selecting columns from noteStats below.
-      if idx is None:
-        return False
-      elif row[idx] == 1.0:
-        return True
-      elif row[idx] == 0.0:
-        return False
-      else:
-        assert False, f"unexpected value: {row[idx]}"
-
-    with c.time_block("Get value apply for group model"):
-      noteStats["actionable"] = noteStats[["core", "expansion"]].apply(_get_value, axis=1)
+    # Prioritize core over expansion intercepts when available.  If either core or expansion
+    # had an intercept then the note is actionable if the intercept was in the valid range.  If
+    # neither had an intercept, the note is not actionable.
+    with c.time_block("Get actionable notes for group model"):
+      values = get_first_valid_values(noteStats, ["core", "expansion"]).to_numpy(np.float64)
+      unexpected = values[~np.isnan(values) & (values != 1.0) & (values != 0.0)]
+      assert len(unexpected) == 0, f"unexpected value: {unexpected[0]}"
+      noteStats["actionable"] = values == 1.0
 
     # Filter set of note status updates to only include actionable notes
     actionableNotes = noteStats[noteStats["actionable"]][[c.noteIdKey]]
@@ -1429,7 +1422,8 @@ def apply_scoring_rules(
   This function applies a list of ScoringRules in order.  Once each rule has run
   a final ratingStatus is set for each note. An additional column is added to capture
   which rules acted on the note and any additional columns generated by the ScoringRules
-  are merged with the scored notes to generate the final return value.
+  are merged with the scored notes to generate the final return value.  The time spent in
+  each rule is logged once all rules have run.
 
   Args:
     noteStats: attributes, aggregates and raw scoring signals for each note.
@@ -1441,26 +1435,34 @@ def apply_scoring_rules(
   Returns:
     noteStats with additional columns representing scoring results.
   """
-  # Initialize empty dataframes to store labels for each note and which rules impacted
-  # scoring for each note.
-  noteLabels = pd.DataFrame.from_dict(
-    {c.noteIdKey: pd.Series([], dtype=np.int64), statusColumn: pd.Series([], dtype=object)}
-  )
-  noteRules = pd.DataFrame.from_dict(
-    {c.noteIdKey: pd.Series([], dtype=np.int64), ruleColumn: pd.Series([], dtype=object)}
-  )
+  # Rule results are kept in arrays aligned with noteStats rows: the current status of each
+  # note, whether the note has been labeled yet, and a bitset of the rules which acted on the
+  # note.  Each rule's updates are scattered into the arrays in place, and the arrays are
+  # condensed into columns once after all rules have run.
+  noteIds = noteStats[c.noteIdKey].to_numpy()
+  notePositions = pd.Index(noteIds)
+  assert notePositions.is_unique, "noteStats must contain one row per note"
+  noteStatus = np.full(len(noteStats), np.nan, dtype=object)
+  noteLabeled = np.zeros(len(noteStats), dtype=bool)
+  activeRuleBits = np.zeros((len(noteStats), (len(rules) + 63) // 64), dtype=np.uint64)
   noteColumns = pd.DataFrame.from_dict({c.noteIdKey: pd.Series([], dtype=np.int64)})
 
   # Establish state to enforce rule dependencies.
   ruleIDs: Set[RuleID] = set()
+  ruleTimings: List[Tuple[str, float]] = []
 
   # Successively apply each rule
-  for rule in rules:
+  for ruleIndex, rule in enumerate(rules):
+    ruleStart = time.time()
     with c.time_block(f"Applying scoring rule: {rule.get_name()}"):
       logger.info(f"Applying scoring rule: {rule.get_name()}")
       rule.check_dependencies(ruleIDs)
       assert rule.get_rule_id() not in ruleIDs, f"repeat ruleID: {rule.get_name()}"
       ruleIDs.add(rule.get_rule_id())
+      # Present the labels assigned so far, which hold at most one label per note.
+      noteLabels = pd.DataFrame(
+        {c.noteIdKey: noteIds[noteLabeled], statusColumn: noteStatus[noteLabeled]}
+      )
       with c.time_block(f"Calling score_notes: {rule.get_name()}"):
         noteStatusUpdates, additionalColumns = rule.score_notes(noteStats, noteLabels, statusColumn)
       if (
@@ -1471,45 +1473,62 @@ def apply_scoring_rules(
       ):
         assert set(noteStatusUpdates[c.noteIdKey]) == set(additionalColumns[c.noteIdKey])
 
-      # Update noteLabels, which will always hold at most one label per note.
-      unsafeAllowed = {c.internalRatingStatusKey, c.finalRatingStatusKey, c.defaultIndexKey}
-      noteLabels = (
-        pd.concat([noteLabels, noteStatusUpdates], unsafeAllowed=unsafeAllowed)
-        .groupby(c.noteIdKey)
-        .tail(1)
-      )
-      # Update note rules to have one row per rule which was active for a note
-      noteRules = pd.concat(
-        [
-          noteRules,
-          pd.DataFrame.from_dict(
-            {c.noteIdKey: noteStatusUpdates[c.noteIdKey], ruleColumn: rule.get_name()}
-          ),
-        ],
-        unsafeAllowed={c.internalActiveRulesKey, c.defaultIndexKey, c.metaScorerActiveRulesKey},
-      )
+      # Update note labels and active rules, keeping the last update when a note repeats.
+      positions = notePositions.get_indexer(noteStatusUpdates[c.noteIdKey])
+      assert (positions >= 0).all(), f"{rule.get_name()} updated notes missing from noteStats"
+      noteStatus[positions] = noteStatusUpdates[statusColumn].to_numpy(dtype=object)
+      noteLabeled[positions] = True
+      activeRuleBits[positions, ruleIndex // 64] |= np.uint64(1 << (ruleIndex % 64))
       if additionalColumns is not None:
         # Merge any additional columns into current set of new columns
         assert {c.noteIdKey} == (set(noteColumns.columns) & set(additionalColumns.columns))
         noteColumns = noteColumns.merge(
           additionalColumns, on=c.noteIdKey, how="outer", unsafeAllowed=c.defaultIndexKey
         )
+    ruleTimings.append((rule.get_name(), time.time() - ruleStart))
+
+  totalSeconds = sum(seconds for (_, seconds) in ruleTimings)
+  logger.info(f"Scoring rule timings for {statusColumn} (total {totalSeconds:.2f} secs):")
+  for name, seconds in ruleTimings:
+    logger.info(f"  {name}: {seconds:.2f} secs")
 
   with c.time_block("Condense noteRules after applying all scoring rules"):
-    # Having applied all scoring rules, condense noteRules to have one row per note representing
-    # all of the ScoringRuless which were active for the note.
-    noteRules = noteRules.groupby(c.noteIdKey).aggregate(list).reset_index()
-    if decidedByColumn:
-      noteRules[decidedByColumn] = [rules[-1] for rules in noteRules[ruleColumn]]
-    noteRules[ruleColumn] = [",".join(activeRules) for activeRules in noteRules[ruleColumn]]
     # Validate that there are labels and assigned rules for each note
-    assert set(noteStats[c.noteIdKey]) == set(noteLabels[c.noteIdKey])
-    assert set(noteStats[c.noteIdKey]) == set(noteRules[c.noteIdKey])
+    assert noteLabeled.all(), "each note must be labeled by a scoring rule"
     assert len(set(noteColumns[c.noteIdKey]) - set(noteStats[c.noteIdKey])) == 0
+    # Having applied all scoring rules, condense the active rule bitsets into a comma separated
+    # list of rule names, in the order the rules were applied.  Rules are listed once for each
+    # distinct bitset rather than once for each note.  A rule which returned a note more than
+    # once is listed once for that note.
+    ruleNames = [rule.get_name() for rule in rules]
+    bitsetIndex = np.zeros(len(noteStats), dtype=np.int64)
+    for word in range(activeRuleBits.shape[1]):
+      wordIndex, wordValues = pd.factorize(activeRuleBits[:, word])
+      bitsetIndex, _ = pd.factorize(bitsetIndex * len(wordValues) + wordIndex)
+    # Locate the first note with each distinct bitset.
+    bitsetRows = np.zeros(bitsetIndex.max() + 1 if len(bitsetIndex) else 0, dtype=np.int64)
+    bitsetRows[bitsetIndex[::-1]] = np.arange(len(bitsetIndex))[::-1]
+    bitsetRules = [
+      [
+        name
+        for (ruleIndex, name) in enumerate(ruleNames)
+        if (int(activeRuleBits[row, ruleIndex // 64]) >> (ruleIndex % 64)) & 1
+      ]
+      for row in bitsetRows
+    ]
+    noteResults = {
+      c.noteIdKey: noteIds,
+      statusColumn: noteStatus,
+      ruleColumn: np.array([",".join(names) for names in bitsetRules], dtype=object)[bitsetIndex],
+    }
+    if decidedByColumn:
+      noteResults[decidedByColumn] = np.array(
+        [names[-1] for names in bitsetRules], dtype=object
+      )[bitsetIndex]
     # Merge note labels, active rules and new columns into noteStats to form scoredNotes
-    scoredNotes = noteStats.merge(noteLabels, on=c.noteIdKey, how="inner")
-    scoredNotes = scoredNotes.merge(noteRules, on=c.noteIdKey, how="inner")
-    scoredNotes = scoredNotes.merge(noteColumns, on=c.noteIdKey, how="left")
+    scoredNotes = noteStats.merge(pd.DataFrame(noteResults), on=c.noteIdKey, how="inner")
+    if len(noteColumns.columns) > 1:
+      scoredNotes = scoredNotes.merge(noteColumns, on=c.noteIdKey, how="left")
     # Add all of the individual model rules to the active rules column
     assert len(scoredNotes) == len(noteStats)
     # Set boolean columns indicating scoring outcomes
@@ -0,0 +1,300 @@
+# Std libraries
+import hashlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Union
+
+# Project libraries
+from . import constants as c
+
+# 3rd-party libraries
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+
+logger = logging.getLogger("birdwatch.snapshot_cache")
+logger.setLevel(logging.INFO)
+
+
+# Bump whenever preprocessing changes in a way that should invalidate existing snapshots.
+_snapshotFormatVersion = 2
+_metaFileName = "meta.json"
+_digestsFileName = "digests.json"
+_hashChunkBytes = 8 << 20
+_maskedNumericDtypes = (
+  pd.Int8Dtype,
+  pd.Int16Dtype,
+  pd.Int32Dtype,
+  pd.Int64Dtype,
+  pd.UInt8Dtype,
+  pd.UInt16Dtype,
+  pd.UInt32Dtype,
+  pd.UInt64Dtype,
+  pd.Float32Dtype,
+  pd.Float64Dtype,
+)
+
+
+def _get_nan_object_columns(df: pd.DataFrame) -> Optional[List[str]]:
+  """Return the object columns whose missing values are NaN rather than None.
+
+  Arrow represents every missing value as null, which pandas converts back to None in object
+  columns, so these columns must be restored to NaN after loading.  Returns None if a column
+  mixes NaN and None, which cannot be restored exactly.
+  """
+  nanColumns = []
+  for col in df.columns[df.dtypes == object]:
+    missing = df[col].values[pd.isna(df[col]).values]
+    numNone = sum(value is None for value in missing)
+    if numNone == len(missing):
+      continue
+    if numNone > 0:
+      return None
+    nanColumns.append(col)
+  return nanColumns
+
+
+def _map_arrow_column(
+  column: pa.ChunkedArray, dtype, mapped: mmap.mmap, baseAddress: int
+) -> Optional[Union[np.ndarray, pd.api.extensions.ExtensionArray]]:
+  """Return the values of a numeric column as a view of mapped, or None if it must be copied.
+
+  Arrow leaves the bytes of null slots unspecified, so they are overwritten with NaN in float
+  columns (copying only the touched pages).  Integer columns with nulls are only mapped as
+  nullable pandas arrays, whose mask is built from the validity bitmap.
+  """
+  if column.num_chunks != 1:
+    return None
+  chunk = column.chunk(0)
+  isMasked = isinstance(dtype, _maskedNumericDtypes)
+  npDtype = dtype.numpy_dtype if isMasked else dtype
+  if not isinstance(npDtype, np.dtype) or npDtype.kind not in "iuf":
+    return None
+  if not (pa.types.is_integer(chunk.type) or pa.types.is_floating(chunk.type)):
+    return None
+  if np.dtype(chunk.type.to_pandas_dtype()) != npDtype:
+    return None
+  if chunk.null_count > 0 and not isMasked and npDtype.kind != "f":
+    return None
+  dataBuffer = chunk.buffers()[1]
+  values = np.frombuffer(
+    mapped,
+    dtype=npDtype,
+    count=len(chunk),
+    offset=dataBuffer.address - baseAddress + chunk.offset * npDtype.itemsize,
+  )
+  isNull = (
+    chunk.is_null().to_numpy(zero_copy_only=False)
+    if chunk.null_count > 0
+    else np.zeros(len(chunk), dtype=bool)
+  )
+  if isMasked:
+    if npDtype.kind == "f":
+      return pd.arrays.FloatingArray(values, isNull)
+    return pd.arrays.IntegerArray(values, isNull)
+  if chunk.null_count > 0:
+    values[isNull] = np.nan
+  return values
+
+
+def _read_feather_mapped(path: str) -> pd.DataFrame:
+  """Read a Feather file written by SnapshotCache.save, mapping numeric columns copy-on-write.
+
+  The file is mapped privately, so the returned columns are writable and in-place updates only
+  copy the touched pages into this process without changing the file.
+  """
+  with open(path, "rb") as handle:
+    mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY)
+  table = pa.ipc.open_file(pa.py_buffer(mapped)).read_all()
+  # Converting no rows recovers the pandas dtypes and index recorded in the schema metadata.
+  empty = table.slice(0, 0).to_pandas()
+  index = empty.index
+  if not (
+    isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1 and index.name is None
+  ):
+    return table.to_pandas()
+  baseAddress = np.frombuffer(mapped, dtype=np.uint8).ctypes.data
+  values = [
+    _map_arrow_column(table.column(i), dtype, mapped, baseAddress)
+    for i, dtype in enumerate(empty.dtypes)
+  ]
+  copied = [i for i, columnValues in enumerate(values) if columnValues is None]
+  if copied:
+    copiedDf = table.select(copied).to_pandas()
+    for j, i in enumerate(copied):
+      values[i] = copiedDf.iloc[:, j].array
+  df = pd.DataFrame(dict(enumerate(values)), index=pd.RangeIndex(table.num_rows), copy=False)
+  df.columns = empty.columns
+  return df
+
+
+class SnapshotCache:
+  """Content-addressed on-disk cache of preprocessed input DataFrames.
+
+  Each entry is a directory holding one uncompressed Feather (Arrow IPC) file per DataFrame,
+  keyed by the size, mtime and content hash of every input file plus the parameters used to
+  produce the frames.  Numeric columns (including nullable integer and float columns) are
+  mapped copy-on-write from the file rather than copied, so processes loading the same snapshot
+  share those pages through the OS page cache.  Other columns (strings, booleans, categoricals)
+  are converted by Arrow, which copies them into each process.
+
+  Entries are evicted least-recently-used first once the cache holds more than maxEntries
+  entries or more than maxBytes bytes.
+  """
+
+  def __init__(self, cacheDir: str, maxBytes: int = 50 << 30, maxEntries: int = 4):
+    self.cacheDir = cacheDir
+    self.maxBytes = maxBytes
+    self.maxEntries = maxEntries
+
+  def _get_file_digest(self, path: str, digests: Dict[str, List]) -> str:
+    """Return the content hash of path, reusing the memoized hash if size and mtime match."""
+    stat = os.stat(path)
+    realPath = os.path.realpath(path)
+    memo = digests.get(realPath)
+    if memo is not None and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+      return memo[2]
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as handle:
+      for chunk in iter(lambda: handle.read(_hashChunkBytes), b""):
+        hasher.update(chunk)
+    digest = hasher.hexdigest()
+    digests[realPath] = [stat.st_size, stat.st_mtime_ns, digest]
+    return digest
+
+  def _get_input_fingerprint(self, path: Optional[str], digests: Dict[str, List]) -> Optional[List]:
+    """Fingerprint a single TSV file or a directory of TSV shards."""
+    if path is None:
+      return None
+    if os.path.isdir(path):
+      filenames = sorted(filename for filename in os.listdir(path) if filename.endswith(".tsv"))
+      paths = [os.path.join(path, filename) for filename in filenames]
+    else:
+      filenames = [os.path.basename(path)]
+      paths = [path]
+    return [
+      [filename, os.path.getsize(filePath), self._get_file_digest(filePath, digests)]
+      for filename, filePath in zip(filenames, paths)
+    ]
+
+  def get_key(self, inputPaths: List[Optional[str]], params: Dict) -> str:
+    """Return the cache key for the given input files and preprocessing parameters."""
+    os.makedirs(self.cacheDir, exist_ok=True)
+    digestsPath = os.path.join(self.cacheDir, _digestsFileName)
+    try:
+      with open(digestsPath, "r") as handle:
+        digests = json.load(handle)
+    except (OSError, ValueError):
+      digests = {}
+    with c.time_block("Snapshot cache: fingerprint inputs"):
+      fingerprint = {
+        "version": _snapshotFormatVersion,
+        "params": params,
+        "inputs": [self._get_input_fingerprint(path, digests) for path in inputPaths],
+      }
+    self._write_json_atomic(digestsPath, digests)
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:32]
+
+  def load(self, key: str) -> Optional[Dict[str, Optional[pd.DataFrame]]]:
+    """Return the DataFrames stored under key, or None if the key is not cached."""
+    entryDir = os.path.join(self.cacheDir, key)
+    metaPath = os.path.join(entryDir, _metaFileName)
+    try:
+      with open(metaPath, "r") as handle:
+        meta = json.load(handle)
+    except (OSError, ValueError):
+      logger.info(f"Snapshot cache miss: {key}")
+      return None
+    with c.time_block(f"Snapshot cache: load {key}"):
+      frames = {}
+      for name, nanColumns in meta["frames"].items():
+        if nanColumns is None:
+          frames[name] = None
+          continue
+        df = _read_feather_mapped(os.path.join(entryDir, f"{name}.feather"))
+        for col in nanColumns:
+          df[col] = df[col].where(df[col].notna(), np.nan)
+        frames[name] = df
+    # Refresh the access time used for LRU eviction.
+    os.utime(metaPath)
+    logger.info(f"Snapshot cache hit: {key}")
+    return frames
+
+  def save(self, key: str, frames: Dict[str, Optional[pd.DataFrame]]) -> None:
+    """Store frames under key and evict old entries.  Frames Arrow cannot represent exactly
+    are not cached."""
+    os.makedirs(self.cacheDir, exist_ok=True)
+    entryDir = os.path.join(self.cacheDir, key)
+    tmpDir = tempfile.mkdtemp(prefix=f".{key}.", dir=self.cacheDir)
+    try:
+      with c.time_block(f"Snapshot cache: save {key}"):
+        nanColumns = {}
+        for name, df in frames.items():
+          if df is None:
+            nanColumns[name] = None
+            continue
+          nanColumns[name] = _get_nan_object_columns(df)
+          if nanColumns[name] is None:
+            logger.warning(f"Snapshot cache: {name} mixes NaN and None; skipping save.")
+            shutil.rmtree(tmpDir, ignore_errors=True)
+            return
+          path = os.path.join(tmpDir, f"{name}.feather")
+          # A single record batch keeps each column contiguous so it can be mapped on load.
+          feather.write_feather(df, path, compression="uncompressed", chunksize=max(len(df), 1))
+          roundTripDtypes = _read_feather_mapped(path).dtypes
+          if not roundTripDtypes.equals(df.dtypes):
+            logger.warning(f"Snapshot cache: {name} dtypes do not round trip; skipping save.")
+            shutil.rmtree(tmpDir, ignore_errors=True)
+            return
+        self._write_json_atomic(
+          os.path.join(tmpDir, _metaFileName),
+          {"frames": nanColumns},
+        )
+      try:
+        os.rename(tmpDir, entryDir)
+      except OSError:
+        # Another process already saved this entry.
+        shutil.rmtree(tmpDir, ignore_errors=True)
+    except (OSError, pa.ArrowException) as e:
+      logger.warning(f"Snapshot cache: failed to save {key}: {e}")
+      shutil.rmtree(tmpDir, ignore_errors=True)
+      return
+    self.evict(keep=key)
+
+  def evict(self, keep: Optional[str] = None) -> None:
+    """Remove least-recently-used entries until the cache is within maxEntries and maxBytes."""
+    entries = []
+    for name in os.listdir(self.cacheDir):
+      metaPath = os.path.join(self.cacheDir, name, _metaFileName)
+      if name.startswith(".") or not os.path.isfile(metaPath):
+        continue
+      entryDir = os.path.join(self.cacheDir, name)
+      size = sum(
+        os.path.getsize(os.path.join(entryDir, filename)) for filename in os.listdir(entryDir)
+      )
+      entries.append((os.path.getmtime(metaPath), name, size))
+    entries.sort(reverse=True)
+    totalBytes = sum(size for (_, _, size) in entries)
+    numEntries = len(entries)
+    for _, name, size in reversed(entries):
+      if numEntries <= self.maxEntries and totalBytes <= self.maxBytes:
+        break
+      if name == keep:
+        continue
+      logger.info(f"Snapshot cache: evicting {name} ({size / (1 << 20):.0f} MB)")
+      shutil.rmtree(os.path.join(self.cacheDir, name), ignore_errors=True)
+      numEntries -= 1
+      totalBytes -= size
+
+  @staticmethod
+  def _write_json_atomic(path: str, obj) -> None:
+    tmpPath = f"{path}.{os.getpid()}.tmp"
+    with open(tmpPath, "w") as handle:
+      json.dump(obj, handle)
+    os.replace(tmpPath, path)
@@ -3,6 +3,7 @@ from typing import Optional
 
 from . import constants as c, process_data
 from .matrix_factorization.matrix_factorization import MatrixFactorization
+from .tag_mask import get_tag
 
 import numpy as np
 import pandas as pd
@@ -132,10 +133,10 @@ def prepare_tag_data(
   # Treat a same-valence rating as negative if the tag used was other
   #  (other is the only tag uncorrelated enough with other tags))
   ## Will be set to True later if the tag itself was also true
-  ratings.loc[ratings[sameValenceOtherTag] == 1, labelColName] = 0
+  ratings.loc[get_tag(ratings, sameValenceOtherTag) == 1, labelColName] = 0
 
   # Positives
-  ratings.loc[ratings[tagName] == 1, labelColName] = 1
+  ratings.loc[get_tag(ratings, tagName) == 1, labelColName] = 1
 
   logger.info(f"Pre-filtering tag label breakdown {ratings.groupby(labelColName).size()}")
   logger.info(f"Number of rows with no tag label {ratings[labelColName].isnull().sum()}")
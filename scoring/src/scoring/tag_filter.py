@@ -4,6 +4,7 @@ import logging
 from typing import Dict
 
 from . import constants as c
+from .tag_mask import get_columns
 
 import numpy as np
 import pandas as pd
@@ -103,7 +104,7 @@ def get_note_tag_aggregates(
   # rater were not included in matrix factorization.
   ratingWeights = _get_rating_weight(ratings, noteParams, raterParams)
   # Filter ratings to only the columns which we need.
-  ratings = ratings[[c.noteIdKey, c.raterParticipantIdKey] + c.notHelpfulTagsTSVOrder]
+  ratings = get_columns(ratings, [c.noteIdKey, c.raterParticipantIdKey] + c.notHelpfulTagsTSVOrder)
   # Add weights to ratings, which will inherently filter out ratings where either the note or
   # rater were not included in matrix factorization.
   ratings = ratings.merge(ratingWeights, on=[c.noteIdKey, c.raterParticipantIdKey], how="inner")
@@ -0,0 +1,143 @@
+"""Bit-packed representation of rating tags.
+
+Ratings carry each helpful and not-helpful tag as its own nullable Int8 column, which takes two
+bytes (value and validity mask) per tag and rating.  pack_tags replaces the tag columns with a
+single uint64 column holding one bit per tag, and the accessors below expand only the tags a
+caller reads, so code using them works on either representation.
+"""
+
+# Std libraries
+import logging
+from typing import Dict, List
+
+# Project libraries
+from . import constants as c
+
+# 3rd-party libraries
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger("birdwatch.tag_mask")
+logger.setLevel(logging.INFO)
+
+
+assert len(c.ratingTagsMaskOrder) <= 64, "tags must fit in a uint64 mask"
+_tagBits = {tag: np.uint64(1) << np.uint64(i) for i, tag in enumerate(c.ratingTagsMaskOrder)}
+
+
+def is_packed(ratings: pd.DataFrame) -> bool:
+  return c.tagMaskKey in ratings.columns
+
+
+def pack_tags(ratings: pd.DataFrame) -> pd.DataFrame:
+  """Return ratings with every tag column replaced by a tagMask column.
+
+  The mask takes the position of the first tag column.  Tags must be 0 or 1.  Missing tags are
+  packed as 0, so unpack_tags restores them as 0.
+
+  Args:
+    ratings: pd.DataFrame with either all or none of the tag columns
+  """
+  tagCols = [col for col in ratings.columns if col in _tagBits]
+  if not tagCols:
+    return ratings
+  assert len(tagCols) == len(_tagBits), f"missing tag columns: {set(_tagBits) - set(tagCols)}"
+  mask = np.zeros(len(ratings), dtype=np.uint64)
+  for tag in tagCols:
+    values = ratings[tag].fillna(0).to_numpy(dtype=np.int64)
+    assert ((values == 0) | (values == 1)).all(), f"{tag} must only contain 0 and 1"
+    mask |= values.astype(np.uint64) * _tagBits[tag]
+  position = ratings.columns.get_loc(tagCols[0])
+  packed = ratings.drop(columns=tagCols)
+  packed.insert(position, c.tagMaskKey, mask)
+  return packed
+
+
+def select_columns(ratings: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+  """Return ratings[cols], keeping tags packed if ratings are packed.
+
+  Tags in cols are selected by keeping the mask column (at the position of the first tag in cols),
+  so callers must read them with the accessors below.
+  """
+  if not is_packed(ratings):
+    return ratings[cols]
+  selected = []
+  for col in cols:
+    col = c.tagMaskKey if col in _tagBits else col
+    if col not in selected:
+      selected.append(col)
+  return ratings[selected]
+
+
+def get_tag(ratings: pd.DataFrame, tag: str) -> pd.Series:
+  """Return the Int8 values of tag, expanding them from the mask if ratings are packed."""
+  if not is_packed(ratings):
+    return ratings[tag]
+  values = (ratings[c.tagMaskKey].to_numpy() & _tagBits[tag]) != 0
+  return pd.Series(
+    pd.arrays.IntegerArray(values.astype(np.int8), np.zeros(len(values), dtype=bool)),
+    index=ratings.index,
+    name=tag,
+  )
+
+
+def get_columns(ratings: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+  """Return ratings[cols], expanding any tag in cols from the mask if ratings are packed."""
+  if not is_packed(ratings) or not any(col in _tagBits for col in cols):
+    return ratings[cols]
+  return pd.DataFrame(
+    {col: (get_tag(ratings, col) if col in _tagBits else ratings[col]) for col in cols},
+    index=ratings.index,
+  )
+
+
+def has_any_tag(ratings: pd.DataFrame, tags: List[str]) -> pd.Series:
+  """Return whether each rating included at least one of tags."""
+  if not is_packed(ratings):
+    return ratings[tags].sum(axis=1) > 0
+  bits = np.uint64(0)
+  for tag in tags:
+    bits |= _tagBits[tag]
+  return pd.Series((ratings[c.tagMaskKey].to_numpy() & bits) != 0, index=ratings.index)
+
+
+def unpack_tags(ratings: pd.DataFrame, tags: List[str] = c.ratingTagsMaskOrder) -> pd.DataFrame:
+  """Return ratings with the tagMask column replaced by Int8 tag columns, in the order of tags."""
+  if not is_packed(ratings):
+    return ratings
+  position = ratings.columns.get_loc(c.tagMaskKey)
+  cols = list(ratings.columns)
+  cols = cols[:position] + list(tags) + cols[position + 1 :]
+  return get_columns(ratings, cols)
+
+
+def get_tag_memory_report(ratings: pd.DataFrame) -> Dict[str, int]:
+  """Return bytes used by ratings with tags held as Int8 columns and as a packed mask.
+
+  Args:
+    ratings: pd.DataFrame with tags in either representation
+  """
+  maskBytes = len(ratings) * np.dtype(np.uint64).itemsize
+  frameBytes = int(ratings.memory_usage(index=True, deep=True).sum())
+  if is_packed(ratings):
+    tagBytes = len(ratings) * len(_tagBits) * 2  # Int8 value and validity mask
+    packedFrameBytes, unpackedFrameBytes = frameBytes, frameBytes - maskBytes + tagBytes
+  else:
+    tagBytes = int(ratings[list(_tagBits)].memory_usage(index=False, deep=True).sum())
+    unpackedFrameBytes, packedFrameBytes = frameBytes, frameBytes - tagBytes + maskBytes
+  return {
+    "tagBytes": tagBytes,
+    "tagMaskBytes": maskBytes,
+    "unpackedRatingsBytes": unpackedFrameBytes,
+    "packedRatingsBytes": packedFrameBytes,
+  }
+
+
+def log_tag_memory_report(ratings: pd.DataFrame) -> None:
+  report = get_tag_memory_report(ratings)
+  saved = report["unpackedRatingsBytes"] - report["packedRatingsBytes"]
+  logger.info(
+    f"""Rating tags: {report['tagBytes'] / 1e6:.1f}MB as columns, {report['tagMaskBytes'] / 1e6:.1f}MB packed.
+    Ratings: {report['unpackedRatingsBytes'] / 1e6:.1f}MB unpacked, {report['packedRatingsBytes'] / 1e6:.1f}MB packed ({100 * saved / max(report['unpackedRatingsBytes'], 1):.0f}% smaller)."""
+  )
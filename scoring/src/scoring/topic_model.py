@@ -9,13 +9,18 @@ This approach represents a prelimiary approach to topic assignment while Communi
 evaluates the efficacy of per-topic note scoring.
 """
 
+import concurrent.futures
+import hashlib
 from itertools import product
+import json
 import logging
+import multiprocessing
 import re
 from typing import List, Optional, Tuple
 
-from . import constants as c
+from . import constants as c, profiling
 from .enums import Topics
+from .topic_model_cache import TopicModelCache, get_classifier_version, get_text_digests
 
 import numpy as np
 import pandas as pd
@@ -30,6 +35,10 @@ logger = logging.getLogger("birdwatch.topic_model")
 logger.setLevel(logging.INFO)
 
 
+# Bump whenever the classifier features or training change in a way that should invalidate
+# classifiers stored in a TopicModelCache.
+_topicClassifierVersion = 1
+
 seedTerms = {
   Topics.UkraineConflict: {
     "ukrain",  # intentionally shortened for expanded matching
@@ -69,6 +78,14 @@ seedTerms = {
 }
 
 
+def get_seed_terms_digest(terms: Optional[dict] = None) -> str:
+  if terms is None:
+    terms = seedTerms
+  return hashlib.sha256(
+    json.dumps({topic.name: sorted(patterns) for (topic, patterns) in terms.items()}).encode()
+  ).hexdigest()[:16]
+
+
 def get_seed_term_with_periods():
   seedTermsWithPeriods = []
   for terms in seedTerms.values():
@@ -78,11 +95,34 @@ def get_seed_term_with_periods():
   return seedTermsWithPeriods
 
 
+# Classifiers used by prediction worker processes, set once per worker by _init_topic_worker so
+# the fitted vocabularies are not pickled again for each shard of post text.
+_workerPipes: Optional[List[Pipeline]] = None
+
+
+def _init_topic_worker(pipes: List[Pipeline]) -> None:
+  global _workerPipes
+  _workerPipes = pipes
+
+
+def _predict_shard_in_worker(texts: np.ndarray) -> List[np.ndarray]:
+  assert _workerPipes is not None
+  return [pipe.decision_function(texts) for pipe in _workerPipes]
+
+
 class TopicModel(object):
-  def __init__(self, unassignedThreshold=0.99):
-    """Initialize a list of seed terms for each topic."""
+  def __init__(self, unassignedThreshold=0.99, numWorkers: int = 1, predictionShardSize=10000):
+    """Initialize a list of seed terms for each topic.
+
+    Args:
+      unassignedThreshold: p(Unassigned) above which seed labels are not applied
+      numWorkers: number of processes used to predict topics for shards of post text
+      predictionShardSize: maximum number of posts predicted in each shard when numWorkers > 1
+    """
     self._seedTerms = seedTerms
     self._unassignedThreshold = unassignedThreshold
+    self._numWorkers = numWorkers
+    self._predictionShardSize = predictionShardSize
     self._compiled_regex = self._compile_regex()
 
   def _compile_regex(self):
@@ -112,6 +152,12 @@ class TopicModel(object):
       Tuple[0]: array specifying topic labels for texts
       Tuple[1]: array specifying texts that are unassigned due to conflicting matches.
     """
+    labels, conflictedTexts = self._match_seed_terms(texts)
+    unassigned_count = np.sum(conflictedTexts)
+    logger.info(f"  Notes unassigned due to multiple matches: {unassigned_count}")
+    return labels, conflictedTexts
+
+  def _match_seed_terms(self, texts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     labels = np.zeros(texts.shape[0], dtype=np.int64)
     conflictedTexts = np.zeros(texts.shape[0], dtype=bool)
 
@@ -126,9 +172,30 @@ class TopicModel(object):
       elif len(found_topics) > 1:
         labels[i] = Topics.Unassigned.value
         conflictedTexts[i] = True
+    return labels, conflictedTexts
 
-    unassigned_count = np.sum(conflictedTexts)
-    logger.info(f"  Notes unassigned due to multiple matches: {unassigned_count}")
+  def _get_seed_labels(
+    self, postText: pd.DataFrame, cache: Optional[TopicModelCache] = None
+  ) -> Tuple[np.ndarray, np.ndarray]:
+    """Produce seed labels for each post, reusing labels cached for posts whose text is unchanged."""
+    texts = postText[c.summaryKey].values
+    if cache is None:
+      return self._make_seed_labels(texts)
+    tweetIds = postText[c.tweetIdKey].to_numpy(dtype=np.int64)
+    textDigests = get_text_digests(postText[c.summaryKey])
+    seedTermsDigest = get_seed_terms_digest(self._seedTerms)
+    cached = cache.load_seed_labels(seedTermsDigest, tweetIds, textDigests)
+    if cached is None:
+      labels = np.zeros(len(texts), dtype=np.int64)
+      conflictedTexts = np.zeros(len(texts), dtype=bool)
+      found = np.zeros(len(texts), dtype=bool)
+    else:
+      labels, conflictedTexts, found = cached
+    logger.info(f"  Seed labels cached for {found.sum()} of {len(texts)} posts")
+    if not found.all():
+      labels[~found], conflictedTexts[~found] = self._match_seed_terms(texts[~found])
+      cache.save_seed_labels(seedTermsDigest, tweetIds, textDigests, labels, conflictedTexts)
+    logger.info(f"  Notes unassigned due to multiple matches: {np.sum(conflictedTexts)}")
     return labels, conflictedTexts
 
   def custom_tokenizer(self, text):
@@ -211,12 +278,19 @@ class TopicModel(object):
     Returns:
       DataFrame with one post per row containing note text
     """
-    postNoteText = (
-      notes[[c.tweetIdKey, c.summaryKey]]
-      .fillna({c.summaryKey: ""})
-      .groupby(c.tweetIdKey)[c.summaryKey]
-      .apply(lambda postNotes: " ".join(postNotes))
-      .reset_index(drop=False)
+    # Join note text in post order, preserving note order within each post (as groupby would),
+    # by slicing a stable sort of the notes at post boundaries.
+    postNotes = notes[[c.tweetIdKey, c.summaryKey]]
+    postNotes = postNotes[postNotes[c.tweetIdKey].notna()].fillna({c.summaryKey: ""})
+    postNotes = postNotes.sort_values(c.tweetIdKey, kind="stable")
+    starts = np.flatnonzero(~postNotes[c.tweetIdKey].duplicated().to_numpy())
+    ends = np.append(starts[1:], len(postNotes))
+    summaries = postNotes[c.summaryKey].values.tolist()
+    postNoteText = pd.DataFrame(
+      {
+        c.tweetIdKey: postNotes[c.tweetIdKey].iloc[starts].values,
+        c.summaryKey: [" ".join(summaries[start:end]) for (start, end) in zip(starts, ends)],
+      }
     )
     # Default tokenization for CountVectorizer will not split on underscore, which
     # results in very long tokens containing many words inside of URLs.  Removing
@@ -226,11 +300,78 @@ class TopicModel(object):
     ]
     return postNoteText
 
+  def _get_decision_functions(self, pipes: List[Pipeline], texts: np.ndarray) -> List[np.ndarray]:
+    """Return the logits of each classifier for texts.
+
+    When numWorkers > 1 texts are split into shards which are predicted by a process pool.
+    Each worker receives the classifiers once when it starts.  Since the vectorizer and
+    classifier act on each text independently, the concatenated shard predictions are
+    identical to predicting all texts at once.
+
+    Args:
+      pipes: fitted classifiers
+      texts: post text to predict
+
+    Returns:
+      List containing the result of decision_function for each classifier
+    """
+    if self._numWorkers <= 1 or len(texts) <= 1:
+      return [pipe.decision_function(texts) for pipe in pipes]
+    numShards = max(self._numWorkers, -(-len(texts) // self._predictionShardSize))
+    shards = np.array_split(texts, min(numShards, len(texts)))
+    logger.info(f"  Predicting {len(texts)} posts in {len(shards)} shards")
+    with concurrent.futures.ProcessPoolExecutor(
+      max_workers=min(self._numWorkers, len(shards)),
+      mp_context=multiprocessing.get_context("forkserver"),
+      initializer=_init_topic_worker,
+      initargs=(pipes,),
+    ) as executor:
+      task = profiling.profiled_task("Topic model prediction shard", _predict_shard_in_worker)
+      shardLogits = [profiling.unwrap_result(logits) for logits in executor.map(task, shards)]
+    return [np.concatenate([logits[i] for logits in shardLogits]) for i in range(len(pipes))]
+
+  @staticmethod
+  def _logits_to_probs(logits: np.ndarray) -> np.ndarray:
+    # Transform logits to probabilities, handling the case where logits are 1D because
+    # of unit testing with only 2 topics.
+    if len(logits.shape) == 1:
+      probs = sigmoid(logits)
+      return np.vstack([1 - probs, probs]).T
+    return softmax(logits, axis=1)
+
+  def _get_probabilities(
+    self, pipes: List[Pipeline], postText: pd.DataFrame, cache: Optional[TopicModelCache]
+  ) -> List[np.ndarray]:
+    """Return the topic probabilities of each classifier for each post.
+
+    When a cache is provided only posts which are new, or whose text changed, since the
+    probabilities were cached for the classifier are predicted.
+    """
+    texts = postText[c.summaryKey].values
+    if cache is None:
+      return [self._logits_to_probs(logits) for logits in self._get_decision_functions(pipes, texts)]
+    tweetIds = postText[c.tweetIdKey].to_numpy(dtype=np.int64)
+    textDigests = get_text_digests(postText[c.summaryKey])
+    versions = [get_classifier_version(pipe) for pipe in pipes]
+    probSets = [cache.load_probabilities(version, tweetIds, textDigests) for version in versions]
+    missing = np.zeros(len(texts), dtype=bool)
+    for probs in probSets:
+      missing |= np.isnan(probs).any(axis=1) if probs is not None else True
+    logger.info(f"  Topic probabilities cached for {(~missing).sum()} of {len(texts)} posts")
+    if missing.any():
+      for i, logits in enumerate(self._get_decision_functions(pipes, texts[missing])):
+        missingProbs = self._logits_to_probs(logits)
+        if probSets[i] is None:
+          probSets[i] = np.full((len(texts), missingProbs.shape[1]), np.nan)
+        probSets[i][missing] = missingProbs
+        cache.save_probabilities(versions[i], tweetIds, textDigests, probSets[i])
+    return probSets
+
   def train_individual_note_topic_classifier(
-    self, postText: pd.DataFrame
+    self, postText: pd.DataFrame, cache: Optional[TopicModelCache] = None
   ) -> Tuple[Pipeline, np.ndarray, np.ndarray]:
     with c.time_block("Get Note Topics: Make Seed Labels"):
-      seedLabels, conflictedTexts = self._make_seed_labels(postText[c.summaryKey].values)
+      seedLabels, conflictedTexts = self._get_seed_labels(postText, cache)
 
     with c.time_block("Get Note Topics: Get Stop Words"):
       stopWords = self._get_stop_words(postText[c.summaryKey].values)
@@ -263,12 +404,30 @@ class TopicModel(object):
     return pipe, seedLabels, conflictedTexts
 
   def train_note_topic_classifier(
-    self, notes: pd.DataFrame
+    self, notes: pd.DataFrame, cache: Optional[TopicModelCache] = None
   ) -> Tuple[Pipeline, np.ndarray, np.ndarray]:
+    """Train a classifier from seed labels, or reuse the classifier stored in cache.
+
+    A cached classifier is keyed by the topic model version and the seed terms it was trained
+    from.  The cache determines whether a classifier trained from other seed terms is reused,
+    and when a classifier is too old or the corpus grew too much since it was trained.
+    """
     # Obtain aggregate post text, seed labels and stop words
     with c.time_block("Get Note Topics: Prepare Post Text"):
       postText = self._prepare_post_text(notes)
-    pipe, seedLabels, conflictedTexts = self.train_individual_note_topic_classifier(postText)
+    if cache is not None:
+      version = f"v{_topicClassifierVersion}"
+      seedTermsDigest = get_seed_terms_digest(self._seedTerms)
+      pipe = cache.load_classifier(version, seedTermsDigest, len(postText))
+      if pipe is not None:
+        with c.time_block("Get Note Topics: Make Seed Labels"):
+          seedLabels, conflictedTexts = self._get_seed_labels(postText, cache)
+        return pipe, seedLabels, conflictedTexts
+    pipe, seedLabels, conflictedTexts = self.train_individual_note_topic_classifier(
+      postText, cache
+    )
+    if cache is not None:
+      cache.save_classifier(version, seedTermsDigest, pipe, len(postText))
     return pipe, seedLabels, conflictedTexts
 
   def train_bootstrapped_note_topic_classifier(
@@ -327,6 +486,7 @@ class TopicModel(object):
     bootstrapped: Optional[bool] = False,
     assignConflicted: Optional[bool] = False,
     exitOnLowAccuracy: Optional[bool] = True,
+    cache: Optional[TopicModelCache] = None,
   ) -> pd.DataFrame:
     """Return a DataFrame specifying each {note, topic} pair.
 
@@ -334,6 +494,7 @@ class TopicModel(object):
 
     Args:
       notes: DF containing all notes to potentially assign to a topic
+      cache: if set, reuse topic probabilities cached for posts whose text has not changed
     """
     logger.info("Assigning notes to topics:")
     if noteTopicClassifiers is not None:
@@ -351,7 +512,7 @@ class TopicModel(object):
           pipe,
           seedLabelSet,
           conflictedTextForAccuracyEval,
-        ) = self.train_note_topic_classifier(notes)
+        ) = self.train_note_topic_classifier(notes, cache)
         pipes, seedLabelSets, conflictedTextSetsForAccuracyEval = (
           [pipe],
           [seedLabelSet],
@@ -371,20 +532,12 @@ class TopicModel(object):
       # training data the model felt were mis-labeled after the training process
       # completed, and generating labels for any posts which were omitted from the
       # original training.
-      for i, pipe in enumerate(pipes):
+      for pipe in pipes:
         assert type(pipe) == Pipeline, "unsupported classifier"
-        logits = pipe.decision_function(postText[c.summaryKey].values)
-        # Transform logits to probabilities, handling the case where logits are 1D because
-        # of unit testing with only 2 topics.
-        if len(logits.shape) == 1:
-          probs = sigmoid(logits)
-          probs = np.vstack([1 - probs, probs]).T
-        else:
-          probs = softmax(logits, axis=1)
-
+      for i, probs in enumerate(self._get_probabilities(pipes, postText, cache)):
         if seedLabelSets[i] is None:
           with c.time_block("Get Note Topics: Make Seed Labels"):
-            seedLabelSets[i], _ = self._make_seed_labels(postText[c.summaryKey].values)
+            seedLabelSets[i], _ = self._get_seed_labels(postText, cache)
 
         if conflictedTextSetsForAccuracyEval[i] is not None:
           self.validate_note_topic_accuracy_on_seed_labels(
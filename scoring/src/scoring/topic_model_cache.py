@@ -0,0 +1,277 @@
+# Std libraries
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+# Project libraries
+from . import constants as c
+
+# 3rd-party libraries
+import joblib
+import numpy as np
+import pandas as pd
+from pyarrow import feather
+from sklearn.pipeline import Pipeline
+
+
+logger = logging.getLogger("birdwatch.topic_model_cache")
+logger.setLevel(logging.INFO)
+
+
+_classifierFileName = "classifier-{version}-{seedTermsDigest}.joblib"
+_classifierInfoSuffix = ".json"
+_probabilitiesFileName = "probabilities-{classifierVersion}.feather"
+_seedLabelsFileName = "seedLabels-{seedTermsDigest}.feather"
+_textDigestKey = "textDigest"
+_seedLabelKey = "seedLabel"
+_conflictedKey = "conflicted"
+
+
+def get_classifier_version(pipe: Pipeline) -> str:
+  """Fingerprint the fitted parameters of a note topic classifier.
+
+  The fingerprint covers everything the pipeline uses at prediction time (vocabulary, IDF
+  weights and logistic regression parameters), so two pipelines with the same fingerprint make
+  identical predictions.
+  """
+  encoder = pipe.named_steps["UnigramEncoder"]
+  hasher = hashlib.sha256()
+  hasher.update(
+    json.dumps(sorted((token, int(index)) for (token, index) in encoder.vocabulary_.items()))
+    .encode()
+  )
+  classifier = pipe.named_steps["Classifier"]
+  for array in [
+    pipe.named_steps["tfidf"].idf_,
+    classifier.coef_,
+    classifier.intercept_,
+    classifier.classes_,
+  ]:
+    hasher.update(np.ascontiguousarray(array).tobytes())
+  return hasher.hexdigest()[:32]
+
+
+def get_text_digests(texts: pd.Series) -> np.ndarray:
+  """Return a 64 bit hash of each post text."""
+  return pd.util.hash_pandas_object(texts, index=False).to_numpy()
+
+
+class TopicModelCache:
+  """On-disk cache of the note topic classifier and its per-post results.
+
+  The classifier is stored under the topic model version and a digest of the seed terms it was
+  trained from, so later runs can reuse it instead of retraining.  A cached classifier is
+  retrained once it is older than maxClassifierAgeSeconds or the number of posts grew by more
+  than maxCorpusGrowth since it was trained, so that the vocabulary and weights follow the
+  corpus.  Topic probabilities are
+  stored per classifier version (see get_classifier_version) and seed labels per seed term
+  digest, with one row per post keyed by post ID and a hash of the post text.  A post only
+  needs to be labeled and predicted again when it is new or its text changed (e.g. because a
+  note was added to the post).
+  """
+
+  def __init__(
+    self,
+    cacheDir: str,
+    invalidateOnSeedTermChange: bool = True,
+    maxVersions: int = 2,
+    maxClassifierAgeSeconds: Optional[float] = 7 * 24 * 60 * 60,
+    maxCorpusGrowth: Optional[float] = 0.1,
+  ):
+    """
+    Args:
+      cacheDir: directory holding the cache
+      invalidateOnSeedTermChange: if True, a cached classifier is only reused when it was
+        trained from the current seed terms.  Otherwise the most recently trained classifier
+        of the topic model version is reused.
+      maxVersions: number of classifier versions (and seed term digests) to keep per-post
+        results for
+      maxClassifierAgeSeconds: retrain a cached classifier trained longer ago than this.  None
+        disables the age limit.
+      maxCorpusGrowth: retrain a cached classifier once the number of posts exceeds the number
+        it was trained on by more than this fraction.  None disables the growth limit.
+    """
+    self.cacheDir = cacheDir
+    self.invalidateOnSeedTermChange = invalidateOnSeedTermChange
+    self.maxVersions = maxVersions
+    self.maxClassifierAgeSeconds = maxClassifierAgeSeconds
+    self.maxCorpusGrowth = maxCorpusGrowth
+
+  def load_classifier(
+    self, version: str, seedTermsDigest: str, numPosts: int
+  ) -> Optional[Pipeline]:
+    """Return the cached classifier for the topic model version, or None on a cache miss.
+
+    Args:
+      version: topic model version
+      seedTermsDigest: digest of the seed terms the classifier should be trained from
+      numPosts: number of posts the classifier would be trained on now
+    """
+    path = os.path.join(
+      self.cacheDir, _classifierFileName.format(version=version, seedTermsDigest=seedTermsDigest)
+    )
+    if not os.path.exists(path) and not self.invalidateOnSeedTermChange:
+      pattern = _classifierFileName.format(version=glob.escape(version), seedTermsDigest="*")
+      paths = glob.glob(os.path.join(glob.escape(self.cacheDir), pattern))
+      if paths:
+        path = max(paths, key=os.path.getmtime)
+    if not os.path.exists(path):
+      logger.info(f"Topic model cache miss for classifier {version}-{seedTermsDigest}")
+      return None
+    if self._is_stale(path, numPosts):
+      return None
+    with c.time_block("Topic model cache: load classifier"):
+      pipe = joblib.load(path)
+    logger.info(f"Topic model cache hit for classifier: {os.path.basename(path)}")
+    return pipe
+
+  def save_classifier(
+    self, version: str, seedTermsDigest: str, pipe: Pipeline, numPosts: int
+  ) -> None:
+    """Store the classifier along with when it was trained and the number of posts it saw."""
+    os.makedirs(self.cacheDir, exist_ok=True)
+    path = os.path.join(
+      self.cacheDir, _classifierFileName.format(version=version, seedTermsDigest=seedTermsDigest)
+    )
+    tmpPath = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(pipe, tmpPath)
+    os.replace(tmpPath, path)
+    infoPath = os.path.splitext(path)[0] + _classifierInfoSuffix
+    with open(tmpPath, "w") as f:
+      json.dump({"trainedAtSeconds": time.time(), "numPosts": int(numPosts)}, f)
+    os.replace(tmpPath, infoPath)
+
+  def _is_stale(self, path: str, numPosts: int) -> bool:
+    """Return whether the cached classifier at path should be retrained."""
+    infoPath = os.path.splitext(path)[0] + _classifierInfoSuffix
+    if not os.path.exists(infoPath):
+      logger.info(f"Topic model cache: retraining {os.path.basename(path)} without training info")
+      return True
+    with open(infoPath) as f:
+      info = json.load(f)
+    ageSeconds = time.time() - info["trainedAtSeconds"]
+    if self.maxClassifierAgeSeconds is not None and ageSeconds > self.maxClassifierAgeSeconds:
+      logger.info(
+        f"Topic model cache: retraining {os.path.basename(path)} trained "
+        f"{ageSeconds / 3600:.1f} hours ago"
+      )
+      return True
+    if self.maxCorpusGrowth is not None and numPosts > info["numPosts"] * (
+      1 + self.maxCorpusGrowth
+    ):
+      logger.info(
+        f"Topic model cache: retraining {os.path.basename(path)} trained on "
+        f"{info['numPosts']} posts for {numPosts} posts"
+      )
+      return True
+    return False
+
+  def load_probabilities(
+    self, classifierVersion: str, tweetIds: np.ndarray, textDigests: np.ndarray
+  ) -> Optional[np.ndarray]:
+    """Return cached probabilities aligned with tweetIds, with NaN rows for uncached posts.
+
+    Returns None if nothing is cached for the classifier version.
+    """
+    fileName = _probabilitiesFileName.format(classifierVersion=classifierVersion)
+    cached = self._load_rows(fileName, tweetIds, textDigests)
+    if cached is None:
+      return None
+    values, rows = cached
+    probs = np.full((len(tweetIds), values.shape[1]), np.nan)
+    probs[rows >= 0] = values.to_numpy()[rows[rows >= 0]]
+    return probs
+
+  def save_probabilities(
+    self,
+    classifierVersion: str,
+    tweetIds: np.ndarray,
+    textDigests: np.ndarray,
+    probs: np.ndarray,
+  ) -> None:
+    fileName = _probabilitiesFileName.format(classifierVersion=classifierVersion)
+    self._save_rows(
+      fileName, tweetIds, textDigests, {str(i): probs[:, i] for i in range(probs.shape[1])}
+    )
+
+  def load_seed_labels(
+    self, seedTermsDigest: str, tweetIds: np.ndarray, textDigests: np.ndarray
+  ) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Return cached (seed labels, conflicted texts, cached rows) aligned with tweetIds.
+
+    Returns None if nothing is cached for the seed terms.
+    """
+    cached = self._load_rows(
+      _seedLabelsFileName.format(seedTermsDigest=seedTermsDigest), tweetIds, textDigests
+    )
+    if cached is None:
+      return None
+    values, rows = cached
+    found = rows >= 0
+    labels = np.zeros(len(tweetIds), dtype=np.int64)
+    labels[found] = values[_seedLabelKey].to_numpy()[rows[found]]
+    conflicted = np.zeros(len(tweetIds), dtype=bool)
+    conflicted[found] = values[_conflictedKey].to_numpy()[rows[found]]
+    return labels, conflicted, found
+
+  def save_seed_labels(
+    self,
+    seedTermsDigest: str,
+    tweetIds: np.ndarray,
+    textDigests: np.ndarray,
+    labels: np.ndarray,
+    conflicted: np.ndarray,
+  ) -> None:
+    self._save_rows(
+      _seedLabelsFileName.format(seedTermsDigest=seedTermsDigest),
+      tweetIds,
+      textDigests,
+      {_seedLabelKey: labels, _conflictedKey: conflicted},
+    )
+
+  def _load_rows(
+    self, fileName: str, tweetIds: np.ndarray, textDigests: np.ndarray
+  ) -> Optional[Tuple[pd.DataFrame, np.ndarray]]:
+    """Return the cached value columns and the cached row of each post (-1 if uncached)."""
+    path = os.path.join(self.cacheDir, fileName)
+    if not os.path.exists(path):
+      return None
+    cached = feather.read_feather(path)
+    rows = pd.MultiIndex.from_arrays([cached[c.tweetIdKey], cached[_textDigestKey]]).get_indexer(
+      pd.MultiIndex.from_arrays([tweetIds, textDigests])
+    )
+    # Refresh the access time used for eviction.
+    os.utime(path)
+    return cached.drop(columns=[c.tweetIdKey, _textDigestKey]), rows
+
+  def _save_rows(
+    self,
+    fileName: str,
+    tweetIds: np.ndarray,
+    textDigests: np.ndarray,
+    values: Dict[str, np.ndarray],
+  ) -> None:
+    """Store values for the given posts, replacing any cached rows for the same posts."""
+    os.makedirs(self.cacheDir, exist_ok=True)
+    path = os.path.join(self.cacheDir, fileName)
+    frame = pd.DataFrame({c.tweetIdKey: tweetIds, _textDigestKey: textDigests, **values})
+    if os.path.exists(path):
+      cached = feather.read_feather(path)
+      frame = pd.concat([cached[~cached[c.tweetIdKey].isin(tweetIds)], frame], ignore_index=True)
+    tmpPath = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(frame, tmpPath)
+    os.replace(tmpPath, path)
+    self._evict(fileName.split("-")[0], keep=path)
+
+  def _evict(self, prefix: str, keep: str) -> None:
+    """Remove the least recently used files with prefix beyond maxVersions."""
+    paths = glob.glob(os.path.join(self.cacheDir, f"{prefix}-*.feather"))
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[self.maxVersions :]:
+      if path != keep:
+        logger.info(f"Topic model cache: evicting {os.path.basename(path)}")
+        os.remove(path)
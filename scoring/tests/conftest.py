@@ -0,0 +1,6 @@
+import os
+import sys
+
+
+# Tests import the scoring package from scoring/src, matching how runner.py is invoked.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,92 @@
+from scoring import constants as c
+from scoring.explanation_tags import get_top_nonhelpful_tags_per_author
+
+import pandas as pd
+
+
+def _make_ratings(noteTagCounts):
+  """Return ratings where each note has the given number of ratings with each tag."""
+  rows = []
+  for noteId, tagCounts in noteTagCounts.items():
+    for tag, count in tagCounts.items():
+      for _ in range(count):
+        row = {tag: 0 for tag in c.notHelpfulTagsTSVOrder}
+        row[tag] = 1
+        rows.append({c.noteIdKey: noteId, **row})
+  return pd.DataFrame(rows, columns=[c.noteIdKey] + c.notHelpfulTagsTSVOrder)
+
+
+def test_top_nonhelpful_tags_per_author():
+  ratings = _make_ratings(
+    {
+      # Top tags: Incorrect, Other.
+      1: {c.notHelpfulIncorrectTagKey: 3, c.notHelpfulOtherTagKey: 2},
+      # Tied counts: SpamHarassmentOrAbuse wins the tiebreak over Incorrect.
+      2: {c.notHelpfulIncorrectTagKey: 2, c.notHelpfulSpamHarassmentOrAbuseTagKey: 2},
+      # Top tags: Outdated, Other.
+      3: {c.notHelpfulOutdatedTagKey: 2, c.notHelpfulOtherTagKey: 2},
+      # Only one tag reaches minRatingsToGetTag, so the note has no top tags.
+      4: {c.notHelpfulIncorrectTagKey: 5, c.notHelpfulOtherTagKey: 1},
+      # Three way tie: Outdated and SpamHarassmentOrAbuse win.
+      5: {
+        c.notHelpfulOutdatedTagKey: 2,
+        c.notHelpfulSpamHarassmentOrAbuseTagKey: 2,
+        c.notHelpfulHardToUnderstandKey: 2,
+      },
+      # Top tags: HardToUnderstand, Other.
+      6: {c.notHelpfulHardToUnderstandKey: 3, c.notHelpfulOtherTagKey: 3},
+      # The author of this note is unknown.
+      7: {c.notHelpfulIncorrectTagKey: 2, c.notHelpfulOtherTagKey: 2},
+    }
+  )
+  noteStatusHistory = pd.DataFrame(
+    {
+      c.noteIdKey: [1, 2, 3, 4, 5, 6, 7, 8],
+      c.noteAuthorParticipantIdKey: [
+        "alice",
+        "alice",
+        "bob",
+        "carol",
+        "erin",
+        "erin",
+        None,
+        # dave's note has no ratings.
+        "dave",
+      ],
+    }
+  )
+
+  topTags = get_top_nonhelpful_tags_per_author(noteStatusHistory, ratings)
+
+  tag = c.notHelpfulTagsEnumMapping
+  expected = pd.DataFrame(
+    {
+      c.noteAuthorParticipantIdKey: ["alice", "bob", "carol", "dave", "erin"],
+      c.authorTopNotHelpfulTagValues: [
+        # Incorrect is top on both notes.  Other and SpamHarassmentOrAbuse are tied, and
+        # SpamHarassmentOrAbuse wins the tiebreak.
+        f"{tag[c.notHelpfulIncorrectTagKey]},{tag[c.notHelpfulSpamHarassmentOrAbuseTagKey]}",
+        f"{tag[c.notHelpfulOutdatedTagKey]},{tag[c.notHelpfulOtherTagKey]}",
+        "",
+        "",
+        # Every tag appears once, so the tags winning the tiebreak are chosen.
+        f"{tag[c.notHelpfulOutdatedTagKey]},{tag[c.notHelpfulSpamHarassmentOrAbuseTagKey]}",
+      ],
+    }
+  )
+  pd.testing.assert_frame_equal(topTags, expected)
+  assert expected[c.authorTopNotHelpfulTagValues].tolist() == ["1,9", "5,0", "", "", "5,9"]
+
+
+def test_top_nonhelpful_tags_per_author_without_tags():
+  noteStatusHistory = pd.DataFrame(
+    {c.noteIdKey: [1, 2], c.noteAuthorParticipantIdKey: ["bob", "alice"]}
+  )
+  ratings = _make_ratings({1: {c.notHelpfulOtherTagKey: 1}})
+  topTags = get_top_nonhelpful_tags_per_author(noteStatusHistory, ratings)
+  assert topTags[c.noteAuthorParticipantIdKey].tolist() == ["alice", "bob"]
+  assert topTags[c.authorTopNotHelpfulTagValues].tolist() == ["", ""]
+
+  empty = get_top_nonhelpful_tags_per_author(noteStatusHistory.iloc[:0], ratings.iloc[:0])
+  assert len(empty) == 0
+  assert list(empty.columns) == [c.noteAuthorParticipantIdKey, c.authorTopNotHelpfulTagValues]
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+
+from scoring import constants as c
+from scoring.feature_dag import FeatureDag
+from scoring import pflip_plus_model
+from scoring.pflip_plus_model import PFlipPlusModel
+
+import pandas as pd
+
+
+def _make_dag(cache):
+  dag = FeatureDag(["notes"], cache=cache, maxCacheEntries=8)
+  dag.add("doubled", lambda notes: notes * 2, ["notes"])
+  dag.add("total", lambda doubled: doubled.sum(), ["doubled"])
+  return dag
+
+
+def test_cached_outputs_are_not_shared_with_callers():
+  cache = OrderedDict()
+  notes = pd.DataFrame({"x": [1, 2, 3]})
+  first = _make_dag(cache).run({"notes": notes})
+  first["doubled"].loc[0, "x"] = -100
+
+  dag = _make_dag(cache)
+  second = dag.run({"notes": notes})
+  assert dag.cacheHits == ["doubled", "total"]
+  pd.testing.assert_frame_equal(second["doubled"], pd.DataFrame({"x": [2, 4, 6]}))
+  second["doubled"].loc[1, "x"] = -100
+  pd.testing.assert_frame_equal(
+    _make_dag(cache).run({"notes": notes})["doubled"], pd.DataFrame({"x": [2, 4, 6]})
+  )
+
+
+def _make_counting_model(calls):
+  model = PFlipPlusModel(featureCacheEntries=64)
+
+  def counting(name):
+    def family(*args):
+      calls.append(name)
+      return pd.DataFrame({c.noteIdKey: args[0][c.noteIdKey].to_numpy()})
+
+    return family
+
+  for method in [
+    "_get_note_writing_latency",
+    "_get_quick_rating_stats",
+    "_get_burst_rating_stats",
+    "_get_recent_rating_stats",
+    "_get_note_counts",
+    "_get_helpfulness_ratings",
+    "_get_user_tag_ratings",
+    "_get_bucket_count_totals",
+    "_get_helpful_rating_stats",
+    "_get_tag_ratios",
+  ]:
+    setattr(model, method, counting(method))
+  model._apply_cutoff = lambda ratings, scoredNotes: ratings
+  return model
+
+
+def _get_sources():
+  notes = pd.DataFrame(
+    {
+      c.noteIdKey: [1, 2, 3],
+      pflip_plus_model._TWEET_CREATION_MILLIS: [0, 0, 0],
+      pflip_plus_model._NOTE_CREATION_MILLIS: [5, 5, 5],
+    }
+  )
+  ratings = pd.DataFrame({c.noteIdKey: [1, 1, 2], c.createdAtMillisKey: [10, 20, 30]})
+  return {
+    pflip_plus_model._SCORED_NOTES: notes,
+    pflip_plus_model._NOTES: notes,
+    pflip_plus_model._NOTE_STATUS_HISTORY: notes,
+    pflip_plus_model._LOCAL: ratings,
+    pflip_plus_model._PEER_MISLEADING: ratings,
+    pflip_plus_model._PEER_NON_MISLEADING: ratings,
+    pflip_plus_model._EFFECTIVE_PRESENT: 100,
+  }
+
+
+def test_pflip_feature_dag_hits_cache_across_calls():
+  calls = []
+  model = _make_counting_model(calls)
+  model._get_feature_dag(prepareForTraining=False).run(_get_sources())
+  numFamilies = len(calls)
+  assert numFamilies > 0
+
+  dag = model._get_feature_dag(prepareForTraining=False)
+  dag.run(_get_sources())
+  assert len(calls) == numFamilies
+  assert len(dag.cacheHits) == len(dag._families)
+
+
+def test_pflip_feature_dag_keys_closure_arguments():
+  calls = []
+  model = _make_counting_model(calls)
+  model._get_feature_dag(prepareForTraining=False).run(_get_sources())
+  del calls[:]
+  # Peer note counts read the same sources in training and prediction, and differ only in the
+  # captured prepareForTraining argument.
+  model._get_feature_dag(prepareForTraining=True).run(_get_sources())
+  assert "_get_note_counts" in calls
@@ -0,0 +1,107 @@
+import concurrent.futures
+
+from scoring import constants as c
+from scoring.matrix_factorization import fused_trainer
+from scoring.matrix_factorization.fused_trainer import FusedTrainer
+from scoring.matrix_factorization.matrix_factorization import MatrixFactorization
+from scoring.pandas_utils import PandasPatcher
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def patched_merge(monkeypatch):
+  # Initializing parameters relies on the merge arguments added by patch_pandas.
+  monkeypatch.setattr(pd.DataFrame, "merge", PandasPatcher(False).safe_merge())
+
+
+def _make_ratings(numNotes, numRaters, ratingsPerRater, seed):
+  rng = np.random.default_rng(seed)
+  noteFactors = rng.normal(size=numNotes)
+  raterFactors = rng.normal(size=numRaters)
+  raterIds = np.repeat(np.arange(numRaters), ratingsPerRater)
+  noteIds = np.concatenate(
+    [rng.choice(numNotes, ratingsPerRater, replace=False) for _ in range(numRaters)]
+  )
+  score = noteFactors[noteIds] * raterFactors[raterIds]
+  return pd.DataFrame(
+    {
+      c.noteIdKey: noteIds.astype(np.int64),
+      c.raterParticipantIdKey: [f"r{i}" for i in raterIds],
+      c.helpfulNumKey: (score + rng.normal(scale=0.3, size=len(score)) > 0).astype(np.float32),
+    }
+  )
+
+
+# Fits with different data sizes.  The last fit has a loose convergence threshold, so it
+# converges long before the others and its segment is deactivated while they keep training.
+_FITS = [
+  (dict(numNotes=60, numRaters=40, ratingsPerRater=20, seed=0), dict(seed=0)),
+  (dict(numNotes=120, numRaters=70, ratingsPerRater=30, seed=1), dict(seed=1)),
+  (dict(numNotes=40, numRaters=25, ratingsPerRater=15, seed=2), dict(seed=2)),
+  (dict(numNotes=80, numRaters=50, ratingsPerRater=25, seed=3), dict(seed=3, convergence=1e-3)),
+]
+
+
+def _fit(ratingsArgs, mfArgs):
+  mf = MatrixFactorization(**mfArgs)
+  noteParams, raterParams, globalIntercept = mf.run_mf(_make_ratings(**ratingsArgs))
+  return noteParams, raterParams, globalIntercept, [r["fullBatchEpochs"] for r in mf.fitReports]
+
+
+def _fit_fused(trainer, fits, fail=None):
+  def run(index, ratingsArgs, mfArgs):
+    with trainer.participant(index):
+      if index == fail:
+        raise ValueError("scorer failed")
+      return _fit(ratingsArgs, mfArgs)
+
+  with concurrent.futures.ThreadPoolExecutor(max_workers=len(fits)) as executor:
+    futures = [executor.submit(run, i, *fit) for (i, fit) in enumerate(fits)]
+    concurrent.futures.wait(futures, timeout=300)
+    assert all(f.done() for f in futures), "fused participants deadlocked"
+    return futures
+
+
+def _assert_fits_equal(actual, expected):
+  for actualParams, expectedParams in zip(actual[:2], expected[:2]):
+    pd.testing.assert_frame_equal(actualParams, expectedParams, check_exact=True)
+  assert actual[2] == expected[2]
+  assert actual[3] == expected[3]
+
+
+def test_fused_fits_match_solo_fits():
+  expected = [_fit(*fit) for fit in _FITS]
+  trainer = FusedTrainer(len(_FITS))
+  actual = [f.result() for f in _fit_fused(trainer, _FITS)]
+
+  assert len(trainer.fitReports) == 1
+  assert trainer.fitReports[0]["models"] == len(_FITS)
+  epochs = trainer.fitReports[0]["epochs"]
+  assert epochs[-1] < min(epochs[:-1])
+  for actualFit, expectedFit in zip(actual, expected):
+    _assert_fits_equal(actualFit, expectedFit)
+
+
+def test_failing_participant_does_not_block_others():
+  expected = [_fit(*fit) for fit in _FITS]
+  futures = _fit_fused(FusedTrainer(len(_FITS)), _FITS, fail=1)
+
+  with pytest.raises(ValueError, match="scorer failed"):
+    futures[1].result()
+  for i in [0, 2, 3]:
+    _assert_fits_equal(futures[i].result(), expected[i])
+
+
+def test_fused_fit_error_reaches_every_caller(monkeypatch):
+  def fail(self):
+    raise FloatingPointError("fused fit failed")
+
+  monkeypatch.setattr(fused_trainer._FusedModel, "fit", fail)
+  futures = _fit_fused(FusedTrainer(len(_FITS)), _FITS)
+  for future in futures:
+    with pytest.raises(RuntimeError) as excinfo:
+      future.result()
+    assert isinstance(excinfo.value.__cause__, FloatingPointError)
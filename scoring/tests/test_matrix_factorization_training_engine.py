@@ -0,0 +1,41 @@
+from scoring import constants as c
+from scoring.matrix_factorization.matrix_factorization import MatrixFactorization
+from scoring.mf_core_scorer import MFCoreScorer
+from scoring.mf_group_scorer import MFGroupScorer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _make_ratings(numNotes=100, numRaters=60, ratingsPerRater=30, seed=0):
+  rng = np.random.default_rng(seed)
+  noteFactors = rng.normal(size=numNotes)
+  raterFactors = rng.normal(size=numRaters)
+  raterIds = np.repeat(np.arange(numRaters), ratingsPerRater)
+  noteIds = np.concatenate(
+    [rng.choice(numNotes, ratingsPerRater, replace=False) for _ in range(numRaters)]
+  )
+  score = noteFactors[noteIds] * raterFactors[raterIds]
+  return pd.DataFrame(
+    {
+      c.noteIdKey: noteIds.astype(np.int64),
+      c.raterParticipantIdKey: [f"r{i}" for i in raterIds],
+      c.helpfulNumKey: (score + rng.normal(scale=0.3, size=len(score)) > 0).astype(np.float32),
+    }
+  )
+
+
+@pytest.mark.parametrize("trainingEngine", sorted(MatrixFactorization.trainingEngines))
+def test_fit_restores_learning_rate(trainingEngine):
+  mf = MatrixFactorization(seed=0, trainingEngine=trainingEngine, miniBatchSize=256)
+  mf.run_mf(_make_ratings())
+  assert [group["lr"] for group in mf.optimizer.param_groups] == [mf._noInitLearningRate]
+  assert mf.fitReports[-1]["trainingEngine"] == trainingEngine
+
+
+def test_scorers_pass_training_engine():
+  assert MFCoreScorer(mfTrainingEngine="minibatch")._mfRanker._trainingEngine == "minibatch"
+  groupScorer = MFGroupScorer(includedGroups={1}, groupId=1, mfTrainingEngine="minibatch")
+  assert groupScorer._mfRanker._trainingEngine == "minibatch"
+  assert MFCoreScorer()._mfRanker._trainingEngine == "full"
@@ -0,0 +1,100 @@
+from scoring import constants as c
+from scoring.matrix_factorization.matrix_factorization import (
+  MatrixFactorization,
+  WarmStart,
+  get_parameter_drift,
+)
+from scoring.matrix_factorization.normalized_loss import NormalizedLossHyperparameters
+from scoring.pandas_utils import PandasPatcher
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def patched_merge(monkeypatch):
+  # Initializing parameters relies on the merge arguments added by patch_pandas.
+  monkeypatch.setattr(pd.DataFrame, "merge", PandasPatcher(False).safe_merge())
+
+
+def _make_ratings(numNotes=150, numRaters=80, ratingsPerRater=40, seed=0):
+  rng = np.random.default_rng(seed)
+  noteFactors = rng.normal(size=numNotes)
+  noteIntercepts = rng.normal(scale=0.3, size=numNotes)
+  raterFactors = rng.normal(size=numRaters)
+  raterIds = np.repeat(np.arange(numRaters), ratingsPerRater)
+  noteIds = np.concatenate(
+    [rng.choice(numNotes, ratingsPerRater, replace=False) for _ in range(numRaters)]
+  )
+  score = noteIntercepts[noteIds] + noteFactors[noteIds] * raterFactors[raterIds]
+  return pd.DataFrame(
+    {
+      c.noteIdKey: noteIds.astype(np.int64),
+      c.raterParticipantIdKey: [f"r{i}" for i in raterIds],
+      c.helpfulNumKey: (score + rng.normal(scale=0.3, size=len(score)) > 0).astype(np.float32),
+      c.createdAtMillisKey: rng.integers(0, 1000, len(score)),
+    }
+  )
+
+
+@pytest.mark.parametrize("normalizedLoss", [False, True])
+def test_warm_start_matches_full_retrain(normalizedLoss):
+  mfArgs = dict(seed=0, initLearningRate=0.2, noInitLearningRate=1.0)
+  if normalizedLoss:
+    mfArgs.update(
+      normalizedLossHyperparameters=NormalizedLossHyperparameters(
+        globalSignNorm=True, noteSignAlpha=None, noteNormExp=0, raterNormExp=-0.25
+      ),
+      initLearningRate=0.02,
+      noInitLearningRate=0.02,
+    )
+  ratings = _make_ratings()
+  noteParams, raterParams, globalIntercept = MatrixFactorization(**mfArgs).run_mf(
+    ratings[ratings[c.createdAtMillisKey] <= 900]
+  )
+
+  mf = MatrixFactorization(**mfArgs)
+  warmNoteParams, warmRaterParams, warmGlobalIntercept = mf.run_mf(
+    ratings,
+    warmStart=WarmStart(
+      noteParams=noteParams,
+      raterParams=raterParams,
+      newRatingsAfterMillis=900,
+      compareToFullRetrain=True,
+      driftTolerance=0.05,
+    ),
+  )
+  assert abs(warmGlobalIntercept - globalIntercept) < 0.1
+  assert set(warmNoteParams[c.noteIdKey]) == set(ratings[c.noteIdKey])
+  drift = mf.warmStartDriftFromFullRetrain
+  assert drift is not None
+  assert (drift["count"] > 0).all()
+  # Drift from a differently configured reference (e.g. without the normalized loss) exceeds
+  # these bounds.
+  assert drift["withinTolerance"].all(), drift
+  assert (drift["meanAbsDiff"] < 0.02).all(), drift
+  # The reference must be a full retrain configured exactly like the warm-started model.
+  fullNoteParams, fullRaterParams, _ = MatrixFactorization(**mfArgs).run_mf(ratings)
+  expectedDrift = get_parameter_drift(
+    warmNoteParams, warmRaterParams, fullNoteParams, fullRaterParams, tolerance=0.05
+  )
+  pd.testing.assert_frame_equal(drift, expectedDrift, check_exact=False, atol=1e-6)
+
+
+def test_warm_start_fits_missing_global_intercept():
+  ratings = _make_ratings()
+  noteParams, raterParams, globalIntercept = MatrixFactorization(seed=0).run_mf(ratings)
+  # Without a previous global intercept, the delta fit must fit the intercept rather than hold it
+  # at its initial value of zero.
+  _, _, warmGlobalIntercept = MatrixFactorization(seed=0).run_mf(
+    ratings,
+    warmStart=WarmStart(
+      noteParams=noteParams,
+      raterParams=raterParams,
+      touchedNoteIds=noteParams[c.noteIdKey].iloc[:10],
+      polishMaxEpochs=0,
+    ),
+  )
+  assert abs(globalIntercept) > 0.1
+  assert abs(warmGlobalIntercept - globalIntercept) < 0.05
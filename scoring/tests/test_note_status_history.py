@@ -0,0 +1,97 @@
+from scoring import constants as c, note_status_history
+from scoring.scoring_rules import RuleID
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+_labels = np.array(
+  [c.currentlyRatedHelpful, c.currentlyRatedNotHelpful, c.needsMoreRatings], dtype=object
+)
+_rules = np.array([rule.get_name() for rule in RuleID], dtype=object)
+
+
+def _with_missing(rng, values: np.ndarray, fraction: float) -> np.ndarray:
+  values = values.astype(object)
+  values[rng.random(len(values)) < fraction] = np.nan
+  return values
+
+
+def _make_merged_statuses(
+  numNotes: int, seed: int, nullableIntegerCreatedAt: bool, hasStatusChangeColumn: bool
+) -> pd.DataFrame:
+  """Synthetic previous note status history joined with new scored notes."""
+  rng = np.random.default_rng(seed)
+  createdAtMillis = rng.integers(
+    c.deletedNoteTombstonesLaunchTime - 10**10, c.epochMillis, numNotes
+  ).astype(np.int64)
+  oldNoteStatusHistory = pd.DataFrame(
+    {
+      c.noteIdKey: np.arange(numNotes, dtype=np.int64),
+      c.noteAuthorParticipantIdKey: [f"author{i}" for i in range(numNotes)],
+      c.createdAtMillisKey: createdAtMillis,
+    }
+  )
+  for col, dtype in c.noteStatusHistoryTSVColumnsAndTypes[3:]:
+    if dtype == "category":
+      values = _labels if ("Label" in col or "Status" in col) else _rules
+      oldNoteStatusHistory[col] = pd.Categorical(
+        _with_missing(rng, rng.choice(values, numNotes), 0.4)
+      )
+    else:
+      timestamps = rng.integers(0, 10**12, numNotes).astype(np.float64)
+      timestamps[rng.random(numNotes) < 0.5] = np.nan
+      oldNoteStatusHistory[col] = timestamps
+  if nullableIntegerCreatedAt:
+    # Note status history joined with new notes carries createdAtMillis as Int64.
+    oldNoteStatusHistory[c.createdAtMillisKey] = oldNoteStatusHistory[c.createdAtMillisKey].astype(
+      pd.Int64Dtype()
+    )
+  if not hasStatusChangeColumn:
+    oldNoteStatusHistory = oldNoteStatusHistory.drop(
+      columns=[c.timestampMillisOfMostRecentStatusChangeKey]
+    )
+
+  scoredCreatedAtMillis = createdAtMillis.astype(np.float64)
+  # Notes which are no longer scored keep their previous history.
+  scoredCreatedAtMillis[rng.random(numNotes) < 0.1] = np.nan
+  scoredNotes = pd.DataFrame(
+    {
+      c.noteIdKey: np.arange(numNotes, dtype=np.int64),
+      c.createdAtMillisKey: scoredCreatedAtMillis,
+      c.finalRatingStatusKey: rng.choice(_labels, numNotes),
+      c.decidedByKey: rng.choice(_rules, numNotes),
+    }
+  )
+  for col in [
+    c.coreRatingStatusKey,
+    c.expansionRatingStatusKey,
+    c.groupRatingStatusKey,
+    c.multiGroupRatingStatusKey,
+  ]:
+    scoredNotes[col] = _with_missing(rng, rng.choice(_labels, numNotes), 0.4)
+  for col in [
+    c.modelingGroupKey,
+    c.modelingMultiGroupKey,
+    c.updatedTimestampMillisOfNmrDueToMinStableCrhTimeKey,
+  ]:
+    values = rng.integers(0, 10**12, numNotes).astype(np.float64)
+    values[rng.random(numNotes) < 0.5] = np.nan
+    scoredNotes[col] = values
+  return note_status_history.merge_old_and_new_note_statuses(oldNoteStatusHistory, scoredNotes)
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("nullableIntegerCreatedAt", [False, True])
+@pytest.mark.parametrize("hasStatusChangeColumn", [False, True])
+def test_vectorized_update_matches_row_wise(
+  monkeypatch, seed, nullableIntegerCreatedAt, hasStatusChangeColumn
+):
+  monkeypatch.setattr(c, "useCurrentTimeInsteadOfEpochMillisForNoteStatusHistory", False)
+  mergedStatuses = _make_merged_statuses(2000, seed, nullableIntegerCreatedAt, hasStatusChangeColumn)
+  expected = note_status_history.update_note_status_history(
+    mergedStatuses.copy(), vectorized=False
+  )
+  actual = note_status_history.update_note_status_history(mergedStatuses.copy())
+  pd.testing.assert_frame_equal(actual, expected, check_exact=True)
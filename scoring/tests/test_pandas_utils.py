@@ -0,0 +1,38 @@
+from scoring.pandas_utils import get_first_valid_values
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _get_first_valid_values_with_apply(df, cols):
+  def _get_value(row):
+    idx = row.first_valid_index()
+    return row[idx] if idx is not None else np.nan
+
+  return df[cols].apply(_get_value, axis=1)
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32", "float16", "Int64", "object"])
+@pytest.mark.parametrize("withMissingRows", [False, True])
+def test_get_first_valid_values_matches_apply(dtype, withMissingRows):
+  rng = np.random.default_rng(0)
+  numRows = 50
+  group = rng.integers(-1 if withMissingRows else 0, 3, numRows)
+  if withMissingRows:
+    group[0] = -1
+  if dtype == "object":
+    columns = {
+      f"x_{i}": np.where(group == i, rng.choice(["A", "B"], numRows).astype(object), None)
+      for i in range(3)
+    }
+  else:
+    columns = {
+      f"x_{i}": pd.array(np.where(group == i, rng.integers(0, 5, numRows), np.nan)).astype(dtype)
+      for i in range(3)
+    }
+  df = pd.DataFrame(columns)
+  cols = list(columns)
+  pd.testing.assert_series_equal(
+    get_first_valid_values(df, cols), _get_first_valid_values_with_apply(df, cols)
+  )
@@ -0,0 +1,329 @@
+import copy
+import os
+
+from scoring import constants as c
+from scoring.enums import Scorers
+from scoring.pandas_utils import PandasPatcher
+from scoring.pflip_feature_store import (
+  PFlipFeatureStore,
+  get_post_digests,
+  postDigestKey,
+  postRecentRatingsKey,
+)
+from scoring.pflip_plus_model import LABEL, PFlipPlusModel
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="module")
+def patched_pandas():
+  # Feature extraction relies on the arguments added by patch_pandas.
+  patcher = PandasPatcher(False)
+  with pytest.MonkeyPatch.context() as monkeypatch:
+    monkeypatch.setattr(pd, "concat", patcher.safe_concat())
+    monkeypatch.setattr(pd.DataFrame, "merge", patcher.safe_merge())
+    monkeypatch.setattr(pd.DataFrame, "join", patcher.safe_join())
+    monkeypatch.setattr(pd.DataFrame, "apply", patcher.safe_apply())
+    yield
+
+
+def _make_inputs(numPosts, seed=0):
+  """Return notes, ratings, note status history and rater factors for numPosts posts."""
+  rng = np.random.default_rng(seed)
+  postMillis = 1760000000000 - rng.integers(0, 30 * 86400000, numPosts)
+  tweetIds = ((postMillis - 1288834974657) << 22) + rng.integers(0, 1 << 20, numPosts)
+  notesPerPost = rng.integers(1, 6, numPosts)
+  numNotes = notesPerPost.sum()
+  notePosts = np.repeat(np.arange(numPosts), notesPerPost)
+  noteIds = np.arange(1, numNotes + 1, dtype=np.int64) * 1000 + 7
+  noteMillis = postMillis[notePosts] + rng.integers(60000, 86400000, numNotes)
+  notes = pd.DataFrame(
+    {
+      c.noteIdKey: noteIds,
+      c.tweetIdKey: tweetIds[notePosts],
+      c.classificationKey: np.where(
+        rng.random(numNotes) < 0.85,
+        c.notesSaysTweetIsMisleadingKey,
+        c.noteSaysTweetIsNotMisleadingKey,
+      ),
+      c.createdAtMillisKey: noteMillis,
+    }
+  )
+  stableMillis = np.where(
+    rng.random(numNotes) < 0.4, noteMillis + rng.integers(3600000, 20 * 3600000, numNotes), np.nan
+  )
+  firstLabelMillis = np.where(
+    rng.random(numNotes) < 0.4, noteMillis + rng.integers(3600000, 30 * 3600000, numNotes), np.nan
+  )
+  firstLabel = np.where(
+    ~np.isnan(firstLabelMillis),
+    np.where(rng.random(numNotes) < 0.8, c.currentlyRatedHelpful, c.currentlyRatedNotHelpful),
+    None,
+  )
+  locked = rng.choice(
+    [c.currentlyRatedHelpful, c.needsMoreRatings, c.currentlyRatedNotHelpful, None], numNotes
+  )
+  noteStatusHistory = pd.DataFrame(
+    {
+      c.noteIdKey: noteIds,
+      c.createdAtMillisKey: noteMillis,
+      c.timestampMillisOfFirstNmrDueToMinStableCrhTimeKey: stableMillis,
+      c.timestampMillisOfNoteFirstNonNMRLabelKey: firstLabelMillis,
+      c.firstNonNMRLabelKey: firstLabel,
+      c.lockedStatusKey: np.where(
+        ~np.isnan(stableMillis) | (firstLabel == c.currentlyRatedHelpful), locked, None
+      ),
+      c.currentDecidedByKey: rng.choice(["CoreModel (v1.1)", "ExpansionModel (v1.1)"], numNotes),
+      c.noteAuthorParticipantIdKey: [
+        f"author{i}" for i in rng.integers(0, numNotes // 5, numNotes)
+      ],
+    }
+  )
+  ratingsPerNote = rng.integers(1, 40, numNotes)
+  numRatings = ratingsPerNote.sum()
+  ratingNotes = np.repeat(np.arange(numNotes), ratingsPerNote)
+  numRaters = 1000
+  # Rater ids are distinct within each note.
+  ratingPositions = np.arange(numRatings) - np.repeat(
+    np.cumsum(ratingsPerNote) - ratingsPerNote, ratingsPerNote
+  )
+  raters = (rng.integers(0, numRaters, numNotes)[ratingNotes] + ratingPositions * 7) % numRaters
+  ratings = pd.DataFrame(
+    {
+      c.noteIdKey: noteIds[ratingNotes],
+      c.raterParticipantIdKey: [f"r{i:04d}" for i in raters],
+      c.createdAtMillisKey: noteMillis[ratingNotes]
+      + rng.exponential(3 * 3600000, numRatings).astype(np.int64),
+      c.helpfulnessLevelKey: rng.choice(
+        [c.helpfulValueTsv, c.somewhatHelpfulValueTsv, c.notHelpfulValueTsv], numRatings
+      ),
+    }
+  )
+  for tag in c.helpfulTagsTSVOrder + c.notHelpfulTagsTSVOrder:
+    ratings[tag] = (rng.random(numRatings) < 0.1).astype(np.int64)
+  raterFactors = pd.concat(
+    [
+      pd.DataFrame(
+        {
+          c.raterParticipantIdKey: [f"r{i:04d}" for i in range(numRaters)],
+          c.internalRaterFactor1Key: rng.normal(0, 0.5, numRaters),
+          c.scorerNameKey: scorer.name,
+        }
+      )
+      for scorer in [
+        Scorers.MFCoreScorer,
+        Scorers.MFExpansionScorer,
+        Scorers.MFExpansionPlusScorer,
+      ]
+    ],
+    ignore_index=True,
+  )
+  return notes, ratings, noteStatusHistory, raterFactors
+
+
+def _add_ratings(notes, ratings, noteIds, minutesLater):
+  """Add a rating by a new rater to each of noteIds, minutesLater after the latest rating."""
+  newRatings = ratings.drop_duplicates(c.noteIdKey).set_index(c.noteIdKey).loc[noteIds]
+  newRatings = newRatings.reset_index()[ratings.columns]
+  newRatings[c.raterParticipantIdKey] = [f"new{minutesLater}-{i}" for i in range(len(noteIds))]
+  newRatings[c.createdAtMillisKey] = ratings[c.createdAtMillisKey].max() + minutesLater * 60000
+  return pd.concat([ratings, newRatings], ignore_index=True)
+
+
+def test_post_digests_ignore_row_order():
+  notes, ratings, noteStatusHistory, _ = _make_inputs(20)
+  digests = get_post_digests(notes, ratings, noteStatusHistory)
+  shuffled = get_post_digests(
+    notes.sample(frac=1, random_state=1),
+    ratings.sample(frac=1, random_state=2),
+    noteStatusHistory.sample(frac=1, random_state=3),
+  )
+  assert len(digests) == notes[c.tweetIdKey].nunique()
+  pd.testing.assert_frame_equal(digests, shuffled)
+
+
+def test_post_digests_change_with_rows_on_post():
+  notes, ratings, noteStatusHistory, _ = _make_inputs(20)
+  digests = get_post_digests(notes, ratings, noteStatusHistory)
+  ratedNote = notes.iloc[0]
+  editedNote = notes[notes[c.tweetIdKey] != ratedNote[c.tweetIdKey]].iloc[0]
+
+  # Adding a rating changes only the digest of the post of the rated note.
+  added = get_post_digests(
+    notes, _add_ratings(notes, ratings, [ratedNote[c.noteIdKey]], 5), noteStatusHistory
+  )
+  changed = digests[postDigestKey] != added[postDigestKey]
+  assert added[c.tweetIdKey].equals(digests[c.tweetIdKey])
+  assert digests.loc[changed, c.tweetIdKey].tolist() == [ratedNote[c.tweetIdKey]]
+
+  # Editing a status history row changes only the digest of the post of the edited note.
+  editedHistory = noteStatusHistory.copy()
+  editedRow = editedHistory[c.noteIdKey] == editedNote[c.noteIdKey]
+  editedHistory.loc[editedRow, c.currentDecidedByKey] = "ScoringDriftGuard (v1.0)"
+  edited = get_post_digests(notes, ratings, editedHistory)
+  changed = digests[postDigestKey] != edited[postDigestKey]
+  assert digests.loc[changed, c.tweetIdKey].tolist() == [editedNote[c.tweetIdKey]]
+
+  # Removing a rating changes only the digest of the post of the rated note.
+  removed = get_post_digests(notes, ratings.drop(index=ratings.index[0]), noteStatusHistory)
+  removedTweetId = notes.set_index(c.noteIdKey).loc[ratings.iloc[0][c.noteIdKey], c.tweetIdKey]
+  changed = digests[postDigestKey] != removed[postDigestKey]
+  assert digests.loc[changed, c.tweetIdKey].tolist() == [removedTweetId]
+
+
+def _make_store_frames(tweetIds, digest):
+  posts = pd.DataFrame(
+    {
+      c.tweetIdKey: tweetIds,
+      postDigestKey: np.full(len(tweetIds), digest, dtype=np.uint64),
+      postRecentRatingsKey: False,
+    }
+  )
+  notes = pd.DataFrame(
+    {c.noteIdKey: [t * 10 for t in tweetIds], c.tweetIdKey: tweetIds, "feature": digest}
+  )
+  return posts, notes
+
+
+def test_store_load_and_append(tmp_path):
+  store = PFlipFeatureStore(str(tmp_path), maxSegments=8)
+  assert store.load("v1") is None
+
+  store.append("v1", *_make_store_frames([1, 2, 3], 10))
+  store.append("v1", *_make_store_frames([2], 20))
+  posts, notes = store.load("v1")
+  assert len(os.listdir(tmp_path)) == 2
+  assert posts.set_index(c.tweetIdKey)[postDigestKey].to_dict() == {1: 10, 2: 20, 3: 10}
+  assert notes.set_index(c.noteIdKey)["feature"].to_dict() == {10: 10, 20: 20, 30: 10}
+  assert store.load("v2") is None
+
+
+def test_store_compaction_drops_dead_posts(tmp_path):
+  store = PFlipFeatureStore(str(tmp_path), maxSegments=2)
+  store.append("v1", *_make_store_frames([1, 2, 3], 10))
+  store.append("v1", *_make_store_frames([2], 20))
+  # Post 3 is no longer scored.  Segments are compacted into the live posts.
+  livePosts, liveNotes = _make_store_frames([1, 2, 4], 30)
+  store.append("v1", *_make_store_frames([4], 30), livePosts, liveNotes)
+
+  assert len(os.listdir(tmp_path)) == 1
+  posts, notes = store.load("v1")
+  assert sorted(posts[c.tweetIdKey]) == [1, 2, 4]
+  assert sorted(notes[c.noteIdKey]) == [10, 20, 40]
+
+
+def test_store_removes_stale_feature_versions(tmp_path):
+  store = PFlipFeatureStore(str(tmp_path))
+  store.append("v1", *_make_store_frames([1, 2], 10))
+  store.append("v1", *_make_store_frames([2], 20))
+  store.append("v2", *_make_store_frames([1], 30))
+
+  assert len(os.listdir(tmp_path)) == 1
+  assert store.load("v1") is None
+  posts, _ = store.load("v2")
+  assert posts[c.tweetIdKey].tolist() == [1]
+
+
+@pytest.fixture(scope="module")
+def fitted_model():
+  notes, ratings, noteStatusHistory, raterFactors = _make_inputs(300)
+  model = PFlipPlusModel(seed=1)
+  model.fit(notes.copy(), ratings.copy(), noteStatusHistory.copy(), raterFactors)
+  return model
+
+
+def _assert_predictions_equal(actual, expected):
+  actual = actual.astype({c.noteIdKey: np.int64}).sort_values(c.noteIdKey, ignore_index=True)
+  expected = expected.astype({c.noteIdKey: np.int64}).sort_values(c.noteIdKey, ignore_index=True)
+  pd.testing.assert_frame_equal(actual, expected)
+
+
+def _assert_stored_notes_equal(actual, expected):
+  actual = actual.sort_values(c.noteIdKey, ignore_index=True)
+  expected = expected.sort_values(c.noteIdKey, ignore_index=True)
+  pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_store_backed_prediction_matches_cold_prediction(fitted_model, tmp_path):
+  notes, ratings, noteStatusHistory, raterFactors = _make_inputs(150, seed=1)
+  store = PFlipFeatureStore(str(tmp_path / "store"), maxSegments=3)
+  featureVersion = fitted_model._get_feature_version(raterFactors)
+  rng = np.random.default_rng(0)
+
+  def predict(featureStore):
+    return fitted_model.predict(
+      notes.copy(),
+      ratings.copy(),
+      noteStatusHistory.copy(),
+      raterFactors,
+      maxBatchSize=100,
+      featureStore=featureStore,
+    )
+
+  def check(numSegments):
+    expected = predict(None)
+    _assert_predictions_equal(predict(store), expected)
+    assert len(os.listdir(store.storeDir)) == numSegments
+    # Stored features match features computed from scratch.
+    coldStore = PFlipFeatureStore(str(tmp_path / f"cold{len(os.listdir(tmp_path))}"))
+    _assert_predictions_equal(predict(coldStore), expected)
+    _assert_stored_notes_equal(store.load(featureVersion)[1], coldStore.load(featureVersion)[1])
+    return expected
+
+  # Cold store, warm store, and two rounds of new ratings, the last of which compacts the store.
+  # Posts with recent ratings are recomputed each run, so every run appends a segment.
+  # The last round adds ratings days after the first, so stored recent rating windows expire.
+  for minutesLater, numSegments in [(None, 1), (None, 2), (20, 3), (60 * 24 * 3, 1)]:
+    if minutesLater is not None:
+      ratedNoteIds = rng.choice(notes[c.noteIdKey], 5, replace=False)
+      ratings = _add_ratings(notes, ratings, ratedNoteIds, minutesLater)
+    assert set(check(numSegments)[LABEL]) == {"FLIP", "CRH"}
+
+  # Remove ratings and change statuses without adding recent ratings.  Only the post digests
+  # show that these posts changed.
+  editedNoteIds = rng.choice(notes[c.noteIdKey], 30, replace=False)
+  ratings = ratings[
+    ~ratings[c.noteIdKey].isin(editedNoteIds[:15]) | ratings.duplicated(c.noteIdKey, keep="last")
+  ]
+  noteStatusHistory = noteStatusHistory.copy()
+  editedStatuses = noteStatusHistory[c.noteIdKey].isin(editedNoteIds[15:])
+  noteStatusHistory.loc[editedStatuses, c.firstNonNMRLabelKey] = c.currentlyRatedHelpful
+  noteStatusHistory.loc[editedStatuses, c.timestampMillisOfNoteFirstNonNMRLabelKey] = (
+    noteStatusHistory.loc[editedStatuses, c.createdAtMillisKey] + 3600000
+  )
+  check(2)
+
+  # Labels stored by a different model are predicted again from stored features.
+  fitted_model._predictionThreshold += 0.5
+  try:
+    check(3)
+  finally:
+    fitted_model._predictionThreshold -= 0.5
+
+
+def _load_model_without_fit_id(state):
+  """Return the model unpickled from state, as serialized before _fitId was added."""
+  state = state.copy()
+  del state["_fitId"]
+  model = PFlipPlusModel.__new__(PFlipPlusModel)
+  model.__setstate__(state)
+  return model
+
+
+def test_model_version_of_old_pickles_is_deterministic(fitted_model):
+  state = fitted_model.__getstate__()
+  versions = [_load_model_without_fit_id(state)._get_model_version() for _ in range(2)]
+  assert versions[0] == versions[1]
+  assert versions[0] != fitted_model._get_model_version()
+
+  # A model with different coefficients has a different version.
+  pipeline = copy.deepcopy(fitted_model._pipeline)
+  pipeline[-1].coef_ = pipeline[-1].coef_ * 2
+  otherVersion = _load_model_without_fit_id({**state, "_pipeline": pipeline})._get_model_version()
+  assert otherVersion != versions[0]
+
+
+
+
@@ -0,0 +1,47 @@
+from scoring import constants as c
+from scoring.post_selection_similarity import (
+  _get_pair_counts_dict,
+  _get_pair_counts_dict_vectorized,
+)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _make_ratings(numRatings: int, numTweets: int, numRaters: int, seed: int) -> pd.DataFrame:
+  rng = np.random.default_rng(seed)
+  tweetIds = rng.integers(0, numTweets, size=numRatings)
+  return pd.DataFrame(
+    {
+      c.tweetIdKey: tweetIds,
+      # Several notes per tweet, with note ids unique across tweets.
+      c.noteIdKey: tweetIds * 10 + rng.integers(0, 3, size=numRatings),
+      c.raterParticipantIdKey: np.array([f"rater{i:04d}" for i in range(numRaters)])[
+        rng.integers(0, numRaters, size=numRatings)
+      ],
+      # Coarse timestamps produce ties and ratings exactly windowMillis apart.
+      c.createdAtMillisKey: rng.integers(0, 200, size=numRatings) * 1000,
+    }
+  )
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("windowMillis", [0, 1000, 20_000])
+def test_vectorized_pair_counts_match_loop(seed, windowMillis):
+  ratings = _make_ratings(numRatings=3000, numTweets=40, numRaters=60, seed=seed)
+  expected = _get_pair_counts_dict(ratings.copy(), windowMillis=windowMillis)
+  assert expected
+  assert _get_pair_counts_dict_vectorized(ratings, windowMillis=windowMillis) == expected
+
+
+def test_vectorized_pair_counts_match_loop_across_chunks():
+  ratings = _make_ratings(numRatings=3000, numTweets=40, numRaters=60, seed=7)
+  expected = _get_pair_counts_dict(ratings.copy(), windowMillis=20_000)
+  actual = _get_pair_counts_dict_vectorized(ratings, windowMillis=20_000, maxPairsPerChunk=1000)
+  assert actual == expected
+
+
+def test_vectorized_pair_counts_empty():
+  ratings = _make_ratings(numRatings=0, numTweets=1, numRaters=1, seed=0)
+  assert _get_pair_counts_dict_vectorized(ratings, windowMillis=1000) == dict()
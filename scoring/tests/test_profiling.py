@@ -0,0 +1,161 @@
+import pickle
+import threading
+import time
+
+from scoring import profiling
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def disable_profiling():
+  yield
+  if profiling.is_enabled():
+    profiling.disable()
+
+
+def _busy(seconds):
+  end = time.perf_counter() + seconds
+  while time.perf_counter() < end:
+    pass
+
+
+def _run_worker_task(value):
+  with profiling.span("worker inner"):
+    profiling.record_frame("frame", pd.DataFrame({"a": range(value)}))
+    _busy(0.02)
+  return value * 2
+
+
+def _record_nested_spans():
+  with profiling.span("outer"):
+    with profiling.span("inner 1"):
+      _busy(0.01)
+    with profiling.span("inner 2"):
+      with profiling.span("innermost"):
+        _busy(0.01)
+
+
+def test_spans_nest_per_thread():
+  profiling.enable()
+  thread = threading.Thread(target=_record_nested_spans)
+  with profiling.span("main"):
+    thread.start()
+    thread.join()
+  profile = profiling.disable()
+
+  assert sorted(span.name for span in profile.spans) == ["main", "outer"]
+  main = next(span for span in profile.spans if span.name == "main")
+  outer = next(span for span in profile.spans if span.name == "outer")
+  assert main.children == []
+  assert main.tid != outer.tid
+  assert [child.name for child in outer.children] == ["inner 1", "inner 2"]
+  assert [child.name for child in outer.children[1].children] == ["innermost"]
+  for child in outer.children:
+    assert child.tid == outer.tid
+    assert outer.startSeconds <= child.startSeconds
+    assert child.startSeconds + child.wallSeconds <= outer.startSeconds + outer.wallSeconds
+
+
+def test_span_is_noop_when_disabled():
+  with profiling.span("unprofiled") as span:
+    profiling.record_frame("frame", pd.DataFrame({"a": [1]}))
+  assert span is None
+  assert profiling.get_profile() is None
+
+
+def test_worker_profile_is_merged_after_pickling():
+  profile = profiling.enable()
+  task = profiling.profiled_task("worker", _run_worker_task)
+  profiling.disable()
+  # The task runs in a worker process, where profiling is not enabled.
+  workerResult = pickle.loads(pickle.dumps(task(3)))
+  assert isinstance(workerResult, profiling.ProfiledResult)
+  assert profiling.unwrap_result(workerResult) == 6
+  assert profile.spans == []
+
+  profile = profiling.enable()
+  with profiling.span("parent"):
+    assert profiling.unwrap_result(workerResult) == 6
+  profiling.disable()
+
+  assert [span.name for span in profile.spans] == ["parent", "worker"]
+  worker = profile.spans[1]
+  assert [child.name for child in worker.children] == ["worker inner"]
+  assert worker.children[0].frames["frame"].rows == 3
+  assert worker.wallSeconds >= worker.children[0].wallSeconds >= 0.02
+
+
+def test_profiled_task_is_unwrapped_when_disabled():
+  assert profiling.profiled_task("worker", _run_worker_task) is _run_worker_task
+  assert profiling.unwrap_result(6) == 6
+
+
+def _record_sampled_profile():
+  # As if recorded by a worker process.
+  workerResult = pickle.loads(pickle.dumps(profiling.run_profiled("worker", 0.002, _busy, 0.05)))
+  profile = profiling.enable(samplingIntervalSeconds=0.002)
+  thread = threading.Thread(target=_record_nested_spans)
+  thread.start()
+  _record_nested_spans()
+  thread.join()
+  profiling.unwrap_result(workerResult)
+  profiling.disable()
+  assert profile.stackSamples and all(s.samples for s in profile.stackSamples)
+  return profile
+
+
+def test_chrome_trace_structure():
+  trace = pickle.loads(pickle.dumps(_record_sampled_profile().to_chrome_trace()))
+
+  spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+  assert sorted(event["name"] for event in spans) == sorted(
+    2 * ["outer", "inner 1", "inner 2", "innermost"] + ["worker"]
+  )
+  for event in spans:
+    assert event["ts"] >= 0 and event["dur"] >= 0
+  processNames = [event for event in trace["traceEvents"] if event["ph"] == "M"]
+  assert {event["pid"] for event in processNames} == {event["pid"] for event in spans}
+
+  stackFrames = trace["stackFrames"]
+  assert trace["samples"]
+  for sample in trace["samples"]:
+    assert sample["sf"] in stackFrames
+  for frameId, frame in stackFrames.items():
+    # Parents are defined, and every chain of parents ends at a root.
+    seen = {frameId}
+    while "parent" in frame:
+      assert frame["parent"] in stackFrames and frame["parent"] not in seen
+      seen.add(frame["parent"])
+      frame = stackFrames[frame["parent"]]
+
+
+def test_speedscope_structure():
+  speedscope = _record_sampled_profile().to_speedscope()
+
+  numFrames = len(speedscope["shared"]["frames"])
+  evented = [p for p in speedscope["profiles"] if p["type"] == "evented"]
+  sampled = [p for p in speedscope["profiles"] if p["type"] == "sampled"]
+  # The "worker" span was recorded on the main thread, before "outer".
+  assert len(evented) == 2
+  assert sampled
+  for profile in evented:
+    openFrames = []
+    lastAt = profile["startValue"]
+    for event in profile["events"]:
+      assert 0 <= event["frame"] < numFrames
+      assert event["at"] >= lastAt
+      lastAt = event["at"]
+      if event["type"] == "O":
+        openFrames.append(event["frame"])
+      else:
+        assert event["type"] == "C"
+        assert openFrames.pop() == event["frame"]
+    assert openFrames == []
+    assert profile["endValue"] == lastAt
+  for profile in sampled:
+    assert len(profile["samples"]) == len(profile["weights"])
+    assert profile["startValue"] <= profile["endValue"]
+    for stack in profile["samples"]:
+      assert stack and all(0 <= frame < numFrames for frame in stack)
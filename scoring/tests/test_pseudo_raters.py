@@ -0,0 +1,104 @@
+from scoring import constants as c
+from scoring.matrix_factorization.matrix_factorization import MatrixFactorization
+from scoring.matrix_factorization.pseudo_raters import PseudoRatersRunner
+from scoring.pandas_utils import PandasPatcher
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+
+@pytest.fixture(autouse=True)
+def patched_pandas(monkeypatch):
+  # Pseudoraters rely on the merge and concat arguments added by patch_pandas.
+  patcher = PandasPatcher(False)
+  monkeypatch.setattr(pd.DataFrame, "merge", patcher.safe_merge())
+  monkeypatch.setattr(pd, "concat", patcher.safe_concat())
+
+
+def _make_ratings(numNotes=40, numRaters=40, ratingsPerRater=20, seed=0):
+  rng = np.random.default_rng(seed)
+  noteFactors = rng.normal(size=numNotes)
+  raterFactors = rng.normal(size=numRaters)
+  raterIds = np.repeat(np.arange(numRaters), ratingsPerRater)
+  noteIds = np.concatenate(
+    [rng.choice(numNotes, ratingsPerRater, replace=False) for _ in range(numRaters)]
+  )
+  score = noteFactors[noteIds] * raterFactors[raterIds]
+  return pd.DataFrame(
+    {
+      c.noteIdKey: noteIds.astype(np.int64),
+      c.raterParticipantIdKey: [f"r{i}" for i in raterIds],
+      c.helpfulNumKey: (score + rng.normal(scale=0.3, size=len(score)) > 0).astype(np.float32),
+    }
+  )
+
+
+def test_batched_scenarios_match_separate_fits():
+  ratings = _make_ratings()
+  mf = MatrixFactorization(seed=0)
+  noteParams, raterParams, globalBias = mf.run_mf(ratings)
+
+  results = [
+    PseudoRatersRunner(
+      ratings, noteParams, raterParams, globalBias, mf, batchScenarios=batchScenarios
+    ).compute_note_parameter_confidence_bounds_with_pseudo_raters()
+    for batchScenarios in [False, True]
+  ]
+  pd.testing.assert_frame_equal(results[0], results[1], check_exact=False, atol=1e-5)
+
+
+def _get_rater_params(mf):
+  _, raterParams = mf._get_parameters_from_trained_model(flipFactorsForIdentification=False)
+  cols = [c.internalRaterInterceptKey, c.internalRaterFactor1Key]
+  return raterParams.set_index(c.raterParticipantIdKey)[cols]
+
+
+def test_batched_and_separate_fits_use_the_same_rater_parameters(monkeypatch):
+  ratings = _make_ratings()
+  mf = MatrixFactorization(seed=0)
+  noteParams, raterParams, globalBias = mf.run_mf(ratings)
+  createModel = PseudoRatersRunner._create_new_model_with_extreme_raters_from_original_params
+  models = []
+
+  def create_and_keep_model(self, ratingFeaturesAndLabels):
+    models.append(createModel(self, ratingFeaturesAndLabels))
+    return models[-1]
+
+  monkeypatch.setattr(
+    PseudoRatersRunner,
+    "_create_new_model_with_extreme_raters_from_original_params",
+    create_and_keep_model,
+  )
+  for batchScenarios in [True, False]:
+    PseudoRatersRunner(
+      ratings, noteParams, raterParams, globalBias, mf, batchScenarios=batchScenarios
+    ).compute_note_parameter_confidence_bounds_with_pseudo_raters()
+  # The batched model followed by one model per separate (already fit) scenario.
+  batchedModel, *separateModels = models
+  assert len(separateModels) > 1
+  batchedParams = _get_rater_params(batchedModel)
+  for separateModel in separateModels:
+    pd.testing.assert_frame_equal(_get_rater_params(separateModel), batchedParams)
+  pd.testing.assert_frame_equal(
+    batchedParams.loc[raterParams[c.raterParticipantIdKey]].reset_index(drop=True),
+    raterParams[[c.internalRaterInterceptKey, c.internalRaterFactor1Key]].astype(np.float32),
+  )
+
+
+def test_changed_rater_parameters_fail_the_check(monkeypatch):
+  ratings = _make_ratings()
+  mf = MatrixFactorization(seed=0)
+  noteParams, raterParams, globalBias = mf.run_mf(ratings)
+  fitModel = MatrixFactorization._fit_model
+
+  def fit_and_move_raters(self, *args, **kwargs):
+    fitModel(self, *args, **kwargs)
+    with torch.no_grad():
+      self.mf_model.user_intercepts.weight[0] += 0.1
+
+  monkeypatch.setattr(MatrixFactorization, "_fit_model", fit_and_move_raters)
+  runner = PseudoRatersRunner(ratings, noteParams, raterParams, globalBias, mf)
+  with pytest.raises(AssertionError, match="rater parameters changed"):
+    runner.compute_note_parameter_confidence_bounds_with_pseudo_raters()
@@ -0,0 +1,96 @@
+from scoring.rating_windows import RatingWindows
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _make_ratings(numNotes, numRatings, rng, farFuture=False):
+  noteIds = pd.Series(rng.choice(10**9, numNotes, replace=False))
+  ratings = pd.DataFrame(
+    {
+      # Some ratings are on notes which are not counted, and some notes have no ratings.
+      "noteId": rng.choice(np.concatenate([noteIds.to_numpy()[:-3], [-1, -2]]), numRatings),
+      # Many ratings share a time, so window edges often coincide with ratings.
+      "millis": 1760000000000 + rng.integers(0, 200, numRatings) * 30000,
+    }
+  )
+  if farFuture:
+    # A single far future rating widens the range of times so combined keys overflow int64.
+    ratings.loc[0, "millis"] = 2**60
+  return noteIds, ratings
+
+
+def _count_brute_force(noteIds, ratings, inWindow):
+  counts = ratings[inWindow].groupby("noteId").size()
+  return counts.reindex(noteIds, fill_value=0).to_numpy()
+
+
+@pytest.mark.parametrize("farFuture", [False, True])
+def test_window_counts_match_brute_force(farFuture):
+  rng = np.random.default_rng(int(farFuture))
+  noteIds, ratings = _make_ratings(50, 2000, rng, farFuture)
+  windows = RatingWindows(noteIds, ratings["noteId"], ratings["millis"])
+  assert (windows._keys is None) == farFuture
+
+  np.testing.assert_array_equal(
+    windows.totals, _count_brute_force(noteIds, ratings, np.ones(len(ratings), dtype=bool))
+  )
+  # Per-note edges, including edges on rating times, between rating times and out of range.
+  edges = pd.Series(
+    1760000000000
+    + rng.integers(-10, 210, len(noteIds)) * 30000
+    + rng.choice([0, 0.5, 15000], len(noteIds)),
+    index=noteIds,
+  )
+  ratingEdges = edges.loc[ratings["noteId"].where(ratings["noteId"].isin(noteIds), noteIds[0])]
+  np.testing.assert_array_equal(
+    windows.count_before(edges.to_numpy()),
+    _count_brute_force(noteIds, ratings, ratings["millis"].to_numpy() < ratingEdges.to_numpy()),
+  )
+  np.testing.assert_array_equal(
+    windows.count_after(edges.to_numpy()),
+    _count_brute_force(noteIds, ratings, ratings["millis"].to_numpy() > ratingEdges.to_numpy()),
+  )
+  edge = 1760000000000 + 100 * 30000
+  np.testing.assert_array_equal(
+    windows.count_before(edge), _count_brute_force(noteIds, ratings, ratings["millis"] < edge)
+  )
+  np.testing.assert_array_equal(
+    windows.count_after(edge), _count_brute_force(noteIds, ratings, ratings["millis"] > edge)
+  )
+
+
+def _max_window_counts_brute_force(noteIds, ratings, widthMillis, alignMillis):
+  counts = {}
+  for noteId, millis in ratings.groupby("noteId")["millis"]:
+    millis = millis.to_numpy()
+    counts[noteId] = max(
+      ((millis >= start) & (millis < start + widthMillis)).sum()
+      for start in (millis // alignMillis) * alignMillis
+    )
+  return pd.Series(counts).reindex(noteIds, fill_value=0).to_numpy()
+
+
+@pytest.mark.parametrize("farFuture", [False, True])
+@pytest.mark.parametrize("widthMillis,alignMillis", [(60000, 60000), (300000, 60000), (30000, 1)])
+def test_max_window_counts_match_brute_force(farFuture, widthMillis, alignMillis):
+  rng = np.random.default_rng(2)
+  noteIds, ratings = _make_ratings(40, 1500, rng, farFuture)
+  ratings["millis"] += rng.integers(0, 30000, len(ratings)) * (ratings["millis"] < 2**60)
+  windows = RatingWindows(noteIds, ratings["noteId"], ratings["millis"])
+
+  np.testing.assert_array_equal(
+    windows.max_window_counts(widthMillis, alignMillis),
+    _max_window_counts_brute_force(
+      noteIds, ratings[ratings["noteId"].isin(noteIds)], widthMillis, alignMillis
+    ),
+  )
+
+
+def test_no_ratings():
+  noteIds = pd.Series([1, 2])
+  windows = RatingWindows(noteIds, pd.Series([], dtype=np.int64), pd.Series([], dtype=np.int64))
+  np.testing.assert_array_equal(windows.count_before(10), [0, 0])
+  np.testing.assert_array_equal(windows.count_after(10), [0, 0])
+  np.testing.assert_array_equal(windows.max_window_counts(10, 1), [0, 0])
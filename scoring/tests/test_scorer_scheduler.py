@@ -0,0 +1,83 @@
+from scoring import scorer_scheduler
+from scoring.scorer_scheduler import (
+  ScheduledTask,
+  ScorerCost,
+  ScorerStats,
+  get_peak_memory_bytes,
+  next_task_within_memory_budget,
+  plan_schedule,
+)
+
+
+def _make_stats(tmp_path, costs):
+  stats = ScorerStats(str(tmp_path / "stats.json"))
+  for name, (seconds, peakMemoryBytes) in costs.items():
+    stats.record(name, seconds, peakMemoryBytes)
+  return stats
+
+
+def _make_task(name, peakMemoryBytes):
+  cost = ScorerCost(1.0, peakMemoryBytes) if peakMemoryBytes is not None else None
+  return ScheduledTask(0, name, 1, cost)
+
+
+def test_plan_schedule_orders_longest_job_first(tmp_path):
+  stats = _make_stats(tmp_path, {"a": (10.0, 1), "b": (30.0, 1), "d": (20.0, 1)})
+  schedule = plan_schedule(["a", "b", "c", "d", "e"], [4] * 5, stats, numCores=8)
+  # Units without history go first, in their original order.
+  assert [task.name for task in schedule] == ["c", "e", "b", "d", "a"]
+  assert [task.index for task in schedule] == [2, 4, 1, 3, 0]
+  assert schedule[0].expectedCost is None
+  assert schedule[2].expectedCost == ScorerCost(30.0, 1)
+
+
+def test_plan_schedule_caps_threads_to_cores(tmp_path):
+  stats = _make_stats(tmp_path, {})
+  schedule = plan_schedule(["a", "b", "c"], [8, 1, 3], stats, numCores=8)
+  assert [task.threads for task in schedule] == [2, 1, 2]
+  schedule = plan_schedule(["a", "b", "c"], [8, 1, 3], stats, maxWorkers=2, numCores=8)
+  assert [task.threads for task in schedule] == [4, 1, 3]
+  schedule = plan_schedule(["a", "b", "c"], [8, 1, 3], stats, numCores=2)
+  assert [task.threads for task in schedule] == [1, 1, 1]
+
+
+def test_stats_round_trip(tmp_path):
+  stats = _make_stats(tmp_path, {"a": (1.5, 100)})
+  stats.save()
+  assert ScorerStats(str(tmp_path / "stats.json")).get("a") == ScorerCost(1.5, 100)
+  (tmp_path / "stats.json").write_text("not json")
+  assert ScorerStats(str(tmp_path / "stats.json")).get("a") is None
+
+
+def test_tasks_are_admitted_within_memory_budget():
+  pending = [_make_task("big", 60), _make_task("medium", 30), _make_task("small", 10)]
+  assert next_task_within_memory_budget(pending, [], 100).name == "big"
+  running = [_make_task("big", 60)]
+  # The first pending task which fits next to the running tasks is admitted.
+  assert next_task_within_memory_budget(pending[1:], running, 100).name == "medium"
+  running.append(_make_task("medium", 30))
+  assert next_task_within_memory_budget(pending[2:], running, 100).name == "small"
+  running.append(_make_task("small", 10))
+  assert next_task_within_memory_budget([_make_task("more", 1)], running, 100) is None
+  # Units without history are expected to use no memory.
+  assert next_task_within_memory_budget([_make_task("new", None)], running, 100).name == "new"
+
+
+def test_task_over_budget_runs_alone():
+  pending = [_make_task("huge", 500), _make_task("small", 10)]
+  # The small task is admitted next to a running task, and the huge task waits until nothing
+  # else is running.
+  running = [_make_task("other", 50)]
+  assert next_task_within_memory_budget(pending, running, 100).name == "small"
+  assert next_task_within_memory_budget(pending[:1], running, 100) is None
+  assert next_task_within_memory_budget(pending[:1], [], 100).name == "huge"
+
+
+def test_peak_memory_excludes_shared_memory(monkeypatch):
+  class Usage:
+    ru_maxrss = 1000
+
+  monkeypatch.setattr(scorer_scheduler.resource, "getrusage", lambda who: Usage)
+  assert get_peak_memory_bytes() == 1024000
+  assert get_peak_memory_bytes(24000) == 1000000
+  assert get_peak_memory_bytes(2048000) == 0
@@ -0,0 +1,171 @@
+from typing import List, Optional, Set
+
+from scoring import constants as c
+from scoring.pandas_utils import PandasPatcher
+from scoring.scoring_rules import (
+  DefaultRule,
+  RuleFromFunction,
+  RuleID,
+  ScoringDriftGuard,
+  ScoringRule,
+  apply_scoring_rules,
+)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def patched_pandas(monkeypatch):
+  # The rules engines rely on the merge and concat arguments added by patch_pandas.
+  patcher = PandasPatcher(False)
+  monkeypatch.setattr(pd.DataFrame, "merge", patcher.safe_merge())
+  monkeypatch.setattr(pd, "concat", patcher.safe_concat())
+
+
+class _TestRuleID:
+  """Stands in for RuleID, which has too few members to exercise more than 64 rules."""
+
+  def __init__(self, name: str) -> None:
+    self._name = name
+
+  def get_name(self) -> str:
+    return f"{self._name} (v1.0)"
+
+
+class _DuplicateNotesRule(ScoringRule):
+  """Returns some notes twice, with different statuses."""
+
+  def __init__(self, ruleID, noteIds: np.ndarray) -> None:
+    super().__init__(ruleID, set())
+    self._noteIds = noteIds
+
+  def score_notes(self, noteStats, currentLabels, statusColumn):
+    noteIds = np.concatenate([self._noteIds, self._noteIds[::2]])
+    statuses = [c.currentlyRatedHelpful] * len(self._noteIds) + [c.currentlyRatedNotHelpful] * len(
+      self._noteIds[::2]
+    )
+    return pd.DataFrame({c.noteIdKey: noteIds, statusColumn: statuses}), None
+
+
+def _apply_scoring_rules_with_concat(
+  noteStats: pd.DataFrame,
+  rules: List[ScoringRule],
+  statusColumn: str,
+  ruleColumn: str,
+  decidedByColumn: Optional[str] = None,
+) -> pd.DataFrame:
+  """apply_scoring_rules before rule results were kept in note-aligned arrays."""
+  noteLabels = pd.DataFrame.from_dict(
+    {c.noteIdKey: pd.Series([], dtype=np.int64), statusColumn: pd.Series([], dtype=object)}
+  )
+  noteRules = pd.DataFrame.from_dict(
+    {c.noteIdKey: pd.Series([], dtype=np.int64), ruleColumn: pd.Series([], dtype=object)}
+  )
+  noteColumns = pd.DataFrame.from_dict({c.noteIdKey: pd.Series([], dtype=np.int64)})
+  ruleIDs: Set = set()
+  for rule in rules:
+    rule.check_dependencies(ruleIDs)
+    ruleIDs.add(rule.get_rule_id())
+    noteStatusUpdates, additionalColumns = rule.score_notes(noteStats, noteLabels, statusColumn)
+    unsafeAllowed = {c.internalRatingStatusKey, c.finalRatingStatusKey, c.defaultIndexKey}
+    noteLabels = (
+      pd.concat([noteLabels, noteStatusUpdates], unsafeAllowed=unsafeAllowed)
+      .groupby(c.noteIdKey)
+      .tail(1)
+    )
+    noteRules = pd.concat(
+      [
+        noteRules,
+        pd.DataFrame.from_dict(
+          {c.noteIdKey: noteStatusUpdates[c.noteIdKey], ruleColumn: rule.get_name()}
+        ),
+      ],
+      unsafeAllowed={c.internalActiveRulesKey, c.defaultIndexKey, c.metaScorerActiveRulesKey},
+    )
+    if additionalColumns is not None:
+      noteColumns = noteColumns.merge(
+        additionalColumns, on=c.noteIdKey, how="outer", unsafeAllowed=c.defaultIndexKey
+      )
+  noteRules = noteRules.groupby(c.noteIdKey).aggregate(list).reset_index()
+  if decidedByColumn:
+    noteRules[decidedByColumn] = [rules[-1] for rules in noteRules[ruleColumn]]
+  noteRules[ruleColumn] = [",".join(activeRules) for activeRules in noteRules[ruleColumn]]
+  scoredNotes = noteStats.merge(noteLabels, on=c.noteIdKey, how="inner")
+  scoredNotes = scoredNotes.merge(noteRules, on=c.noteIdKey, how="inner")
+  scoredNotes = scoredNotes.merge(noteColumns, on=c.noteIdKey, how="left")
+  scoredNotes[c.currentlyRatedHelpfulBoolKey] = scoredNotes[statusColumn] == c.currentlyRatedHelpful
+  scoredNotes[c.currentlyRatedNotHelpfulBoolKey] = (
+    scoredNotes[statusColumn] == c.currentlyRatedNotHelpful
+  )
+  scoredNotes[c.awaitingMoreRatingsBoolKey] = scoredNotes[statusColumn] == c.needsMoreRatings
+  return scoredNotes
+
+
+def _make_rules(noteStats: pd.DataFrame, numRules: int, rng: np.random.Generator):
+  statuses = [c.currentlyRatedHelpful, c.currentlyRatedNotHelpful, c.needsMoreRatings]
+  rules: List[ScoringRule] = [
+    DefaultRule(_TestRuleID("Default"), set(), c.needsMoreRatings),
+    _DuplicateNotesRule(
+      _TestRuleID("Duplicates"), rng.choice(noteStats[c.noteIdKey], 20, replace=False)
+    ),
+  ]
+  for i in range(numRules):
+    threshold = rng.uniform(0.7, 1.0)
+    rules.append(
+      RuleFromFunction(
+        _TestRuleID(f"Rule{i}"),
+        set(),
+        statuses[i % len(statuses)],
+        lambda noteStats, threshold=threshold: noteStats["score"] > threshold,
+        onlyApplyToNotesThatSayTweetIsMisleading=bool(i % 2),
+      )
+    )
+  lockedStatus = noteStats[[c.noteIdKey]].copy()
+  lockedStatus[c.lockedStatusKey] = np.where(
+    rng.random(len(noteStats)) < 0.3, rng.choice(statuses, len(noteStats)), None
+  )
+  rules.append(ScoringDriftGuard(RuleID.SCORING_DRIFT_GUARD, set(), lockedStatus))
+  return rules
+
+
+def _make_note_stats(numNotes: int, rng: np.random.Generator) -> pd.DataFrame:
+  return pd.DataFrame(
+    {
+      c.noteIdKey: rng.choice(10**12, numNotes, replace=False).astype(np.int64),
+      c.classificationKey: rng.choice(
+        [c.notesSaysTweetIsMisleadingKey, c.noteSaysTweetIsNotMisleadingKey], numNotes
+      ),
+      "score": rng.random(numNotes),
+    }
+  )
+
+
+def _drop_repeated_rules(activeRules: str) -> str:
+  names = activeRules.split(",")
+  return ",".join(name for (i, name) in enumerate(names) if i == 0 or name != names[i - 1])
+
+
+@pytest.mark.parametrize("numRules", [10, 70])
+def test_apply_scoring_rules_matches_concat_engine(numRules):
+  rng = np.random.default_rng(numRules)
+  noteStats = _make_note_stats(300, rng)
+  rules = _make_rules(noteStats, numRules, rng)
+  args = (c.finalRatingStatusKey, c.metaScorerActiveRulesKey, c.decidedByKey)
+
+  actual = apply_scoring_rules(noteStats, rules, *args)
+  expected = _apply_scoring_rules_with_concat(noteStats, rules, *args)
+
+  # A rule which returns a note more than once is now listed once in the active rules of the
+  # note, where the concat engine repeated it.
+  duplicated = expected[c.metaScorerActiveRulesKey].str.contains(
+    "Duplicates (v1.0),Duplicates (v1.0)", regex=False
+  )
+  assert duplicated.sum() == 10
+  expected[c.metaScorerActiveRulesKey] = expected[c.metaScorerActiveRulesKey].map(
+    _drop_repeated_rules
+  )
+  assert expected[c.unlockedRatingStatusKey].notna().any()
+  assert len(rules) == numRules + 3
+  pd.testing.assert_frame_equal(actual, expected)
@@ -0,0 +1,50 @@
+from scoring import constants as c
+from scoring.run_scoring import get_df_from_shared_memory, save_df_to_shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _make_frame():
+  return pd.DataFrame(
+    {
+      c.noteIdKey: np.arange(5, dtype=np.int64),
+      c.helpfulNumKey: np.linspace(0, 1, 5, dtype=np.float32),
+      c.notHelpfulOtherTagKey: pd.array([1, None, 0, 1, 0], dtype="Int8"),
+      c.raterParticipantIdKey: ["a", "b", "c", "d", "e"],
+    },
+    index=pd.Index([10, 11, 12, 13, 14], name="row"),
+  )
+
+
+@pytest.mark.parametrize(
+  "transport", [c.SharedMemoryTransport.PARQUET, c.SharedMemoryTransport.COLUMNAR]
+)
+def test_frames_round_trip_through_shared_memory(transport):
+  df = _make_frame()
+  shms = []
+  try:
+    info = save_df_to_shared_memory(df, shms, transport)
+    pd.testing.assert_frame_equal(get_df_from_shared_memory(info), df)
+  finally:
+    for shm in shms:
+      shm.close()
+      shm.unlink()
+
+
+def test_columnar_frames_are_private_copies():
+  df = _make_frame()
+  shms = []
+  try:
+    info = save_df_to_shared_memory(df, shms, c.SharedMemoryTransport.COLUMNAR)
+    mapped = get_df_from_shared_memory(info)
+    mapped.loc[10, c.noteIdKey] = -1
+    mapped[c.helpfulNumKey] *= 2
+    mapped.loc[11, c.notHelpfulOtherTagKey] = 1
+    # Writes stay in the reader and do not reach the segment seen by other readers.
+    pd.testing.assert_frame_equal(get_df_from_shared_memory(info), df)
+  finally:
+    for shm in shms:
+      shm.close()
+      shm.unlink()
@@ -0,0 +1,67 @@
+import mmap
+
+from scoring.snapshot_cache import SnapshotCache
+
+import numpy as np
+import pandas as pd
+
+
+def _make_frame(numRows):
+  rng = np.random.default_rng(0)
+  floats = rng.random(numRows)
+  floats[::7] = np.nan
+  return pd.DataFrame(
+    {
+      "noteId": np.arange(numRows, dtype=np.int64),
+      "raterParticipantId": rng.integers(0, 100, numRows).astype(np.int32),
+      "score": floats,
+      "helpful": pd.array(rng.choice([0, 1, None], numRows), dtype="Int8"),
+      "weight": pd.array(rng.choice([0.5, None], numRows), dtype="Float32"),
+      "label": rng.choice(["a", "b"], numRows).astype(object),
+      "missing": np.where(np.arange(numRows) % 3 == 0, np.nan, "x").astype(object),
+      "flag": rng.random(numRows) > 0.5,
+      "category": pd.Categorical(rng.choice(["x", "y"], numRows)),
+    }
+  )
+
+
+def _is_mapped(values):
+  """Return whether values is a view of a memory mapped file."""
+  while values is not None and not isinstance(values, mmap.mmap):
+    values = values.obj if isinstance(values, memoryview) else getattr(values, "base", None)
+  return values is not None
+
+
+def test_snapshot_round_trips_and_maps_numeric_columns(tmp_path):
+  cache = SnapshotCache(str(tmp_path))
+  # More rows than the default Feather chunk size.
+  df = _make_frame(70000)
+  cache.save("key", {"ratings": df, "notes": None})
+
+  frames = cache.load("key")
+  assert frames["notes"] is None
+  loaded = frames["ratings"]
+  pd.testing.assert_frame_equal(loaded, df)
+  for col in ["noteId", "raterParticipantId", "score"]:
+    assert _is_mapped(loaded[col].to_numpy())
+  for col in ["helpful", "weight"]:
+    assert _is_mapped(loaded[col].array._data)
+  for col in ["label", "missing", "flag"]:
+    assert not _is_mapped(loaded[col].to_numpy())
+  assert not _is_mapped(loaded["category"].array.codes)
+
+
+def test_mapped_columns_are_private_copies(tmp_path):
+  cache = SnapshotCache(str(tmp_path))
+  df = _make_frame(100)
+  cache.save("key", {"ratings": df})
+  loaded = cache.load("key")["ratings"]
+  loaded.loc[0, "noteId"] = -1
+  loaded.loc[0, "helpful"] = pd.NA
+  loaded["score"] *= 2
+  # Updates stay in this process and are not written back to the snapshot.
+  pd.testing.assert_frame_equal(cache.load("key")["ratings"], df)
+
+
+def test_missing_key_is_a_miss(tmp_path):
+  assert SnapshotCache(str(tmp_path)).load("key") is None
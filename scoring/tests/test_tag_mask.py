@@ -0,0 +1,41 @@
+from scoring import constants as c
+from scoring.tag_mask import get_columns, get_tag, pack_tags, select_columns, unpack_tags
+
+import numpy as np
+import pandas as pd
+
+
+def _make_ratings(numRatings=20, seed=0):
+  rng = np.random.default_rng(seed)
+  ratings = pd.DataFrame({c.noteIdKey: np.arange(numRatings), c.helpfulNumKey: 1.0})
+  for tag in c.ratingTagsMaskOrder:
+    ratings[tag] = pd.array(rng.integers(0, 2, numRatings), dtype="Int8")
+  return ratings
+
+
+def test_pack_tags_round_trips():
+  ratings = _make_ratings()
+  packed = pack_tags(ratings)
+  assert list(packed.columns) == [c.noteIdKey, c.helpfulNumKey, c.tagMaskKey]
+  pd.testing.assert_frame_equal(unpack_tags(packed), ratings)
+
+
+def test_pack_tags_treats_missing_tags_as_zero():
+  ratings = _make_ratings()
+  tag = c.notHelpfulIncorrectTagKey
+  ratings.loc[[0, 3], tag] = pd.NA
+  unpacked = unpack_tags(pack_tags(ratings))
+  pd.testing.assert_series_equal(unpacked[tag], ratings[tag].fillna(0))
+
+
+def test_select_columns_keeps_tags_packed():
+  ratings = _make_ratings()
+  packed = pack_tags(ratings)
+  cols = [c.noteIdKey, c.notHelpfulIncorrectTagKey, c.notHelpfulOtherTagKey]
+  selected = select_columns(packed, cols)
+  assert list(selected.columns) == [c.noteIdKey, c.tagMaskKey]
+  pd.testing.assert_frame_equal(get_columns(selected, cols), ratings[cols])
+  pd.testing.assert_series_equal(
+    get_tag(selected, c.notHelpfulOtherTagKey), ratings[c.notHelpfulOtherTagKey]
+  )
+  pd.testing.assert_frame_equal(select_columns(ratings, cols), ratings[cols])
@@ -0,0 +1,134 @@
+import json
+import os
+import time
+
+from scoring.topic_model_cache import TopicModelCache, get_classifier_version, get_text_digests
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+
+def _fit_classifier(texts, labels):
+  pipe = Pipeline(
+    [
+      ("UnigramEncoder", CountVectorizer()),
+      ("tfidf", TfidfTransformer()),
+      ("Classifier", LogisticRegression()),
+    ]
+  )
+  return pipe.fit(texts, labels)
+
+
+_TEXTS = ["war in the east", "match tonight", "free crypto giveaway", "goal scored", "ceasefire"]
+_LABELS = [1, 2, 3, 2, 1]
+
+
+def test_classifier_version_changes_with_fitted_parameters():
+  pipe = _fit_classifier(_TEXTS, _LABELS)
+  assert get_classifier_version(pipe) == get_classifier_version(_fit_classifier(_TEXTS, _LABELS))
+  assert get_classifier_version(pipe) != get_classifier_version(
+    _fit_classifier(_TEXTS + ["another goal"], _LABELS + [2])
+  )
+
+
+def test_probabilities_are_keyed_by_post_and_text(tmp_path):
+  cache = TopicModelCache(str(tmp_path))
+  texts = pd.Series(["a", "b", "c"])
+  tweetIds = np.array([1, 2, 3])
+  probs = np.array([[0.1, 0.9], [0.2, 0.8], [0.3, 0.7]])
+  assert cache.load_probabilities("v1", tweetIds, get_text_digests(texts)) is None
+  cache.save_probabilities("v1", tweetIds, get_text_digests(texts), probs)
+
+  # Post 2 has new text, post 4 is new and post 3 is not requested.
+  loaded = cache.load_probabilities(
+    "v1", np.array([1, 2, 4]), get_text_digests(pd.Series(["a", "b2", "c"]))
+  )
+  np.testing.assert_array_equal(loaded[0], probs[0])
+  assert np.isnan(loaded[1:]).all()
+  # A new classifier version misses every post.
+  assert cache.load_probabilities("v2", tweetIds, get_text_digests(texts)) is None
+
+
+def test_saved_rows_replace_rows_of_the_same_posts(tmp_path):
+  cache = TopicModelCache(str(tmp_path))
+  cache.save_seed_labels(
+    "s1", np.array([1, 2]), get_text_digests(pd.Series(["a", "b"])), np.array([1, 2]), np.zeros(2)
+  )
+  cache.save_seed_labels(
+    "s1", np.array([2]), get_text_digests(pd.Series(["b2"])), np.array([3]), np.ones(1)
+  )
+  labels, conflicted, found = cache.load_seed_labels(
+    "s1", np.array([1, 2, 2]), get_text_digests(pd.Series(["a", "b", "b2"]))
+  )
+  assert found.tolist() == [True, False, True]
+  assert labels[found].tolist() == [1, 3]
+  assert conflicted[found].tolist() == [False, True]
+
+
+def test_least_recently_used_versions_are_evicted(tmp_path):
+  cache = TopicModelCache(str(tmp_path), maxVersions=2)
+  tweetIds = np.array([1])
+  digests = get_text_digests(pd.Series(["a"]))
+  probs = np.array([[0.5, 0.5]])
+  for i, version in enumerate(["v1", "v2"]):
+    cache.save_probabilities(version, tweetIds, digests, probs)
+    path = os.path.join(tmp_path, f"probabilities-{version}.feather")
+    os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+  # Loading v1 makes v2 the least recently used version.
+  assert cache.load_probabilities("v1", tweetIds, digests) is not None
+  cache.save_probabilities("v3", tweetIds, digests, probs)
+
+  assert sorted(os.listdir(tmp_path)) == ["probabilities-v1.feather", "probabilities-v3.feather"]
+  assert cache.load_probabilities("v2", tweetIds, digests) is None
+
+
+def _set_trained_at(cacheDir, seconds):
+  (path,) = [p for p in os.listdir(cacheDir) if p.endswith(".json")]
+  with open(os.path.join(cacheDir, path)) as f:
+    info = json.load(f)
+  info["trainedAtSeconds"] = seconds
+  with open(os.path.join(cacheDir, path), "w") as f:
+    json.dump(info, f)
+
+
+def test_classifier_is_reused_until_stale(tmp_path):
+  cache = TopicModelCache(str(tmp_path), maxClassifierAgeSeconds=3600, maxCorpusGrowth=0.1)
+  pipe = _fit_classifier(_TEXTS, _LABELS)
+  assert cache.load_classifier("v1", "seeds", 100) is None
+  cache.save_classifier("v1", "seeds", pipe, 100)
+
+  loaded = cache.load_classifier("v1", "seeds", 110)
+  assert get_classifier_version(loaded) == get_classifier_version(pipe)
+  # Too many new posts since training.
+  assert cache.load_classifier("v1", "seeds", 111) is None
+  # Other seed terms or another topic model version.
+  assert cache.load_classifier("v1", "other seeds", 100) is None
+  assert cache.load_classifier("v2", "seeds", 100) is None
+  # Trained too long ago.
+  _set_trained_at(tmp_path, time.time() - 3601)
+  assert cache.load_classifier("v1", "seeds", 100) is None
+  # Limits can be disabled.
+  unlimited = TopicModelCache(str(tmp_path), maxClassifierAgeSeconds=None, maxCorpusGrowth=None)
+  assert unlimited.load_classifier("v1", "seeds", 1000) is not None
+
+
+def test_classifier_without_training_info_is_retrained(tmp_path):
+  cache = TopicModelCache(str(tmp_path))
+  cache.save_classifier("v1", "seeds", _fit_classifier(_TEXTS, _LABELS), 100)
+  assert cache.load_classifier("v1", "seeds", 100) is not None
+  for path in os.listdir(tmp_path):
+    if path.endswith(".json"):
+      os.remove(os.path.join(tmp_path, path))
+  assert cache.load_classifier("v1", "seeds", 100) is None
+
+
+def test_classifier_of_other_seed_terms_is_reused_when_kept(tmp_path):
+  cache = TopicModelCache(str(tmp_path), invalidateOnSeedTermChange=False)
+  pipe = _fit_classifier(_TEXTS, _LABELS)
+  cache.save_classifier("v1", "seeds", pipe, 100)
+  loaded = cache.load_classifier("v1", "other seeds", 100)
+  assert get_classifier_version(loaded) == get_classifier_version(pipe)
+  assert cache.load_classifier("v1", "other seeds", 200) is None